@@ -7,7 +7,7 @@ from logging.config import fileConfig
 from pathlib import Path
 
 from alembic import context
-from sqlalchemy import pool
+from sqlalchemy import make_url, pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
@@ -24,6 +24,7 @@ for path in {PROJECT_ROOT, BACKEND_ROOT}:
 from app.core.config import get_settings
 from app.db import models  # pylint: disable=unused-import
 from app.db.base import Base
+from app.db.schema import include_object
 
 config = context.config
 settings = get_settings()
@@ -42,6 +43,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object(make_url(url).get_backend_name()),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -51,7 +53,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object(connection.dialect.name),
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,124 @@
+"""Initial schema: plugins, VCF assets and variants, plugin runs and annotations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 03:48:11.002833
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _json() -> sa.types.TypeEngine:
+    return sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "plugins",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("version", sa.String(length=50), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("entrypoint", sa.String(length=512), nullable=False),
+        sa.Column("authors", _json(), nullable=False),
+        sa.Column("tags", _json(), nullable=False),
+        sa.Column("manifest", _json(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("latest_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", "version", name="uq_plugin_name_version"),
+    )
+    op.create_index("ix_plugins_id", "plugins", ["id"])
+    op.create_index("ix_plugins_name", "plugins", ["name"])
+
+    op.create_table(
+        "vcf_assets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=1024), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("header", sa.Text(), nullable=False),
+        sa.Column("samples", _json(), nullable=False),
+        sa.Column("record_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_vcf_assets_id", "vcf_assets", ["id"])
+
+    op.create_table(
+        "variants",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("contig", sa.String(length=255), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("end_position", sa.Integer(), nullable=False),
+        sa.Column("bin", sa.Integer(), nullable=False),
+        sa.Column("identifier", sa.String(length=255), nullable=True),
+        sa.Column("ref", sa.Text(), nullable=False),
+        sa.Column("alt", sa.Text(), nullable=False),
+        sa.Column("qual", sa.Float(), nullable=True),
+        sa.Column("filter", sa.String(length=255), nullable=True),
+        sa.Column("info", sa.Text(), nullable=True),
+        sa.Column("genotypes", sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(["asset_id"], ["vcf_assets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_variants_asset_locus", "variants", ["asset_id", "contig", "position"])
+    op.create_index("ix_variants_region", "variants", ["contig", "bin", "position"])
+
+    op.create_table(
+        "plugin_runs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("plugin_name", sa.String(length=255), nullable=False),
+        sa.Column("plugin_version", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("parameters", _json(), nullable=False),
+        sa.Column("inputs", _json(), nullable=False),
+        sa.Column("workspace", sa.String(length=1024), nullable=False),
+        sa.Column("cpu", sa.Float(), nullable=False),
+        sa.Column("memory", sa.BigInteger(), nullable=False),
+        sa.Column("exit_code", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("shard_count", sa.Integer(), nullable=True),
+        sa.Column("shards_completed", sa.Integer(), nullable=False),
+        sa.Column("cache_hits", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_plugin_runs_plugin", "plugin_runs", ["plugin_name", "plugin_version"])
+    op.create_index("ix_plugin_runs_status", "plugin_runs", ["status"])
+
+    op.create_table(
+        "annotations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.String(length=36), nullable=False),
+        sa.Column("plugin_name", sa.String(length=255), nullable=False),
+        sa.Column("plugin_version", sa.String(length=50), nullable=False),
+        sa.Column("contig", sa.String(length=255), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("payload", _json(), nullable=False),
+        sa.ForeignKeyConstraint(["run_id"], ["plugin_runs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_annotations_keyset", "annotations", ["contig", "position", "plugin_name", "id"]
+    )
+    op.create_index("ix_annotations_run", "annotations", ["run_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("annotations")
+    op.drop_table("plugin_runs")
+    op.drop_table("variants")
+    op.drop_table("vcf_assets")
+    op.drop_table("plugins")
@@ -0,0 +1,87 @@
+"""Plugin listing indexes: keyset order, JSONB/full-text GIN and the facets fallback.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 05:12:40.318204
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+_SEARCH_VECTOR = (
+    "(to_tsvector('simple'::regconfig, name) || to_tsvector('simple'::regconfig, description))"
+)
+
+
+def _backfill_facets() -> None:
+    connection = op.get_bind()
+    facets = sa.table(
+        "plugin_facets", sa.column("plugin_id"), sa.column("kind"), sa.column("value")
+    )
+    plugins = sa.table(
+        "plugins",
+        sa.column("id"),
+        sa.column("name"),
+        sa.column("description"),
+        sa.column("authors", sa.JSON()),
+        sa.column("tags", sa.JSON()),
+        sa.column("manifest", sa.JSON()),
+    )
+    rows = set()
+    for plugin in connection.execute(sa.select(plugins)):
+        manifest = plugin.manifest or {}
+        values = [("tag", tag) for tag in plugin.tags or []]
+        values += [("author", author) for author in plugin.authors or []]
+        values += [("input", item["media_type"]) for item in manifest.get("inputs", [])]
+        values += [("output", item["media_type"]) for item in manifest.get("outputs", [])]
+        words = re.findall(r"[a-z0-9]+", f"{plugin.name} {plugin.description}".lower())
+        values += [("word", word) for word in words]
+        rows.update((plugin.id, kind, value) for kind, value in values)
+    if rows:
+        op.bulk_insert(
+            facets, [{"plugin_id": row[0], "kind": row[1], "value": row[2]} for row in sorted(rows)]
+        )
+
+
+def upgrade() -> None:
+    op.create_index("ix_plugins_updated", "plugins", ["updated_at", "id"])
+    op.create_table(
+        "plugin_facets",
+        sa.Column("plugin_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("value", sa.String(length=512), nullable=False),
+        sa.ForeignKeyConstraint(["plugin_id"], ["plugins.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("plugin_id", "kind", "value"),
+    )
+    op.create_index("ix_plugin_facets_lookup", "plugin_facets", ["kind", "value", "plugin_id"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        for column in ("tags", "authors", "manifest"):
+            op.create_index(
+                f"ix_plugins_{column}_gin",
+                "plugins",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "jsonb_path_ops"},
+            )
+        op.create_index(
+            "ix_plugins_search", "plugins", [sa.text(_SEARCH_VECTOR)], postgresql_using="gin"
+        )
+    else:
+        _backfill_facets()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_plugins_search", table_name="plugins")
+        for column in ("tags", "authors", "manifest"):
+            op.drop_index(f"ix_plugins_{column}_gin", table_name="plugins")
+    op.drop_table("plugin_facets")
+    op.drop_index("ix_plugins_updated", table_name="plugins")
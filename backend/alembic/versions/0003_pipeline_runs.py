@@ -0,0 +1,55 @@
+"""Pipeline runs and the stage columns linking plugin runs to them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 07:40:02.551870
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pipeline_runs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column(
+            "stages",
+            sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql"),
+            nullable=False,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_pipeline_runs_status", "pipeline_runs", ["status"])
+
+    with op.batch_alter_table("plugin_runs") as batch:
+        batch.add_column(sa.Column("pipeline_id", sa.String(length=36), nullable=True))
+        batch.add_column(sa.Column("stage", sa.String(length=255), nullable=True))
+        batch.create_foreign_key(
+            "fk_plugin_runs_pipeline_id",
+            "pipeline_runs",
+            ["pipeline_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+        batch.create_index("ix_plugin_runs_pipeline", ["pipeline_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch:
+        batch.drop_index("ix_plugin_runs_pipeline")
+        batch.drop_constraint("fk_plugin_runs_pipeline_id", type_="foreignkey")
+        batch.drop_column("stage")
+        batch.drop_column("pipeline_id")
+    op.drop_index("ix_pipeline_runs_status", table_name="pipeline_runs")
+    op.drop_table("pipeline_runs")
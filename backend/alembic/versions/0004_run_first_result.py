@@ -0,0 +1,24 @@
+"""Time of the first queryable annotation of a plugin run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:02:17.804113
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        batch_op.add_column(sa.Column("first_result_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        batch_op.drop_column("first_result_at")
@@ -0,0 +1,49 @@
+"""Measured resource usage of plugin runs and real ``latest_run_at`` values.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:37:52.119406
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+_USAGE_COLUMNS = (
+    ("wall_seconds", sa.Float()),
+    ("cpu_seconds", sa.Float()),
+    ("peak_rss_bytes", sa.BigInteger()),
+    ("read_bytes", sa.BigInteger()),
+    ("write_bytes", sa.BigInteger()),
+    ("record_count", sa.BigInteger()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        batch_op.add_column(sa.Column("container_digest", sa.String(length=255), nullable=True))
+        for name, type_ in _USAGE_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+    # Registration used to copy ``updated_at`` into ``latest_run_at``; derive it
+    # from the runs that actually finished instead.
+    op.execute(
+        """
+        UPDATE plugins SET latest_run_at = (
+            SELECT MAX(plugin_runs.finished_at) FROM plugin_runs
+            WHERE plugin_runs.plugin_name = plugins.name
+              AND plugin_runs.plugin_version = plugins.version
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        for name, _ in reversed(_USAGE_COLUMNS):
+            batch_op.drop_column(name)
+        batch_op.drop_column("container_digest")
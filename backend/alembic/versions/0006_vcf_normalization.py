@@ -0,0 +1,31 @@
+"""Normalization statistics on VCF assets.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:02:41.508233
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("vcf_assets") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "normalization",
+                sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql"),
+                nullable=True,
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("vcf_assets") as batch_op:
+        batch_op.drop_column("normalization")
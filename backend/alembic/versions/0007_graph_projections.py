@@ -0,0 +1,62 @@
+"""Projections of VCF assets onto pangenome graph bubbles.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:24:09.381562
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def _json() -> sa.types.TypeEngine:
+    return sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "graph_projections",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("graph_key", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("variant_count", sa.Integer(), nullable=False),
+        sa.Column("placed_count", sa.Integer(), nullable=False),
+        sa.Column("bubble_count", sa.Integer(), nullable=False),
+        sa.Column("matched_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["asset_id"], ["vcf_assets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("asset_id", "graph_key", name="uq_graph_projection_asset_graph"),
+    )
+    op.create_table(
+        "projected_variants",
+        sa.Column("projection_id", sa.Integer(), nullable=False),
+        sa.Column("variant_id", sa.Integer(), nullable=False),
+        sa.Column("path", sa.String(length=1024), nullable=False),
+        sa.Column("bubble_id", sa.Integer(), nullable=True),
+        sa.Column("traversal", sa.Integer(), nullable=True),
+        sa.Column("ref_nodes", _json(), nullable=False),
+        sa.Column("alt_nodes", _json(), nullable=True),
+        sa.ForeignKeyConstraint(["projection_id"], ["graph_projections.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["variant_id"], ["variants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("projection_id", "variant_id"),
+    )
+    op.create_index(
+        "ix_projected_variants_bubble", "projected_variants", ["bubble_id", "projection_id"]
+    )
+    op.create_index("ix_projected_variants_variant", "projected_variants", ["variant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projected_variants_variant", table_name="projected_variants")
+    op.drop_index("ix_projected_variants_bubble", table_name="projected_variants")
+    op.drop_table("projected_variants")
+    op.drop_table("graph_projections")
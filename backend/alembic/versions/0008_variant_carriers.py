@@ -0,0 +1,110 @@
+"""Carrier bitmaps and allele frequencies on variants.
+
+Variants ingested before this revision are backfilled from their packed
+genotypes, in batches of ``_BACKFILL_BATCH`` rows, so cohort queries cover
+them too. The bitmap encoding is copied here as it was at this revision, so
+later changes to ``app.genomics`` cannot change what this upgrade writes.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 19:11:52.604317
+"""
+
+from typing import Optional
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH = 10_000
+# Roaring-style bitmap layout: container count, (key, kind, cardinality) headers, payloads.
+_ARRAY_LIMIT = 4096
+_BITMAP = 1
+_COUNT = np.dtype("<u4")
+_HEADER = np.dtype([("key", "<u2"), ("kind", "<u2"), ("cardinality", "<u4")])
+_WORDS = 1 << 10
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("variants") as batch_op:
+        batch_op.add_column(sa.Column("carriers", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("carrier_count", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("allele_frequency", sa.Float(), nullable=True))
+    op.create_index("ix_variants_asset_frequency", "variants", ["asset_id", "allele_frequency"])
+    _backfill()
+
+
+def _backfill() -> None:
+    variants = sa.table(
+        "variants",
+        sa.column("id", sa.Integer()),
+        sa.column("genotypes", sa.LargeBinary()),
+        sa.column("carriers", sa.LargeBinary()),
+        sa.column("carrier_count", sa.Integer()),
+        sa.column("allele_frequency", sa.Float()),
+    )
+    update = variants.update().where(variants.c.id == sa.bindparam("variant_id"))
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(variants.c.id, variants.c.genotypes)
+            .where(variants.c.id > last_id, variants.c.genotypes.is_not(None))
+            .order_by(variants.c.id)
+            .limit(_BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for variant_id, genotypes in rows:
+            carriers, count, frequency = _carrier_summary(bytes(genotypes))
+            values.append(
+                {
+                    "variant_id": variant_id,
+                    "carriers": carriers,
+                    "carrier_count": count,
+                    "allele_frequency": frequency,
+                }
+            )
+        connection.execute(update, values)
+        last_id = rows[-1].id
+
+
+def _encode_bitmap(indices: np.ndarray) -> bytes:
+    values = np.unique(np.asarray(indices, dtype=np.uint32))
+    keys, starts, counts = np.unique(values >> 16, return_index=True, return_counts=True)
+    headers = np.zeros(len(keys), dtype=_HEADER)
+    headers["key"] = keys
+    headers["cardinality"] = counts
+    payloads: list[bytes] = []
+    for index, (start, count) in enumerate(zip(starts.tolist(), counts.tolist())):
+        low = (values[start : start + count] & 0xFFFF).astype("<u2")
+        if count <= _ARRAY_LIMIT:
+            payloads.append(low.tobytes())
+        else:
+            headers["kind"][index] = _BITMAP
+            words = np.zeros(_WORDS, dtype="<u8")
+            np.bitwise_or.at(words, low >> 6, np.uint64(1) << (low & 63).astype(np.uint64))
+            payloads.append(words.tobytes())
+    return np.array([len(keys)], dtype=_COUNT).tobytes() + headers.tobytes() + b"".join(payloads)
+
+
+def _carrier_summary(genotypes: bytes) -> tuple[bytes, int, Optional[float]]:
+    codes = np.frombuffer(genotypes, dtype=np.int8)
+    carriers = np.flatnonzero(codes > 0)
+    called = int((codes >= 0).sum())
+    frequency = float(codes[codes > 0].sum()) / (2 * called) if called else None
+    return _encode_bitmap(carriers), len(carriers), frequency
+
+
+def downgrade() -> None:
+    op.drop_index("ix_variants_asset_frequency", table_name="variants")
+    with op.batch_alter_table("variants") as batch_op:
+        batch_op.drop_column("allele_frequency")
+        batch_op.drop_column("carrier_count")
+        batch_op.drop_column("carriers")
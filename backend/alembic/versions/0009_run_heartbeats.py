@@ -0,0 +1,24 @@
+"""Lease renewal time of unfinished plugin runs.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 10:24:06.318275
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("plugin_runs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
@@ -0,0 +1,95 @@
+"""Streaming annotation query endpoints."""
+
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import get_settings
+from app.genomics.intervals import parse_region
+from app.services import annotations as annotation_service
+from app.services import columnar
+
+router = APIRouter(prefix="/annotations", tags=["annotations"])
+
+
+@router.get(
+    "",
+    response_class=StreamingResponse,
+    responses={200: {"content": {annotation_service.NDJSON_MEDIA_TYPE: {}}}},
+)
+async def query_annotations(
+    region: Optional[str] = Query(
+        default=None, description="Region in contig:start-end notation (1-based, inclusive)"
+    ),
+    plugin: Optional[str] = Query(default=None, description="Restrict results to one plugin"),
+    run_id: Optional[str] = Query(default=None, description="Restrict results to one run"),
+    cursor: Optional[str] = Query(default=None, description="Resume after a previous page"),
+    limit: int = Query(default=10_000, ge=1, le=1_000_000),
+) -> StreamingResponse:
+    """Stream annotations as NDJSON ordered by contig, position and plugin.
+
+    When more records match than ``limit``, the last line is
+    ``{"next_cursor": "..."}``; pass it back as ``cursor`` to fetch the next page.
+    """
+
+    try:
+        parsed = parse_region(region) if region is not None else None
+        after = annotation_service.decode_cursor(cursor) if cursor is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        annotation_service.stream_annotations(
+            region=parsed, plugin_name=plugin, run_id=run_id, after=after, limit=limit
+        ),
+        media_type=annotation_service.NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {columnar.ARROW_STREAM_MEDIA_TYPE: {}, columnar.PARQUET_MEDIA_TYPE: {}}}
+    },
+)
+def export_annotations(
+    plugin: Optional[str] = Query(default=None, description="Restrict results to one plugin"),
+    region: Optional[str] = Query(
+        default=None, description="Region in contig:start-end notation (1-based, inclusive)"
+    ),
+    columns: Optional[str] = Query(default=None, description="Comma-separated columns to return"),
+    format: columnar.ExportFormat = Query(default="arrow"),
+) -> StreamingResponse:
+    """Export annotations from the columnar store as an Arrow IPC stream or Parquet file.
+
+    Only the partitions, row groups and column chunks needed for the request
+    are read from disk.
+    """
+
+    settings = get_settings()
+    if not settings.annotation_columnar_dir:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Columnar annotation store is not configured",
+        )
+    try:
+        parsed = parse_region(region) if region is not None else None
+        selected = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        schema, batches = columnar.scan_batches(
+            Path(settings.annotation_columnar_dir),
+            plugin_name=plugin,
+            region=parsed,
+            columns=selected,
+        )
+    except columnar.ColumnarUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        columnar.export_stream(schema, batches, format=format),
+        media_type=columnar.media_type(format),
+    )
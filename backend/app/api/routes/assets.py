@@ -0,0 +1,185 @@
+"""Asset ingestion endpoints."""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import get_read_session, get_session
+from app.genomics.fasta import FastaFormatError
+from app.genomics.intervals import parse_region
+from app.genomics.normalize import CheckRef
+from app.genomics.vcf import VcfFormatError
+from app.models.asset import VcfAssetSummary
+from app.models.graph import GraphProjectionSummary
+from app.models.variant import CohortQuery, CohortQueryResult, CohortStatistics
+from app.repositories import assets as asset_repo
+from app.repositories import projections as projection_repo
+from app.services import cohorts as cohort_service
+from app.services import graph as graph_service
+from app.services import ingest as ingest_service
+from app.services import projection as projection_service
+from app.services import stats as stats_service
+
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+
+@router.post("/vcf", response_model=VcfAssetSummary, status_code=status.HTTP_201_CREATED)
+async def ingest_vcf(
+    request: Request,
+    source: str = Query(default="upload", description="Original location of the uploaded VCF"),
+    normalize: bool = Query(
+        default=False,
+        description="Split multiallelic sites and left-align indels against the reference FASTA",
+    ),
+    check_ref: CheckRef = Query(
+        default="error",
+        description="How to handle REF alleles that disagree with the reference when normalizing",
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> VcfAssetSummary:
+    """Stream a plain or bgzipped VCF request body into the variant store."""
+
+    settings = get_settings()
+    options = None
+    if normalize:
+        if not settings.reference_fasta_path:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Normalization requires PGIP_REFERENCE_FASTA_PATH to be configured",
+            )
+        workers = settings.vcf_normalize_workers
+        options = ingest_service.NormalizeOptions(
+            reference=Path(settings.reference_fasta_path),
+            check_ref=check_ref,
+            executor=ingest_service.normalize_pool(workers),
+            block_size=settings.vcf_normalize_block_size,
+            max_pending=2 * (workers or os.cpu_count() or 1),
+        )
+    try:
+        asset = await ingest_service.ingest_vcf_stream(
+            session,
+            request.stream(),
+            source=source,
+            batch_size=settings.vcf_ingest_batch_size,
+            normalize=options,
+        )
+    except (VcfFormatError, FastaFormatError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return VcfAssetSummary.model_validate(asset)
+
+
+@router.get("/vcf/{asset_id}", response_model=VcfAssetSummary)
+async def get_vcf_asset(
+    asset_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> VcfAssetSummary:
+    """Return ingestion status for a VCF asset, read from the primary."""
+
+    asset = await asset_repo.get_vcf_asset(session, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+    return VcfAssetSummary.model_validate(asset)
+
+
+@router.get("/vcf/{asset_id}/stats", response_model=CohortStatistics)
+async def get_vcf_statistics(
+    asset_id: int,
+    region: Optional[str] = Query(
+        default=None, description="Region in contig:start-end notation (1-based, inclusive)"
+    ),
+    samples: Optional[str] = Query(
+        default=None, description="Comma-separated sample names; all samples when omitted"
+    ),
+    after: int = Query(default=0, ge=0, description="next_after of the previous page"),
+    limit: int = Query(default=10_000, ge=1, le=100_000),
+    session: AsyncSession = Depends(get_read_session),
+) -> CohortStatistics:
+    """Return a page of allele frequency, call rate, heterozygosity and HWE p-value per variant."""
+
+    asset = await asset_repo.get_vcf_asset(session, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    try:
+        parsed = parse_region(region) if region is not None else None
+        return await stats_service.cohort_statistics(
+            session,
+            asset,
+            region=parsed,
+            samples=[name.strip() for name in samples.split(",") if name.strip()] if samples else None,
+            after=after,
+            limit=limit,
+            batch_size=get_settings().stats_batch_size,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+
+@router.post("/vcf/{asset_id}/cohort", response_model=CohortQueryResult)
+async def query_vcf_cohort(
+    asset_id: int,
+    query: CohortQuery,
+    session: AsyncSession = Depends(get_read_session),
+) -> CohortQueryResult:
+    """Return variants whose carriers satisfy sample-set and allele frequency filters."""
+
+    asset = await asset_repo.get_vcf_asset(session, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    try:
+        return await cohort_service.query_cohort(
+            session, asset, query, batch_size=get_settings().stats_batch_size
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+
+@router.post(
+    "/vcf/{asset_id}/projection",
+    response_model=GraphProjectionSummary,
+    status_code=status.HTTP_201_CREATED,
+)
+async def project_vcf_asset(
+    asset_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> GraphProjectionSummary:
+    """Project the asset's variants onto the loaded graph's bubbles, replacing any earlier run."""
+
+    asset = await asset_repo.get_vcf_asset(session, asset_id)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+    try:
+        projection = await projection_service.project_asset(
+            session, asset, batch_size=get_settings().graph_projection_batch_size
+        )
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except projection_service.AssetNotReadyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return GraphProjectionSummary.model_validate(projection)
+
+
+@router.get("/vcf/{asset_id}/projection", response_model=GraphProjectionSummary)
+async def get_vcf_projection(
+    asset_id: int,
+    session: AsyncSession = Depends(get_read_session),
+) -> GraphProjectionSummary:
+    """Return the status of the asset's projection onto the loaded graph."""
+
+    try:
+        graph_key = await asyncio.to_thread(projection_service.graph_key)
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    projection = await projection_repo.get_projection(session, asset_id=asset_id, graph_key=graph_key)
+    if projection is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset has not been projected onto this graph",
+        )
+    return GraphProjectionSummary.model_validate(projection)
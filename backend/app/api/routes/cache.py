@@ -0,0 +1,30 @@
+"""Result cache introspection endpoints."""
+
+from fastapi import APIRouter
+
+from app.models.cache import CacheStatsSummary
+from app.services import runs as run_service
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats", response_model=CacheStatsSummary)
+async def cache_stats() -> CacheStatsSummary:
+    """Return hit/miss counters and the size of the plugin result cache."""
+
+    cache = run_service.get_result_cache()
+    if cache is None:
+        return CacheStatsSummary(enabled=False)
+    stats = cache.stats()
+    return CacheStatsSummary(
+        enabled=True,
+        hits=stats.hits,
+        misses=stats.misses,
+        hit_ratio=stats.hit_ratio,
+        stores=stats.stores,
+        evictions=stats.evictions,
+        bytes_saved=stats.bytes_saved,
+        entries=stats.entries,
+        size_bytes=stats.size_bytes,
+        max_bytes=stats.max_bytes,
+    )
@@ -0,0 +1,213 @@
+"""Pangenome graph endpoints."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import get_read_session
+from app.genomics.gfa import PangenomeGraph
+from app.genomics.minimizers import MinimizerIndexError
+from app.models.graph import (
+    GraphBubble,
+    GraphBubbleList,
+    GraphLayoutSummary,
+    GraphPath,
+    GraphPathList,
+    GraphSearchRequest,
+    GraphSearchResult,
+    GraphSelection,
+    GraphSummary,
+    GraphTile,
+)
+from app.models.variant import VariantRecord
+from app.repositories import projections as projection_repo
+from app.services import graph as graph_service
+from app.services import projection as projection_service
+from app.services import registry
+
+GRAPH_SELECTION_MEDIA_TYPE = "application/vnd.pgip.graph-selection+json"
+
+router = APIRouter(prefix="/graph", tags=["graph"])
+
+
+def require_graph() -> PangenomeGraph:
+    """Dependency returning the loaded graph or a 503 response."""
+
+    try:
+        return graph_service.get_graph()
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+
+
+def require_graph_key() -> str:
+    """Dependency returning the key projections of the loaded graph are stored under."""
+
+    try:
+        return projection_service.graph_key()
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+
+
+@router.get("", response_model=GraphSummary)
+def get_graph_summary(graph: PangenomeGraph = Depends(require_graph)) -> GraphSummary:
+    """Return size statistics for the loaded graph."""
+
+    return GraphSummary(
+        source=graph.metadata["source"],
+        node_count=graph.node_count,
+        edge_count=graph.edge_count,
+        path_count=len(graph.path_names),
+        total_length=graph.metadata["total_length"],
+    )
+
+
+@router.get("/paths", response_model=GraphPathList)
+def list_graph_paths(graph: PangenomeGraph = Depends(require_graph)) -> GraphPathList:
+    """Return the paths embedded in the loaded graph."""
+
+    return GraphPathList(
+        paths=[
+            GraphPath(name=name, steps=len(graph.path_steps(name)), length=graph.path_length(name))
+            for name in graph.path_names
+        ]
+    )
+
+
+@router.get(
+    "/paths/{path_name}/selection",
+    response_model=GraphSelection,
+    responses={200: {"content": {GRAPH_SELECTION_MEDIA_TYPE: {}}}},
+)
+def get_graph_selection(
+    path_name: str,
+    start: int = Query(..., ge=0, description="0-based start offset on the path"),
+    end: int = Query(..., gt=0, description="Exclusive end offset on the path"),
+    context: int = Query(default=0, ge=0, le=10, description="Hops of neighbouring nodes to include"),
+    include_sequence: bool = Query(default=True, description="Embed segment sequences"),
+    graph: PangenomeGraph = Depends(require_graph),
+) -> JSONResponse:
+    """Extract the subgraph covering a path interval as a graph selection."""
+
+    if not graph.has_path(path_name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Path not found")
+    if end <= start or start >= graph.path_length(path_name):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Range must satisfy start < end and start < path length",
+        )
+
+    try:
+        selection = graph_service.extract_selection(
+            path_name,
+            start,
+            end,
+            context=context,
+            include_sequence=include_sequence,
+            max_nodes=get_settings().graph_selection_max_nodes,
+        )
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+
+    return JSONResponse(selection.model_dump(mode="json"), media_type=GRAPH_SELECTION_MEDIA_TYPE)
+
+
+@router.post("/search", response_model=GraphSearchResult)
+def search_graph(
+    request: GraphSearchRequest, _: PangenomeGraph = Depends(require_graph)
+) -> GraphSearchResult:
+    """Locate a sequence in the graph, returning hit nodes and path coordinates."""
+
+    try:
+        return graph_service.search_sequence(
+            request.sequence, max_hits=request.max_hits, min_matches=request.min_matches
+        )
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except MinimizerIndexError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+
+@router.get("/layout", response_model=GraphLayoutSummary)
+def get_graph_layout(_: PangenomeGraph = Depends(require_graph)) -> GraphLayoutSummary:
+    """Return the extent and zoom levels of the precomputed explorer layout."""
+
+    try:
+        return graph_service.layout_summary()
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+
+
+@router.get("/layout/tiles/{z}/{x}", response_model=GraphTile)
+def get_graph_tile(
+    z: int,
+    x: int,
+    if_none_match: Optional[str] = Header(default=None),
+    _: PangenomeGraph = Depends(require_graph),
+) -> Response:
+    """Return one layout tile, cacheable by browsers and proxies."""
+
+    try:
+        entry = graph_service.layout_tile(z, x)
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found") from exc
+
+    max_age = get_settings().graph_tile_max_age_seconds
+    headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if registry.etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+@router.get("/bubbles", response_model=GraphBubbleList)
+def list_graph_bubbles(
+    path: str = Query(..., description="Reference path name"),
+    start: int = Query(default=0, ge=0, description="0-based start offset on the path"),
+    end: Optional[int] = Query(default=None, gt=0, description="Exclusive end offset (path length)"),
+    limit: int = Query(default=100, ge=1, le=10_000),
+    graph: PangenomeGraph = Depends(require_graph),
+) -> GraphBubbleList:
+    """Return the bubbles overlapping an interval of a reference path."""
+
+    if not graph.has_path(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Path not found")
+    try:
+        return graph_service.list_bubbles(
+            path, start, graph.path_length(path) if end is None else end, limit=limit
+        )
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+
+
+@router.get("/bubbles/{bubble_id}", response_model=GraphBubble)
+def get_graph_bubble(bubble_id: int, _: PangenomeGraph = Depends(require_graph)) -> GraphBubble:
+    """Return a bubble's reference interval, anchors and traversals."""
+
+    try:
+        return graph_service.describe_bubble(bubble_id)
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bubble not found") from exc
+
+
+@router.get("/bubbles/{bubble_id}/variants", response_model=list[VariantRecord])
+async def list_bubble_variants(
+    bubble_id: int,
+    asset_id: Optional[int] = Query(default=None, description="Restrict results to one ingested VCF"),
+    limit: int = Query(default=1000, ge=1, le=10000),
+    graph_key: str = Depends(require_graph_key),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[VariantRecord]:
+    """Return the projected variants that lie in a bubble, ordered by position."""
+
+    rows = await projection_repo.bubble_variants(
+        session, bubble_id=bubble_id, graph_key=graph_key, asset_id=asset_id, limit=limit
+    )
+    return [VariantRecord.model_validate(variant) for variant, _ in rows]
@@ -1,12 +1,50 @@
 """Health and metadata endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.metrics import render_prometheus
+from app.models.health import ReadinessReport
+from app.services import readiness
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 router = APIRouter(tags=["health"])
 
 
-@router.get("/health", summary="Service heartbeat", description="Basic health probe.")
+@router.get(
+    "/health",
+    summary="Service heartbeat",
+    description="Liveness probe; does not touch the database or other dependencies.",
+)
 def get_health() -> dict[str, str]:
     """Return a simple service heartbeat payload."""
 
     return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe",
+    response_model=ReadinessReport,
+    responses={503: {"model": ReadinessReport, "description": "A dependency is not ready"}},
+)
+async def get_ready() -> JSONResponse:
+    """Report whether the database, schema and graph are ready to serve requests."""
+
+    report = await readiness.check_readiness(get_settings())
+    code = status.HTTP_200_OK if report.status == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(report.model_dump(), status_code=code)
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+def get_metrics() -> PlainTextResponse:
+    """Expose process metrics in the Prometheus text format."""
+
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,50 @@
+"""Plugin pipeline endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import PipelineRun
+from app.db.session import get_session
+from app.models.pipeline import PipelineRequest, PipelineSummary
+from app.models.run import RunSummary
+from app.repositories import pipelines as pipeline_repo
+from app.services import pipelines as pipeline_service
+
+router = APIRouter(prefix="/pipelines", tags=["pipelines"])
+
+
+async def _summary(session: AsyncSession, pipeline: PipelineRun) -> PipelineSummary:
+    runs = await pipeline_repo.list_stage_runs(session, pipeline.id)
+    return PipelineSummary(
+        id=pipeline.id,
+        status=pipeline.status,
+        error=pipeline.error,
+        created_at=pipeline.created_at,
+        finished_at=pipeline.finished_at,
+        stages=[RunSummary.model_validate(run) for run in runs],
+    )
+
+
+@router.post("/", response_model=PipelineSummary, status_code=status.HTTP_202_ACCEPTED)
+async def start_pipeline(
+    request: PipelineRequest, session: AsyncSession = Depends(get_session)
+) -> PipelineSummary:
+    """Queue a DAG of plugin stages."""
+
+    try:
+        pipeline = await pipeline_service.submit_pipeline(session, request)
+    except pipeline_service.PipelineValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return await _summary(session, pipeline)
+
+
+@router.get("/{pipeline_id}", response_model=PipelineSummary)
+async def get_pipeline(
+    pipeline_id: str, session: AsyncSession = Depends(get_session)
+) -> PipelineSummary:
+    """Return the status of a pipeline and each of its stages, read from the primary."""
+
+    pipeline = await pipeline_repo.get_pipeline(session, pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found")
+    return await _summary(session, pipeline)
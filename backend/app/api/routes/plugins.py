@@ -1,46 +1,76 @@
 """Plugin discovery endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
+from app.core.config import get_settings
+from app.db.session import get_read_session, get_session
 from app.models.plugin import PluginManifest, PluginSummary
+from app.models.run import PluginVersionUsage, RunRequest, RunSummary
 from app.repositories import plugins as plugin_repo
+from app.repositories.plugins import PluginFilter
+from app.services import registry
+from app.services import runs as run_service
 
 router = APIRouter(prefix="/plugins", tags=["plugins"])
 
 
+def _cached_response(entry: registry.CachedBody, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.next_cursor:
+        headers["X-Next-Cursor"] = entry.next_cursor
+    if registry.etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/", response_model=list[PluginSummary])
 async def list_plugins(
+    tag: Optional[str] = Query(default=None, description="Only plugins carrying this tag"),
+    author: Optional[str] = Query(default=None, description="Only plugins by this author"),
+    input_media_type: Optional[str] = Query(default=None, description="Accepted input media type"),
+    output_media_type: Optional[str] = Query(default=None, description="Produced output media type"),
+    q: Optional[str] = Query(default=None, description="Words to match in name and description"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum plugins per page"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor of the previous page"),
+    if_none_match: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_session),
-) -> list[PluginSummary]:
-    """Return a collection of available plugins."""
-
-    records = await plugin_repo.list_plugins(session)
-    return [
-        PluginSummary(
-            name=record.name,
-            version=record.version,
-            description=record.description,
-            tags=record.tags or [],
-            latest_run_at=record.latest_run_at,
-        )
-        for record in records
-    ]
+) -> Response:
+    """Return a page of available plugins, most recently updated first.
+
+    When more plugins match, the ``X-Next-Cursor`` response header holds the
+    cursor of the next page.
+    """
+
+    filters = PluginFilter(
+        tag=tag,
+        author=author,
+        input_media_type=input_media_type,
+        output_media_type=output_media_type,
+        q=q,
+    )
+    try:
+        entry = await registry.plugin_list(session, filters, limit=limit, cursor=cursor)
+    except registry.InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return _cached_response(entry, if_none_match)
 
 
 @router.get("/{plugin_name}", response_model=PluginManifest)
 async def get_plugin(
     plugin_name: str,
     version: str | None = Query(default=None, description="Specific plugin version to fetch"),
+    if_none_match: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_session),
-) -> PluginManifest:
+) -> Response:
     """Return the manifest for a specific plugin."""
 
-    record = await plugin_repo.get_plugin(session, name=plugin_name, version=version)
-    if record is None:
+    entry = await registry.plugin_manifest(session, name=plugin_name, version=version)
+    if entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plugin not found")
-    return PluginManifest.model_validate(record.manifest)
+    return _cached_response(entry, if_none_match)
 
 
 @router.post("/", response_model=PluginManifest, status_code=status.HTTP_201_CREATED)
@@ -50,10 +80,27 @@ async def register_plugin(
 ) -> PluginManifest:
     """Create or update a plugin manifest."""
 
-    record = await plugin_repo.upsert_plugin(session, manifest)
+    record = await registry.upsert_plugin(session, manifest)
     return PluginManifest.model_validate(record.manifest)
 
 
+@router.post(":batch", response_model=list[PluginSummary])
+async def register_plugins(
+    manifests: list[PluginManifest],
+    session: AsyncSession = Depends(get_session),
+) -> list[PluginSummary]:
+    """Create or update many plugin manifests in a single transaction."""
+
+    max_size = get_settings().plugin_batch_max_size
+    if len(manifests) > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_size} manifests per batch",
+        )
+    records = await registry.upsert_plugins(session, manifests)
+    return [PluginSummary.model_validate(record) for record in records]
+
+
 @router.delete("/{plugin_name}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_plugin(
     plugin_name: str,
@@ -62,6 +109,42 @@ async def delete_plugin(
 ) -> None:
     """Delete a plugin manifest."""
 
-    success = await plugin_repo.delete_plugin(session, name=plugin_name, version=version)
+    success = await registry.delete_plugin(session, name=plugin_name, version=version)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plugin not found")
+
+
+@router.post(
+    "/{plugin_name}/runs", response_model=RunSummary, status_code=status.HTTP_202_ACCEPTED
+)
+async def start_plugin_run(
+    plugin_name: str,
+    request: RunRequest,
+    session: AsyncSession = Depends(get_session),
+) -> RunSummary:
+    """Queue an execution of a plugin."""
+
+    record = await plugin_repo.get_plugin(session, name=plugin_name, version=request.version)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plugin not found")
+
+    try:
+        run = await run_service.submit_run(session, record, request)
+    except run_service.RunValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return RunSummary.model_validate(run)
+
+
+@router.get("/{plugin_name}/usage", response_model=list[PluginVersionUsage])
+async def get_plugin_usage(
+    plugin_name: str,
+    session: AsyncSession = Depends(get_read_session),
+) -> list[PluginVersionUsage]:
+    """Return measured resource usage and throughput per plugin version and container digest.
+
+    Only successful runs that executed the plugin count; result cache hits are excluded.
+    """
+
+    if await plugin_repo.get_plugin(session, name=plugin_name) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plugin not found")
+    return await run_service.plugin_usage(session, plugin_name)
@@ -0,0 +1,38 @@
+"""Plugin run status endpoints."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session, get_session
+from app.models.run import RunSummary
+from app.repositories import runs as run_repo
+
+router = APIRouter(prefix="/runs", tags=["runs"])
+
+
+@router.get("/", response_model=list[RunSummary])
+async def list_runs(
+    plugin: Optional[str] = Query(default=None, description="Filter by plugin name"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[RunSummary]:
+    """Return the most recent plugin runs."""
+
+    records = await run_repo.list_runs(session, plugin_name=plugin, limit=limit)
+    return [RunSummary.model_validate(record) for record in records]
+
+
+@router.get("/{run_id}", response_model=RunSummary)
+async def get_run(run_id: str, session: AsyncSession = Depends(get_session)) -> RunSummary:
+    """Return the status of a plugin run.
+
+    Clients poll this right after submitting, so it reads from the primary;
+    a lagging replica would report a missing run or a stale status.
+    """
+
+    record = await run_repo.get_run(session, run_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    return RunSummary.model_validate(record)
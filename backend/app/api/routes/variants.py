@@ -0,0 +1,67 @@
+"""Variant range query endpoints."""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session
+from app.genomics.intervals import parse_region
+from app.models.graph import VariantGraphProjection
+from app.models.variant import VariantRecord
+from app.repositories import projections as projection_repo
+from app.repositories import variants as variant_repo
+from app.services import graph as graph_service
+from app.services import projection as projection_service
+
+router = APIRouter(prefix="/variants", tags=["variants"])
+
+
+@router.get("", response_model=list[VariantRecord])
+async def list_variants(
+    region: str = Query(..., description="Region in contig:start-end notation (1-based, inclusive)"),
+    asset_id: Optional[int] = Query(default=None, description="Restrict results to one ingested VCF"),
+    limit: int = Query(default=1000, ge=1, le=10000),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[VariantRecord]:
+    """Return variants overlapping a genomic region."""
+
+    try:
+        parsed = parse_region(region)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+    records = await variant_repo.query_region(session, parsed, asset_id=asset_id, limit=limit)
+    return [VariantRecord.model_validate(record) for record in records]
+
+
+@router.get("/{variant_id}/graph", response_model=VariantGraphProjection)
+async def get_variant_graph_projection(
+    variant_id: int,
+    session: AsyncSession = Depends(get_read_session),
+) -> VariantGraphProjection:
+    """Return the graph segments and bubble a variant touches on the loaded graph."""
+
+    try:
+        graph_key = await asyncio.to_thread(projection_service.graph_key)
+    except graph_service.GraphUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    found = await projection_repo.variant_projection(
+        session, variant_id=variant_id, graph_key=graph_key
+    )
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Variant not found or its asset has not been projected onto this graph",
+        )
+    projected, asset_id = found
+    return VariantGraphProjection(
+        variant_id=projected.variant_id,
+        asset_id=asset_id,
+        path=projected.path,
+        bubble_id=projected.bubble_id,
+        traversal=projected.traversal,
+        ref_nodes=projected.ref_nodes,
+        alt_nodes=projected.alt_nodes,
+    )
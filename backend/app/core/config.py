@@ -1,7 +1,7 @@
 """Application configuration using pydantic settings."""
 
 from functools import lru_cache
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +20,57 @@ class Settings(BaseSettings):
     openapi_url: str = "/openapi.json"
     database_url: str = "sqlite+aiosqlite:///./pgip.db"
     database_echo: bool = False
+    database_replica_url: Optional[str] = None
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_statement_cache_size: int = 500
+    database_statement_timeout_ms: Optional[int] = None
+    database_application_name: str = "pgip-backend"
+    database_schema_mode: Literal["verify", "create"] = "verify"
+    readiness_cache_seconds: float = 5.0
+    readiness_timeout_seconds: float = 2.0
+    registry_cache_ttl_seconds: float = 30.0
+    plugin_batch_max_size: int = 1000
+    vcf_ingest_batch_size: int = 5000
+    reference_fasta_path: Optional[str] = None
+    vcf_normalize_workers: Optional[int] = None
+    vcf_normalize_block_size: int = 10_000
+    stats_batch_size: int = 5000
+    graph_gfa_path: Optional[str] = None
+    graph_cache_dir: str = "./graph-cache"
+    graph_preload: bool = True
+    graph_preload_indexes: List[Literal["bubbles", "minimizers", "layout"]] = []
+    graph_selection_max_nodes: int = 50000
+    graph_reference_sample: Optional[str] = None
+    graph_projection_batch_size: int = 10_000
+    graph_minimizer_k: int = 15
+    graph_minimizer_w: int = 10
+    graph_index_workers: Optional[int] = None
+    graph_tile_bases: int = 32_768
+    graph_tile_bins: int = 128
+    graph_tile_max_age_seconds: int = 3600
+    run_workspace_dir: str = "./runs"
+    run_pool_kind: Literal["thread", "process"] = "thread"
+    run_max_workers: int = 4
+    run_cpu_capacity: Optional[float] = None
+    run_memory_capacity: Optional[str] = None
+    run_default_cpu: str = "1"
+    run_default_memory: str = "1Gi"
+    run_timeout_seconds: Optional[float] = None
+    run_backend_api: str = "http://localhost:8000"
+    run_heartbeat_seconds: float = 30.0
+    shard_window_size: int = 5_000_000
+    shard_concurrency: int = 4
+    pipeline_stream_queue_chunks: int = 64
+    cache_enabled: bool = True
+    cache_dir: str = "./result-cache"
+    cache_max_size: str = "10Gi"
+    annotation_ingest_batch_size: int = 5000
+    annotation_columnar_dir: Optional[str] = None
+    annotation_row_group_size: int = 100_000
 
     model_config = SettingsConfigDict(env_prefix="PGIP_", env_file=".env", env_file_encoding="utf-8")
 
@@ -0,0 +1,257 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Metrics are plain Python objects registered in a module-level registry so
+instrumentation can be added anywhere without a client library. They are
+thread-safe because pool checkouts and run workers record from threads.
+:func:`render_prometheus` serializes the registry in the text format served at
+``/metrics``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterator
+from typing import Optional, Sequence
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RUN_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 14400.0)
+
+
+class Metric:
+    """Base class holding the name, help text and label names of a metric."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose value is computed when the registry is scraped.
+
+    Suits values that already live elsewhere, such as the scheduler queue
+    depth or result cache counters, where mirroring every change would be
+    redundant. The callback returns a number, a mapping of label values to
+    numbers, or ``None`` when there is nothing to report.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float] | float | None],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._callback = callback
+
+    def samples(self) -> dict[LabelValues, float]:
+        value = self._callback()
+        if value is None:
+            return {}
+        if isinstance(value, dict):
+            return value
+        return {(): float(value)}
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            totals[0] += value
+
+    def samples(self) -> dict[LabelValues, tuple[list[int], float, int]]:
+        """Return cumulative bucket counts, sum and count for every label set."""
+
+        with self._lock:
+            snapshot = {}
+            for key, (counts, totals) in self._values.items():
+                cumulative, running = [], 0
+                for count in counts:
+                    running += count
+                    cumulative.append(running)
+                snapshot[key] = (cumulative, totals[0], running)
+            return snapshot
+
+
+class Registry:
+    """Ordered collection of every metric defined in the process."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def __iter__(self) -> Iterator[Metric]:
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+
+REGISTRY = Registry()
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def render_prometheus(registry: Registry = REGISTRY) -> str:
+    """Serialize every metric in the Prometheus text exposition format (0.0.4)."""
+
+    lines: list[str] = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            for key, (cumulative, total, count) in sorted(metric.samples().items()):
+                for bound, value in zip((*metric.buckets, math.inf), cumulative):
+                    labels = _labels((*metric.labelnames, "le"), (*key, _format_value(bound)))
+                    lines.append(f"{metric.name}_bucket{labels} {value}")
+                labels = _labels(metric.labelnames, key)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{labels} {count}")
+            continue
+        for key, value in sorted(metric.samples().items()):
+            lines.append(f"{metric.name}{_labels(metric.labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "pgip_db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the database pool.",
+    labelnames=("engine",),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "pgip_db_pool_timeouts_total",
+    "Connection checkouts that gave up because the pool stayed exhausted.",
+    labelnames=("engine",),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "pgip_http_request_duration_seconds",
+    "Time from receiving a request until its response body is fully sent.",
+    labelnames=("method", "route", "status"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "pgip_db_query_duration_seconds",
+    "Execution time of SQL statements, by engine and statement type.",
+    labelnames=("engine", "operation"),
+)
+RUN_DURATION_SECONDS = Histogram(
+    "pgip_plugin_run_duration_seconds",
+    "Wall-clock time of plugin runs from start to final status.",
+    labelnames=("plugin", "status"),
+    buckets=RUN_BUCKETS,
+)
+RUN_FIRST_RESULT_SECONDS = Histogram(
+    "pgip_plugin_run_first_result_seconds",
+    "Time from the start of a plugin run until its first annotation is queryable.",
+    labelnames=("plugin", "io_mode"),
+    buckets=RUN_BUCKETS,
+)
+REGISTRY_CACHE_LOOKUPS = Counter(
+    "pgip_registry_cache_lookups_total",
+    "Plugin registry cache lookups by result.",
+    labelnames=("result",),
+)
+
+
+def _registry_hit_ratio() -> Optional[float]:
+    hits = REGISTRY_CACHE_LOOKUPS.value(result="hit")
+    lookups = hits + REGISTRY_CACHE_LOOKUPS.value(result="miss")
+    return hits / lookups if lookups else None
+
+
+REGISTRY_CACHE_HIT_RATIO = CallbackMetric(
+    "pgip_registry_cache_hit_ratio",
+    "Fraction of plugin registry cache lookups served from memory.",
+    _registry_hit_ratio,
+)
@@ -2,7 +2,20 @@
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    literal_column,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import JSON
@@ -14,7 +27,30 @@ class Plugin(Base):
     """Persistent representation of a plugin manifest."""
 
     __tablename__ = "plugins"
-    __table_args__ = (UniqueConstraint("name", "version", name="uq_plugin_name_version"),)
+    __table_args__ = (
+        UniqueConstraint("name", "version", name="uq_plugin_name_version"),
+        # Keyset order of the paginated plugin listing.
+        Index("ix_plugins_updated", "updated_at", "id"),
+        # Containment (@>) lookups for tag, author and media-type filters.
+        Index(
+            "ix_plugins_tags_gin",
+            "tags",
+            postgresql_using="gin",
+            postgresql_ops={"tags": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_plugins_authors_gin",
+            "authors",
+            postgresql_using="gin",
+            postgresql_ops={"authors": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_plugins_manifest_gin",
+            "manifest",
+            postgresql_using="gin",
+            postgresql_ops={"manifest": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
@@ -27,3 +63,204 @@ class Plugin(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     latest_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+def _simple_tsvector(column):
+    return func.to_tsvector(literal_column("'simple'::regconfig"), column)
+
+
+# Full-text document of a plugin. Queries must use this exact expression for
+# PostgreSQL to answer them from ``ix_plugins_search``.
+PLUGIN_SEARCH_VECTOR = _simple_tsvector(Plugin.__table__.c.name).op("||")(
+    _simple_tsvector(Plugin.__table__.c.description)
+)
+Plugin.__table__.append_constraint(
+    Index("ix_plugins_search", PLUGIN_SEARCH_VECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
+)
+
+
+class PluginFacet(Base):
+    """One searchable value of a plugin: a tag, author, media type or word.
+
+    Stands in for the JSONB and full-text GIN indexes on databases without
+    them, so every listing filter is an indexed ``(kind, value)`` lookup.
+    """
+
+    __tablename__ = "plugin_facets"
+    __table_args__ = (Index("ix_plugin_facets_lookup", "kind", "value", "plugin_id"),)
+
+    plugin_id: Mapped[int] = mapped_column(
+        ForeignKey("plugins.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    value: Mapped[str] = mapped_column(String(512), primary_key=True)
+
+
+class VcfAsset(Base):
+    """A VCF file registered through the ingestion endpoint."""
+
+    __tablename__ = "vcf_assets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    source: Mapped[str] = mapped_column(String(1024))
+    status: Mapped[str] = mapped_column(String(20), default="loading")
+    header: Mapped[str] = mapped_column(Text, default="")
+    samples: Mapped[list[str]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=list)
+    record_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Statistics from in-process normalization; NULL when the VCF was loaded as-is.
+    normalization: Mapped[dict | None] = mapped_column(
+        JSON().with_variant(JSONB, "postgresql"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Variant(Base):
+    """A single VCF record belonging to an ingested asset."""
+
+    __tablename__ = "variants"
+    __table_args__ = (
+        Index("ix_variants_asset_locus", "asset_id", "contig", "position"),
+        Index("ix_variants_region", "contig", "bin", "position"),
+        Index("ix_variants_asset_frequency", "asset_id", "allele_frequency"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("vcf_assets.id", ondelete="CASCADE"))
+    contig: Mapped[str] = mapped_column(String(255))
+    position: Mapped[int] = mapped_column(Integer)
+    end_position: Mapped[int] = mapped_column(Integer)
+    bin: Mapped[int] = mapped_column(Integer)
+    identifier: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    ref: Mapped[str] = mapped_column(Text)
+    alt: Mapped[str] = mapped_column(Text)
+    qual: Mapped[float | None] = mapped_column(Float, nullable=True)
+    filter: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    info: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # One int8 per sample: count of non-reference alleles, -1 when missing.
+    genotypes: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # Roaring-style bitmap of the sample columns carrying an alternate allele.
+    carriers: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    carrier_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    allele_frequency: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class GraphProjection(Base):
+    """Placement of one VCF asset's variants on the bubbles of one compiled graph."""
+
+    __tablename__ = "graph_projections"
+    __table_args__ = (
+        UniqueConstraint("asset_id", "graph_key", name="uq_graph_projection_asset_graph"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("vcf_assets.id", ondelete="CASCADE"))
+    # Name of the compiled graph directory, which changes whenever the GFA does,
+    # suffixed with ":<sample>" when a reference sample selects the bubble paths.
+    graph_key: Mapped[str] = mapped_column(String(255))
+    status: Mapped[str] = mapped_column(String(20), default="running")
+    variant_count: Mapped[int] = mapped_column(Integer, default=0)
+    placed_count: Mapped[int] = mapped_column(Integer, default=0)
+    bubble_count: Mapped[int] = mapped_column(Integer, default=0)
+    matched_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class ProjectedVariant(Base):
+    """Graph segments and bubble of a single variant within a :class:`GraphProjection`."""
+
+    __tablename__ = "projected_variants"
+    __table_args__ = (
+        Index("ix_projected_variants_bubble", "bubble_id", "projection_id"),
+        Index("ix_projected_variants_variant", "variant_id"),
+    )
+
+    projection_id: Mapped[int] = mapped_column(
+        ForeignKey("graph_projections.id", ondelete="CASCADE"), primary_key=True
+    )
+    variant_id: Mapped[int] = mapped_column(
+        ForeignKey("variants.id", ondelete="CASCADE"), primary_key=True
+    )
+    path: Mapped[str] = mapped_column(String(1024))
+    bubble_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    traversal: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    ref_nodes: Mapped[list[str]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=list)
+    alt_nodes: Mapped[list[str] | None] = mapped_column(
+        JSON().with_variant(JSONB, "postgresql"), nullable=True
+    )
+
+
+class PipelineRun(Base):
+    """An execution of a DAG of plugin stages; each stage is a :class:`PluginRun`."""
+
+    __tablename__ = "pipeline_runs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    stages: Mapped[list] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=list)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class PluginRun(Base):
+    """A single execution of a plugin version."""
+
+    __tablename__ = "plugin_runs"
+    __table_args__ = (
+        Index("ix_plugin_runs_plugin", "plugin_name", "plugin_version"),
+        Index("ix_plugin_runs_pipeline", "pipeline_id"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    plugin_name: Mapped[str] = mapped_column(String(255))
+    plugin_version: Mapped[str] = mapped_column(String(50))
+    container_digest: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    parameters: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
+    inputs: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
+    workspace: Mapped[str] = mapped_column(String(1024))
+    cpu: Mapped[float] = mapped_column(Float)
+    memory: Mapped[int] = mapped_column(BigInteger)
+    exit_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    shard_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    shards_completed: Mapped[int] = mapped_column(Integer, default=0)
+    cache_hits: Mapped[int] = mapped_column(Integer, default=0)
+    # Measured from the plugin process; unset for cache hits and runs that never started.
+    wall_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cpu_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    peak_rss_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    read_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    write_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    record_count: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    pipeline_id: Mapped[str | None] = mapped_column(
+        ForeignKey("pipeline_runs.id", ondelete="CASCADE"), nullable=True
+    )
+    stage: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    first_result_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Renewed by the worker executing the run; a stale lease means that worker is gone.
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Annotation(Base):
+    """One record from a plugin run's annotation JSONL output."""
+
+    __tablename__ = "annotations"
+    __table_args__ = (
+        # Matches the keyset order used by the streaming query endpoint.
+        Index("ix_annotations_keyset", "contig", "position", "plugin_name", "id"),
+        Index("ix_annotations_run", "run_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[str] = mapped_column(ForeignKey("plugin_runs.id", ondelete="CASCADE"))
+    plugin_name: Mapped[str] = mapped_column(String(255))
+    plugin_version: Mapped[str] = mapped_column(String(50))
+    contig: Mapped[str] = mapped_column(String(255))
+    position: Mapped[int] = mapped_column(Integer)
+    payload: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=dict)
@@ -0,0 +1,141 @@
+"""Schema revision checks against the Alembic migration history.
+
+Workers never issue DDL in production: migrations are applied out of band with
+``alembic upgrade head``, and each process only confirms that the database is
+stamped with the newest revision shipped in ``alembic/versions``. The check runs
+once per engine; later calls return the remembered revision.
+
+Importing Alembic itself costs more than a tenth of a second, so the head is
+read from the migration scripts' syntax tree and the stamp with a plain query.
+"""
+
+from __future__ import annotations
+
+import ast
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SCRIPT_LOCATION = Path(__file__).resolve().parents[2] / "alembic"
+VERSION_TABLE = "alembic_version"
+
+_verified: Optional[tuple[AsyncEngine, str]] = None
+
+
+class SchemaRevisionError(RuntimeError):
+    """Raised when the database is not at the migration head of this build."""
+
+
+def _revision_links(path: Path) -> tuple[str, tuple[str, ...]]:
+    values = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                values[target.id] = ast.literal_eval(node.value)
+    down = values.get("down_revision")
+    parents = () if down is None else (down,) if isinstance(down, str) else tuple(down)
+    return values["revision"], parents
+
+
+@cache
+def head_revision() -> str:
+    """Return the newest migration revision shipped with the application."""
+
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in (SCRIPT_LOCATION / "versions").glob("*.py"):
+        revision, down = _revision_links(path)
+        revisions.add(revision)
+        parents.update(down)
+    heads = sorted(revisions - parents)
+    if len(heads) != 1:
+        raise SchemaRevisionError(f"Expected one migration head in {SCRIPT_LOCATION}, found {heads}")
+    return heads[0]
+
+
+def include_object(dialect_name: str):
+    """Return an autogenerate ``include_object`` hook honouring ``ddl_if(dialect=...)``.
+
+    Alembic compares every declared index regardless of ``ddl_if``, so without
+    this PostgreSQL-only GIN indexes would be reported missing on SQLite.
+    """
+
+    def include(obj, name, type_, reflected, compare_to) -> bool:
+        condition = getattr(obj, "_ddl_if", None)
+        return condition is None or condition.dialect in (None, dialect_name)
+
+    return include
+
+
+def _current_revision(connection: Connection) -> Optional[str]:
+    if not inspect(connection).has_table(VERSION_TABLE):
+        return None
+    return connection.execute(text(f"SELECT version_num FROM {VERSION_TABLE}")).scalar()
+
+
+def stamp_head(connection: Connection) -> None:
+    """Record the head revision for a schema created directly from the models."""
+
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    MigrationContext.configure(connection).stamp(ScriptDirectory(str(SCRIPT_LOCATION)), "head")
+
+
+def _outdated(found: str, expected: str) -> SchemaRevisionError:
+    return SchemaRevisionError(
+        f"Database schema is at revision {found}, expected {expected}; run 'alembic upgrade head'"
+    )
+
+
+def create_schema(connection: Connection, metadata: MetaData) -> None:
+    """Create missing tables from ``metadata``, stamping the head on an unstamped database.
+
+    ``create_all`` only adds missing tables, never missing columns, so a
+    database already stamped with an older revision is left alone and
+    :class:`SchemaRevisionError` is raised instead of moving its stamp.
+    """
+
+    expected = head_revision()
+    found = _current_revision(connection)
+    if found is not None and found != expected:
+        raise _outdated(found, expected)
+    metadata.create_all(connection)
+    if found is None:
+        stamp_head(connection)
+
+
+async def current_revision(engine: AsyncEngine) -> Optional[str]:
+    """Return the revision stored in ``alembic_version``, or ``None`` when unstamped."""
+
+    async with engine.connect() as connection:
+        return await connection.run_sync(_current_revision)
+
+
+async def verify_schema(engine: AsyncEngine) -> str:
+    """Ensure ``engine`` points at a database migrated to :func:`head_revision`.
+
+    Returns the verified revision. Raises :class:`SchemaRevisionError` when the
+    database is unstamped or at another revision.
+    """
+
+    global _verified
+    if _verified is not None and _verified[0] is engine:
+        return _verified[1]
+
+    expected = head_revision()
+    found = await current_revision(engine)
+    if found is None:
+        raise SchemaRevisionError(
+            "Database has no schema revision; run 'alembic upgrade head' "
+            "(or 'alembic stamp head' if its tables predate migrations)"
+        )
+    if found != expected:
+        raise _outdated(found, expected)
+    _verified = (engine, found)
+    return found
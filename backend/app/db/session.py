@@ -1,17 +1,24 @@
 """Database session management for PGIP."""
 
+import time
 from collections.abc import AsyncIterator
-from typing import Optional
+from functools import cache
+from typing import Any, Optional
 
+from sqlalchemy import event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS, DB_QUERY_SECONDS
 from app.db.base import Base
+from app.db.schema import create_schema
 
 
 class _BaseModel:
@@ -19,7 +26,63 @@ class _BaseModel:
 
 
 engine: Optional[AsyncEngine] = None
+read_engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+_read_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    engine_label = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc(engine=self.engine_label)
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine=self.engine_label)
+
+
+@cache
+def _timed_pool(label: str) -> type[TimedQueuePool]:
+    return type(f"TimedQueuePool[{label}]", (TimedQueuePool,), {"engine_label": label})
+
+
+def _engine_options(url: str, settings: Settings, label: str) -> dict[str, Any]:
+    """Pool and driver options for ``url``.
+
+    SQLite keeps SQLAlchemy's default pool (``NullPool`` for files,
+    ``StaticPool`` for memory), where pooling knobs do not apply.
+    """
+
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options: dict[str, Any] = {
+        "poolclass": _timed_pool(label),
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        server_settings = {"application_name": settings.database_application_name}
+        if settings.database_statement_timeout_ms is not None:
+            server_settings["statement_timeout"] = str(settings.database_statement_timeout_ms)
+        options["connect_args"] = {
+            # SQLAlchemy's prepared statement cache and asyncpg's own; both must
+            # be 0 behind PgBouncer in transaction mode.
+            "prepared_statement_cache_size": settings.database_statement_cache_size,
+            "statement_cache_size": settings.database_statement_cache_size,
+            "server_settings": server_settings,
+        }
+    return options
 
 
 def get_engine() -> AsyncEngine:
@@ -34,18 +97,88 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _session_factory
 
 
-def init_engine(database_url: Optional[str] = None, echo: Optional[bool] = None) -> None:
-    """Initialize the async database engine and session factory."""
+_QUERY_OPERATIONS = frozenset(
+    {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "DROP"}
+)
+_QUERY_START = "pgip_query_start"
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in _QUERY_OPERATIONS else "OTHER"
+
+
+def instrument_engine(async_engine: AsyncEngine, label: str) -> None:
+    """Record the execution time of every statement run through ``async_engine``."""
+
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_QUERY_START, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        start = conn.info[_QUERY_START].pop()
+        DB_QUERY_SECONDS.observe(
+            time.perf_counter() - start, engine=label, operation=_operation(statement)
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context) -> None:
+        starts = context.connection.info.get(_QUERY_START) if context.connection else None
+        if starts:
+            starts.pop()
+
+
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the replica session factory, or the primary one without a replica."""
+
+    return _read_session_factory or get_session_factory()
+
 
-    global engine, _session_factory
+def init_engine(
+    database_url: Optional[str] = None,
+    echo: Optional[bool] = None,
+    replica_url: Optional[str] = None,
+) -> None:
+    """Initialize the async database engines and session factories.
+
+    When a replica URL is configured, a second engine serves read-only request
+    handlers through :func:`get_read_session`.
+    """
+
+    global engine, read_engine, _session_factory, _read_session_factory
 
     settings = get_settings()
     url = database_url or settings.database_url
     echo_flag = echo if echo is not None else settings.database_echo
 
-    engine = create_async_engine(url, echo=echo_flag, future=True)
+    engine = create_async_engine(
+        url, echo=echo_flag, future=True, **_engine_options(url, settings, "primary")
+    )
+    instrument_engine(engine, "primary")
     _session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
+    replica = replica_url or settings.database_replica_url
+    if replica:
+        read_engine = create_async_engine(
+            replica, echo=echo_flag, future=True, **_engine_options(replica, settings, "replica")
+        )
+        instrument_engine(read_engine, "replica")
+        _read_session_factory = async_sessionmaker(read_engine, expire_on_commit=False)
+    else:
+        read_engine = None
+        _read_session_factory = None
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection of the primary and replica engines."""
+
+    for instance in (engine, read_engine):
+        if instance is not None:
+            await instance.dispose()
+
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     """Yield an async session for request-scoped usage."""
@@ -55,12 +188,28 @@ async def get_session() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Yield a session on the read replica for read-only request handlers.
+
+    Replicas may lag the primary, so handlers that must observe their own
+    writes, and status endpoints polled right after a create (runs,
+    pipelines, assets), keep using :func:`get_session`.
+    """
+
+    async with get_read_session_factory()() as session:
+        yield session
+
+
 async def create_all() -> None:
-    """Create all database tables."""
+    """Create all database tables and stamp a fresh database with the migration head.
+
+    Raises :class:`app.db.schema.SchemaRevisionError` for a database stamped
+    with an older revision; it needs ``alembic upgrade head``.
+    """
 
     engine_instance = get_engine()
     async with engine_instance.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_schema, Base.metadata)
 
 
 async def drop_all() -> None:
@@ -69,3 +218,4 @@ async def drop_all() -> None:
     engine_instance = get_engine()
     async with engine_instance.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        await conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
@@ -0,0 +1 @@
+"""File-format parsers and genomic algorithms used by PGIP services."""
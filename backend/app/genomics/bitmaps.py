@@ -0,0 +1,136 @@
+"""Roaring-style compressed bitmaps of sample indices.
+
+A bitmap stores a set of 32-bit integers, here the sample columns that carry
+a variant. The integers are split on their high 16 bits into *containers*,
+and each container picks whichever encoding is smaller:
+
+* an *array* container: the sorted low 16 bits, two bytes per member, used up
+  to 4096 members;
+* a *bitmap* container: 65536 bits as 1024 ``uint64`` words, a fixed 8 KiB.
+
+Rare variants are carried by a handful of samples and cost a few bytes.
+Common variants in large cohorts switch to the fixed-size form. The
+serialized layout is a little-endian container count, a
+``(key, kind, cardinality)`` header per container, then the payloads in
+header order.
+
+Queries do not operate container by container. A batch of bitmaps is
+expanded into a dense ``(variants, words)`` ``uint64`` matrix over the
+asset's samples. A sample set becomes one mask row, and intersections,
+unions and carrier counts are whole-matrix ``&``, ``|`` and popcount
+reductions.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
+
+ARRAY_LIMIT = 4096
+_ARRAY, _BITMAP = 0, 1
+_COUNT = np.dtype("<u4")
+_HEADER = np.dtype([("key", "<u2"), ("kind", "<u2"), ("cardinality", "<u4")])
+_WORDS = 1 << 10
+
+
+def encode_bitmap(indices: np.ndarray) -> bytes:
+    """Serialize a set of non-negative integers (duplicates are ignored)."""
+
+    values = np.unique(np.asarray(indices, dtype=np.uint32))
+    keys, starts, counts = np.unique(values >> 16, return_index=True, return_counts=True)
+    headers = np.zeros(len(keys), dtype=_HEADER)
+    headers["key"] = keys
+    headers["cardinality"] = counts
+    payloads: list[bytes] = []
+    for index, (start, count) in enumerate(zip(starts.tolist(), counts.tolist())):
+        low = (values[start : start + count] & 0xFFFF).astype("<u2")
+        if count <= ARRAY_LIMIT:
+            payloads.append(low.tobytes())
+        else:
+            headers["kind"][index] = _BITMAP
+            words = np.zeros(_WORDS, dtype="<u8")
+            np.bitwise_or.at(words, low >> 6, np.uint64(1) << (low & 63).astype(np.uint64))
+            payloads.append(words.tobytes())
+    return np.array([len(keys)], dtype=_COUNT).tobytes() + headers.tobytes() + b"".join(payloads)
+
+
+def _containers(blob: bytes):
+    """Yield ``(key, kind, payload)`` for each container of a serialized bitmap."""
+
+    count = int(np.frombuffer(blob, dtype=_COUNT, count=1)[0])
+    headers = np.frombuffer(blob, dtype=_HEADER, count=count, offset=_COUNT.itemsize)
+    offset = _COUNT.itemsize + count * _HEADER.itemsize
+    for key, kind, cardinality in headers.tolist():
+        if kind == _ARRAY:
+            payload = np.frombuffer(blob, dtype="<u2", count=cardinality, offset=offset)
+        else:
+            payload = np.frombuffer(blob, dtype="<u8", count=_WORDS, offset=offset)
+        offset += payload.nbytes
+        yield key, kind, payload
+
+
+def decode_bitmap(blob: bytes) -> np.ndarray:
+    """Return the sorted members of a serialized bitmap."""
+
+    parts = []
+    for key, kind, payload in _containers(blob):
+        if kind == _BITMAP:
+            bits = np.unpackbits(payload.view(np.uint8), bitorder="little")
+            payload = np.flatnonzero(bits)
+        parts.append((key << 16) + payload.astype(np.int64))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def word_count(universe: int) -> int:
+    return max(1, -(-universe // 64))
+
+
+def mask(indices: np.ndarray, universe: int) -> np.ndarray:
+    """Dense ``uint64`` mask with the bits of ``indices`` set."""
+
+    words = np.zeros(word_count(universe), dtype=np.uint64)
+    indices = np.asarray(indices, dtype=np.int64)
+    np.bitwise_or.at(words, indices >> 6, np.uint64(1) << (indices & 63).astype(np.uint64))
+    return words
+
+
+def dense_matrix(blobs: Sequence[Optional[bytes]], universe: int) -> np.ndarray:
+    """Expand serialized bitmaps over ``[0, universe)`` into a ``(rows, words)`` matrix.
+
+    Array containers from the whole batch are scattered in one vectorized
+    call. Bitmap containers are copied word for word. ``None`` rows stay empty.
+    """
+
+    width = word_count(universe)
+    matrix = np.zeros((len(blobs), width), dtype=np.uint64)
+    rows: list[np.ndarray] = []
+    members: list[np.ndarray] = []
+    for row, blob in enumerate(blobs):
+        if not blob:
+            continue
+        for key, kind, payload in _containers(blob):
+            first = key * _WORDS
+            if first >= width:
+                continue
+            if kind == _BITMAP:
+                span = min(_WORDS, width - first)
+                matrix[row, first : first + span] = payload[:span]
+            else:
+                values = (key << 16) + payload.astype(np.int64)
+                members.append(values[values < universe])
+                rows.append(np.full(len(members[-1]), row, dtype=np.int64))
+    if members:
+        values = np.concatenate(members)
+        flat = np.concatenate(rows) * width + (values >> 6)
+        np.bitwise_or.at(
+            matrix.reshape(-1), flat, np.uint64(1) << (values & 63).astype(np.uint64)
+        )
+    return matrix
+
+
+def popcount(matrix: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row."""
+
+    return np.bitwise_count(matrix).sum(axis=-1, dtype=np.int64)
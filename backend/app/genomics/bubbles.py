@@ -0,0 +1,363 @@
+"""Bubble decomposition of compiled graphs along their reference paths.
+
+A *bubble* is a stretch of a reference path that other paths or links
+bypass, bounded by two *anchor* steps that every traversal passes through.
+This follows how ``vg deconstruct`` reports snarls against a reference path.
+Bubbles are found with whole-array operations:
+
+1. Every step of every path, and both ends of every link, is mapped to its
+   step index on the reference path. Nodes the reference visits more than
+   once are not mapped.
+2. Two consecutive mapped steps of a path that are not neighbours on the
+   reference cover the reference steps between them. So does a direct link
+   between non-adjacent reference steps. Two neighbouring reference steps
+   with unmapped steps between them on some path mark an insertion.
+3. Uncovered reference steps are anchors. Two consecutive anchors bound a
+   bubble when there are reference steps between them or an insertion
+   after the first one.
+
+Nested bubbles are merged into the outermost one. Sites that lie outside
+the reference or are seen only in unembedded links are not decomposed.
+
+A bubble's *traversals* are the distinct handle sequences that paths take
+between its anchors, oriented like the reference. The reference traversal
+always comes first. All arrays are stored next to the compiled graph:
+
+* ``bubble_paths.npy`` – graph path id of each bubble's reference path
+* ``bubble_starts.npy`` / ``bubble_ends.npy`` – 0-based ``[start, end)`` of the
+  bases between the anchors on that path (empty for insertions)
+* ``bubble_anchors.npy`` – ``(left, right)`` anchor handles per bubble
+* ``bubble_traversal_offsets.npy`` – CSR of traversals per bubble
+* ``traversal_offsets.npy`` / ``traversal_handles.npy`` – CSR of handles per traversal
+* ``node_bubbles.npy`` – bubble of each segment, or ``-1`` for anchors and
+  segments outside any bubble
+
+Bubbles on one reference path are stored in path order, and ids are
+positions in these arrays.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.genomics.gfa import PangenomeGraph, save_array, save_json
+from app.genomics.path_index import PathPositionIndex
+
+_FILES = (
+    "bubble_paths",
+    "bubble_starts",
+    "bubble_ends",
+    "bubble_anchors",
+    "bubble_traversal_offsets",
+    "traversal_offsets",
+    "traversal_handles",
+    "node_bubbles",
+)
+_METADATA = "bubbles.json"
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Bubble:
+    """One bubble with its reference interval and the traversals seen through it."""
+
+    id: int
+    path: str
+    start: int
+    end: int
+    left: int
+    right: int
+    traversals: list[np.ndarray]
+
+
+def reference_paths(graph: PangenomeGraph, reference_sample: Optional[str]) -> dict[str, str]:
+    """Map each contig name to the graph path that serves as its reference.
+
+    Without ``reference_sample`` the reference paths are the ones with plain
+    names (``chr1``). Otherwise they are the PanSN paths of that sample
+    (``GRCh38#0#chr1`` or ``GRCh38#chr1``), named by their last component.
+    """
+
+    contigs: dict[str, str] = {}
+    for name in graph.path_names:
+        parts = name.split("#")
+        if reference_sample is None:
+            if len(parts) == 1:
+                contigs[name] = name
+        elif len(parts) > 1 and parts[0] == reference_sample:
+            contigs.setdefault(parts[-1], name)
+    return contigs
+
+
+class _Decomposer:
+    """Bubble decomposition of one graph, one reference path at a time."""
+
+    def __init__(self, graph: PangenomeGraph) -> None:
+        self.graph = graph
+        self.steps = np.asarray(graph.step_handles)
+        self.offsets = np.asarray(graph.step_offsets)
+        self.step_paths = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        edge_offsets = np.asarray(graph.edge_offsets)
+        self.edge_sources = np.repeat(np.arange(len(edge_offsets) - 1), np.diff(edge_offsets))
+        self.edge_targets = np.asarray(graph.edge_targets)
+
+    def _pairs(self, mapped: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Consecutive mapped steps within each path: their positions and reference indices."""
+
+        positions = np.flatnonzero(mapped >= 0)
+        same_path = self.step_paths[positions[1:]] == self.step_paths[positions[:-1]]
+        before, after = positions[:-1][same_path], positions[1:][same_path]
+        return before, after, mapped[before], mapped[after]
+
+    def decompose(self, path_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Decompose one reference path.
+
+        Returns the reference step indices of every anchor and of the left and
+        right anchors of each bubble, plus the reference index of every graph
+        step (``-1`` when unmapped).
+        """
+
+        first, last = int(self.offsets[path_id]), int(self.offsets[path_id + 1])
+        nodes = self.steps[first:last] >> 1
+        length = len(nodes)
+        repeated = np.bincount(nodes, minlength=self.graph.node_count)[nodes] > 1
+        ref_index = np.full(self.graph.node_count, -1, dtype=np.int64)
+        ref_index[nodes] = np.arange(length)
+        ref_index[nodes[repeated]] = -1
+
+        cover = np.zeros(length + 1, dtype=np.int64)
+        insertion = np.zeros(length, dtype=bool)
+
+        def add(a: np.ndarray, b: np.ndarray, gap: np.ndarray) -> None:
+            low, high = np.minimum(a, b), np.maximum(a, b)
+            span = high - low >= 2
+            np.add.at(cover, low[span] + 1, 1)
+            np.add.at(cover, high[span], -1)
+            insertion[low[(high - low == 1) & gap]] = True
+            # A path leaving a reference node and returning to it is a cycle through it.
+            loop = (high == low) & gap
+            np.add.at(cover, low[loop], 1)
+            np.add.at(cover, low[loop] + 1, -1)
+
+        mapped = ref_index[self.steps >> 1]
+        before, after, a, b = self._pairs(mapped)
+        add(a, b, after - before > 1)
+
+        sources = ref_index[self.edge_sources >> 1]
+        targets = ref_index[self.edge_targets >> 1]
+        linked = (sources >= 0) & (targets >= 0)
+        add(sources[linked], targets[linked], np.zeros(int(linked.sum()), dtype=bool))
+
+        covered = (np.cumsum(cover)[:length] > 0) | repeated
+        anchors = np.flatnonzero(~covered)
+        left, right = anchors[:-1], anchors[1:]
+        is_bubble = (right - left > 1) | insertion[left]
+        return anchors, left[is_bubble], right[is_bubble], mapped
+
+    def traversals(
+        self,
+        path_id: int,
+        anchors: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        mapped: np.ndarray,
+    ) -> list[list[tuple[int, ...]]]:
+        """Distinct handle sequences between the anchors of each bubble, reference first."""
+
+        first, last = int(self.offsets[path_id]), int(self.offsets[path_id + 1])
+        found: list[dict[tuple[int, ...], None]] = [
+            {tuple(self.steps[first + start + 1 : first + end].tolist()): None}
+            for start, end in zip(left.tolist(), right.tolist())
+        ]
+
+        # Steps of any path through two consecutive anchors that bound a bubble.
+        by_left = np.full(last - first, -1, dtype=np.int64)
+        by_left[left] = np.arange(len(left))
+        is_anchor = np.zeros(last - first, dtype=bool)
+        is_anchor[anchors] = True
+        before, after, a, b = self._pairs(np.where(is_anchor[mapped] & (mapped >= 0), mapped, -1))
+        bubble = by_left[np.minimum(a, b)]
+        crossing = (bubble >= 0) & (np.maximum(a, b) == right[np.maximum(bubble, 0)])
+        for start, end, forward, index in zip(
+            before[crossing].tolist(),
+            after[crossing].tolist(),
+            (a < b)[crossing].tolist(),
+            bubble[crossing].tolist(),
+        ):
+            handles = self.steps[start + 1 : end]
+            if not forward:
+                handles = handles[::-1] ^ 1
+            found[index].setdefault(tuple(handles.tolist()), None)
+        return [list(traversals) for traversals in found]
+
+
+def build_bubble_index(
+    graph: PangenomeGraph, path_index: PathPositionIndex, reference_sample: Optional[str]
+) -> None:
+    """Decompose every reference path and store the bubble arrays in the graph directory."""
+
+    decomposer = _Decomposer(graph)
+    references = reference_paths(graph, reference_sample)
+    paths: list[np.ndarray] = []
+    starts: list[np.ndarray] = []
+    ends: list[np.ndarray] = []
+    anchors: list[np.ndarray] = []
+    traversals: list[tuple[int, ...]] = []
+    traversal_counts: list[int] = []
+
+    for path in references.values():
+        path_id = graph.path_id(path)
+        path_anchors, left, right, mapped = decomposer.decompose(path_id)
+        step_starts = np.asarray(path_index.path_step_starts(path))
+        handles = np.asarray(graph.path_steps(path))
+        paths.append(np.full(len(left), path_id, dtype=np.int64))
+        starts.append(step_starts[left + 1])
+        ends.append(step_starts[right])
+        anchors.append(np.stack([handles[left], handles[right]], axis=1))
+        for bubble_traversals in decomposer.traversals(
+            path_id, path_anchors, left, right, mapped
+        ):
+            traversals.extend(bubble_traversals)
+            traversal_counts.append(len(bubble_traversals))
+
+    bubble_count = len(traversal_counts)
+    traversal_offsets = np.zeros(len(traversals) + 1, dtype=np.int64)
+    np.cumsum([len(handles) for handles in traversals], out=traversal_offsets[1:])
+    traversal_handles = np.fromiter(
+        (value for handles in traversals for value in handles),
+        dtype=np.int64,
+        count=int(traversal_offsets[-1]),
+    )
+    bubble_traversal_offsets = np.zeros(bubble_count + 1, dtype=np.int64)
+    np.cumsum(traversal_counts, out=bubble_traversal_offsets[1:])
+
+    # Segments inside a bubble; with several reference paths the first bubble wins.
+    traversal_bubbles = np.repeat(np.arange(bubble_count), traversal_counts)
+    handle_bubbles = np.repeat(traversal_bubbles, np.diff(traversal_offsets))
+    segments, first_seen = np.unique(traversal_handles >> 1, return_index=True)
+    node_bubbles = np.full(graph.node_count, -1, dtype=np.int64)
+    node_bubbles[segments] = handle_bubbles[first_seen]
+
+    def concatenated(parts: list[np.ndarray], shape: tuple[int, ...] = (0,)) -> np.ndarray:
+        return np.concatenate(parts).astype(np.int64) if parts else np.zeros(shape, np.int64)
+
+    arrays = {
+        "bubble_paths": concatenated(paths),
+        "bubble_starts": concatenated(starts),
+        "bubble_ends": concatenated(ends),
+        "bubble_anchors": concatenated(anchors, (0, 2)),
+        "bubble_traversal_offsets": bubble_traversal_offsets,
+        "traversal_offsets": traversal_offsets,
+        "traversal_handles": traversal_handles,
+        "node_bubbles": node_bubbles,
+    }
+    for name, values in arrays.items():
+        save_array(graph.directory, name, values)
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "reference_sample": reference_sample,
+        "reference_paths": references,
+        "bubble_count": bubble_count,
+    }
+    save_json(graph.directory, _METADATA, metadata)
+
+
+class BubbleIndex:
+    """Memory-mapped bubble decomposition of a :class:`PangenomeGraph`."""
+
+    def __init__(self, graph: PangenomeGraph) -> None:
+        self.graph = graph
+        self.metadata = json.loads((graph.directory / _METADATA).read_text())
+        arrays = {name: np.load(graph.directory / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        self.paths = arrays["bubble_paths"]
+        self.starts = arrays["bubble_starts"]
+        self.ends = arrays["bubble_ends"]
+        self.anchors = arrays["bubble_anchors"]
+        self._bubble_traversal_offsets = arrays["bubble_traversal_offsets"]
+        self._traversal_offsets = arrays["traversal_offsets"]
+        self._traversal_handles = arrays["traversal_handles"]
+        self._node_bubbles = arrays["node_bubbles"]
+
+    @classmethod
+    def load_or_build(
+        cls,
+        graph: PangenomeGraph,
+        path_index: PathPositionIndex,
+        reference_sample: Optional[str] = None,
+    ) -> "BubbleIndex":
+        """Open the stored decomposition, rebuilding it if missing or made for other references."""
+
+        metadata_path = graph.directory / _METADATA
+        current = False
+        if metadata_path.exists() and all(
+            (graph.directory / f"{name}.npy").exists() for name in _FILES
+        ):
+            metadata = json.loads(metadata_path.read_text())
+            current = (
+                metadata.get("format_version") == FORMAT_VERSION
+                and metadata.get("reference_sample") == reference_sample
+            )
+        if not current:
+            build_bubble_index(graph, path_index, reference_sample)
+        return cls(graph)
+
+    @property
+    def bubble_count(self) -> int:
+        return int(self.metadata["bubble_count"])
+
+    def reference_path(self, contig: str) -> Optional[str]:
+        """Return the graph path used as the reference for ``contig``, if any."""
+
+        return self.metadata["reference_paths"].get(contig)
+
+    def path_bubbles(self, path: str) -> tuple[int, int]:
+        """Return the id range ``[first, last)`` of the bubbles on a reference path."""
+
+        path_id = self.graph.path_id(path)
+        return (
+            int(np.searchsorted(self.paths, path_id, side="left")),
+            int(np.searchsorted(self.paths, path_id, side="right")),
+        )
+
+    def overlapping(self, path: str, start: int, end: int) -> range:
+        """Return ids of bubbles on ``path`` whose anchors or interior overlap ``[start, end)``."""
+
+        first, last = self.path_bubbles(path)
+        # Widen each bubble by the anchor bases on either side.
+        low = int(np.searchsorted(self.ends[first:last], start - 1, side="right"))
+        high = int(np.searchsorted(self.starts[first:last], end + 1, side="left"))
+        return range(first + low, first + max(high, low))
+
+    def traversal_handles(self, bubble: int) -> list[np.ndarray]:
+        """Return the handle sequence of each traversal of ``bubble``, reference first."""
+
+        first = int(self._bubble_traversal_offsets[bubble])
+        last = int(self._bubble_traversal_offsets[bubble + 1])
+        offsets = self._traversal_offsets
+        return [
+            self._traversal_handles[offsets[index] : offsets[index + 1]]
+            for index in range(first, last)
+        ]
+
+    def bubble(self, bubble: int) -> Bubble:
+        if not 0 <= bubble < self.bubble_count:
+            raise KeyError(bubble)
+        return Bubble(
+            id=bubble,
+            path=self.graph.path_names[int(self.paths[bubble])],
+            start=int(self.starts[bubble]),
+            end=int(self.ends[bubble]),
+            left=int(self.anchors[bubble][0]),
+            right=int(self.anchors[bubble][1]),
+            traversals=self.traversal_handles(bubble),
+        )
+
+    def node_bubble(self, segment: int) -> Optional[int]:
+        """Return the bubble containing ``segment``; ``None`` for anchors and outside segments."""
+
+        bubble = int(self._node_bubbles[segment])
+        return None if bubble < 0 else bubble
@@ -0,0 +1,151 @@
+"""Random access to an uncompressed FASTA file through its ``.fai`` index.
+
+The file is memory-mapped, so a lookup touches only the pages holding the
+requested bases. Every process that opens the same reference shares those
+pages through the OS page cache. The index uses the ``samtools faidx`` format
+and is built next to the FASTA file when it is missing or older than the FASTA.
+"""
+
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from app.genomics.vcf import GZIP_MAGIC
+
+
+class FastaFormatError(ValueError):
+    """Raised when a FASTA file or its index cannot be used."""
+
+
+class FaiEntry(NamedTuple):
+    """One line of a ``.fai`` index."""
+
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".fai")
+
+
+def read_fai(path: Path) -> dict[str, FaiEntry]:
+    """Parse a ``samtools faidx`` index."""
+
+    entries: dict[str, FaiEntry] = {}
+    with path.open("r", encoding="ascii") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5:
+                raise FastaFormatError(f"{path}:{line_number}: expected 5 columns")
+            try:
+                entries[fields[0]] = FaiEntry(*(int(value) for value in fields[1:5]))
+            except ValueError as exc:
+                raise FastaFormatError(f"{path}:{line_number}: {exc}") from exc
+    return entries
+
+
+def build_fai(path: Path) -> dict[str, FaiEntry]:
+    """Index ``path`` in one pass, requiring equal line lengths within each sequence."""
+
+    entries: dict[str, FaiEntry] = {}
+    name: Optional[str] = None
+    length = offset = line_bases = line_width = 0
+    short_line = False
+    position = 0
+    with path.open("rb") as handle:
+        for line in handle:
+            width = len(line)
+            if line.startswith(b">"):
+                if name is not None:
+                    entries[name] = FaiEntry(length, offset, line_bases, line_width)
+                words = line[1:].split(None, 1)
+                if not words:
+                    raise FastaFormatError(f"{path}: empty sequence name at byte {position}")
+                name = words[0].decode("ascii")
+                length = line_bases = line_width = 0
+                offset = position + width
+                short_line = False
+            elif name is not None and (bases := len(line.rstrip(b"\r\n"))):
+                # Only the last line of a sequence may be shorter than the others.
+                uneven = short_line or bases > line_bases > 0
+                if line_bases and bases == line_bases and line.endswith(b"\n"):
+                    uneven = uneven or width != line_width
+                if uneven:
+                    raise FastaFormatError(
+                        f"{path}: sequence {name!r} has lines of different lengths"
+                    )
+                if not line_bases:
+                    line_bases, line_width = bases, width
+                elif bases < line_bases:
+                    short_line = True
+                length += bases
+            position += width
+    if name is not None:
+        entries[name] = FaiEntry(length, offset, line_bases, line_width)
+    return entries
+
+
+def _write_fai(path: Path, entries: dict[str, FaiEntry]) -> None:
+    lines = (f"{name}\t" + "\t".join(map(str, entry)) + "\n" for name, entry in entries.items())
+    path.write_text("".join(lines), encoding="ascii")
+
+
+class IndexedFasta:
+    """A memory-mapped FASTA reference with 1-based, inclusive coordinate lookups."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            if handle.read(len(GZIP_MAGIC)) == GZIP_MAGIC:
+                raise FastaFormatError(
+                    f"{path} is compressed; decompress it so it can be memory-mapped"
+                )
+        index = _index_path(path)
+        if index.exists() and index.stat().st_mtime >= path.stat().st_mtime:
+            self.index = read_fai(index)
+        else:
+            self.index = build_fai(path)
+            try:
+                _write_fai(index, self.index)
+            except OSError:  # read-only reference directory: keep the index in memory
+                pass
+        with path.open("rb") as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def contigs(self) -> list[str]:
+        return list(self.index)
+
+    def __contains__(self, contig: str) -> bool:
+        return contig in self.index
+
+    def length(self, contig: str) -> int:
+        return self.index[contig].length
+
+    def _byte_offset(self, entry: FaiEntry, position: int) -> int:
+        line, column = divmod(position, entry.line_bases)
+        return entry.offset + line * entry.line_width + column
+
+    def fetch(self, contig: str, start: int, end: int) -> str:
+        """Return the upper-cased bases of ``contig:start-end``, clipped to the sequence.
+
+        Raises ``KeyError`` for a contig that is not in the reference.
+        """
+
+        entry = self.index[contig]
+        start, end = max(start, 1), min(end, entry.length)
+        if start > end:
+            return ""
+        first = self._byte_offset(entry, start - 1)
+        last = self._byte_offset(entry, end - 1)
+        chunk = self._data[first : last + 1]
+        if entry.line_width != entry.line_bases:
+            chunk = chunk.replace(b"\n", b"").replace(b"\r", b"")
+        return chunk.decode("ascii").upper()
+
+    def close(self) -> None:
+        self._data.close()
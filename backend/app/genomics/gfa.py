@@ -0,0 +1,441 @@
+"""Compact, memory-mapped storage for GFA v1 pangenome graphs.
+
+A GFA file is compiled once into a directory of flat arrays:
+
+* ``sequences.bin`` / ``names.bin`` – concatenated segment sequences and names
+* ``seq_starts.npy`` / ``seq_lengths.npy`` – per-segment slices into ``sequences.bin``
+
+A segment stored without sequence (``S name * LN:i:N``) is spelled as ``N``
+copies of ``N``, so every slice has its segment's length and the bases of
+neighbouring segments never leak into it. Sequence consumers treat ``N`` as
+an unknown base.
+* ``edge_offsets.npy`` / ``edge_targets.npy`` – CSR adjacency over oriented handles
+* ``path_offsets.npy`` / ``path_steps.npy`` – CSR of oriented handles per path
+
+Segments are numbered ``0..n-1`` in order of first appearance and an oriented
+*handle* is ``2 * segment + is_reverse``. Every link is stored in both
+directions (``a+ -> b+`` also yields ``b- -> a-``) so traversals work from
+either strand. Opening a compiled graph only maps these files, so start-up is
+independent of graph size and every worker process shares the same pages from
+the OS cache instead of holding a private copy.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Optional, TextIO
+
+import numpy as np
+
+FORMAT_VERSION = 2
+# Placeholder bases written per call for segments stored without sequence.
+_PLACEHOLDER = b"N" * (1 << 20)
+_WALK_STEP = re.compile(r"([<>])([^<>]+)")
+_COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+_ARRAYS = (
+    "seq_starts",
+    "seq_lengths",
+    "name_offsets",
+    "name_order",
+    "edge_offsets",
+    "edge_targets",
+    "path_offsets",
+    "path_steps",
+)
+
+
+class GfaFormatError(ValueError):
+    """Raised when a GFA file cannot be parsed."""
+
+
+def handle(segment: int, reverse: bool = False) -> int:
+    """Return the oriented handle for a segment."""
+
+    return segment * 2 + int(reverse)
+
+
+def _open_text(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+class _Compiler:
+    """Single-pass GFA reader accumulating compact arrays."""
+
+    def __init__(self, workdir: Path) -> None:
+        self.ids: dict[str, int] = {}
+        self.seq_starts = array("q")
+        self.seq_lengths = array("q")
+        self.name_offsets = array("q", [0])
+        self.link_sources = array("q")
+        self.link_targets = array("q")
+        self.path_names: list[str] = []
+        self.path_offsets = array("q", [0])
+        self.path_steps = array("q")
+        self.defined: set[int] = set()
+        self._sequences = (workdir / "sequences.bin").open("wb")
+        self._names = (workdir / "names.bin").open("wb")
+
+    def close(self) -> None:
+        self._sequences.close()
+        self._names.close()
+
+    def segment(self, name: str) -> int:
+        segment_id = self.ids.get(name)
+        if segment_id is None:
+            segment_id = len(self.ids)
+            self.ids[name] = segment_id
+            self.seq_starts.append(0)
+            self.seq_lengths.append(0)
+            self.name_offsets.append(self.name_offsets[-1] + self._names.write(name.encode()))
+        return segment_id
+
+    def add_segment(self, fields: list[str]) -> None:
+        if len(fields) < 3:
+            raise GfaFormatError("S line requires a name and a sequence")
+        segment_id = self.segment(fields[1])
+        if segment_id in self.defined:
+            raise GfaFormatError(f"Segment {fields[1]!r} is defined twice")
+        self.defined.add(segment_id)
+
+        sequence = fields[2]
+        self.seq_starts[segment_id] = self._sequences.tell()
+        if sequence == "*":
+            length = next((int(tag[5:]) for tag in fields[3:] if tag.startswith("LN:i:")), 0)
+            remaining = length
+            while remaining:
+                remaining -= self._sequences.write(_PLACEHOLDER[: min(remaining, len(_PLACEHOLDER))])
+            self.seq_lengths[segment_id] = length
+            return
+        self.seq_lengths[segment_id] = self._sequences.write(sequence.encode("ascii"))
+
+    def add_link(self, fields: list[str]) -> None:
+        if len(fields) < 5:
+            raise GfaFormatError("L line requires from, from-orient, to, to-orient")
+        source = handle(self.segment(fields[1]), fields[2] == "-")
+        target = handle(self.segment(fields[3]), fields[4] == "-")
+        self.link_sources.append(source)
+        self.link_targets.append(target)
+
+    def _add_path(self, name: str, steps: Iterator[tuple[str, bool]]) -> None:
+        for segment_name, reverse in steps:
+            self.path_steps.append(handle(self.segment(segment_name), reverse))
+        self.path_names.append(name)
+        self.path_offsets.append(len(self.path_steps))
+
+    def add_path(self, fields: list[str]) -> None:
+        if len(fields) < 3:
+            raise GfaFormatError("P line requires a name and a segment list")
+        steps = fields[2].split(",")
+        for step in steps:
+            if step[-1:] not in ("+", "-"):
+                raise GfaFormatError(f"Invalid path step {step!r} in path {fields[1]!r}")
+        self._add_path(fields[1], ((step[:-1], step[-1] == "-") for step in steps))
+
+    def add_walk(self, fields: list[str]) -> None:
+        if len(fields) < 7:
+            raise GfaFormatError("W line requires sample, haplotype, sequence, start, end and walk")
+        name = f"{fields[1]}#{fields[2]}#{fields[3]}"
+        steps = _WALK_STEP.findall(fields[6])
+        self._add_path(name, ((segment, orient == "<") for orient, segment in steps))
+
+
+def compile_gfa(source: Path, destination: Path) -> Path:
+    """Compile ``source`` into the array layout described in the module docstring."""
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    workdir = Path(tempfile.mkdtemp(prefix=".compile-", dir=destination.parent))
+    compiler = _Compiler(workdir)
+    try:
+        handlers = {
+            "S": compiler.add_segment,
+            "L": compiler.add_link,
+            "P": compiler.add_path,
+            "W": compiler.add_walk,
+        }
+        with _open_text(source) as stream:
+            for line_number, line in enumerate(stream, start=1):
+                handler = handlers.get(line[:1])
+                if handler is None:
+                    continue
+                try:
+                    handler(line.rstrip("\n").split("\t"))
+                except (GfaFormatError, ValueError, IndexError) as exc:
+                    raise GfaFormatError(f"{source}:{line_number}: {exc}") from exc
+        compiler.close()
+
+        node_count = len(compiler.ids)
+        missing = node_count - len(compiler.defined)
+        if missing:
+            raise GfaFormatError(f"{missing} segments are referenced but never defined")
+
+        arrays = _build_arrays(compiler, workdir, node_count)
+        for name, values in arrays.items():
+            np.save(workdir / f"{name}.npy", values)
+
+        step_lengths = arrays["seq_lengths"][arrays["path_steps"] >> 1]
+        cumulative = np.concatenate([[0], np.cumsum(step_lengths)])
+        offsets = arrays["path_offsets"]
+        path_lengths = (cumulative[offsets[1:]] - cumulative[offsets[:-1]]).tolist()
+
+        stat = source.stat()
+        metadata = {
+            "format_version": FORMAT_VERSION,
+            "source": str(source),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "node_count": node_count,
+            "edge_count": int(len(arrays["edge_targets"])),
+            "path_names": compiler.path_names,
+            "path_lengths": path_lengths,
+            "total_length": int(arrays["seq_lengths"].sum()),
+        }
+        (workdir / "graph.json").write_text(json.dumps(metadata))
+
+        try:
+            os.replace(workdir, destination)
+        except OSError:
+            # Another worker finished compiling first; keep its copy.
+            if not (destination / "graph.json").exists():
+                raise
+            shutil.rmtree(workdir, ignore_errors=True)
+    except BaseException:
+        compiler.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    return destination
+
+
+def _build_arrays(compiler: _Compiler, workdir: Path, node_count: int) -> dict[str, np.ndarray]:
+    sources = np.frombuffer(compiler.link_sources, dtype=np.int64)
+    targets = np.frombuffer(compiler.link_targets, dtype=np.int64)
+    # Add the reverse-complement of every link, then drop duplicates. Sorting the
+    # packed (source, target) keys groups edges by source handle for the CSR.
+    all_sources = np.concatenate([sources, targets ^ 1])
+    all_targets = np.concatenate([targets, sources ^ 1])
+    keys = np.unique((all_sources << 32) | all_targets)
+    edge_sources = keys >> 32
+    edge_targets = keys & 0xFFFFFFFF
+    edge_offsets = np.zeros(node_count * 2 + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_sources, minlength=node_count * 2), out=edge_offsets[1:])
+
+    names = (workdir / "names.bin").read_bytes()
+    name_offsets = np.frombuffer(compiler.name_offsets, dtype=np.int64)
+    name_values = np.array(
+        [names[name_offsets[index] : name_offsets[index + 1]] for index in range(node_count)],
+        dtype=bytes,
+    )
+    name_order = np.argsort(name_values, kind="stable") if node_count else np.zeros(0, np.int64)
+
+    return {
+        "seq_starts": np.frombuffer(compiler.seq_starts, dtype=np.int64),
+        "seq_lengths": np.frombuffer(compiler.seq_lengths, dtype=np.int64),
+        "name_offsets": name_offsets,
+        "name_order": name_order.astype(np.int64),
+        "edge_offsets": edge_offsets,
+        "edge_targets": edge_targets.astype(np.int64),
+        "path_offsets": np.frombuffer(compiler.path_offsets, dtype=np.int64),
+        "path_steps": np.frombuffer(compiler.path_steps, dtype=np.int64),
+    }
+
+
+def _map_bytes(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+class _SortedNames(Sequence[bytes]):
+    """Lazy view of segment names in sorted order, for binary search."""
+
+    def __init__(self, graph: "PangenomeGraph") -> None:
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph.node_count
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self._graph._name_bytes(int(self._graph._name_order[index]))
+
+
+class PangenomeGraph:
+    """Read-only pangenome graph backed by memory-mapped arrays."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.metadata = json.loads((directory / "graph.json").read_text())
+        if self.metadata.get("format_version") != FORMAT_VERSION:
+            raise GfaFormatError(f"Unsupported compiled graph format in {directory}")
+
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        self._seq_starts = arrays["seq_starts"]
+        self._seq_lengths = arrays["seq_lengths"]
+        self._name_offsets = arrays["name_offsets"]
+        self._name_order = arrays["name_order"]
+        self._edge_offsets = arrays["edge_offsets"]
+        self._edge_targets = arrays["edge_targets"]
+        self._path_offsets = arrays["path_offsets"]
+        self._path_steps = arrays["path_steps"]
+        self._sequences = _map_bytes(directory / "sequences.bin")
+        self._names = _map_bytes(directory / "names.bin")
+        self._path_index = {name: index for index, name in enumerate(self.metadata["path_names"])}
+
+    @property
+    def node_count(self) -> int:
+        return int(self.metadata["node_count"])
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.metadata["edge_count"])
+
+    @property
+    def path_names(self) -> list[str]:
+        return list(self.metadata["path_names"])
+
+    @property
+    def segment_lengths(self) -> np.ndarray:
+        return self._seq_lengths
+
+    @property
+    def segment_offsets(self) -> np.ndarray:
+        """Offset of each segment's sequence within :attr:`sequence_bytes`."""
+
+        return self._seq_starts
+
+    @property
+    def sequence_bytes(self) -> np.ndarray:
+        """All segment sequences, concatenated, as memory-mapped ASCII bytes."""
+
+        return self._sequences
+
+    @property
+    def edge_offsets(self) -> np.ndarray:
+        """CSR offsets of each oriented handle's successors within :attr:`edge_targets`."""
+
+        return self._edge_offsets
+
+    @property
+    def edge_targets(self) -> np.ndarray:
+        return self._edge_targets
+
+    @property
+    def step_handles(self) -> np.ndarray:
+        """Oriented handles of every path step, concatenated path by path."""
+
+        return self._path_steps
+
+    @property
+    def step_offsets(self) -> np.ndarray:
+        """CSR offsets of each path's steps within :attr:`step_handles`."""
+
+        return self._path_offsets
+
+    def _name_bytes(self, segment: int) -> bytes:
+        return bytes(self._names[self._name_offsets[segment] : self._name_offsets[segment + 1]])
+
+    def segment_name(self, segment: int) -> str:
+        return self._name_bytes(segment).decode()
+
+    def segment_id(self, name: str) -> Optional[int]:
+        """Resolve a segment name to its id with a binary search over sorted names."""
+
+        key = name.encode()
+        position = bisect_left(_SortedNames(self), key)
+        if position < self.node_count:
+            segment = int(self._name_order[position])
+            if self._name_bytes(segment) == key:
+                return segment
+        return None
+
+    def segment_length(self, segment: int) -> int:
+        return int(self._seq_lengths[segment])
+
+    def sequence(self, segment: int) -> str:
+        """Return a segment's bases, all ``N`` when the GFA stored it as ``*``."""
+
+        start = int(self._seq_starts[segment])
+        return bytes(self._sequences[start : start + int(self._seq_lengths[segment])]).decode("ascii")
+
+    def handle_sequence(self, node_handle: int) -> str:
+        """Return the sequence spelled by an oriented handle (reverse-complemented on ``-``)."""
+
+        sequence = self.sequence(node_handle >> 1).upper()
+        if node_handle & 1:
+            return sequence.translate(_COMPLEMENT)[::-1]
+        return sequence
+
+    def successors(self, node_handle: int) -> np.ndarray:
+        """Return oriented handles reachable by one edge from ``node_handle``."""
+
+        return self._edge_targets[self._edge_offsets[node_handle] : self._edge_offsets[node_handle + 1]]
+
+    def neighbors(self, segment: int) -> np.ndarray:
+        """Return segment ids adjacent to ``segment`` on either strand."""
+
+        forward = self.successors(handle(segment))
+        reverse = self.successors(handle(segment, True))
+        return np.unique(np.concatenate([forward, reverse]) >> 1)
+
+    def has_path(self, name: str) -> bool:
+        return name in self._path_index
+
+    def path_id(self, name: str) -> int:
+        return self._path_index[name]
+
+    def path_steps(self, name: str) -> np.ndarray:
+        """Return the oriented handles visited by a path."""
+
+        index = self._path_index[name]
+        return self._path_steps[self._path_offsets[index] : self._path_offsets[index + 1]]
+
+    def path_length(self, name: str) -> int:
+        return int(self.metadata["path_lengths"][self._path_index[name]])
+
+
+def save_array(directory: Path, name: str, values: np.ndarray) -> None:
+    """Write ``<directory>/<name>.npy`` via a rename, so readers never see a partial file."""
+
+    temporary = directory / f".{name}.{os.getpid()}.tmp.npy"
+    np.save(temporary, values)
+    os.replace(temporary, directory / f"{name}.npy")
+
+
+def save_json(directory: Path, name: str, document: dict) -> None:
+    """Store ``document`` as ``<directory>/<name>`` via a rename, like :func:`save_array`."""
+
+    temporary = directory / f".{name}.{os.getpid()}.tmp"
+    temporary.write_text(json.dumps(document))
+    os.replace(temporary, directory / name)
+
+
+def compiled_directory(source: Path, cache_dir: Path) -> Path:
+    """Return the cache location for a compiled copy of ``source``.
+
+    The name embeds the source size and modification time, so editing the GFA
+    transparently triggers a recompile.
+    """
+
+    stat = source.stat()
+    fingerprint = f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{FORMAT_VERSION}"
+    digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+    return cache_dir / f"{source.name}.{digest}"
+
+
+def open_graph(source: Path, cache_dir: Path) -> PangenomeGraph:
+    """Open the compiled form of ``source``, compiling it first if needed."""
+
+    directory = compiled_directory(source, cache_dir)
+    if not (directory / "graph.json").exists():
+        compile_gfa(source, directory)
+    return PangenomeGraph(directory)
@@ -0,0 +1,75 @@
+"""Hierarchical binning index for genomic intervals.
+
+This is the UCSC/tabix binning scheme (the same one stored in ``.tbi`` files):
+the genome is tiled by bins of 512 Mbp, 64 Mbp, 8 Mbp, 1 Mbp, 128 kbp and
+16 kbp. Every interval is assigned the smallest bin that fully contains it, so
+all features overlapping a query lie in one of the bins returned by
+:func:`region_to_bins`. Storing the bin next to each record turns an overlap
+query into an indexed lookup instead of a scan.
+
+The overlapping bins on each level are consecutive, so
+:func:`region_to_bin_ranges` describes them as six ``bin BETWEEN lo AND hi``
+ranges. The number of query parameters therefore stays fixed however long the
+region is; a whole contig spans tens of thousands of 16 kbp bins.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+# (first bin id on level, bit shift of bin width) from coarsest to finest level.
+_LEVELS = ((0, 29), (1, 26), (9, 23), (73, 20), (585, 17), (4681, 14))
+_REGION_PATTERN = re.compile(r"^(?P<contig>[^:\s]+)(?::(?P<start>[\d,]+)(?:-(?P<end>[\d,]+))?)?$")
+MAX_POSITION = 1 << 29
+
+
+class GenomicRegion(NamedTuple):
+    """A 1-based, inclusive genomic interval."""
+
+    contig: str
+    start: int
+    end: int
+
+
+def interval_to_bin(start: int, end: int) -> int:
+    """Return the smallest bin containing the 1-based inclusive interval."""
+
+    begin = max(start - 1, 0)
+    last = max(end - 1, begin)
+    for offset, shift in reversed(_LEVELS):
+        if begin >> shift == last >> shift:
+            return offset + (begin >> shift)
+    return 0
+
+
+def region_to_bin_ranges(start: int, end: int) -> list[tuple[int, int]]:
+    """Return the inclusive ``(first, last)`` bin range per level overlapping ``start``-``end``."""
+
+    begin = max(start - 1, 0)
+    last = min(max(end - 1, begin), MAX_POSITION - 1)
+    return [(offset + (begin >> shift), offset + (last >> shift)) for offset, shift in _LEVELS]
+
+
+def region_to_bins(start: int, end: int) -> list[int]:
+    """Return every bin that may hold intervals overlapping ``start``-``end``."""
+
+    bins: list[int] = []
+    for first, last in region_to_bin_ranges(start, end):
+        bins.extend(range(first, last + 1))
+    return bins
+
+
+def parse_region(value: str) -> GenomicRegion:
+    """Parse ``contig``, ``contig:start`` or ``contig:start-end`` notation."""
+
+    match = _REGION_PATTERN.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid region {value!r}; expected contig:start-end")
+
+    contig = match["contig"]
+    start = int(match["start"].replace(",", "")) if match["start"] else 1
+    end = int(match["end"].replace(",", "")) if match["end"] else MAX_POSITION
+    if start < 1 or end < start:
+        raise ValueError(f"Invalid region {value!r}; start must be >= 1 and <= end")
+    return GenomicRegion(contig=contig, start=start, end=end)
@@ -0,0 +1,309 @@
+"""Precomputed, tiled layout of compiled graphs for the graph explorer.
+
+Every segment gets a 2D position. ``x`` is a base coordinate, and ``lane`` is
+a small integer row:
+
+* Contigs are laid out one after another. A path belongs to the contig named
+  by the last part of its PanSN name (``HG002#1#chr1`` → ``chr1``).
+* A segment on a reference path (see
+  :func:`app.genomics.bubbles.reference_paths`) is placed at its reference
+  offset. Any other segment is placed at the mean offset of the path steps
+  that visit it. Segments on no path take their position from a linked
+  neighbour.
+* Segments are packed into lanes the way a genome browser packs features.
+  Going left to right, most-visited first, each segment takes the lowest lane
+  that is free at its ``x``. The shared backbone therefore ends up in lane 0
+  and alternative alleles stack above it.
+
+Positions are grouped into tiles for a range of zoom levels. At zoom ``z`` a
+tile spans ``tile_bases << (max_zoom - z)`` bases, and the deepest level,
+``max_zoom``, lists individual segments. Coarser levels split each tile into
+``tile_bins`` bins and store one aggregate per bin and lane: segment count,
+bases, summed path depth and extent. Each coarser level has about half the
+rows of the one below, so all levels together take a small multiple of one
+row per segment. Every level is a single array, sorted so that a tile is a
+contiguous slice found by binary search:
+
+* ``layout_nodes.npy`` – ``(x, length, lane, segment, depth)`` per segment,
+  sorted by ``x``
+* ``layout_level_{z}.npy`` – ``(bin, lane, count, bases, depth, x_min,
+  x_max)`` per occupied bin and lane, for ``z < max_zoom``
+* ``layout.json`` – extent, zoom levels and contig offsets
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.genomics.bubbles import reference_paths
+from app.genomics.gfa import PangenomeGraph, save_array, save_json
+from app.genomics.path_index import PathPositionIndex
+
+_METADATA = "layout.json"
+FORMAT_VERSION = 1
+# Passes spreading positions over links to segments that no path visits.
+_PROPAGATION_PASSES = 32
+
+
+@dataclass(frozen=True)
+class LayoutTile:
+    """One tile: individual segments at the deepest zoom, per-bin aggregates above it.
+
+    ``nodes`` rows are ``(x, length, lane, segment, depth)``. ``bins`` rows
+    are ``(bin, lane, count, bases, depth, x_min, x_max)``.
+    """
+
+    z: int
+    x: int
+    start: int
+    end: int
+    detail: bool
+    nodes: np.ndarray
+    bins: np.ndarray
+
+
+def _contig(path: str) -> str:
+    return path.split("#")[-1]
+
+
+def _positions(
+    graph: PangenomeGraph, path_index: PathPositionIndex, reference_sample: Optional[str]
+) -> tuple[np.ndarray, np.ndarray, list[dict], int]:
+    """Return each segment's ``x`` and path depth, the contig table and the total width."""
+
+    names = graph.path_names
+    references = reference_paths(graph, reference_sample)
+    contigs: dict[str, dict] = {}
+    for name in names:
+        contig = contigs.setdefault(
+            _contig(name), {"name": _contig(name), "path": None, "offset": 0, "length": 0}
+        )
+        contig["length"] = max(contig["length"], graph.path_length(name))
+    for contig, path in references.items():
+        if contig in contigs:
+            contigs[contig]["path"] = path
+    offset = 0
+    for contig in contigs.values():
+        contig["offset"] = offset
+        offset += contig["length"]
+
+    steps = np.asarray(graph.step_handles)
+    step_nodes = steps >> 1
+    path_offsets = np.array([contigs[_contig(name)]["offset"] for name in names], dtype=np.int64)
+    step_paths = np.repeat(np.arange(len(names)), np.diff(np.asarray(graph.step_offsets)))
+    step_x = np.asarray(path_index.step_starts) + path_offsets[step_paths]
+
+    node_count = graph.node_count
+    depth = np.bincount(step_nodes, minlength=node_count)
+    x = np.bincount(step_nodes, weights=step_x, minlength=node_count)
+    x = np.divide(x, depth, out=np.full(node_count, np.nan), where=depth > 0)
+    reference_ids = [graph.path_id(path) for path in references.values()]
+    on_reference = np.isin(step_paths, reference_ids)
+    reference_x = np.full(node_count, np.inf)
+    np.minimum.at(reference_x, step_nodes[on_reference], step_x[on_reference])
+    x = np.where(np.isfinite(reference_x), reference_x, x)
+
+    # Segments on no path follow their neighbours. Links are stored on both
+    # strands; leaving a segment forwards places the next one after it, and
+    # leaving it in reverse places the next one before it.
+    lengths = np.asarray(graph.segment_lengths)
+    edge_offsets = np.asarray(graph.edge_offsets)
+    source_handles = np.repeat(np.arange(len(edge_offsets) - 1), np.diff(edge_offsets))
+    sources, targets = source_handles >> 1, np.asarray(graph.edge_targets) >> 1
+    reverse = (source_handles & 1).astype(bool)
+    for _ in range(_PROPAGATION_PASSES):
+        missing = np.isnan(x)
+        reached = missing[targets] & ~missing[sources]
+        if not reached.any():
+            break
+        source, target = sources[reached], targets[reached]
+        x[target] = np.where(
+            reverse[reached], x[source] - lengths[target], x[source] + lengths[source]
+        )
+    missing = np.flatnonzero(np.isnan(x))
+    if len(missing):
+        # Unreachable segments go after the last contig, side by side.
+        ends = np.cumsum(lengths[missing])
+        x[missing] = offset + ends - lengths[missing]
+        offset += int(ends[-1])
+    x = np.clip(np.rint(x), 0, None).astype(np.int64)
+    width = max(offset, int((x + lengths).max()) if node_count else 0)
+    return x, depth.astype(np.int64), list(contigs.values()), width
+
+
+def _lanes(x: np.ndarray, lengths: np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """Greedy interval packing: each segment takes the lowest lane free at its ``x``.
+
+    Occupied lanes sit in a heap keyed by where they become free, and freed
+    lanes in a heap of lane numbers, so each segment costs ``O(log lanes)``.
+    """
+
+    order = np.lexsort((-depth, x))
+    starts, ends = x[order], (x + np.maximum(lengths, 1))[order]
+    placed = np.empty(len(x), dtype=np.int64)
+    busy: list[tuple[int, int]] = []
+    free: list[int] = []
+    lane_count = 0
+    for index, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        while busy and busy[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            lane = heapq.heappop(free)
+        else:
+            lane = lane_count
+            lane_count += 1
+        heapq.heappush(busy, (end, lane))
+        placed[index] = lane
+    lanes = np.empty(len(x), dtype=np.int64)
+    lanes[order] = placed
+    return lanes
+
+
+def _aggregate(
+    bins: np.ndarray, lanes: np.ndarray, x: np.ndarray, lengths: np.ndarray, depth: np.ndarray
+) -> np.ndarray:
+    """One ``(bin, lane, count, bases, depth, x_min, x_max)`` row per occupied bin and lane."""
+
+    if not len(bins):
+        return np.zeros((0, 7), dtype=np.int64)
+    order = np.lexsort((lanes, bins))
+    bins, lanes = bins[order], lanes[order]
+    starts = np.r_[0, np.flatnonzero((np.diff(bins) != 0) | (np.diff(lanes) != 0)) + 1]
+    return np.stack(
+        [
+            bins[starts],
+            lanes[starts],
+            np.diff(np.r_[starts, len(bins)]),
+            np.add.reduceat(lengths[order], starts),
+            np.add.reduceat(depth[order], starts),
+            np.minimum.reduceat(x[order], starts),
+            np.maximum.reduceat((x + lengths)[order], starts),
+        ],
+        axis=1,
+    ).astype(np.int64)
+
+
+def build_layout(
+    graph: PangenomeGraph,
+    path_index: PathPositionIndex,
+    reference_sample: Optional[str],
+    *,
+    tile_bases: int,
+    tile_bins: int,
+) -> None:
+    """Compute segment positions and every zoom level, and store them in the graph directory."""
+
+    x, depth, contigs, width = _positions(graph, path_index, reference_sample)
+    lengths = np.asarray(graph.segment_lengths).astype(np.int64)
+    lanes = _lanes(x, lengths, depth)
+    max_zoom = 0
+    while tile_bases << max_zoom < width:
+        max_zoom += 1
+
+    order = np.lexsort((lanes, x))
+    nodes = np.stack([x, lengths, lanes, np.arange(len(x)), depth], axis=1)[order]
+    save_array(graph.directory, "layout_nodes", nodes.astype(np.int64))
+    for z in range(max_zoom):
+        bins = x * tile_bins // (tile_bases << (max_zoom - z))
+        level = _aggregate(bins, lanes, x, lengths, depth)
+        save_array(graph.directory, f"layout_level_{z}", level)
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "reference_sample": reference_sample,
+        "tile_bases": tile_bases,
+        "tile_bins": tile_bins,
+        "max_zoom": max_zoom,
+        "width": width,
+        "lanes": int(lanes.max()) + 1 if len(lanes) else 0,
+        "max_length": int(lengths.max()) if len(lengths) else 0,
+        "contigs": contigs,
+    }
+    save_json(graph.directory, _METADATA, metadata)
+
+
+class GraphLayout:
+    """Memory-mapped tiled layout of a :class:`PangenomeGraph`."""
+
+    def __init__(self, graph: PangenomeGraph) -> None:
+        self.graph = graph
+        self.metadata = json.loads((graph.directory / _METADATA).read_text())
+        self._nodes = np.load(graph.directory / "layout_nodes.npy", mmap_mode="r")
+        self._levels = [
+            np.load(graph.directory / f"layout_level_{z}.npy", mmap_mode="r")
+            for z in range(self.max_zoom)
+        ]
+
+    @classmethod
+    def load_or_build(
+        cls,
+        graph: PangenomeGraph,
+        path_index: PathPositionIndex,
+        reference_sample: Optional[str] = None,
+        *,
+        tile_bases: int,
+        tile_bins: int,
+    ) -> "GraphLayout":
+        """Open the stored layout, rebuilding it if missing or made with other settings."""
+
+        metadata_path = graph.directory / _METADATA
+        current = False
+        if metadata_path.exists():
+            metadata = json.loads(metadata_path.read_text())
+            current = (
+                metadata.get("format_version") == FORMAT_VERSION
+                and metadata.get("reference_sample") == reference_sample
+                and metadata.get("tile_bases") == tile_bases
+                and metadata.get("tile_bins") == tile_bins
+                and all(
+                    (graph.directory / f"layout_level_{z}.npy").exists()
+                    for z in range(metadata["max_zoom"])
+                )
+                and (graph.directory / "layout_nodes.npy").exists()
+            )
+        if not current:
+            build_layout(
+                graph, path_index, reference_sample, tile_bases=tile_bases, tile_bins=tile_bins
+            )
+        return cls(graph)
+
+    @property
+    def max_zoom(self) -> int:
+        return int(self.metadata["max_zoom"])
+
+    @property
+    def width(self) -> int:
+        return int(self.metadata["width"])
+
+    def tile_span(self, z: int) -> int:
+        return int(self.metadata["tile_bases"]) << (self.max_zoom - z)
+
+    def tile_count(self, z: int) -> int:
+        return max(1, -(-self.width // self.tile_span(z)))
+
+    def tile(self, z: int, x: int) -> LayoutTile:
+        """Return tile ``x`` of zoom level ``z``; ``KeyError`` when out of range."""
+
+        if not 0 <= z <= self.max_zoom or not 0 <= x < self.tile_count(z):
+            raise KeyError((z, x))
+        span = self.tile_span(z)
+        start, end = x * span, (x + 1) * span
+        if z == self.max_zoom:
+            # Long segments starting in earlier tiles still overlap this one.
+            positions = self._nodes[:, 0]
+            first = int(np.searchsorted(positions, start - int(self.metadata["max_length"])))
+            last = int(np.searchsorted(positions, end, side="left"))
+            nodes = np.asarray(self._nodes[first:last])
+            nodes = nodes[nodes[:, 0] + np.maximum(nodes[:, 1], 1) > start]
+            return LayoutTile(z, x, start, end, True, nodes, np.zeros((0, 7), np.int64))
+        bins = int(self.metadata["tile_bins"])
+        level = self._levels[z]
+        first = int(np.searchsorted(level[:, 0], x * bins, side="left"))
+        last = int(np.searchsorted(level[:, 0], (x + 1) * bins, side="left"))
+        bins_slice = np.asarray(level[first:last])
+        return LayoutTile(z, x, start, end, False, np.zeros((0, 5), np.int64), bins_slice)
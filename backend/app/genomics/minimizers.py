@@ -0,0 +1,425 @@
+"""Minimizer index for locating sequences in a compiled graph.
+
+A ``(k, w)`` minimizer is the canonical k-mer with the smallest hash among
+``w`` consecutive k-mers. K-mers are packed two bits per base, and the hash
+is minimap2's invertible ``hash64``. K-mers containing anything other than
+``ACGT`` are skipped, as are palindromes, whose strand is ambiguous.
+Minimizers are computed over whole arrays, one chunk of bases at a time.
+
+The index is split into *shards*:
+
+* one per path, over the path's spelled sequence, with positions as path
+  offsets;
+* one for the segments that no path visits. Their sequences are joined with
+  ``N`` separators, and each position is mapped back to a segment and offset.
+
+A shard is a pair of ``.npy`` files holding hashes (sorted) and positions
+(``offset << 1 | reverse``), so a lookup is a binary search on a
+memory-mapped array. Shards are named by a digest of ``(k, w)`` and the
+sequence they cover, and they live in a store shared by every compiled
+version of the graph. A recompiled graph, for example one with a new
+haplotype, therefore builds shards only for paths whose sequence is new.
+The paths are independent, so missing shards are built in parallel worker
+processes. A per-graph manifest maps each path to its shard.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.genomics.gfa import PangenomeGraph
+
+FORMAT_VERSION = 1
+# Bases spelled and hashed per step while building a shard.
+CHUNK_BASES = 1 << 22
+_MISSING = np.uint64(0xFFFFFFFFFFFFFFFF)
+_ENCODE = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate((b"Aa", b"Cc", b"Gg", b"Tt")):
+    for _base in _bases:
+        _ENCODE[_base] = _code
+_COMPLEMENT = np.arange(256, dtype=np.uint8)
+for _base, _other in zip(b"ACGTNacgtn", b"TGCANtgcan"):
+    _COMPLEMENT[_base] = _other
+
+
+class MinimizerIndexError(ValueError):
+    """Raised for invalid index parameters or queries."""
+
+
+def _hash64(keys: np.ndarray, mask: np.uint64) -> np.ndarray:
+    """minimap2's invertible integer hash, restricted to ``mask``."""
+
+    with np.errstate(over="ignore"):
+        keys = (~keys + (keys << np.uint64(21))) & mask
+        keys = keys ^ (keys >> np.uint64(24))
+        keys = (keys + (keys << np.uint64(3)) + (keys << np.uint64(8))) & mask
+        keys = keys ^ (keys >> np.uint64(14))
+        keys = (keys + (keys << np.uint64(2)) + (keys << np.uint64(4))) & mask
+        keys = keys ^ (keys >> np.uint64(28))
+        keys = (keys + (keys << np.uint64(31))) & mask
+    return keys
+
+
+def minimizers(bases: np.ndarray, k: int, w: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the hashes, positions and strands (``True`` = reverse) of the minimizers of ``bases``.
+
+    ``bases`` is a ``uint8`` array of ASCII bases. A sequence shorter than
+    one full window contributes the minimum over the k-mers it has.
+    """
+
+    codes = _ENCODE[bases]
+    count = len(codes) - k + 1
+    if count <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty.astype(np.uint64), empty, empty.astype(bool)
+
+    forward = np.zeros(count, dtype=np.uint64)
+    reverse = np.zeros(count, dtype=np.uint64)
+    for offset in range(k):
+        values = (codes[offset : offset + count] & 3).astype(np.uint64)
+        forward = (forward << np.uint64(2)) | values
+        reverse |= (np.uint64(3) - values) << np.uint64(2 * offset)
+    unknown = np.concatenate([[0], np.cumsum(codes == 4)])
+    valid = (unknown[k:] == unknown[:-k]) & (forward != reverse)
+
+    mask = np.uint64((1 << (2 * k)) - 1)
+    hashes = np.where(valid, _hash64(np.minimum(forward, reverse), mask), _MISSING)
+    if count >= w:
+        windows = np.lib.stride_tricks.sliding_window_view(hashes, w)
+        positions = np.unique(windows.argmin(axis=1) + np.arange(count - w + 1))
+    else:
+        positions = np.array([hashes.argmin()])
+    positions = positions[hashes[positions] != _MISSING]
+    return hashes[positions], positions.astype(np.int64), (reverse < forward)[positions]
+
+
+def _chunked_minimizers(
+    chunks: Iterable[np.ndarray], k: int, w: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Minimizers of a sequence delivered in chunks, as sorted hashes and packed positions."""
+
+    carry = np.zeros(0, dtype=np.uint8)
+    carry_start = 0
+    last = -1
+    hashes: list[np.ndarray] = []
+    positions: list[np.ndarray] = []
+    for chunk in chunks:
+        # Windows spanning the boundary need the previous chunk's last k + w - 2 bases.
+        buffer = np.concatenate([carry, chunk])
+        chunk_hashes, chunk_positions, strands = minimizers(buffer, k, w)
+        chunk_positions = chunk_positions + carry_start
+        new = chunk_positions > last
+        if new.any():
+            last = int(chunk_positions[new][-1])
+        hashes.append(chunk_hashes[new])
+        positions.append((chunk_positions[new] << 1) | strands[new])
+        tail = min(len(buffer), k + w - 2)
+        carry_start += len(buffer) - tail
+        carry = buffer[len(buffer) - tail :]
+    if not hashes:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    all_hashes = np.concatenate(hashes)
+    all_positions = np.concatenate(positions)
+    order = np.lexsort((all_positions, all_hashes))
+    return all_hashes[order], all_positions[order]
+
+
+def _spell_path(
+    graph: PangenomeGraph, name: str, chunk_bases: int = CHUNK_BASES
+) -> Iterator[np.ndarray]:
+    """Yield the bases spelled by a path as ``uint8`` chunks of about ``chunk_bases``."""
+
+    handles = np.asarray(graph.path_steps(name))
+    sequences = graph.sequence_bytes
+    starts = np.asarray(graph.segment_offsets)[handles >> 1]
+    lengths = np.asarray(graph.segment_lengths)[handles >> 1]
+    reverse = (handles & 1).astype(bool)
+    ends = np.cumsum(lengths)
+    first = 0
+    while first < len(handles):
+        # Steps whose bases fill the next chunk (at least one step).
+        base = int(ends[first - 1]) if first else 0
+        last = max(int(np.searchsorted(ends, base + chunk_bases, side="right")), first + 1)
+        step_lengths = lengths[first:last]
+        total = int(step_lengths.sum())
+        within = np.arange(total) - np.repeat(np.cumsum(step_lengths) - step_lengths, step_lengths)
+        step_starts = np.repeat(starts[first:last], step_lengths)
+        step_reverse = np.repeat(reverse[first:last], step_lengths)
+        step_ends = step_starts + np.repeat(step_lengths, step_lengths) - 1
+        indices = np.where(step_reverse, step_ends - within, step_starts + within)
+        chunk = np.asarray(sequences[indices])
+        yield np.where(step_reverse, _COMPLEMENT[chunk], chunk)
+        first = last
+
+
+def _digest(k: int, w: int, kind: str, chunks: Iterable[np.ndarray]) -> str:
+    digest = hashlib.sha256(f"{FORMAT_VERSION}:{k}:{w}:{kind}:".encode())
+    for chunk in chunks:
+        digest.update(np.ascontiguousarray(chunk).tobytes())
+    return digest.hexdigest()[:32]
+
+
+def _shard_files(store: Path, digest: str) -> tuple[Path, Path]:
+    return store / f"{digest}.hashes.npy", store / f"{digest}.positions.npy"
+
+
+def _segment_files(store: Path, digest: str) -> tuple[Path, Path]:
+    return store / f"{digest}.segments.npy", store / f"{digest}.starts.npy"
+
+
+def _save(files: tuple[Path, Path], *arrays: np.ndarray) -> None:
+    for path, values in zip(files, arrays):
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp.npy")
+        np.save(temporary, values)
+        os.replace(temporary, path)
+
+
+def _build_path_shard(directory: str, store: str, name: str, k: int, w: int) -> tuple[str, bool]:
+    """Build the shard of one path unless the store already has it. Runs in a worker process."""
+
+    graph = PangenomeGraph(Path(directory))
+    digest = _digest(k, w, "path", _spell_path(graph, name))
+    if all(path.exists() for path in _shard_files(Path(store), digest)):
+        return digest, False
+    hashes, positions = _chunked_minimizers(_spell_path(graph, name), k, w)
+    _save(_shard_files(Path(store), digest), hashes, positions)
+    return digest, True
+
+
+def _orphan_segments(graph: PangenomeGraph) -> np.ndarray:
+    visited = np.zeros(graph.node_count, dtype=bool)
+    visited[np.asarray(graph.step_handles) >> 1] = True
+    return np.flatnonzero(~visited)
+
+
+def _build_segment_shard(graph: PangenomeGraph, store: Path, k: int, w: int) -> Optional[str]:
+    """Index the segments no path visits, joined by ``N`` so no k-mer spans two of them."""
+
+    segments = _orphan_segments(graph)
+    if not len(segments):
+        return None
+    separator = np.frombuffer(b"N", dtype=np.uint8)
+    offsets, lengths = np.asarray(graph.segment_offsets), np.asarray(graph.segment_lengths)
+    sequences = graph.sequence_bytes
+    joined = np.concatenate(
+        [
+            part
+            for segment in segments.tolist()
+            for part in (
+                np.asarray(sequences[offsets[segment] : offsets[segment] + lengths[segment]]),
+                separator,
+            )
+        ]
+    )
+    starts = np.zeros(len(segments), dtype=np.int64)
+    np.cumsum(lengths[segments][:-1] + 1, out=starts[1:])
+    digest = _digest(k, w, "segments", (segments.astype(np.int64).view(np.uint8), joined))
+    if not all(path.exists() for path in _shard_files(store, digest)):
+        hashes, positions = _chunked_minimizers((joined,), k, w)
+        _save(_shard_files(store, digest), hashes, positions)
+        _save(_segment_files(store, digest), segments.astype(np.int64), starts)
+    return digest
+
+
+def manifest_path(graph: PangenomeGraph, k: int, w: int) -> Path:
+    return graph.directory / f"minimizers.k{k}.w{w}.json"
+
+
+def shard_store(graph: PangenomeGraph) -> Path:
+    """Directory next to the compiled graphs where shards are shared between versions."""
+
+    return graph.directory.parent / "minimizers"
+
+
+def build_minimizer_index(
+    graph: PangenomeGraph, *, k: int, w: int, workers: Optional[int] = None
+) -> dict:
+    """Build missing shards, write the graph's manifest and return it.
+
+    With more than one worker, path shards are built in a ``forkserver`` (or
+    ``spawn``) process pool; otherwise in this process. The manifest's ``built`` and ``reused``
+    lists tell which paths needed work.
+    """
+
+    if not 1 <= k <= 31:
+        raise MinimizerIndexError("k must be between 1 and 31")
+    if w < 1:
+        raise MinimizerIndexError("w must be at least 1")
+    store = shard_store(graph)
+    store.mkdir(parents=True, exist_ok=True)
+    names = graph.path_names
+    arguments = [(str(graph.directory), str(store), name, k, w) for name in names]
+    if workers is not None and workers > 1 and len(names) > 1:
+        # The server process is multithreaded; do not fork it.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(names)), mp_context=context) as pool:
+            results = list(pool.map(_build_path_shard, *zip(*arguments)))
+    else:
+        results = [_build_path_shard(*argument) for argument in arguments]
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "k": k,
+        "w": w,
+        "paths": {name: digest for name, (digest, _) in zip(names, results)},
+        "segments": _build_segment_shard(graph, store, k, w),
+        "built": [name for name, (_, built) in zip(names, results) if built],
+        "reused": [name for name, (_, built) in zip(names, results) if not built],
+    }
+    target = manifest_path(graph, k, w)
+    temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(manifest))
+    os.replace(temporary, target)
+    return manifest
+
+
+@dataclass(frozen=True)
+class SequenceHit:
+    """A region of a path (or of an unvisited segment) that shares minimizers with the query.
+
+    ``path`` is ``None`` for segment hits, in which case ``start``/``end``
+    are offsets within ``segment``.
+    """
+
+    path: Optional[str]
+    segment: Optional[int]
+    start: int
+    end: int
+    reverse: bool
+    matches: int
+
+
+class MinimizerIndex:
+    """Memory-mapped minimizer shards of one compiled graph."""
+
+    def __init__(self, graph: PangenomeGraph, manifest: dict) -> None:
+        self.graph = graph
+        self.manifest = manifest
+        self.k = int(manifest["k"])
+        self.w = int(manifest["w"])
+        store = shard_store(graph)
+        self._shards: dict[Optional[str], tuple[np.ndarray, np.ndarray]] = {
+            name: self._load(_shard_files(store, digest))
+            for name, digest in manifest["paths"].items()
+        }
+        self._segments: Optional[tuple[np.ndarray, np.ndarray]] = None
+        if manifest["segments"]:
+            self._shards[None] = self._load(_shard_files(store, manifest["segments"]))
+            self._segments = self._load(_segment_files(store, manifest["segments"]))
+
+    @staticmethod
+    def _load(files: tuple[Path, Path]) -> tuple[np.ndarray, np.ndarray]:
+        return np.load(files[0], mmap_mode="r"), np.load(files[1], mmap_mode="r")
+
+    @classmethod
+    def load_or_build(
+        cls, graph: PangenomeGraph, *, k: int, w: int, workers: Optional[int] = None
+    ) -> "MinimizerIndex":
+        path = manifest_path(graph, k, w)
+        if path.exists():
+            manifest = json.loads(path.read_text())
+            store = shard_store(graph)
+            digests = [*manifest["paths"].values(), manifest["segments"]]
+            files = [file for digest in digests if digest for file in _shard_files(store, digest)]
+            if manifest["segments"]:
+                files.extend(_segment_files(store, manifest["segments"]))
+            if manifest.get("format_version") == FORMAT_VERSION and all(
+                file.exists() for file in files
+            ):
+                return cls(graph, manifest)
+        return cls(graph, build_minimizer_index(graph, k=k, w=w, workers=workers))
+
+    def search(
+        self,
+        query: str,
+        *,
+        max_hits: int = 10,
+        min_matches: int = 1,
+        max_occurrences: int = 1000,
+    ) -> tuple[int, list[SequenceHit]]:
+        """Locate ``query`` on both strands.
+
+        Query minimizers are looked up in every shard. Hits on the same
+        target and strand whose implied start positions lie close together
+        are merged into one candidate, scored by the number of distinct query
+        minimizers it shares. Minimizers occurring more than
+        ``max_occurrences`` times in a shard are ignored as repeats. Returns
+        the number of query minimizers and the best hits.
+        """
+
+        if len(query) < self.k:
+            raise MinimizerIndexError(f"Query must be at least k={self.k} bases long")
+        bases = np.frombuffer(query.encode("ascii"), dtype=np.uint8)
+        query_hashes, query_positions, query_reverse = minimizers(bases, self.k, self.w)
+        length = len(query)
+        tolerance = max(16, length // 10)
+
+        candidates: list[SequenceHit] = []
+        for name, (hashes, positions) in self._shards.items():
+            lows = np.searchsorted(hashes, query_hashes, side="left")
+            highs = np.searchsorted(hashes, query_hashes, side="right")
+            counts = highs - lows
+            usable = (counts > 0) & (counts <= max_occurrences)
+            if not usable.any():
+                continue
+            which = np.repeat(np.flatnonzero(usable), counts[usable])
+            take = np.concatenate(
+                [np.arange(low, high) for low, high in zip(lows[usable], highs[usable])]
+            )
+            packed = np.asarray(positions[take])
+            target, target_reverse = packed >> 1, (packed & 1).astype(bool)
+            # Same canonical strand on both sides: the query aligns forward.
+            reverse = target_reverse != query_reverse[which]
+            starts = np.where(
+                reverse,
+                target - (length - query_positions[which] - self.k),
+                target - query_positions[which],
+            )
+            candidates.extend(self._cluster(name, starts, reverse, which, length, tolerance))
+
+        candidates = [hit for hit in candidates if hit.matches >= min_matches]
+        candidates.sort(key=lambda hit: (-hit.matches, hit.path or "", hit.start))
+        return len(query_hashes), candidates[:max_hits]
+
+    def _cluster(
+        self,
+        name: Optional[str],
+        starts: np.ndarray,
+        reverse: np.ndarray,
+        which: np.ndarray,
+        length: int,
+        tolerance: int,
+    ) -> Iterator[SequenceHit]:
+        order = np.lexsort((starts, reverse))
+        starts, reverse, which = starts[order], reverse[order], which[order]
+        breaks = np.flatnonzero((np.diff(starts) > tolerance) | (np.diff(reverse) != 0)) + 1
+        for first, last in zip(np.r_[0, breaks], np.r_[breaks, len(starts)]):
+            start = int(np.median(starts[first:last]))
+            segment = None
+            if name is None:
+                segment, start = self._segment_offset(start)
+            yield SequenceHit(
+                path=name,
+                segment=segment,
+                start=start,
+                end=start + length,
+                reverse=bool(reverse[first]),
+                matches=len(np.unique(which[first:last])),
+            )
+
+    def _segment_offset(self, position: int) -> tuple[int, int]:
+        assert self._segments is not None
+        segments, starts = self._segments
+        index = max(int(np.searchsorted(starts, position, side="right")) - 1, 0)
+        return int(segments[index]), position - int(starts[index])
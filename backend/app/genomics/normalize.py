@@ -0,0 +1,328 @@
+"""VCF normalization: multiallelic splitting, reference checks and left-alignment.
+
+This mirrors ``bcftools norm -m-any --check-ref`` in process. The work is
+split into independent blocks of data lines handled by
+:func:`normalize_block`, which runs in worker processes. Each worker
+memory-maps the reference FASTA once, so all workers share its pages.
+
+* A site with several ALT alleles becomes one record per allele. ``INFO`` and
+  ``FORMAT`` values declared with ``Number=A``, ``R`` or ``G`` keep the entries
+  for that allele. Genotype alleles that refer to the other ALTs become ``0``.
+* ``REF`` is compared with the reference. Mismatches raise
+  :class:`ReferenceMismatchError`, are counted and kept (``warn``), or are
+  dropped (``exclude``). A site that fails the check is not left-aligned.
+* Sequence alleles are trimmed and shifted left across repeats following
+  Tan et al. (2015). Symbolic, breakend, ``*`` and missing alleles are left as
+  they are and counted as ``other``.
+
+Left-alignment can move a record before records that came earlier in the
+input. :class:`RecordReorderer` restores coordinate order, assuming no record
+moves more than :data:`SITE_WINDOW` bp, which is the same assumption bcftools
+makes.
+
+Each block also counts variant types, so statistics for the normalized file
+come out of the same pass.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Optional
+
+from app.genomics.fasta import IndexedFasta
+from app.genomics.vcf import VcfFormatError, VcfRecord, parse_record
+
+CheckRef = Literal["error", "warn", "exclude"]
+SITE_WINDOW = 1000
+
+_NUMBER_PATTERN = re.compile(r"^##(INFO|FORMAT)=<ID=([^,>]+),Number=([^,>]+)")
+_SEQUENCE_ALLELE = re.compile(r"^[ACGTN]+$")
+_TRANSITIONS = {frozenset("AG"), frozenset("CT")}
+# Worker-local references, opened once per process and path.
+_REFERENCES: dict[str, IndexedFasta] = {}
+
+
+class ReferenceMismatchError(VcfFormatError):
+    """Raised when a record's ``REF`` disagrees with the reference in ``error`` mode."""
+
+
+@dataclass(frozen=True)
+class FieldNumbers:
+    """``Number`` of each ``INFO`` and ``FORMAT`` field declared in a VCF header."""
+
+    info: dict[str, str] = field(default_factory=dict)
+    format: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_header(cls, lines: Iterable[str]) -> "FieldNumbers":
+        info: dict[str, str] = {}
+        format_: dict[str, str] = {}
+        for line in lines:
+            match = _NUMBER_PATTERN.match(line)
+            if match:
+                kind, key, number = match.groups()
+                (info if kind == "INFO" else format_)[key] = number
+        return cls(info=info, format=format_)
+
+
+@dataclass
+class NormalizationStats:
+    """Counts collected while normalizing; blocks are combined with :meth:`merge`."""
+
+    input_records: int = 0
+    records: int = 0
+    multiallelic_sites: int = 0
+    split_records: int = 0
+    realigned: int = 0
+    ref_mismatches: int = 0
+    excluded: int = 0
+    snvs: int = 0
+    mnps: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    complex: int = 0
+    other: int = 0
+    transitions: int = 0
+    transversions: int = 0
+    contigs: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "NormalizationStats") -> None:
+        for name, value in vars(other).items():
+            if name == "contigs":
+                self.contigs.update(value)
+            else:
+                setattr(self, name, getattr(self, name) + value)
+
+    def count(self, contig: str, ref: str, alt: str) -> None:
+        """Classify one output record."""
+
+        self.records += 1
+        self.contigs[contig] += 1
+        if not _SEQUENCE_ALLELE.match(alt):
+            self.other += 1
+        elif len(ref) == len(alt) == 1:
+            self.snvs += 1
+            if frozenset((ref, alt)) in _TRANSITIONS:
+                self.transitions += 1
+            else:
+                self.transversions += 1
+        elif len(ref) == len(alt):
+            self.mnps += 1
+        elif len(ref) == 1 and alt.startswith(ref):
+            self.insertions += 1
+        elif len(alt) == 1 and ref.startswith(alt):
+            self.deletions += 1
+        else:
+            self.complex += 1
+
+    def summary(self) -> dict:
+        document = {name: value for name, value in vars(self).items() if name != "contigs"}
+        document["ts_tv_ratio"] = (
+            self.transitions / self.transversions if self.transversions else None
+        )
+        document["contigs"] = dict(self.contigs)
+        return document
+
+
+def left_align(
+    reference: IndexedFasta, contig: str, position: int, ref: str, alt: str
+) -> tuple[int, str, str]:
+    """Return the left-most, parsimonious representation of a ``REF``/``ALT`` pair."""
+
+    if ref == alt:
+        return position, ref, alt
+    while ref[-1] == alt[-1] and (min(len(ref), len(alt)) > 1 or position > 1):
+        ref, alt = ref[:-1], alt[:-1]
+        if not ref or not alt:
+            position -= 1
+            base = reference.fetch(contig, position, position)
+            ref, alt = base + ref, base + alt
+    while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
+        ref, alt = ref[1:], alt[1:]
+        position += 1
+    return position, ref, alt
+
+
+def _select(values: str, number: str, allele: int, alleles: int) -> str:
+    """Keep the entries of a comma-separated value that belong to ALT ``allele``."""
+
+    entries = values.split(",")
+    if number == "A" and len(entries) == alleles:
+        return entries[allele - 1]
+    if number == "R" and len(entries) == alleles + 1:
+        return f"{entries[0]},{entries[allele]}"
+    if number == "G":
+        if len(entries) == (alleles + 1) * (alleles + 2) // 2:  # diploid
+            het = allele * (allele + 1) // 2
+            return f"{entries[0]},{entries[het]},{entries[het + allele]}"
+        if len(entries) == alleles + 1:  # haploid
+            return f"{entries[0]},{entries[allele]}"
+    return values
+
+
+def _split_info(info: str, numbers: dict[str, str], allele: int, alleles: int) -> str:
+    if info == ".":
+        return info
+    entries = []
+    for entry in info.split(";"):
+        key, separator, value = entry.partition("=")
+        number = numbers.get(key)
+        if separator and number in ("A", "R", "G"):
+            entry = f"{key}={_select(value, number, allele, alleles)}"
+        entries.append(entry)
+    return ";".join(entries)
+
+
+def _split_genotype(gt: str, allele: int) -> str:
+    def recode(match: re.Match) -> str:
+        value = match.group(0)
+        if value in (".", "0"):
+            return value
+        return "1" if value == str(allele) else "0"
+
+    return re.sub(r"[^/|]+", recode, gt)
+
+
+def _split_samples(
+    format_field: str, samples: list[str], numbers: dict[str, str], allele: int, alleles: int
+) -> list[str]:
+    keys = format_field.split(":")
+    split: list[str] = []
+    for sample in samples:
+        values = sample.split(":")
+        for index, value in enumerate(values[: len(keys)]):
+            key = keys[index]
+            if key == "GT":
+                values[index] = _split_genotype(value, allele)
+            elif value != "." and numbers.get(key) in ("A", "R", "G"):
+                values[index] = _select(value, numbers[key], allele, alleles)
+        split.append(":".join(values))
+    return split
+
+
+def _reference(path: str) -> IndexedFasta:
+    reference = _REFERENCES.get(path)
+    if reference is None:
+        reference = _REFERENCES[path] = IndexedFasta(Path(path))
+    return reference
+
+
+def _matches_reference(ref: str, expected: Optional[str]) -> bool:
+    if expected is None or len(expected) != len(ref):
+        return False
+    return all(base == other or "N" in (base, other) for base, other in zip(ref, expected))
+
+
+def _normalize_line(
+    line: str,
+    reference: IndexedFasta,
+    numbers: FieldNumbers,
+    check_ref: CheckRef,
+    stats: NormalizationStats,
+) -> Iterator[VcfRecord]:
+    fields = line.split("\t")
+    if len(fields) < 8:
+        raise VcfFormatError(f"Expected at least 8 tab-separated columns, got {len(fields)}")
+    stats.input_records += 1
+    contig, ref = fields[0], fields[3].upper()
+    try:
+        position = int(fields[1])
+    except ValueError as exc:
+        raise VcfFormatError(f"Invalid POS in record at {contig}:{fields[1]}") from exc
+
+    try:
+        expected: Optional[str] = reference.fetch(contig, position, position + len(ref) - 1)
+    except KeyError:
+        expected = None
+    checked = _matches_reference(ref, expected)
+    if not checked:
+        stats.ref_mismatches += 1
+        if check_ref == "error":
+            found = "contig absent from the reference" if expected is None else expected
+            raise ReferenceMismatchError(
+                f"REF {ref} at {contig}:{position} does not match the reference ({found})"
+            )
+        if check_ref == "exclude":
+            stats.excluded += 1
+            return
+
+    alts = fields[4].split(",")
+    if len(alts) > 1:
+        stats.multiallelic_sites += 1
+        stats.split_records += len(alts) - 1
+    for allele, alt in enumerate(alts, start=1):
+        if _SEQUENCE_ALLELE.match(alt.upper()):
+            alt = alt.upper()
+        record_position, record_ref, record_alt = position, ref, alt
+        if checked and _SEQUENCE_ALLELE.match(alt) and _SEQUENCE_ALLELE.match(ref):
+            record_position, record_ref, record_alt = left_align(
+                reference, contig, position, ref, alt
+            )
+            if (record_position, record_ref) != (position, ref):
+                stats.realigned += 1
+        output = [contig, str(record_position), fields[2], record_ref, record_alt, *fields[5:7]]
+        if len(alts) == 1:
+            output.extend(fields[7:])
+        else:
+            output.append(_split_info(fields[7], numbers.info, allele, len(alts)))
+            if len(fields) > 8:
+                output.append(fields[8])
+                output.extend(
+                    _split_samples(fields[8], fields[9:], numbers.format, allele, len(alts))
+                )
+        stats.count(contig, record_ref, record_alt)
+        yield parse_record("\t".join(output))
+
+
+def normalize_block(
+    lines: list[str], reference_path: str, numbers: FieldNumbers, check_ref: CheckRef
+) -> tuple[list[VcfRecord], NormalizationStats]:
+    """Normalize a block of VCF data lines and parse the results.
+
+    Runs in a worker process. Returns the records in input order, which
+    left-alignment may have made unsorted, and the block's statistics.
+    """
+
+    reference = _reference(reference_path)
+    stats = NormalizationStats()
+    records: list[VcfRecord] = []
+    for line in lines:
+        records.extend(_normalize_line(line, reference, numbers, check_ref, stats))
+    return records, stats
+
+
+class RecordReorderer:
+    """Restore coordinate order within each contig after left-alignment.
+
+    Feed records in input order; records come out once no later input can
+    sort before them.
+    """
+
+    def __init__(self, window: int = SITE_WINDOW) -> None:
+        self.window = window
+        self._heap: list[tuple[int, int, VcfRecord]] = []
+        self._contig: Optional[str] = None
+        self._sequence = 0
+        self._frontier = 0
+
+    def push(self, record: VcfRecord) -> Iterator[VcfRecord]:
+        """Add the next record in input order and yield the records it releases."""
+
+        if record.contig != self._contig:
+            yield from self.flush()
+            self._contig = record.contig
+        self._sequence += 1
+        heapq.heappush(self._heap, (record.position, self._sequence, record))
+        self._frontier = max(self._frontier, record.position)
+        while self._heap and self._heap[0][0] < self._frontier - self.window:
+            yield heapq.heappop(self._heap)[2]
+
+    def flush(self) -> Iterator[VcfRecord]:
+        while self._heap:
+            yield heapq.heappop(self._heap)[2]
+        self._frontier = 0
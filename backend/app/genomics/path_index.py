@@ -0,0 +1,194 @@
+"""Path-position index and subgraph extraction for compiled graphs.
+
+Two arrays are precomputed next to the compiled graph:
+
+* ``path_step_starts.npy`` – 0-based offset of every path step along its path,
+  aligned with ``path_steps``. Offsets increase monotonically within a path,
+  so the steps covering a coordinate range are found by binary search.
+* ``node_step_offsets.npy`` / ``node_steps.npy`` – CSR mapping each segment to
+  the global indices of the path steps that visit it.
+
+Together they make extracting a path range ``O(log n + k)`` in the number of
+steps on the path and the size of the result.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.genomics.gfa import PangenomeGraph, save_array
+
+_FILES = ("path_step_starts", "node_step_offsets", "node_steps")
+
+
+@dataclass(frozen=True)
+class PathRun:
+    """A contiguous run of steps ``[first, last)`` (global indices) on one path."""
+
+    path: str
+    first: int
+    last: int
+
+
+@dataclass(frozen=True)
+class Subgraph:
+    """Induced subgraph around a path interval."""
+
+    nodes: np.ndarray
+    edges: list[tuple[int, int]]
+    runs: list[PathRun]
+
+
+def build_path_index(graph: PangenomeGraph) -> None:
+    """Compute the index arrays and store them in the graph directory."""
+
+    steps = np.asarray(graph.step_handles)
+    offsets = np.asarray(graph.step_offsets)
+    lengths = np.asarray(graph.segment_lengths)[steps >> 1]
+
+    # Exclusive prefix sum over all steps, rebased to zero at each path start.
+    global_starts = np.zeros(len(steps), dtype=np.int64)
+    if len(steps):
+        np.cumsum(lengths[:-1], out=global_starts[1:])
+    counts = np.diff(offsets)
+    path_bases = np.repeat(global_starts[offsets[:-1][counts > 0]], counts[counts > 0])
+    step_starts = global_starts - path_bases
+
+    nodes = steps >> 1
+    node_steps = np.argsort(nodes, kind="stable").astype(np.int64)
+    node_step_offsets = np.zeros(graph.node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(nodes, minlength=graph.node_count), out=node_step_offsets[1:])
+
+    save_array(graph.directory, "path_step_starts", step_starts)
+    save_array(graph.directory, "node_step_offsets", node_step_offsets)
+    save_array(graph.directory, "node_steps", node_steps)
+
+
+class PathPositionIndex:
+    """Memory-mapped path-position index for a :class:`PangenomeGraph`."""
+
+    def __init__(self, graph: PangenomeGraph) -> None:
+        self.graph = graph
+        arrays = {name: np.load(graph.directory / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        self._step_starts = arrays["path_step_starts"]
+        self._node_step_offsets = arrays["node_step_offsets"]
+        self._node_steps = arrays["node_steps"]
+        self._path_offsets = graph.step_offsets
+        self._path_steps = graph.step_handles
+
+    @classmethod
+    def load_or_build(cls, graph: PangenomeGraph) -> "PathPositionIndex":
+        if not all((graph.directory / f"{name}.npy").exists() for name in _FILES):
+            build_path_index(graph)
+        return cls(graph)
+
+    def step_range(self, path: str, start: int, end: int) -> tuple[int, int]:
+        """Return global step indices ``[first, last)`` overlapping ``[start, end)`` on ``path``."""
+
+        index = self.graph.path_id(path)
+        path_first = int(self._path_offsets[index])
+        path_last = int(self._path_offsets[index + 1])
+        starts = self._step_starts[path_first:path_last]
+        first = max(int(np.searchsorted(starts, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(starts, end, side="left"))
+        return path_first + first, path_first + max(last, first)
+
+    @property
+    def step_starts(self) -> np.ndarray:
+        """0-based path offset of every step, aligned with ``graph.step_handles``."""
+
+        return self._step_starts
+
+    def path_step_starts(self, path: str) -> np.ndarray:
+        """Return the 0-based offsets at which each step of ``path`` begins."""
+
+        index = self.graph.path_id(path)
+        return self._step_starts[self._path_offsets[index] : self._path_offsets[index + 1]]
+
+    def sequence(self, path: str, start: int, end: int) -> str:
+        """Return the bases spelled by ``path[start:end]``."""
+
+        first, last = self.step_range(path, start, end)
+        if first >= last:
+            return ""
+        handles = self._path_steps[first:last].tolist()
+        bases = "".join(self.graph.handle_sequence(node_handle) for node_handle in handles)
+        skip = start - self.step_offset(first)
+        return bases[skip : skip + end - start]
+
+    def step_offset(self, step: int) -> int:
+        """Return the 0-based path offset at which a global step begins."""
+
+        return int(self._step_starts[step])
+
+    def step_handle(self, step: int) -> int:
+        return int(self._path_steps[step])
+
+    def path_of_step(self, steps: np.ndarray) -> np.ndarray:
+        """Map global step indices to path indices."""
+
+        return np.searchsorted(self._path_offsets, steps, side="right") - 1
+
+    def steps_on_nodes(self, nodes: np.ndarray) -> np.ndarray:
+        """Return sorted global indices of all path steps visiting ``nodes``."""
+
+        if len(nodes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        slices = [
+            self._node_steps[self._node_step_offsets[node] : self._node_step_offsets[node + 1]]
+            for node in nodes
+        ]
+        return np.sort(np.concatenate(slices))
+
+    def extract(
+        self, path: str, start: int, end: int, *, context: int = 0, max_nodes: int | None = None
+    ) -> Subgraph:
+        """Return the subgraph induced by ``path[start:end]`` plus ``context`` hops."""
+
+        first, last = self.step_range(path, start, end)
+        seed = np.unique(np.asarray(self._path_steps[first:last]) >> 1)
+        nodes = set(seed.tolist())
+        frontier = seed.tolist()
+        for _ in range(context):
+            discovered: list[int] = []
+            for node in frontier:
+                for neighbor in self.graph.neighbors(node).tolist():
+                    if neighbor not in nodes:
+                        nodes.add(neighbor)
+                        discovered.append(neighbor)
+            if max_nodes is not None and len(nodes) > max_nodes:
+                break
+            frontier = discovered
+        if max_nodes is not None and len(nodes) > max_nodes:
+            raise ValueError(f"Selection exceeds {max_nodes} nodes; narrow the range or context")
+
+        node_array = np.array(sorted(nodes), dtype=np.int64)
+        edges: list[tuple[int, int]] = []
+        for node in node_array.tolist():
+            for source in (node * 2, node * 2 + 1):
+                for target in self.graph.successors(source).tolist():
+                    # Each link is stored on both strands; keep one canonical copy.
+                    if (target >> 1) in nodes and (source, target) <= (target ^ 1, source ^ 1):
+                        edges.append((source, target))
+
+        runs = self._runs(self.steps_on_nodes(node_array))
+        return Subgraph(nodes=node_array, edges=edges, runs=runs)
+
+    def _runs(self, steps: np.ndarray) -> list[PathRun]:
+        if len(steps) == 0:
+            return []
+        path_ids = self.path_of_step(steps)
+        breaks = np.flatnonzero((np.diff(steps) != 1) | (np.diff(path_ids) != 0)) + 1
+        names = self.graph.path_names
+        runs = []
+        for run_first, run_last in zip(np.r_[0, breaks], np.r_[breaks, len(steps)]):
+            runs.append(
+                PathRun(
+                    path=names[int(path_ids[run_first])],
+                    first=int(steps[run_first]),
+                    last=int(steps[run_last - 1]) + 1,
+                )
+            )
+        return runs
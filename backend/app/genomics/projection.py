@@ -0,0 +1,172 @@
+"""Projection of VCF records onto the bubbles of a compiled graph.
+
+A record is placed on the reference path of its contig. Its 1-based
+``POS``/``REF`` becomes the 0-based path interval ``[POS - 1, POS - 1 + len(REF))``.
+That interval gives two things:
+
+* The segments that ``REF`` overlaps. They are found with a binary search over
+  the path-position index.
+* The bubble that contains the record. The record must lie within the bubble
+  and its two anchor bases, and it must touch the bubble's interior. An indel
+  whose padding base is the last base of the left anchor also counts.
+
+Both lookups run over a whole batch of records at once, grouped by contig.
+Within a bubble the ALT allele is spelled out over the bubble's reference
+sequence and compared with the sequence of each traversal. The traversal
+that matches gives the segments that carry the allele in the graph.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.genomics.bubbles import BubbleIndex
+from app.genomics.path_index import PathPositionIndex
+
+
+@dataclass(frozen=True)
+class VariantProjection:
+    """Where one VCF record lies in the graph."""
+
+    path: str
+    # Segments overlapped by REF on the reference path, in path order.
+    ref_nodes: list[int]
+    bubble: Optional[int] = None
+    # Index of the bubble traversal spelling ALT, and its oriented handles.
+    traversal: Optional[int] = None
+    alt_handles: Optional[list[int]] = None
+
+
+class VariantProjector:
+    """Project batches of records onto one graph's reference paths and bubbles."""
+
+    def __init__(self, bubbles: BubbleIndex, path_index: PathPositionIndex) -> None:
+        self.bubbles = bubbles
+        self.path_index = path_index
+        self.graph = bubbles.graph
+
+    def project(
+        self,
+        contigs: Sequence[str],
+        positions: Sequence[int],
+        refs: Sequence[str],
+        alts: Sequence[str],
+    ) -> list[Optional[VariantProjection]]:
+        """Project records given column-wise; ``None`` for contigs without a reference path."""
+
+        contig_array = np.asarray(contigs, dtype=object)
+        begins = np.asarray(positions, dtype=np.int64) - 1
+        ref_lengths = np.fromiter((len(ref) for ref in refs), dtype=np.int64, count=len(refs))
+        alt_lengths = np.fromiter((len(alt) for alt in alts), dtype=np.int64, count=len(alts))
+        ends = begins + ref_lengths
+
+        projections: list[Optional[VariantProjection]] = [None] * len(contig_array)
+        for contig in dict.fromkeys(contigs):
+            path = self.bubbles.reference_path(contig)
+            if path is None:
+                continue
+            rows = np.flatnonzero(contig_array == contig)
+            self._project_path(
+                path,
+                rows,
+                begins[rows],
+                ends[rows],
+                ref_lengths[rows] != alt_lengths[rows],
+                refs,
+                alts,
+                projections,
+            )
+        return projections
+
+    def _project_path(
+        self,
+        path: str,
+        rows: np.ndarray,
+        begins: np.ndarray,
+        ends: np.ndarray,
+        indels: np.ndarray,
+        refs: Sequence[str],
+        alts: Sequence[str],
+        projections: list[Optional[VariantProjection]],
+    ) -> None:
+        step_starts = self.path_index.path_step_starts(path)
+        nodes = np.asarray(self.graph.path_steps(path)) >> 1
+        first_steps = np.maximum(np.searchsorted(step_starts, begins, side="right") - 1, 0)
+        last_steps = np.maximum(np.searchsorted(step_starts, ends, side="left"), first_steps + 1)
+
+        first_bubble, last_bubble = self.bubbles.path_bubbles(path)
+        starts = np.asarray(self.bubbles.starts[first_bubble:last_bubble])
+        bubble_ends = np.asarray(self.bubbles.ends[first_bubble:last_bubble])
+        # The last bubble whose left anchor base is at or before the record.
+        candidates = np.searchsorted(starts - 1, begins, side="right") - 1
+        found = candidates >= 0
+        candidates = np.maximum(candidates, 0)
+        if len(starts):
+            bubble_starts, bubble_stops = starts[candidates], bubble_ends[candidates]
+            inside = found & (ends <= bubble_stops + 1)
+            touches = ((begins < bubble_stops) & (ends > bubble_starts)) | (
+                indels & (begins == bubble_starts - 1)
+            )
+            in_bubble = inside & touches
+        else:
+            in_bubble = np.zeros(len(rows), dtype=bool)
+
+        windows: dict[int, tuple[str, list[str]]] = {}
+        for index, row in enumerate(rows.tolist()):
+            ref_nodes = nodes[first_steps[index] : last_steps[index]].tolist()
+            if not in_bubble[index]:
+                projections[row] = VariantProjection(path=path, ref_nodes=ref_nodes)
+                continue
+            bubble = first_bubble + int(candidates[index])
+            traversal = self._match_allele(bubble, int(begins[index]), refs[row], alts[row], windows)
+            projections[row] = VariantProjection(
+                path=path,
+                ref_nodes=ref_nodes,
+                bubble=bubble,
+                traversal=traversal,
+                alt_handles=(
+                    None
+                    if traversal is None
+                    else self.bubbles.traversal_handles(bubble)[traversal].tolist()
+                ),
+            )
+
+    def _match_allele(
+        self,
+        bubble: int,
+        begin: int,
+        ref: str,
+        alt: str,
+        windows: dict[int, tuple[str, list[str]]],
+    ) -> Optional[int]:
+        """Return the traversal of ``bubble`` whose sequence carries ``alt``, if any."""
+
+        if not alt.isalpha():
+            return None
+        if bubble not in windows:
+            start, end = int(self.bubbles.starts[bubble]), int(self.bubbles.ends[bubble])
+            path = self.graph.path_names[int(self.bubbles.paths[bubble])]
+            # The bubble's bases plus one anchor base on either side.
+            window = self.path_index.sequence(path, start - 1, end + 1)
+            sequences = [
+                "".join(self.graph.handle_sequence(int(node_handle)) for node_handle in handles)
+                for handles in self.bubbles.traversal_handles(bubble)
+            ]
+            windows[bubble] = (window, sequences)
+        window, sequences = windows[bubble]
+
+        offset = begin - (int(self.bubbles.starts[bubble]) - 1)
+        if window[offset : offset + len(ref)] != ref.upper():
+            return None
+        spelled = window[:offset] + alt.upper() + window[offset + len(ref) :]
+        # Alleles that change an anchor base do not follow a single traversal.
+        if len(spelled) < 2 or (spelled[0], spelled[-1]) != (window[0], window[-1]):
+            return None
+        try:
+            return sequences.index(spelled[1:-1])
+        except ValueError:
+            return None
@@ -0,0 +1,153 @@
+"""Incremental VCF parsing over byte streams."""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import NamedTuple, Optional
+
+from app.genomics.genotypes import carrier_summary, encode_genotypes
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Upper bound on decompressed bytes produced per ``decompress`` call so a highly
+# compressible member never expands into one huge buffer.
+_MAX_INFLATE_CHUNK = 1 << 20
+
+
+class VcfFormatError(ValueError):
+    """Raised when a VCF stream cannot be parsed."""
+
+
+class VcfRecord(NamedTuple):
+    """Site-level fields of a single VCF data line plus its packed genotype calls.
+
+    The last three fields are derived from the calls: the carrier bitmap, the
+    carrier count and the alternate allele frequency.
+    """
+
+    contig: str
+    position: int
+    end_position: int
+    identifier: Optional[str]
+    ref: str
+    alt: str
+    qual: Optional[float]
+    filter: Optional[str]
+    info: Optional[str]
+    genotypes: Optional[bytes] = None
+    carriers: Optional[bytes] = None
+    carrier_count: Optional[int] = None
+    allele_frequency: Optional[float] = None
+
+
+async def decompress_stream(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Yield decompressed bytes from a gzip/BGZF stream.
+
+    BGZF files are a series of concatenated gzip members, so a fresh
+    decompressor is started whenever one member ends. Input that does not begin
+    with the gzip magic number is passed through unchanged.
+    """
+
+    head = b""
+    iterator = chunks.__aiter__()
+    async for chunk in iterator:
+        head += chunk
+        if len(head) >= len(GZIP_MAGIC):
+            break
+
+    if not head.startswith(GZIP_MAGIC):
+        if head:
+            yield head
+        async for chunk in iterator:
+            yield chunk
+        return
+
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+    def inflate(data: bytes):
+        nonlocal decompressor
+        while data:
+            out = decompressor.decompress(data, _MAX_INFLATE_CHUNK)
+            if out:
+                yield out
+            if decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            else:
+                data = decompressor.unconsumed_tail
+
+    try:
+        for out in inflate(head):
+            yield out
+        async for chunk in iterator:
+            for out in inflate(chunk):
+                yield out
+    except zlib.error as exc:
+        raise VcfFormatError(f"Invalid gzip/BGZF data: {exc}") from exc
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole input."""
+
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if pending:
+        yield pending.rstrip(b"\r").decode("utf-8")
+
+
+def _info_end(info: str) -> Optional[int]:
+    for entry in info.split(";"):
+        if entry.startswith("END="):
+            try:
+                return int(entry[4:])
+            except ValueError:
+                return None
+    return None
+
+
+def parse_record(line: str) -> VcfRecord:
+    """Parse the fixed columns of a VCF data line and encode its ``GT`` calls."""
+
+    fields = line.split("\t", 8)
+    if len(fields) < 8:
+        raise VcfFormatError(f"Expected at least 8 tab-separated columns, got {len(fields)}")
+
+    contig, pos, identifier, ref, alt, qual, filter_, info = fields[:8]
+    try:
+        position = int(pos)
+        qual_value = None if qual == "." else float(qual)
+    except ValueError as exc:
+        raise VcfFormatError(f"Invalid POS/QUAL in record at {contig}:{pos}") from exc
+
+    end_position = position + len(ref) - 1
+    if "END=" in info:
+        end_position = _info_end(info) or end_position
+
+    genotypes = carriers = carrier_count = allele_frequency = None
+    if len(fields) == 9:
+        format_field, _, samples = fields[8].partition("\t")
+        if samples:
+            genotypes = encode_genotypes(format_field, samples.split("\t"))
+        if genotypes is not None:
+            carriers, carrier_count, allele_frequency = carrier_summary(genotypes)
+
+    return VcfRecord(
+        contig=contig,
+        position=position,
+        end_position=end_position,
+        identifier=None if identifier == "." else identifier,
+        ref=ref,
+        alt=alt,
+        qual=qual_value,
+        filter=None if filter_ == "." else filter_,
+        info=None if info == "." else info,
+        genotypes=genotypes,
+        carriers=carriers,
+        carrier_count=carrier_count,
+        allele_frequency=allele_frequency,
+    )
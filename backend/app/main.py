@@ -1,14 +1,29 @@
 """FastAPI application entrypoint for PGIP."""
 
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.middleware import RequestTimingMiddleware
+from app.api.routes import annotations as annotations_routes
+from app.api.routes import assets as assets_routes
+from app.api.routes import cache as cache_routes
+from app.api.routes import graph as graph_routes
 from app.api.routes import health as health_routes
+from app.api.routes import pipelines as pipelines_routes
 from app.api.routes import plugins as plugins_routes
+from app.api.routes import runs as runs_routes
+from app.api.routes import variants as variants_routes
 from app.core.config import get_settings
-from app.db.session import create_all, get_engine, init_engine
+from app.db.schema import verify_schema
+from app.db.session import create_all, dispose_engines, get_engine, init_engine
+from app.services import graph as graph_service
+from app.services import ingest as ingest_service
+from app.services import readiness
+from app.services import runs as run_service
 
 settings = get_settings()
 
@@ -16,18 +31,41 @@ settings = get_settings()
 async def lifespan(_: FastAPI):
     """Initialize and tear down shared resources for the application."""
 
+    runtime_settings = get_settings()
     init_engine()
-    await create_all()
+    if runtime_settings.database_schema_mode == "create":
+        await create_all()
+    await verify_schema(get_engine())
+    readiness.reset()
+
+    # The graph is opened lazily; preloading only moves that work off the
+    # request path while /ready reports the worker as not yet ready.
+    warm_up = None
+    if runtime_settings.graph_gfa_path:
+        graph_service.configure_graph(
+            Path(runtime_settings.graph_gfa_path),
+            Path(runtime_settings.graph_cache_dir),
+            reference_sample=runtime_settings.graph_reference_sample,
+            minimizer=(runtime_settings.graph_minimizer_k, runtime_settings.graph_minimizer_w),
+            index_workers=runtime_settings.graph_index_workers,
+            tiles=(runtime_settings.graph_tile_bases, runtime_settings.graph_tile_bins),
+        )
+        if runtime_settings.graph_preload:
+            warm_up = asyncio.create_task(
+                asyncio.to_thread(graph_service.warm_up, runtime_settings.graph_preload_indexes)
+            )
+
+    run_service.start_runtime(runtime_settings)
 
     try:
         yield
     finally:
-        try:
-            engine = get_engine()
-        except RuntimeError:  # pragma: no cover - defensive guard
-            return
-
-        await engine.dispose()
+        await run_service.stop_runtime()
+        if warm_up is not None:
+            await asyncio.gather(warm_up, return_exceptions=True)
+        graph_service.unload_graph()
+        ingest_service.shutdown_normalize_pool()
+        await dispose_engines()
 
 
 app = FastAPI(
@@ -38,16 +76,25 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(RequestTimingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(health_routes.router)
 app.include_router(plugins_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(assets_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(variants_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(graph_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(runs_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(pipelines_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(cache_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(annotations_routes.router, prefix=settings.api_v1_prefix)
 
 
 @app.get("/", summary="Service metadata")
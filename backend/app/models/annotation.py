@@ -0,0 +1,18 @@
+"""Pydantic models for plugin annotation records."""
+
+from typing import Any, Dict
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AnnotationRecord(BaseModel):
+    """One annotation produced by a plugin run, as streamed by the query API."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    run_id: str
+    plugin_name: str
+    plugin_version: str
+    contig: str
+    position: int
+    payload: Dict[str, Any]
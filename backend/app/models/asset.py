@@ -0,0 +1,48 @@
+"""Pydantic models describing ingested data assets."""
+
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class NormalizationSummary(BaseModel):
+    """Counts collected while normalizing a VCF during ingestion.
+
+    ``input_records`` counts the uploaded data lines and ``records`` the
+    normalized records stored for them; the variant-type counts describe the
+    stored records.
+    """
+
+    input_records: int
+    records: int
+    multiallelic_sites: int
+    split_records: int
+    realigned: int
+    ref_mismatches: int
+    excluded: int
+    snvs: int
+    mnps: int
+    insertions: int
+    deletions: int
+    complex: int
+    other: int
+    transitions: int
+    transversions: int
+    ts_tv_ratio: Optional[float] = None
+    contigs: Dict[str, int]
+
+
+class VcfAssetSummary(BaseModel):
+    """Response model describing an ingested VCF."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    source: str
+    status: Literal["loading", "ready", "failed"]
+    samples: List[str]
+    record_count: int
+    normalization: Optional[NormalizationSummary] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
@@ -0,0 +1,18 @@
+"""Pydantic models describing the run result cache."""
+
+from pydantic import BaseModel
+
+
+class CacheStatsSummary(BaseModel):
+    """Effectiveness counters for the content-addressed result cache."""
+
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    hit_ratio: float = 0.0
+    stores: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+    max_bytes: int = 0
@@ -0,0 +1,231 @@
+"""Pydantic models describing pangenome graph resources."""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class GraphPath(BaseModel):
+    """A named path (reference or haplotype) through the graph."""
+
+    name: str
+    steps: int
+    length: int
+
+
+class GraphSummary(BaseModel):
+    """Size statistics for the loaded pangenome graph."""
+
+    source: str
+    node_count: int
+    edge_count: int
+    path_count: int
+    total_length: int
+
+
+class GraphPathList(BaseModel):
+    """Collection of graph paths."""
+
+    paths: List[GraphPath]
+
+
+class GraphNode(BaseModel):
+    """A segment included in a graph selection."""
+
+    id: str
+    length: int
+    sequence: Optional[str] = None
+
+
+class GraphEdge(BaseModel):
+    """A link between two oriented segments."""
+
+    source: str
+    source_orientation: Literal["+", "-"]
+    target: str
+    target_orientation: Literal["+", "-"]
+
+
+class GraphStep(BaseModel):
+    """A path step with its 0-based offset along the path."""
+
+    node: str
+    orientation: Literal["+", "-"]
+    offset: int
+
+
+class GraphSelectionPath(BaseModel):
+    """A contiguous stretch of a path running through the selection."""
+
+    name: str
+    steps: List[GraphStep]
+
+
+class GraphSelection(BaseModel):
+    """Payload of the ``application/vnd.pgip.graph-selection+json`` media type."""
+
+    path: str
+    start: int
+    end: int
+    context: int
+    nodes: List[GraphNode]
+    edges: List[GraphEdge]
+    paths: List[GraphSelectionPath]
+
+
+class GraphHandle(BaseModel):
+    """An oriented segment."""
+
+    node: str
+    orientation: Literal["+", "-"]
+
+
+class BubbleTraversal(BaseModel):
+    """One distinct way through a bubble taken by the embedded paths."""
+
+    index: int
+    reference: bool
+    length: int
+    steps: List[GraphHandle]
+
+
+class GraphBubble(BaseModel):
+    """A bubble on a reference path: the bases between two anchors and its traversals."""
+
+    id: int
+    path: str
+    start: int
+    end: int
+    left: GraphHandle
+    right: GraphHandle
+    traversals: List[BubbleTraversal]
+
+
+class GraphBubbleList(BaseModel):
+    """Bubbles overlapping a reference path interval."""
+
+    bubbles: List[GraphBubble]
+
+
+class GraphProjectionSummary(BaseModel):
+    """Status and counts of a VCF asset's projection onto the loaded graph."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    asset_id: int
+    graph_key: str
+    status: Literal["running", "ready", "failed"]
+    variant_count: int
+    placed_count: int
+    bubble_count: int
+    matched_count: int
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class VariantGraphProjection(BaseModel):
+    """The graph segments and bubble a variant touches.
+
+    ``ref_nodes`` are the segments under ``REF`` on the reference path.
+    ``alt_nodes`` are the segments of the bubble traversal that spells
+    ``ALT``. They are ``null`` when no embedded path carries the allele, and
+    empty for a deletion of the whole bubble interior.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    variant_id: int
+    asset_id: int
+    path: str
+    bubble_id: Optional[int] = None
+    traversal: Optional[int] = None
+    ref_nodes: List[str]
+    alt_nodes: Optional[List[str]] = None
+
+
+class GraphSearchRequest(BaseModel):
+    """A sequence to locate in the loaded graph."""
+
+    sequence: str = Field(min_length=1, max_length=100_000, pattern=r"^[ACGTNacgtn]+$")
+    max_hits: int = Field(default=10, ge=1, le=1000)
+    min_matches: int = Field(default=1, ge=1, description="Shared minimizers required per hit")
+
+
+class GraphSearchHit(BaseModel):
+    """A graph region sharing minimizers with the query.
+
+    ``path`` is ``null`` for hits on a segment that no path visits; ``start``
+    and ``end`` are then offsets within that segment.
+    """
+
+    path: Optional[str] = None
+    start: int
+    end: int
+    strand: Literal["+", "-"]
+    matches: int
+    exact: bool
+    nodes: List[GraphStep]
+
+
+class GraphSearchResult(BaseModel):
+    """Hits for a sequence search, best first."""
+
+    query_length: int
+    minimizers: int
+    hits: List[GraphSearchHit]
+
+
+class GraphLayoutContig(BaseModel):
+    """Where a contig's paths are laid out along the layout's x axis."""
+
+    name: str
+    path: Optional[str] = None
+    offset: int
+    length: int
+
+
+class GraphLayoutSummary(BaseModel):
+    """Extent and zoom levels of the precomputed graph layout."""
+
+    width: int
+    lanes: int
+    max_zoom: int
+    tile_bases: int
+    tile_bins: int
+    contigs: List[GraphLayoutContig]
+
+
+class GraphTileNode(BaseModel):
+    """A segment placed in a detail tile; ``depth`` counts the path steps visiting it."""
+
+    id: str
+    x: int
+    length: int
+    lane: int
+    depth: int
+
+
+class GraphTileBin(BaseModel):
+    """Segments of one lane aggregated into a bin of a coarse tile."""
+
+    lane: int
+    start: int
+    end: int
+    nodes: int
+    bases: int
+    depth: float
+
+
+class GraphTile(BaseModel):
+    """One layout tile: segments and their links at full zoom, bins above it."""
+
+    z: int
+    x: int
+    start: int
+    end: int
+    detail: bool
+    nodes: List[GraphTileNode]
+    bins: List[GraphTileBin]
+    edges: List[GraphEdge]
@@ -0,0 +1,19 @@
+"""Pydantic models describing service readiness."""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ReadinessCheck(BaseModel):
+    """Outcome of one dependency check behind the readiness probe."""
+
+    ok: bool
+    detail: Optional[str] = None
+
+
+class ReadinessReport(BaseModel):
+    """Aggregated readiness of the worker and the dependencies it serves from."""
+
+    status: Literal["ready", "unavailable"]
+    checks: dict[str, ReadinessCheck]
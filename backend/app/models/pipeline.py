@@ -0,0 +1,47 @@
+"""Pydantic models describing plugin pipelines."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.run import RunSummary
+
+
+class StageSource(BaseModel):
+    """An upstream stage output feeding one input of a stage."""
+
+    stage: str = Field(description="Identifier of the upstream stage")
+    output: str = Field(description="Output name in the upstream plugin's manifest")
+
+
+class PipelineStage(BaseModel):
+    """One plugin invocation within a pipeline."""
+
+    id: str = Field(pattern=r"^[a-z0-9][a-z0-9_-]*$", max_length=64)
+    plugin: str
+    version: Optional[str] = Field(default=None, description="Plugin version; latest when omitted")
+    inputs: Dict[str, str] = Field(
+        default_factory=dict, description="Manifest input names mapped to server-side file paths"
+    )
+    sources: Dict[str, StageSource] = Field(
+        default_factory=dict, description="Manifest input names fed by upstream stage outputs"
+    )
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+
+
+class PipelineRequest(BaseModel):
+    """Request body for running a DAG of plugin stages."""
+
+    stages: List[PipelineStage] = Field(min_length=1)
+
+
+class PipelineSummary(BaseModel):
+    """Response model describing a pipeline run and each of its stages."""
+
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    stages: List[RunSummary]
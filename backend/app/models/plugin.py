@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, HttpUrl, field_validator
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator, model_validator
 
 
 class PluginInput(BaseModel):
@@ -15,6 +15,7 @@ class PluginInput(BaseModel):
         "application/vnd.pgip.vcf",
         "application/vnd.pgip.gfa",
         "application/vnd.pgip.graph-selection+json",
+        "application/vnd.pgip.annotation+jsonl",
         "application/json",
         "text/plain",
     ]
@@ -33,6 +34,18 @@ class PluginOutput(BaseModel):
     ] = "application/vnd.pgip.annotation+jsonl"
 
 
+class PluginStream(BaseModel):
+    """Binding of a plugin's standard streams for the ``stream`` I/O mode.
+
+    The named input is piped to the entrypoint's stdin instead of being staged
+    into the workspace, and annotation records written to stdout are collected
+    as the named output while the plugin runs.
+    """
+
+    input: str = Field(description="Input delivered on stdin")
+    output: str = Field(description="Annotation JSONL output read from stdout")
+
+
 class PluginProvenance(BaseModel):
     """Metadata capturing provenance for a plugin build or container image."""
 
@@ -70,6 +83,21 @@ class PluginManifest(BaseModel):
     tags: List[str] = []
     provenance: PluginProvenance
     resources: Optional[dict[str, str]] = None
+    stream: Optional[PluginStream] = None
+
+    @model_validator(mode="after")
+    def validate_stream(self) -> "PluginManifest":
+        if self.stream is None:
+            return self
+        if self.stream.input not in {item.name for item in self.inputs}:
+            raise ValueError(f"Stream input {self.stream.input!r} is not a declared input")
+        outputs = {item.name: item for item in self.outputs}
+        output = outputs.get(self.stream.output)
+        if output is None:
+            raise ValueError(f"Stream output {self.stream.output!r} is not a declared output")
+        if output.media_type != "application/vnd.pgip.annotation+jsonl":
+            raise ValueError("Stream output must have media type application/vnd.pgip.annotation+jsonl")
+        return self
 
 
 class PluginSummary(BaseModel):
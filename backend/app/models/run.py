@@ -0,0 +1,90 @@
+"""Pydantic models describing plugin execution runs."""
+
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+class ShardOptions(BaseModel):
+    """How to split a VCF input into independently annotated regions."""
+
+    input: str = Field(description="Name of the VCF input to split")
+    strategy: Literal["contig", "window"] = "window"
+    window_size: Optional[int] = Field(
+        default=None, gt=0, description="Window length in bp; defaults to the server setting"
+    )
+
+
+class RunRequest(BaseModel):
+    """Request body for starting a plugin run."""
+
+    version: Optional[str] = Field(default=None, description="Plugin version; latest when omitted")
+    inputs: Dict[str, str] = Field(
+        default_factory=dict, description="Mapping of manifest input names to server-side file paths"
+    )
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    shard: Optional[ShardOptions] = Field(
+        default=None, description="Split a VCF input by region and run the plugin once per shard"
+    )
+
+
+class RunSummary(BaseModel):
+    """Response model describing a plugin run."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    plugin_name: str
+    plugin_version: str
+    container_digest: Optional[str] = None
+    status: Literal["queued", "running", "succeeded", "failed"]
+    parameters: Dict[str, Any]
+    inputs: Dict[str, str]
+    workspace: str
+    cpu: float
+    memory: int
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+    shard_count: Optional[int] = None
+    shards_completed: int = 0
+    cache_hits: int = 0
+    wall_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    read_bytes: Optional[int] = None
+    write_bytes: Optional[int] = None
+    record_count: Optional[int] = None
+    pipeline_id: Optional[str] = None
+    stage: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    first_result_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def records_per_second(self) -> Optional[float]:
+        """Annotation records produced per second of plugin wall time."""
+
+        if self.record_count is None or not self.wall_seconds:
+            return None
+        return self.record_count / self.wall_seconds
+
+
+class PluginVersionUsage(BaseModel):
+    """Resource usage of the successful runs of one plugin version and container digest."""
+
+    version: str
+    container_digest: Optional[str] = None
+    runs: int
+    mean_wall_seconds: float
+    mean_cpu_seconds: float
+    mean_cores: float = Field(description="CPU seconds per wall-clock second")
+    mean_peak_rss_bytes: int
+    max_peak_rss_bytes: int
+    mean_read_bytes: Optional[int] = None
+    mean_write_bytes: Optional[int] = None
+    records: int
+    records_per_second: float
+    last_run_at: Optional[datetime] = None
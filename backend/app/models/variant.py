@@ -0,0 +1,93 @@
+"""Pydantic models describing variant records."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class VariantRecord(BaseModel):
+    """Response model for a single ingested variant."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    asset_id: int
+    contig: str
+    position: int
+    end_position: int
+    identifier: Optional[str] = None
+    ref: str
+    alt: str
+    qual: Optional[float] = None
+    filter: Optional[str] = None
+    info: Optional[str] = None
+
+
+class VariantStatistics(BaseModel):
+    """Cohort summary statistics for one variant."""
+
+    id: int
+    contig: str
+    position: int
+    ref: str
+    alt: str
+    called: int
+    call_rate: float
+    allele_frequency: Optional[float] = None
+    heterozygosity: Optional[float] = None
+    hwe_p: float
+
+
+class CohortStatistics(BaseModel):
+    """A page of per-variant statistics for a set of samples of an ingested VCF, in id order."""
+
+    asset_id: int
+    sample_count: int
+    variant_count: int
+    variants: List[VariantStatistics]
+    next_after: Optional[int] = None
+
+
+class CohortQuery(BaseModel):
+    """Sample-set and allele frequency filters over an asset's variants.
+
+    Sample filters combine with AND. ``any_of`` is a union (at least
+    ``min_carriers`` of the samples carry the variant), ``all_of`` an
+    intersection and ``none_of`` an exclusion.
+    """
+
+    any_of: List[str] = Field(default_factory=list)
+    min_carriers: int = Field(default=1, ge=1)
+    all_of: List[str] = Field(default_factory=list)
+    none_of: List[str] = Field(default_factory=list)
+    af_below: Optional[float] = Field(default=None, ge=0, le=1, description="Only AF < af_below")
+    af_at_least: Optional[float] = Field(default=None, ge=0, le=1, description="Only AF >= this")
+    region: Optional[str] = Field(default=None, description="contig:start-end (1-based, inclusive)")
+    after: int = Field(default=0, ge=0, description="next_after of the previous page")
+    limit: int = Field(default=1000, ge=1, le=100_000)
+
+
+class CohortVariant(BaseModel):
+    """A variant matching a cohort query.
+
+    ``carriers`` lists the ``any_of`` and ``all_of`` samples that carry it.
+    """
+
+    id: int
+    contig: str
+    position: int
+    ref: str
+    alt: str
+    allele_frequency: Optional[float] = None
+    carrier_count: int
+    carriers: List[str]
+
+
+class CohortQueryResult(BaseModel):
+    """A page of cohort query matches in variant id order."""
+
+    asset_id: int
+    scanned: int
+    variant_count: int
+    variants: List[CohortVariant]
+    next_after: Optional[int] = None
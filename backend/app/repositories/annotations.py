@@ -0,0 +1,111 @@
+"""Data access helpers for plugin annotation records."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import Select, delete, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Annotation
+from app.genomics.intervals import GenomicRegion
+
+_ANNOTATION_COLUMNS = ("run_id", "plugin_name", "plugin_version", "contig", "position", "payload")
+
+
+class AnnotationKey(NamedTuple):
+    """Position of a record in the ``(contig, position, plugin, id)`` keyset order."""
+
+    contig: str
+    position: int
+    plugin_name: str
+    id: int
+
+
+async def insert_annotations(
+    session: AsyncSession,
+    *,
+    run_id: str,
+    plugin_name: str,
+    plugin_version: str,
+    records: Sequence[tuple[str, int, dict[str, Any]]],
+) -> None:
+    """Insert a batch of ``(contig, position, payload)`` records for one run.
+
+    PostgreSQL uses the binary ``COPY`` protocol through asyncpg; other dialects
+    fall back to a multi-row ``executemany`` insert.
+    """
+
+    if not records:
+        return
+
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Annotation.__tablename__,
+            records=[
+                (run_id, plugin_name, plugin_version, contig, position, json.dumps(payload))
+                for contig, position, payload in records
+            ],
+            columns=_ANNOTATION_COLUMNS,
+        )
+        return
+
+    await session.execute(
+        insert(Annotation),
+        [
+            {
+                "run_id": run_id,
+                "plugin_name": plugin_name,
+                "plugin_version": plugin_version,
+                "contig": contig,
+                "position": position,
+                "payload": payload,
+            }
+            for contig, position, payload in records
+        ],
+    )
+
+
+async def delete_run_annotations(session: AsyncSession, run_id: str) -> None:
+    """Remove every record loaded for a run, e.g. after it failed part-way."""
+
+    await session.execute(delete(Annotation).where(Annotation.run_id == run_id))
+    await session.commit()
+
+
+def keyset_statement(
+    *,
+    region: Optional[GenomicRegion] = None,
+    plugin_name: Optional[str] = None,
+    run_id: Optional[str] = None,
+    after: Optional[AnnotationKey] = None,
+) -> Select[tuple[Annotation]]:
+    """Build a query ordered by ``(contig, position, plugin, id)`` resuming after ``after``.
+
+    The row-value comparison lets the database seek directly into
+    ``ix_annotations_keyset`` instead of skipping ``OFFSET`` rows.
+    """
+
+    stmt: Select[tuple[Annotation]] = select(Annotation)
+    if region is not None:
+        stmt = stmt.where(
+            Annotation.contig == region.contig,
+            Annotation.position >= region.start,
+            Annotation.position <= region.end,
+        )
+    if plugin_name is not None:
+        stmt = stmt.where(Annotation.plugin_name == plugin_name)
+    if run_id is not None:
+        stmt = stmt.where(Annotation.run_id == run_id)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(Annotation.contig, Annotation.position, Annotation.plugin_name, Annotation.id)
+            > tuple_(*after)
+        )
+    return stmt.order_by(
+        Annotation.contig, Annotation.position, Annotation.plugin_name, Annotation.id
+    )
@@ -0,0 +1,108 @@
+"""Data access helpers for ingested VCF assets."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Variant, VcfAsset
+from app.genomics.intervals import interval_to_bin
+from app.genomics.vcf import VcfRecord
+
+_VARIANT_COLUMNS = ("asset_id", *VcfRecord._fields, "bin")
+
+
+async def create_vcf_asset(session: AsyncSession, *, source: str) -> VcfAsset:
+    """Persist a new asset in the ``loading`` state."""
+
+    asset = VcfAsset(
+        source=source,
+        status="loading",
+        header="",
+        samples=[],
+        record_count=0,
+        created_at=datetime.now(timezone.utc),
+    )
+    session.add(asset)
+    await session.commit()
+    await session.refresh(asset)
+    return asset
+
+
+async def get_vcf_asset(session: AsyncSession, asset_id: int) -> Optional[VcfAsset]:
+    """Fetch an asset by primary key."""
+
+    return await session.get(VcfAsset, asset_id)
+
+
+async def insert_variants(
+    session: AsyncSession, *, asset_id: int, records: Sequence[VcfRecord]
+) -> None:
+    """Insert a batch of variant records in a single round trip.
+
+    PostgreSQL uses the binary ``COPY`` protocol through asyncpg; other dialects
+    fall back to a multi-row ``executemany`` insert.
+    """
+
+    if not records:
+        return
+
+    connection = await session.connection()
+    if connection.dialect.name == "postgresql":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Variant.__tablename__,
+            records=[
+                (asset_id, *record, interval_to_bin(record.position, record.end_position))
+                for record in records
+            ],
+            columns=_VARIANT_COLUMNS,
+        )
+        return
+
+    await session.execute(
+        insert(Variant),
+        [
+            {
+                "asset_id": asset_id,
+                **record._asdict(),
+                "bin": interval_to_bin(record.position, record.end_position),
+            }
+            for record in records
+        ],
+    )
+
+
+async def complete_vcf_asset(
+    session: AsyncSession,
+    asset: VcfAsset,
+    *,
+    header: str,
+    samples: list[str],
+    record_count: int,
+    normalization: Optional[dict] = None,
+) -> VcfAsset:
+    """Mark an asset as fully loaded and commit the pending variant batches."""
+
+    asset.header = header
+    asset.normalization = normalization
+    asset.samples = samples
+    asset.record_count = record_count
+    asset.status = "ready"
+    asset.completed_at = datetime.now(timezone.utc)
+    await session.commit()
+    await session.refresh(asset)
+    return asset
+
+
+async def fail_vcf_asset(session: AsyncSession, asset: VcfAsset) -> None:
+    """Roll back partially inserted variants and flag the asset as failed."""
+
+    await session.rollback()
+    asset.status = "failed"
+    asset.completed_at = datetime.now(timezone.utc)
+    await session.commit()
@@ -0,0 +1,65 @@
+"""Data access helpers for pipeline runs."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import PipelineRun, PluginRun
+
+
+async def create_pipeline(
+    session: AsyncSession, pipeline: PipelineRun, runs: list[PluginRun]
+) -> PipelineRun:
+    """Persist a queued pipeline together with one queued run per stage."""
+
+    session.add(pipeline)
+    await session.flush()
+    session.add_all(runs)
+    await session.commit()
+    await session.refresh(pipeline)
+    return pipeline
+
+
+async def get_pipeline(session: AsyncSession, pipeline_id: str) -> Optional[PipelineRun]:
+    """Fetch a pipeline by id."""
+
+    return await session.get(PipelineRun, pipeline_id)
+
+
+async def list_stage_runs(session: AsyncSession, pipeline_id: str) -> list[PluginRun]:
+    """Return the stage runs of a pipeline in submission order."""
+
+    result = await session.execute(
+        select(PluginRun)
+        .where(PluginRun.pipeline_id == pipeline_id)
+        .order_by(PluginRun.created_at, PluginRun.id)
+    )
+    return list(result.scalars().all())
+
+
+async def set_status(session: AsyncSession, pipeline_id: str, status: str) -> None:
+    """Update the status of a pipeline that is still in progress."""
+
+    await session.execute(
+        update(PipelineRun).where(PipelineRun.id == pipeline_id).values(status=status)
+    )
+    await session.commit()
+
+
+async def mark_finished(session: AsyncSession, pipeline_id: str, *, error: Optional[str]) -> None:
+    """Record the final status of a pipeline."""
+
+    await session.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == pipeline_id)
+        .values(
+            status="failed" if error else "succeeded",
+            error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+    )
+    await session.commit()
@@ -2,19 +2,126 @@
 
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Iterable, Optional
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, delete, func, insert, literal_column, select, tuple_, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Plugin
+from app.db.models import PLUGIN_SEARCH_VECTOR, Plugin, PluginFacet
 from app.models.plugin import PluginManifest
 
-
-async def list_plugins(session: AsyncSession) -> list[Plugin]:
-    """Return plugins ordered by most recent update."""
-
-    stmt: Select[tuple[Plugin]] = select(Plugin).order_by(Plugin.updated_at.desc())
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class PluginFilter:
+    """Listing filters; every field that is set must match."""
+
+    tag: Optional[str] = None
+    author: Optional[str] = None
+    input_media_type: Optional[str] = None
+    output_media_type: Optional[str] = None
+    q: Optional[str] = None
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _facets(plugin: Plugin) -> set[tuple[str, str]]:
+    manifest = plugin.manifest or {}
+    facets = {("tag", tag) for tag in plugin.tags or []}
+    facets.update(("author", author) for author in plugin.authors or [])
+    facets.update(("input", item["media_type"]) for item in manifest.get("inputs", []))
+    facets.update(("output", item["media_type"]) for item in manifest.get("outputs", []))
+    facets.update(("word", word) for word in _words(f"{plugin.name} {plugin.description}"))
+    return facets
+
+
+async def _uses_facets(session: AsyncSession) -> bool:
+    connection = await session.connection()
+    return connection.dialect.name != "postgresql"
+
+
+async def _sync_facets(session: AsyncSession, plugins: list[Plugin]) -> None:
+    """Rewrite the facet rows of ``plugins`` on databases without GIN indexes."""
+
+    if not plugins or not await _uses_facets(session):
+        return
+    await session.execute(delete(PluginFacet).where(PluginFacet.plugin_id.in_([p.id for p in plugins])))
+    rows = [
+        {"plugin_id": plugin.id, "kind": kind, "value": value}
+        for plugin in plugins
+        for kind, value in _facets(plugin)
+    ]
+    if rows:
+        await session.execute(insert(PluginFacet), rows)
+
+
+def _facet_match(kind: str, value: str):
+    return Plugin.id.in_(
+        select(PluginFacet.plugin_id).where(PluginFacet.kind == kind, PluginFacet.value == value)
+    )
+
+
+def _filter_clauses(filters: PluginFilter, use_facets: bool) -> list:
+    clauses = []
+    if use_facets:
+        for kind, value in (
+            ("tag", filters.tag),
+            ("author", filters.author),
+            ("input", filters.input_media_type),
+            ("output", filters.output_media_type),
+        ):
+            if value is not None:
+                clauses.append(_facet_match(kind, value))
+        if filters.q:
+            clauses.extend(_facet_match("word", word) for word in _words(filters.q))
+        return clauses
+
+    # Each clause below is answered by a GIN index declared on ``Plugin``.
+    if filters.tag is not None:
+        clauses.append(type_coerce(Plugin.tags, JSONB).contains([filters.tag]))
+    if filters.author is not None:
+        clauses.append(type_coerce(Plugin.authors, JSONB).contains([filters.author]))
+    if filters.input_media_type is not None:
+        document = {"inputs": [{"media_type": filters.input_media_type}]}
+        clauses.append(type_coerce(Plugin.manifest, JSONB).contains(document))
+    if filters.output_media_type is not None:
+        document = {"outputs": [{"media_type": filters.output_media_type}]}
+        clauses.append(type_coerce(Plugin.manifest, JSONB).contains(document))
+    if filters.q:
+        query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), filters.q)
+        clauses.append(PLUGIN_SEARCH_VECTOR.op("@@")(query))
+    return clauses
+
+
+async def list_plugins(
+    session: AsyncSession,
+    filters: PluginFilter = PluginFilter(),
+    *,
+    limit: Optional[int] = None,
+    after: Optional[tuple[datetime, int]] = None,
+) -> list[Plugin]:
+    """Return plugins matching ``filters``, most recently updated first.
+
+    Pages are keyset-paginated on ``(updated_at, id)``: ``after`` is the key
+    of the last plugin of the previous page.
+    """
+
+    stmt: Select[tuple[Plugin]] = select(Plugin).where(
+        *_filter_clauses(filters, await _uses_facets(session))
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Plugin.updated_at, Plugin.id) < tuple_(*after))
+    stmt = stmt.order_by(Plugin.updated_at.desc(), Plugin.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
@@ -49,7 +156,6 @@ async def upsert_plugin(session: AsyncSession, manifest: PluginManifest) -> Plug
         plugin.manifest = manifest_payload
         plugin.created_at = manifest.created_at
         plugin.updated_at = manifest.updated_at
-        plugin.latest_run_at = manifest.updated_at
     else:
         plugin = Plugin(
             name=manifest.name,
@@ -61,10 +167,11 @@ async def upsert_plugin(session: AsyncSession, manifest: PluginManifest) -> Plug
             manifest=manifest_payload,
             created_at=manifest.created_at,
             updated_at=manifest.updated_at,
-            latest_run_at=manifest.updated_at,
         )
         session.add(plugin)
 
+    await session.flush()
+    await _sync_facets(session, [plugin])
     await session.commit()
     await session.refresh(plugin)
     return plugin
@@ -77,6 +184,59 @@ async def delete_plugin(session: AsyncSession, *, name: str, version: str) -> bo
     if plugin is None:
         return False
 
+    # SQLite does not enforce the cascade unless foreign keys are switched on.
+    await session.execute(delete(PluginFacet).where(PluginFacet.plugin_id == plugin.id))
     await session.delete(plugin)
     await session.commit()
     return True
+
+
+_UPSERT_CHUNK = 500
+
+
+def _plugin_values(manifest: PluginManifest) -> dict:
+    return {
+        "name": manifest.name,
+        "version": manifest.version,
+        "description": manifest.description,
+        "entrypoint": manifest.entrypoint,
+        "authors": list(manifest.authors),
+        "tags": list(manifest.tags),
+        "manifest": manifest.model_dump(mode="json"),
+        "created_at": manifest.created_at,
+        "updated_at": manifest.updated_at,
+    }
+
+
+async def upsert_plugins(session: AsyncSession, manifests: Iterable[PluginManifest]) -> list[Plugin]:
+    """Insert or update many manifests in one transaction.
+
+    Uses ``INSERT ... ON CONFLICT (name, version) DO UPDATE`` so each chunk of
+    manifests is a single statement instead of a SELECT plus a write per row.
+    When a name/version pair appears more than once, the last manifest wins.
+    """
+
+    latest = {(manifest.name, manifest.version): manifest for manifest in manifests}
+    rows = [_plugin_values(manifest) for manifest in latest.values()]
+    if not rows:
+        return []
+
+    connection = await session.connection()
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    plugins: list[Plugin] = []
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = dialect.insert(Plugin).values(rows[start : start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Plugin.name, Plugin.version],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ("name", "version")
+            },
+        ).returning(Plugin)
+        result = await session.execute(stmt, execution_options={"populate_existing": True})
+        plugins.extend(result.scalars().all())
+
+    await _sync_facets(session, plugins)
+    await session.commit()
+    return plugins
@@ -0,0 +1,140 @@
+"""Data access helpers for variant-to-graph projections."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import Row, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import GraphProjection, ProjectedVariant, Variant
+
+
+async def start_projection(
+    session: AsyncSession, *, asset_id: int, graph_key: str
+) -> GraphProjection:
+    """Replace any earlier projection of the asset onto this graph with a fresh, running one."""
+
+    previous = select(GraphProjection.id).where(
+        GraphProjection.asset_id == asset_id, GraphProjection.graph_key == graph_key
+    )
+    # Deleted explicitly: SQLite does not enforce the cascade by default.
+    await session.execute(delete(ProjectedVariant).where(ProjectedVariant.projection_id.in_(previous)))
+    await session.execute(delete(GraphProjection).where(GraphProjection.id.in_(previous)))
+    projection = GraphProjection(
+        asset_id=asset_id,
+        graph_key=graph_key,
+        status="running",
+        variant_count=0,
+        placed_count=0,
+        bubble_count=0,
+        matched_count=0,
+        created_at=datetime.now(timezone.utc),
+    )
+    session.add(projection)
+    await session.commit()
+    await session.refresh(projection)
+    return projection
+
+
+async def get_projection(
+    session: AsyncSession, *, asset_id: int, graph_key: str
+) -> Optional[GraphProjection]:
+    """Fetch the projection of an asset onto a graph."""
+
+    result = await session.execute(
+        select(GraphProjection).where(
+            GraphProjection.asset_id == asset_id, GraphProjection.graph_key == graph_key
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def variant_batch(
+    session: AsyncSession, *, asset_id: int, after: int, limit: int
+) -> Sequence[Row]:
+    """Return the next ``limit`` variants of an asset with ids above ``after``."""
+
+    result = await session.execute(
+        select(Variant.id, Variant.contig, Variant.position, Variant.ref, Variant.alt)
+        .where(Variant.asset_id == asset_id, Variant.id > after)
+        .order_by(Variant.id)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def insert_projected(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """Insert a batch of projected variants in a single round trip."""
+
+    if rows:
+        await session.execute(insert(ProjectedVariant), rows)
+
+
+async def complete_projection(
+    session: AsyncSession, projection: GraphProjection, *, counts: dict[str, int]
+) -> GraphProjection:
+    """Mark a projection as ready and commit its rows."""
+
+    for name, value in counts.items():
+        setattr(projection, name, value)
+    projection.status = "ready"
+    projection.completed_at = datetime.now(timezone.utc)
+    await session.commit()
+    await session.refresh(projection)
+    return projection
+
+
+async def fail_projection(session: AsyncSession, projection: GraphProjection) -> None:
+    """Roll back partially inserted rows and flag the projection as failed."""
+
+    await session.rollback()
+    projection.status = "failed"
+    projection.completed_at = datetime.now(timezone.utc)
+    await session.commit()
+
+
+async def variant_projection(
+    session: AsyncSession, *, variant_id: int, graph_key: str
+) -> Optional[tuple[ProjectedVariant, int]]:
+    """Return a variant's projection onto a graph together with its asset id."""
+
+    result = await session.execute(
+        select(ProjectedVariant, GraphProjection.asset_id)
+        .join(GraphProjection, GraphProjection.id == ProjectedVariant.projection_id)
+        .where(
+            ProjectedVariant.variant_id == variant_id,
+            GraphProjection.graph_key == graph_key,
+            GraphProjection.status == "ready",
+        )
+    )
+    row = result.first()
+    return None if row is None else (row[0], row[1])
+
+
+async def bubble_variants(
+    session: AsyncSession,
+    *,
+    bubble_id: int,
+    graph_key: str,
+    asset_id: Optional[int] = None,
+    limit: int,
+) -> list[tuple[Variant, ProjectedVariant]]:
+    """Return the variants projected into a bubble, ordered by position."""
+
+    stmt = (
+        select(Variant, ProjectedVariant)
+        .join(ProjectedVariant, ProjectedVariant.variant_id == Variant.id)
+        .join(GraphProjection, GraphProjection.id == ProjectedVariant.projection_id)
+        .where(
+            ProjectedVariant.bubble_id == bubble_id,
+            GraphProjection.graph_key == graph_key,
+            GraphProjection.status == "ready",
+        )
+    )
+    if asset_id is not None:
+        stmt = stmt.where(GraphProjection.asset_id == asset_id)
+    result = await session.execute(stmt.order_by(Variant.position, Variant.id).limit(limit))
+    return [(row[0], row[1]) for row in result.all()]
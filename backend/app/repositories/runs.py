@@ -0,0 +1,193 @@
+"""Data access helpers for plugin runs."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Row, Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Plugin, PluginRun
+from app.runtime.accounting import ResourceUsage
+
+_UNFINISHED = ("queued", "running")
+
+
+async def create_run(session: AsyncSession, run: PluginRun) -> PluginRun:
+    """Persist a newly queued run."""
+
+    session.add(run)
+    await session.commit()
+    await session.refresh(run)
+    return run
+
+
+async def get_run(session: AsyncSession, run_id: str) -> Optional[PluginRun]:
+    """Fetch a run by id."""
+
+    return await session.get(PluginRun, run_id)
+
+
+async def list_runs(
+    session: AsyncSession, *, plugin_name: Optional[str] = None, limit: int = 100
+) -> list[PluginRun]:
+    """Return the most recent runs, optionally for a single plugin."""
+
+    stmt: Select[tuple[PluginRun]] = select(PluginRun)
+    if plugin_name is not None:
+        stmt = stmt.where(PluginRun.plugin_name == plugin_name)
+    stmt = stmt.order_by(PluginRun.created_at.desc()).limit(limit)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def mark_running(session: AsyncSession, run_id: str) -> bool:
+    """Record that a run has been dispatched to a worker.
+
+    Returns ``False`` without changing anything if the run already finished,
+    e.g. because it was failed as orphaned while its worker was disconnected.
+    """
+
+    result = await session.execute(
+        update(PluginRun)
+        .where(PluginRun.id == run_id, PluginRun.status.in_(_UNFINISHED))
+        .values(status="running", started_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount > 0
+
+
+async def renew_leases(session: AsyncSession, run_ids: Collection[str]) -> None:
+    """Record that the runs in ``run_ids`` are still being executed by this worker."""
+
+    if run_ids:
+        await session.execute(
+            update(PluginRun)
+            .where(PluginRun.id.in_(list(run_ids)), PluginRun.status.in_(_UNFINISHED))
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+
+
+async def fail_expired(session: AsyncSession, *, before: datetime, error: str) -> int:
+    """Mark unfinished runs whose lease was last renewed before ``before`` as failed.
+
+    Runs never renewed count from ``created_at``. Returns the number of runs failed.
+    """
+
+    result = await session.execute(
+        update(PluginRun)
+        .where(
+            PluginRun.status.in_(_UNFINISHED),
+            func.coalesce(PluginRun.heartbeat_at, PluginRun.created_at) < before,
+        )
+        .values(status="failed", exit_code=-1, error=error, finished_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def mark_first_result(session: AsyncSession, run_id: str) -> None:
+    """Record when the first annotation of a run became queryable."""
+
+    await session.execute(
+        update(PluginRun)
+        .where(PluginRun.id == run_id, PluginRun.first_result_at.is_(None))
+        .values(first_result_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+
+
+async def set_shard_count(session: AsyncSession, run_id: str, shard_count: int) -> None:
+    """Record how many shards a sharded run was split into."""
+
+    await session.execute(
+        update(PluginRun).where(PluginRun.id == run_id).values(shard_count=shard_count)
+    )
+    await session.commit()
+
+
+async def increment_shards_completed(session: AsyncSession, run_id: str) -> None:
+    """Atomically count one more finished shard."""
+
+    await session.execute(
+        update(PluginRun)
+        .where(PluginRun.id == run_id)
+        .values(shards_completed=PluginRun.shards_completed + 1)
+    )
+    await session.commit()
+
+
+async def mark_finished(
+    session: AsyncSession,
+    run_id: str,
+    *,
+    exit_code: int,
+    error: Optional[str],
+    cache_hits: int = 0,
+    usage: Optional[ResourceUsage] = None,
+    record_count: Optional[int] = None,
+) -> bool:
+    """Record the outcome and resource usage of a run and bump the plugin's ``latest_run_at``.
+
+    Only unfinished runs are updated. Returns ``False`` if the run does not
+    exist or already has a final status, which is then left as it is.
+    """
+
+    run = await session.get(PluginRun, run_id, with_for_update=True, populate_existing=True)
+    if run is None or run.status not in _UNFINISHED:
+        return False
+    finished_at = datetime.now(timezone.utc)
+    run.status = "succeeded" if exit_code == 0 and error is None else "failed"
+    run.exit_code = exit_code
+    run.error = error
+    run.cache_hits = cache_hits
+    run.record_count = record_count
+    if usage is not None:
+        run.wall_seconds = usage.wall_seconds
+        run.cpu_seconds = usage.cpu_seconds
+        run.peak_rss_bytes = usage.peak_rss_bytes
+        run.read_bytes = usage.read_bytes
+        run.write_bytes = usage.write_bytes
+    run.finished_at = finished_at
+    await session.execute(
+        update(Plugin)
+        .where(Plugin.name == run.plugin_name, Plugin.version == run.plugin_version)
+        .values(latest_run_at=finished_at)
+    )
+    await session.commit()
+    return True
+
+
+async def version_usage(session: AsyncSession, plugin_name: str) -> list[Row]:
+    """Aggregate the measured, successful runs of a plugin per version and container digest.
+
+    Cache hits and runs that never started have no measurements and are left out.
+    """
+
+    stmt = (
+        select(
+            PluginRun.plugin_version.label("version"),
+            PluginRun.container_digest,
+            func.count().label("runs"),
+            func.sum(PluginRun.wall_seconds).label("wall_seconds"),
+            func.sum(PluginRun.cpu_seconds).label("cpu_seconds"),
+            func.avg(PluginRun.peak_rss_bytes).label("mean_peak_rss_bytes"),
+            func.max(PluginRun.peak_rss_bytes).label("max_peak_rss_bytes"),
+            func.avg(PluginRun.read_bytes).label("mean_read_bytes"),
+            func.avg(PluginRun.write_bytes).label("mean_write_bytes"),
+            func.coalesce(func.sum(PluginRun.record_count), 0).label("records"),
+            func.max(PluginRun.finished_at).label("last_run_at"),
+        )
+        .where(
+            PluginRun.plugin_name == plugin_name,
+            PluginRun.status == "succeeded",
+            PluginRun.wall_seconds.is_not(None),
+        )
+        .group_by(PluginRun.plugin_version, PluginRun.container_digest)
+        .order_by(func.max(PluginRun.finished_at).desc())
+    )
+    result = await session.execute(stmt)
+    return list(result.all())
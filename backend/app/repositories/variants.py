@@ -0,0 +1,100 @@
+"""Data access helpers for ingested variants."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Variant
+from app.genomics.intervals import GenomicRegion, region_to_bin_ranges
+
+
+def _overlaps(region: GenomicRegion) -> tuple[ColumnElement[bool], ...]:
+    """Overlap predicates resolved through the binning index, one bin range per level."""
+
+    ranges = region_to_bin_ranges(region.start, region.end)
+    bins = or_(*(Variant.bin.between(first, last) for first, last in ranges))
+    return (
+        Variant.contig == region.contig,
+        bins,
+        Variant.position <= region.end,
+        Variant.end_position >= region.start,
+    )
+
+
+def region_statement(
+    region: GenomicRegion, *, asset_id: Optional[int] = None
+) -> Select[tuple[Variant]]:
+    """Build an overlap query that is resolved through the binning index."""
+
+    stmt: Select[tuple[Variant]] = select(Variant).where(*_overlaps(region))
+    if asset_id is not None:
+        stmt = stmt.where(Variant.asset_id == asset_id)
+    return stmt.order_by(Variant.position, Variant.id)
+
+
+async def query_region(
+    session: AsyncSession,
+    region: GenomicRegion,
+    *,
+    asset_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list[Variant]:
+    """Return variants overlapping ``region`` ordered by position."""
+
+    stmt = region_statement(region, asset_id=asset_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+def genotype_statement(
+    asset_id: int, *, after: int = 0, region: Optional[GenomicRegion] = None
+) -> Select:
+    """Select sites and packed genotypes of an asset's variants with ids above ``after``, by id."""
+
+    stmt = select(
+        Variant.id, Variant.contig, Variant.position, Variant.ref, Variant.alt, Variant.genotypes
+    ).where(Variant.asset_id == asset_id, Variant.id > after)
+    if region is not None:
+        stmt = stmt.where(*_overlaps(region))
+    return stmt.order_by(Variant.id)
+
+
+def carrier_statement(
+    asset_id: int,
+    *,
+    after: int,
+    region: Optional[GenomicRegion] = None,
+    af_below: Optional[float] = None,
+    af_at_least: Optional[float] = None,
+    carried: bool = False,
+) -> Select:
+    """Select the carrier bitmaps of an asset's variants with ids above ``after``, in id order.
+
+    Frequency bounds and ``carried`` (at least one carrier) are applied in
+    SQL so bitmaps of variants that cannot match are never loaded.
+    """
+
+    stmt = select(
+        Variant.id,
+        Variant.contig,
+        Variant.position,
+        Variant.ref,
+        Variant.alt,
+        Variant.allele_frequency,
+        Variant.carrier_count,
+        Variant.carriers,
+    ).where(Variant.asset_id == asset_id, Variant.id > after)
+    if carried:
+        stmt = stmt.where(Variant.carrier_count > 0)
+    if af_below is not None:
+        stmt = stmt.where(Variant.allele_frequency < af_below)
+    if af_at_least is not None:
+        stmt = stmt.where(Variant.allele_frequency >= af_at_least)
+    if region is not None:
+        stmt = stmt.where(*_overlaps(region))
+    return stmt.order_by(Variant.id)
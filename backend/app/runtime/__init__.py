@@ -0,0 +1 @@
+"""Plugin execution runtime: resource accounting, scheduling and backends."""
@@ -0,0 +1,93 @@
+"""Resource accounting for plugin processes.
+
+The runtime reaps every plugin process itself with ``wait4`` so the kernel
+reports what the process and the descendants it waited for consumed: CPU time
+and peak resident set size. Just before reaping, the exited process is still
+present in ``/proc``, so its I/O counters are read from ``/proc/<pid>/io``.
+Those count the bytes moved through ``read``/``write`` system calls (files
+and pipes alike) and are left unset on systems without that file.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# ``ru_maxrss`` is reported in kilobytes on Linux but in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """What one plugin execution consumed, as measured by the runtime."""
+
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_bytes: int
+    read_bytes: Optional[int] = None
+    write_bytes: Optional[int] = None
+
+    @classmethod
+    def combine(
+        cls, usages: Iterable[Optional["ResourceUsage"]], *, wall_seconds: float
+    ) -> Optional["ResourceUsage"]:
+        """Sum concurrent executions (e.g. shards) over an overall ``wall_seconds``.
+
+        CPU time and I/O are added up and the peak RSS is the largest single
+        peak. Returns ``None`` when no execution was measured.
+        """
+
+        measured = [usage for usage in usages if usage is not None]
+        if not measured:
+            return None
+        reads = [usage.read_bytes for usage in measured]
+        writes = [usage.write_bytes for usage in measured]
+        return cls(
+            wall_seconds=wall_seconds,
+            cpu_seconds=sum(usage.cpu_seconds for usage in measured),
+            peak_rss_bytes=max(usage.peak_rss_bytes for usage in measured),
+            read_bytes=None if None in reads else sum(reads),
+            write_bytes=None if None in writes else sum(writes),
+        )
+
+
+def _read_io_counters(pid: int) -> tuple[Optional[int], Optional[int]]:
+    try:
+        text = Path(f"/proc/{pid}/io").read_text()
+    except OSError:
+        return None, None
+    counters = dict(line.split(": ", 1) for line in text.splitlines() if ": " in line)
+    try:
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (KeyError, ValueError):
+        return None, None
+
+
+def wait_for_exit(process: subprocess.Popen, started: float) -> ResourceUsage:
+    """Reap ``process`` and return its usage; sets ``process.returncode``.
+
+    ``started`` is the ``time.monotonic()`` reading taken before the process
+    was spawned.
+    """
+
+    read_bytes = write_bytes = None
+    if hasattr(os, "waitid"):
+        # Wait without reaping so /proc/<pid> is still there to read.
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        read_bytes, write_bytes = _read_io_counters(process.pid)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_seconds = time.monotonic() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return ResourceUsage(
+        wall_seconds=wall_seconds,
+        cpu_seconds=rusage.ru_utime + rusage.ru_stime,
+        peak_rss_bytes=rusage.ru_maxrss * _MAXRSS_UNIT,
+        read_bytes=read_bytes,
+        write_bytes=write_bytes,
+    )
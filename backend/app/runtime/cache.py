@@ -0,0 +1,226 @@
+"""Content-addressed store for plugin outputs with size-bounded LRU eviction.
+
+A plugin pinned to a container digest is a pure function of its parameters and
+input bytes, so its outputs can be reused whenever the same triple is seen
+again. Entries live under ``<root>/objects/<key[:2]>/<key>/`` and hold a copy
+of the run's ``output/`` tree plus a ``meta.json``. The modification time of
+``meta.json`` is refreshed on every hit, which keeps LRU order across restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+_HASH_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters describing cache effectiveness since process start."""
+
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    bytes_saved: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _copy_tree(source: Path, target: Path) -> int:
+    """Mirror ``source`` into ``target`` using hard links where possible."""
+
+    size = 0
+    for path in sorted(source.rglob("*")):
+        destination = target / path.relative_to(source)
+        if path.is_dir():
+            destination.mkdir(parents=True, exist_ok=True)
+            continue
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.exists():
+            destination.unlink()
+        _link_or_copy(path, destination)
+        size += path.stat().st_size
+    return size
+
+
+class InputHasher:
+    """SHA-256 of files or directory trees, memoized by path, size and mtime.
+
+    The memo keeps one entry per path, so a rewritten file replaces its old
+    digest. At most ``max_entries`` paths are remembered, least recently used
+    first out.
+    """
+
+    def __init__(self, max_entries: int = 65_536) -> None:
+        self.max_entries = max_entries
+        self._memo: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _hash_file(self, path: Path) -> str:
+        stat = path.stat()
+        resolved = str(path.resolve())
+        with self._lock:
+            cached = self._memo.get(resolved)
+            if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._memo.move_to_end(resolved)
+                return cached[2]
+
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            while chunk := handle.read(_HASH_CHUNK):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._memo[resolved] = (stat.st_size, stat.st_mtime_ns, value)
+            self._memo.move_to_end(resolved)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return value
+
+    def hash_path(self, path: Path) -> str:
+        if path.is_file():
+            return self._hash_file(path)
+        digest = hashlib.sha256()
+        for child in sorted(path.rglob("*")):
+            if child.is_file():
+                digest.update(str(child.relative_to(path)).encode())
+                digest.update(self._hash_file(child).encode())
+        return digest.hexdigest()
+
+
+def cache_key(digest: str, parameters: Mapping[str, Any], input_hashes: Mapping[str, str]) -> str:
+    """Return the content address for a (container digest, parameters, inputs) triple."""
+
+    payload = json.dumps(
+        {"digest": digest, "parameters": parameters, "inputs": input_hashes},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe content-addressed output store."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._objects = root / "objects"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._stores = self._evictions = self._bytes_saved = 0
+        self._load()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self._objects / key[:2] / key
+
+    def _load(self) -> None:
+        found = []
+        for meta in self._objects.glob("*/*/meta.json"):
+            try:
+                size = json.loads(meta.read_text())["size"]
+                found.append((meta.stat().st_mtime_ns, meta.parent.name, int(size)))
+            except (OSError, ValueError, KeyError):
+                shutil.rmtree(meta.parent, ignore_errors=True)
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+
+    def restore(self, key: str, destination: Path) -> bool:
+        """Materialize cached outputs for ``key`` into ``destination``."""
+
+        with self._lock:
+            size = self._entries.get(key)
+            if size is None:
+                self._misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._bytes_saved += size
+
+        entry = self._entry_dir(key)
+        try:
+            os.utime(entry / "meta.json")
+            _copy_tree(entry / "output", destination)
+        except OSError:
+            # Evicted between the lookup and the copy; treat as a miss.
+            with self._lock:
+                self._hits -= 1
+                self._misses += 1
+                self._bytes_saved -= size
+            return False
+        return True
+
+    def store(self, key: str, source: Path) -> None:
+        """Add the output tree at ``source`` under ``key`` and evict to fit the budget."""
+
+        with self._lock:
+            if key in self._entries:
+                return
+
+        staging = Path(tempfile.mkdtemp(prefix=".store-", dir=self.root))
+        try:
+            size = _copy_tree(source, staging / "output")
+            if size > self.max_bytes:
+                return
+            (staging / "meta.json").write_text(json.dumps({"size": size}))
+            target = self._entry_dir(key)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(staging, target)
+            except OSError:
+                return  # stored concurrently by another run
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        evicted = []
+        with self._lock:
+            self._entries[key] = size
+            self._size += size
+            self._stores += 1
+            while self._size > self.max_bytes and self._entries:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self._evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            shutil.rmtree(self._entry_dir(old_key), ignore_errors=True)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                stores=self._stores,
+                evictions=self._evictions,
+                bytes_saved=self._bytes_saved,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
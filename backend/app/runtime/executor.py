@@ -0,0 +1,255 @@
+"""Local subprocess backend implementing the plugin runtime contract.
+
+Until container execution lands, a run is executed as a child process whose
+working directory is a per-run workspace laid out exactly like the container
+mount described in ``docs/plugin-spec.md``::
+
+    <workspace>/input/<input-name>/<file>
+    <workspace>/output/<output-name>/
+    <workspace>/logs/
+
+The workspace path is exported as ``PGIP_WORKSPACE`` alongside the documented
+``PGIP_*`` variables.
+
+In the ``stream`` I/O mode the manifest's stream input is not staged. Its bytes
+are piped to the entrypoint's stdin, and stdout is appended to
+``<workspace>/output/<stream-output>/stream.jsonl`` as it arrives so the
+backend can load records while the plugin is still running.
+
+Every plugin process is reaped by :func:`~app.runtime.accounting.wait_for_exit`,
+so each outcome carries the CPU time, peak memory and I/O the plugin used.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from app.runtime.accounting import ResourceUsage, wait_for_exit
+from app.runtime.streams import CHUNK_SIZE
+
+
+@dataclass(frozen=True)
+class RunSpec:
+    """Everything a backend needs to execute one plugin run."""
+
+    run_id: str
+    entrypoint: str
+    workspace: str
+    inputs: dict[str, str]
+    outputs: list[str]
+    parameters: dict[str, Any] = field(default_factory=dict)
+    threads: int = 1
+    backend_api: str = ""
+    timeout: Optional[float] = None
+    stream_input: Optional[str] = None
+    stream_output: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RunOutcome:
+    """Result of executing a :class:`RunSpec`.
+
+    ``usage`` is set whenever the plugin process was started; it is ``None``
+    for runs that failed before that or were served from the result cache.
+    """
+
+    exit_code: int
+    error: Optional[str] = None
+    usage: Optional[ResourceUsage] = None
+
+
+def prepare_workspace(spec: RunSpec) -> Path:
+    """Create the workspace tree and stage inputs into it.
+
+    Inputs are hard-linked when possible so staging large files is free;
+    otherwise they are copied.
+    """
+
+    workspace = Path(spec.workspace)
+    for name, source in spec.inputs.items():
+        if name == spec.stream_input:
+            continue
+        source_path = Path(source)
+        target_dir = workspace / "input" / name
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / source_path.name
+        if target.exists():
+            continue
+        if source_path.is_dir():
+            shutil.copytree(source_path, target)
+            continue
+        try:
+            os.link(source_path, target)
+        except OSError:
+            shutil.copy2(source_path, target)
+    for name in spec.outputs:
+        (workspace / "output" / name).mkdir(parents=True, exist_ok=True)
+    (workspace / "logs").mkdir(parents=True, exist_ok=True)
+    return workspace
+
+
+def run_environment(spec: RunSpec) -> dict[str, str]:
+    """Return the child environment for a run."""
+
+    env = dict(os.environ)
+    env.update(
+        {
+            "PGIP_RUN_ID": spec.run_id,
+            "PGIP_WORKSPACE": str(Path(spec.workspace).resolve()),
+            "PGIP_PARAMETERS": json.dumps(spec.parameters),
+            "PGIP_BACKEND_API": spec.backend_api,
+            # Keep threaded libraries within the CPU share the scheduler reserved.
+            "OMP_NUM_THREADS": str(spec.threads),
+            "OPENBLAS_NUM_THREADS": str(spec.threads),
+            "MKL_NUM_THREADS": str(spec.threads),
+        }
+    )
+    return env
+
+
+def stream_sources(spec: RunSpec) -> list[Path]:
+    """Return the files piped to stdin in the ``stream`` I/O mode, in order.
+
+    A stream input that was staged ahead of time (e.g. a shard) is read from the
+    workspace; a directory contributes its files in name order.
+    """
+
+    assert spec.stream_input is not None
+    source = spec.inputs.get(spec.stream_input)
+    root = Path(source) if source else Path(spec.workspace) / "input" / spec.stream_input
+    if root.is_dir():
+        return sorted(path for path in root.rglob("*") if not path.is_dir())
+    return [root]
+
+
+def _feed(sources: list[Path], stdin: IO[bytes]) -> None:
+    try:
+        for path in sources:
+            with path.open("rb") as handle:
+                while chunk := handle.read(CHUNK_SIZE):
+                    stdin.write(chunk)
+    except OSError:  # broken pipe: the plugin stopped reading early
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+@contextmanager
+def _enforce_timeout(
+    process: subprocess.Popen, timeout: Optional[float]
+) -> Iterator[threading.Event]:
+    """Kill ``process`` if it outlives ``timeout``; the yielded event tells whether it did."""
+
+    timed_out = threading.Event()
+
+    def expire() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, expire) if timeout else None
+    if timer is not None:
+        timer.start()
+    try:
+        yield timed_out
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+
+def _run_files(
+    spec: RunSpec, command: list[str], workspace: Path, log: IO[bytes]
+) -> tuple[int, ResourceUsage, bool]:
+    """Run ``command`` with output logged.
+
+    Returns the exit status, the measured usage and whether the run timed out.
+    """
+
+    started = time.monotonic()
+    process = subprocess.Popen(
+        command,
+        cwd=workspace,
+        env=run_environment(spec),
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    with _enforce_timeout(process, spec.timeout) as timed_out:
+        usage = wait_for_exit(process, started)
+    return process.returncode, usage, timed_out.is_set()
+
+
+def _run_streaming(
+    spec: RunSpec, command: list[str], workspace: Path, log: IO[bytes]
+) -> tuple[int, ResourceUsage, bool]:
+    """Run ``command`` with the stream input on stdin and stdout captured as it arrives."""
+
+    assert spec.stream_output is not None
+    sources = stream_sources(spec)
+    output = workspace / "output" / spec.stream_output / "stream.jsonl"
+    with output.open("wb") as sink:
+        started = time.monotonic()
+        process = subprocess.Popen(
+            command,
+            cwd=workspace,
+            env=run_environment(spec),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=log,
+        )
+        assert process.stdin is not None and process.stdout is not None
+        feeder = threading.Thread(target=_feed, args=(sources, process.stdin), daemon=True)
+        feeder.start()
+        with _enforce_timeout(process, spec.timeout) as timed_out:
+            try:
+                while chunk := process.stdout.read1(CHUNK_SIZE):
+                    sink.write(chunk)
+                    sink.flush()
+                usage = wait_for_exit(process, started)
+            finally:
+                process.stdout.close()
+        feeder.join()
+    return process.returncode, usage, timed_out.is_set()
+
+
+def execute_run(spec: RunSpec) -> RunOutcome:
+    """Execute a run to completion. Runs inside a scheduler worker."""
+
+    try:
+        workspace = prepare_workspace(spec)
+        command = shlex.split(spec.entrypoint)
+    except (OSError, ValueError) as exc:
+        return RunOutcome(exit_code=-1, error=f"Failed to prepare run: {exc}")
+
+    log_path = workspace / "logs" / "plugin.log"
+    run = _run_streaming if spec.stream_input is not None else _run_files
+    with log_path.open("wb") as log:
+        try:
+            returncode, usage, timed_out = run(spec, command, workspace, log)
+        except FileNotFoundError as exc:
+            return RunOutcome(exit_code=-1, error=f"Entrypoint not found: {exc.filename}")
+
+    if timed_out:
+        return RunOutcome(
+            exit_code=-1, error=f"Run exceeded timeout of {spec.timeout}s", usage=usage
+        )
+    if returncode != 0:
+        return RunOutcome(
+            exit_code=returncode,
+            error=f"Plugin exited with status {returncode}; see {log_path}",
+            usage=usage,
+        )
+    return RunOutcome(exit_code=0, usage=usage)
@@ -0,0 +1,98 @@
+"""Parsing and arithmetic for plugin resource requests."""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+_MEMORY_PATTERN = re.compile(r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[KMGTPE]i?|[kmgtpe])?[Bb]?\s*$")
+_MEMORY_UNITS = {
+    None: 1,
+    "k": 10**3,
+    "K": 10**3,
+    "M": 10**6,
+    "G": 10**9,
+    "T": 10**12,
+    "P": 10**15,
+    "E": 10**18,
+    "Ki": 2**10,
+    "Mi": 2**20,
+    "Gi": 2**30,
+    "Ti": 2**40,
+    "Pi": 2**50,
+    "Ei": 2**60,
+}
+
+
+def parse_cpu(value: str) -> float:
+    """Parse a Kubernetes-style CPU quantity (``"2"``, ``"0.5"``, ``"500m"``)."""
+
+    text = value.strip()
+    try:
+        cores = float(text[:-1]) / 1000 if text.endswith("m") else float(text)
+    except ValueError as exc:
+        raise ValueError(f"Invalid CPU quantity {value!r}") from exc
+    if cores <= 0:
+        raise ValueError(f"CPU quantity must be positive, got {value!r}")
+    return cores
+
+
+def parse_memory(value: str) -> int:
+    """Parse a memory quantity such as ``"4Gi"``, ``"512Mi"`` or ``"1G"`` into bytes."""
+
+    match = _MEMORY_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"Invalid memory quantity {value!r}")
+    unit = match["unit"]
+    if unit in ("m", "g", "t", "p", "e"):
+        unit = unit.upper()
+    return int(float(match["value"]) * _MEMORY_UNITS[unit])
+
+
+def total_memory() -> int:
+    """Return physical memory of this host in bytes, or 0 when unknown."""
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):  # pragma: no cover - non-POSIX hosts
+        return 0
+
+
+@dataclass(frozen=True)
+class Resources:
+    """CPU cores and memory bytes reserved by a job or offered by a node."""
+
+    cpu: float
+    memory: int
+
+    def fits(self, other: "Resources") -> bool:
+        """Return whether ``other`` can be reserved out of these resources."""
+
+        return other.cpu <= self.cpu + 1e-9 and other.memory <= self.memory
+
+    def __add__(self, other: "Resources") -> "Resources":
+        return Resources(cpu=self.cpu + other.cpu, memory=self.memory + other.memory)
+
+    def __sub__(self, other: "Resources") -> "Resources":
+        return Resources(cpu=self.cpu - other.cpu, memory=self.memory - other.memory)
+
+    @property
+    def threads(self) -> int:
+        """Whole number of threads a job with this CPU share should use."""
+
+        return max(1, math.ceil(self.cpu))
+
+    @classmethod
+    def from_manifest(
+        cls, resources: Optional[Mapping[str, str]], *, default_cpu: str, default_memory: str
+    ) -> "Resources":
+        """Build a request from a manifest ``resources`` block, filling in defaults."""
+
+        resources = resources or {}
+        return cls(
+            cpu=parse_cpu(resources.get("cpu", default_cpu)),
+            memory=parse_memory(resources.get("memory", default_memory)),
+        )
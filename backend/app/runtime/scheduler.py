@@ -0,0 +1,128 @@
+"""Resource-aware job scheduler dispatching work to a bounded worker pool."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal, Optional
+
+from app.runtime.resources import Resources
+
+
+@dataclass(eq=False)
+class ScheduledJob:
+    """Handle for a job submitted to :class:`RunScheduler`."""
+
+    function: Callable[..., Any]
+    args: tuple[Any, ...]
+    resources: Resources
+    started: asyncio.Event = field(default_factory=asyncio.Event)
+    result: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class RunScheduler:
+    """Pack jobs onto a node without exceeding its CPU and memory capacity.
+
+    Jobs wait in a FIFO queue. Whenever capacity frees up, the queue is scanned
+    in order and every job that still fits is started (first-fit backfilling),
+    so a large job at the head does not leave the node idle while smaller jobs
+    could run. Concurrency is additionally capped by the pool size.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: Resources,
+        max_workers: int,
+        pool_kind: Literal["thread", "process"] = "thread",
+    ) -> None:
+        self.capacity = capacity
+        self.max_workers = max_workers
+        self.pool_kind = pool_kind
+        self._available = capacity
+        self._pending: deque[ScheduledJob] = deque()
+        self._running: set[ScheduledJob] = set()
+        self._pool: Optional[Executor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def available(self) -> Resources:
+        return self._available
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.pool_kind == "process":
+            # The server has threads running by now; do not fork it.
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pgip-run")
+
+    async def stop(self) -> None:
+        """Cancel queued jobs and wait for running ones to finish."""
+
+        while self._pending:
+            self._pending.popleft().result.cancel()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+
+    def submit(self, function: Callable[..., Any], *args: Any, resources: Resources) -> ScheduledJob:
+        """Queue ``function(*args)`` to run once ``resources`` are available."""
+
+        if not self.capacity.fits(resources):
+            raise ValueError(
+                f"Job requests {resources.cpu:g} CPU / {resources.memory} bytes, "
+                f"more than node capacity {self.capacity.cpu:g} CPU / {self.capacity.memory} bytes"
+            )
+        if self._pool is None:
+            raise RuntimeError("Scheduler has not been started")
+
+        job = ScheduledJob(function=function, args=args, resources=resources)
+        self._pending.append(job)
+        self._dispatch()
+        return job
+
+    def _dispatch(self) -> None:
+        if self._pool is None:
+            return
+        loop = asyncio.get_running_loop()
+        for job in list(self._pending):
+            if len(self._running) >= self.max_workers:
+                break
+            if job.result.cancelled():
+                self._pending.remove(job)
+                continue
+            if not self._available.fits(job.resources):
+                continue
+
+            self._pending.remove(job)
+            self._running.add(job)
+            self._available = self._available - job.resources
+            job.started.set()
+            future = loop.run_in_executor(self._pool, job.function, *job.args)
+            future.add_done_callback(lambda completed, job=job: self._finish(job, completed))
+
+    def _finish(self, job: ScheduledJob, completed: asyncio.Future) -> None:
+        self._running.discard(job)
+        self._available = self._available + job.resources
+        if not job.result.done():
+            if completed.cancelled():
+                job.result.cancel()
+            elif completed.exception() is not None:
+                job.result.set_exception(completed.exception())
+            else:
+                job.result.set_result(completed.result())
+        self._dispatch()
@@ -0,0 +1,147 @@
+"""Stream JSONL records between pipeline stages while both are running.
+
+A producing stage writes its outputs to disk as usual. An :class:`OutputFollower`
+tails every ``*.jsonl`` file in one of its output directories and hands complete
+lines to one bounded queue per consumer. A :class:`FifoWriter` drains a queue
+into a named pipe that is staged as the consuming stage's input file, so the
+consumer reads records as they are produced instead of after the producer
+exits.
+
+Queues hold at most ``capacity`` chunks of up to :data:`CHUNK_SIZE` bytes. When
+a consumer falls behind, its follower stops reading; the producer is never
+blocked because its output stays on disk.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import IO, Optional
+
+CHUNK_SIZE = 1 << 20
+# Put on every sink once a follower has emitted everything; never a real chunk.
+END_OF_STREAM = b""
+_POLL_SECONDS = 0.05
+
+
+class OutputFollower(threading.Thread):
+    """Tail the ``*.jsonl`` files of ``directory`` until ``producer_done`` is set."""
+
+    def __init__(
+        self, directory: Path, sinks: list[queue.Queue], producer_done: threading.Event
+    ) -> None:
+        super().__init__(name=f"pgip-follow-{directory.name}", daemon=True)
+        self.directory = directory
+        self.sinks = sinks
+        self.producer_done = producer_done
+        self._offsets: dict[Path, int] = {}
+        self._partial: dict[Path, bytes] = {}
+
+    def _emit(self, chunk: bytes) -> None:
+        for sink in self.sinks:
+            sink.put(chunk)
+
+    def _scan(self) -> bool:
+        progressed = False
+        for path in sorted(self.directory.glob("*.jsonl")):
+            offset = self._offsets.get(path, 0)
+            try:
+                with path.open("rb") as handle:
+                    handle.seek(offset)
+                    data = handle.read(CHUNK_SIZE)
+            except OSError:
+                continue
+            if not data:
+                continue
+            progressed = True
+            self._offsets[path] = offset + len(data)
+            data = self._partial.pop(path, b"") + data
+            complete, newline, rest = data.rpartition(b"\n")
+            if rest:
+                self._partial[path] = rest
+            if newline:
+                self._emit(complete + newline)
+        return progressed
+
+    def run(self) -> None:
+        try:
+            while True:
+                # Read the flag before scanning so writes made just before the
+                # producer exited are picked up by this final pass.
+                finished = self.producer_done.is_set()
+                if self._scan():
+                    continue
+                if finished:
+                    break
+                time.sleep(_POLL_SECONDS)
+            for path in sorted(self._partial):
+                self._emit(self._partial[path] + b"\n")
+        finally:
+            self._emit(END_OF_STREAM)
+
+
+class FifoWriter(threading.Thread):
+    """Copy chunks from ``source`` into the named pipe at ``path``.
+
+    The pipe is opened without blocking so that a consumer which exits without
+    ever opening it cannot hang the writer. After the consumer goes away, the
+    remaining chunks are discarded so the follower never stalls on a full
+    queue.
+    """
+
+    def __init__(self, path: Path, source: queue.Queue, consumer_done: threading.Event) -> None:
+        super().__init__(name=f"pgip-fifo-{path.name}", daemon=True)
+        self.path = path
+        self.source = source
+        self.consumer_done = consumer_done
+
+    def _open(self) -> Optional[IO[bytes]]:
+        while True:
+            try:
+                descriptor = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as exc:
+                if exc.errno != errno.ENXIO:  # ENXIO: no reader has opened the pipe yet
+                    return None
+                if self.consumer_done.is_set():
+                    return None
+                time.sleep(_POLL_SECONDS)
+                continue
+            os.set_blocking(descriptor, True)
+            return os.fdopen(descriptor, "wb")
+
+    def run(self) -> None:
+        handle = self._open()
+        try:
+            while (chunk := self.source.get()) != END_OF_STREAM:
+                if handle is None:
+                    continue
+                try:
+                    handle.write(chunk)
+                    handle.flush()
+                except OSError:  # consumer closed its end early
+                    _close(handle)
+                    handle = None
+        finally:
+            _close(handle)
+
+
+def _close(handle: Optional[IO[bytes]]) -> None:
+    if handle is not None:
+        try:
+            handle.close()
+        except OSError:
+            pass
+
+
+def create_fifo(path: Path) -> Path:
+    """Create a named pipe at ``path`` (replacing any stale file)."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists() or path.is_symlink():
+        path.unlink()
+    os.mkfifo(path, 0o600)
+    return path
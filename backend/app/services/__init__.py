@@ -0,0 +1 @@
+"""Domain services orchestrating repositories and genomic utilities."""
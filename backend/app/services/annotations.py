@@ -0,0 +1,216 @@
+"""Loading plugin annotation outputs and streaming them back to clients."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import itertools
+import json
+import queue
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session_factory
+from app.genomics.intervals import GenomicRegion
+from app.models.annotation import AnnotationRecord
+from app.repositories import annotations as annotation_repo
+from app.repositories.annotations import AnnotationKey
+from app.runtime.streams import END_OF_STREAM, OutputFollower
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_STREAM_BATCH = 1000
+_FOLLOW_QUEUE_CHUNKS = 8
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class AnnotationFormatError(ValueError):
+    """Raised when an annotation output is not valid JSONL."""
+
+
+def encode_cursor(key: AnnotationKey) -> str:
+    """Return an opaque, URL-safe cursor for the record after ``key``."""
+
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> AnnotationKey:
+    """Inverse of :func:`encode_cursor`."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        contig, position, plugin_name, record_id = json.loads(raw)
+        return AnnotationKey(str(contig), int(position), str(plugin_name), int(record_id))
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed pagination cursor") from exc
+
+
+def _parse_line(
+    source: str, line_number: int, line: str
+) -> Optional[tuple[str, int, dict[str, Any]]]:
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        raise AnnotationFormatError(f"{source}:{line_number}: {exc}") from exc
+    if not isinstance(record, dict):
+        raise AnnotationFormatError(f"{source}:{line_number}: expected a JSON object")
+    contig, position = record.get("contig"), record.get("position")
+    if contig is None or position is None:
+        return None
+    return str(contig), int(position), record
+
+
+def iter_annotation_records(paths: Iterable[Path]) -> Iterator[tuple[str, int, dict[str, Any]]]:
+    """Yield ``(contig, position, record)`` from annotation JSONL files.
+
+    Records without ``contig`` and ``position`` cannot be located and are
+    skipped.
+    """
+
+    for path in paths:
+        with path.open("r", encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                parsed = _parse_line(path.name, line_number, line)
+                if parsed is not None:
+                    yield parsed
+
+
+async def load_run_annotations(
+    session: AsyncSession,
+    *,
+    run_id: str,
+    plugin_name: str,
+    plugin_version: str,
+    directories: Iterable[Path],
+    batch_size: int,
+) -> int:
+    """Insert every annotation under ``directories`` and commit; returns the count.
+
+    Files are parsed in a worker thread one batch at a time, so memory use is
+    bounded by ``batch_size`` regardless of the output size.
+    """
+
+    paths = [path for directory in directories for path in sorted(directory.glob("*.jsonl"))]
+    records = iter_annotation_records(paths)
+    count = 0
+    try:
+        while batch := await asyncio.to_thread(lambda: list(itertools.islice(records, batch_size))):
+            await annotation_repo.insert_annotations(
+                session,
+                run_id=run_id,
+                plugin_name=plugin_name,
+                plugin_version=plugin_version,
+                records=batch,
+            )
+            count += len(batch)
+    except Exception:
+        await session.rollback()
+        raise
+    await session.commit()
+    return count
+
+
+async def follow_run_annotations(
+    session: AsyncSession,
+    *,
+    run_id: str,
+    plugin_name: str,
+    plugin_version: str,
+    directory: Path,
+    exited: threading.Event,
+    batch_size: int,
+    on_first_result: Optional[Callable[[], Awaitable[None]]] = None,
+) -> int:
+    """Load the annotation records under ``directory`` while a run is still writing them.
+
+    Records are committed after every chunk of complete lines, so they can be
+    queried seconds after the plugin emits them. Loading ends once ``exited``
+    is set and the directory has been read to the end. Returns the count.
+
+    On a malformed record or a database error, the rest of the output is
+    drained unread and the error is raised at the end. Records committed before
+    the error stay in the store for the caller to remove.
+    """
+
+    channel: queue.Queue = queue.Queue(maxsize=_FOLLOW_QUEUE_CHUNKS)
+    OutputFollower(directory, [channel], exited).start()
+    count = line_number = 0
+    failure: Optional[Exception] = None
+    while (chunk := await asyncio.to_thread(channel.get)) != END_OF_STREAM:
+        if failure is not None:
+            continue  # keep draining so the follower thread can finish
+        try:
+            records = []
+            for line in chunk.decode("utf-8").splitlines():
+                line_number += 1
+                parsed = _parse_line(directory.name, line_number, line)
+                if parsed is not None:
+                    records.append(parsed)
+            for start in range(0, len(records), batch_size):
+                await annotation_repo.insert_annotations(
+                    session,
+                    run_id=run_id,
+                    plugin_name=plugin_name,
+                    plugin_version=plugin_version,
+                    records=records[start : start + batch_size],
+                )
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            failure = exc
+            continue
+        if records and count == 0 and on_first_result is not None:
+            await on_first_result()
+        count += len(records)
+    if failure is not None:
+        raise failure
+    return count
+
+
+async def stream_annotations(
+    *,
+    region: Optional[GenomicRegion] = None,
+    plugin_name: Optional[str] = None,
+    run_id: Optional[str] = None,
+    after: Optional[AnnotationKey] = None,
+    limit: int,
+) -> AsyncIterator[bytes]:
+    """Yield one NDJSON line per annotation, in keyset order.
+
+    At most ``limit`` records are emitted. When more remain, a final
+    ``{"next_cursor": ...}`` line tells the client where to resume. Rows are
+    read through a server-side cursor, so memory use does not grow with
+    ``limit``. The generator owns its session because it outlives the request
+    handler that created the response.
+    """
+
+    stmt = annotation_repo.keyset_statement(
+        region=region, plugin_name=plugin_name, run_id=run_id, after=after
+    ).limit(limit + 1)
+    emitted = 0
+    last: Optional[AnnotationKey] = None
+
+    async with get_read_session_factory()() as session:
+        result = await session.stream_scalars(stmt.execution_options(yield_per=_STREAM_BATCH))
+        async for partition in result.partitions():
+            lines = []
+            for annotation in partition:
+                if emitted == limit:
+                    lines.append(json.dumps({"next_cursor": encode_cursor(last)}) + "\n")
+                    break
+                lines.append(AnnotationRecord.model_validate(annotation).model_dump_json() + "\n")
+                last = AnnotationKey(
+                    annotation.contig, annotation.position, annotation.plugin_name, annotation.id
+                )
+                emitted += 1
+            yield "".join(lines).encode()
@@ -0,0 +1,98 @@
+"""Cohort queries over the carrier bitmaps of ingested VCF assets."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import VcfAsset
+from app.genomics import bitmaps
+from app.genomics.intervals import parse_region
+from app.models.variant import CohortQuery, CohortQueryResult, CohortVariant
+from app.repositories import variants as variant_repo
+from app.services.stats import UnknownSampleError
+
+
+def _columns(samples: list[str], names: list[str]) -> np.ndarray:
+    positions = {name: index for index, name in enumerate(samples)}
+    unknown = [name for name in names if name not in positions]
+    if unknown:
+        raise UnknownSampleError(f"Unknown samples: {', '.join(unknown)}")
+    return np.array([positions[name] for name in names], dtype=np.int64)
+
+
+async def query_cohort(
+    session: AsyncSession, asset: VcfAsset, query: CohortQuery, *, batch_size: int
+) -> CohortQueryResult:
+    """Return up to ``query.limit`` variants whose carriers satisfy the sample filters.
+
+    Frequency and region filters run in SQL. Each batch of ``batch_size``
+    candidate bitmaps is expanded into one dense word matrix, and the sample
+    filters are evaluated for the whole batch with bitwise AND and popcount
+    against one mask per sample set. ``next_after`` is set when the page is
+    full and more variants may match.
+    """
+
+    samples = list(asset.samples)
+    universe = len(samples)
+    any_of = bitmaps.mask(_columns(samples, query.any_of), universe)
+    all_of = bitmaps.mask(_columns(samples, query.all_of), universe)
+    none_of = bitmaps.mask(_columns(samples, query.none_of), universe)
+    named = any_of | all_of
+    region = parse_region(query.region) if query.region else None
+
+    variants: list[CohortVariant] = []
+    scanned = 0
+    after = query.after
+    next_after: Optional[int] = None
+    while True:
+        stmt = variant_repo.carrier_statement(
+            asset.id,
+            after=after,
+            region=region,
+            af_below=query.af_below,
+            af_at_least=query.af_at_least,
+            carried=bool(query.any_of or query.all_of),
+        )
+        rows = (await session.execute(stmt.limit(batch_size))).all()
+        scanned += len(rows)
+        matrix = bitmaps.dense_matrix([row.carriers for row in rows], universe)
+        keep = np.ones(len(rows), dtype=bool)
+        if query.any_of:
+            keep &= bitmaps.popcount(matrix & any_of) >= query.min_carriers
+        if query.all_of:
+            keep &= ((matrix & all_of) == all_of).all(axis=1)
+        if query.none_of:
+            keep &= ~(matrix & none_of).any(axis=1)
+
+        for index in np.flatnonzero(keep).tolist():
+            row = rows[index]
+            bits = np.unpackbits((matrix[index] & named).view(np.uint8), bitorder="little")
+            variants.append(
+                CohortVariant(
+                    id=row.id,
+                    contig=row.contig,
+                    position=row.position,
+                    ref=row.ref,
+                    alt=row.alt,
+                    allele_frequency=row.allele_frequency,
+                    carrier_count=row.carrier_count or 0,
+                    carriers=[samples[column] for column in np.flatnonzero(bits).tolist()],
+                )
+            )
+            if len(variants) == query.limit:
+                next_after = row.id
+                break
+        if next_after is not None or len(rows) < batch_size:
+            break
+        after = rows[-1].id
+
+    return CohortQueryResult(
+        asset_id=asset.id,
+        scanned=scanned,
+        variant_count=len(variants),
+        variants=variants,
+        next_after=next_after,
+    )
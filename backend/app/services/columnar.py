@@ -0,0 +1,344 @@
+"""Optional Parquet store for annotation outputs, partitioned by plugin and contig.
+
+Files are laid out hive-style so readers can prune whole partitions from the
+path alone::
+
+    <root>/plugin=<name>/contig=<contig>/run-<run-id>.parquet
+
+Every file holds ``run_id``, ``plugin_version``, ``position`` and the full
+record as JSON in ``payload``, plus one column per top-level scalar field of
+the records. Row groups are written in position order, so range predicates on
+``position`` skip row groups using their min/max statistics.
+
+Field types are inferred from a run's records before anything is written. A
+field seen with both integers and floats becomes ``double``, and one seen with
+any other mix of types becomes ``string``. Runs are unified the same way at
+read time, so a field stored as ``int64`` by one run and as ``double`` or
+``string`` by another is cast to the wider type.
+
+``pyarrow`` is an optional dependency; without it the store is unavailable and
+the rest of the service keeps working.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Literal, Optional
+from urllib.parse import quote
+
+from app.genomics.intervals import GenomicRegion
+from app.services.annotations import iter_annotation_records
+
+ExportFormat = Literal["arrow", "parquet"]
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+_BASE_COLUMNS = ("run_id", "plugin_version", "position", "payload")
+_PARTITION_COLUMNS = ("plugin", "contig")
+
+
+class ColumnarUnavailableError(RuntimeError):
+    """Raised when the columnar store is disabled or pyarrow is not installed."""
+
+
+class ColumnarQueryError(ValueError):
+    """Raised when an export request cannot be answered from the stored schema."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ColumnarUnavailableError(
+            "The columnar annotation store requires pyarrow (pip install pyarrow)"
+        ) from exc
+    return pyarrow
+
+
+def _partition_dir(root: Path, plugin_name: str, contig: str) -> Path:
+    return root / f"plugin={quote(plugin_name, safe='')}" / f"contig={quote(contig, safe='')}"
+
+
+def _scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def _common_type(pa, types: Iterable):
+    """The narrowest type every one of ``types`` converts to without loss."""
+
+    distinct = list(dict.fromkeys(t for t in types if not pa.types.is_null(t)))
+    if not distinct:
+        return pa.null()
+    if len(distinct) == 1:
+        return distinct[0]
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in distinct):
+        return pa.float64()
+    return pa.string()
+
+
+def _value_type(pa, value: Any):
+    if value is None:
+        return pa.null()
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    return pa.string()
+
+
+def _record_schema(pa, paths: Sequence[Path]):
+    """Infer one column type per top-level scalar field across every record of a run."""
+
+    observed: dict[str, set] = {}
+    for _, _, record in iter_annotation_records(paths):
+        for name, value in record.items():
+            if name in ("contig", "position") or name in _BASE_COLUMNS or name in _PARTITION_COLUMNS:
+                continue
+            if _scalar(value):
+                observed.setdefault(name, set()).add(_value_type(pa, value))
+    base = [
+        ("run_id", pa.string()),
+        ("plugin_version", pa.string()),
+        ("position", pa.int64()),
+        ("payload", pa.string()),
+    ]
+    return pa.schema(base + [(name, _common_type(pa, types)) for name, types in observed.items()])
+
+
+def _column_value(value: Any, string: bool) -> Any:
+    if not _scalar(value):
+        return None
+    if string and value is not None and not isinstance(value, str):
+        return json.dumps(value)
+    return value
+
+
+class _RunWriter:
+    """Write one run's records for one contig, one row group per batch."""
+
+    def __init__(self, path: Path, run_id: str, plugin_version: str, schema) -> None:
+        self.path = path
+        self.run_id = run_id
+        self.plugin_version = plugin_version
+        self._schema = schema
+        self._writer = None
+
+    def write(self, batch: list[tuple[int, dict[str, Any]]]) -> None:
+        pa = _pyarrow()
+        batch.sort(key=lambda item: item[0])
+        rows = [record for _, record in batch]
+        columns = {
+            "run_id": [self.run_id] * len(batch),
+            "plugin_version": [self.plugin_version] * len(batch),
+            "position": [position for position, _ in batch],
+            "payload": [json.dumps(record, separators=(",", ":")) for record in rows],
+        }
+        for field in self._schema:
+            if field.name not in columns:
+                string = pa.types.is_string(field.type)
+                columns[field.name] = [_column_value(record.get(field.name), string) for record in rows]
+
+        try:
+            table = pa.table(columns, schema=self._schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as exc:
+            raise ColumnarQueryError(f"Inconsistent annotation field types: {exc}") from exc
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pa.parquet.ParquetWriter(self.path, self._schema, compression="zstd")
+        self._writer.write_table(table, row_group_size=len(batch))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def discard(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def write_run_annotations(
+    root: Path,
+    *,
+    run_id: str,
+    plugin_name: str,
+    plugin_version: str,
+    directories: Iterable[Path],
+    row_group_size: int,
+) -> int:
+    """Write a run's annotation JSONL outputs into the store; returns the record count.
+
+    Records are buffered per contig and flushed as a row group once
+    ``row_group_size`` accumulate, so memory use is bounded by the number of
+    contigs times the row group size. The records are read twice: once to
+    infer the column types and once to write them. A run that fails part way
+    leaves no files behind.
+    """
+
+    pa = _pyarrow()
+    paths = [path for directory in directories for path in sorted(directory.glob("*.jsonl"))]
+    schema = _record_schema(pa, paths)
+    writers: dict[str, _RunWriter] = {}
+    buffers: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+
+    def flush(contig: str) -> None:
+        writer = writers.get(contig)
+        if writer is None:
+            path = _partition_dir(root, plugin_name, contig) / f"run-{run_id}.parquet"
+            writer = writers[contig] = _RunWriter(path, run_id, plugin_version, schema)
+        writer.write(buffers.pop(contig))
+
+    count = 0
+    try:
+        for contig, position, record in iter_annotation_records(paths):
+            buffer = buffers.setdefault(contig, [])
+            buffer.append((position, record))
+            count += 1
+            if len(buffer) >= row_group_size:
+                flush(contig)
+        for contig in list(buffers):
+            flush(contig)
+    except BaseException:
+        for writer in writers.values():
+            writer.discard()
+        raise
+    for writer in writers.values():
+        writer.close()
+    return count
+
+
+def delete_run_annotations(root: Path, *, run_id: str, plugin_name: str) -> int:
+    """Remove a run's files from the store; returns how many were removed."""
+
+    paths = list(
+        (root / f"plugin={quote(plugin_name, safe='')}").glob(f"contig=*/run-{run_id}.parquet")
+    )
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return len(paths)
+
+
+def _unify(pa, schemas: Sequence):
+    """Merge the schemas of several runs, widening fields whose types differ."""
+
+    types: dict[str, list] = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+    return pa.schema([(name, _common_type(pa, found)) for name, found in types.items()])
+
+
+def _dataset(root: Path, plugin_name: Optional[str], contig: Optional[str]):
+    pa = _pyarrow()
+    plugin_glob = f"plugin={quote(plugin_name, safe='')}" if plugin_name else "plugin=*"
+    contig_glob = f"contig={quote(contig, safe='')}" if contig else "contig=*"
+    files = sorted(str(path) for path in root.glob(f"{plugin_glob}/{contig_glob}/*.parquet"))
+    if not files:
+        return None
+    schema = _unify(pa, [pa.parquet.read_schema(path) for path in files])
+    partitioning = pa.dataset.partitioning(
+        pa.schema([("plugin", pa.string()), ("contig", pa.string())]), flavor="hive"
+    )
+    return pa.dataset.dataset(
+        files,
+        schema=pa.unify_schemas([schema, partitioning.schema]),
+        format="parquet",
+        partitioning=partitioning,
+        partition_base_dir=str(root),
+    )
+
+
+def scan_batches(
+    root: Path,
+    *,
+    plugin_name: Optional[str] = None,
+    region: Optional[GenomicRegion] = None,
+    columns: Optional[list[str]] = None,
+    batch_size: int = 65_536,
+):
+    """Return ``(schema, batches)`` for records matching the filters.
+
+    Partition filters select files by path; ``region`` bounds on ``position``
+    are pushed down to Parquet row-group statistics; ``columns`` limits which
+    column chunks are read at all.
+    """
+
+    pa = _pyarrow()
+    dataset = _dataset(root, plugin_name, region.contig if region else None)
+    if dataset is None:
+        empty = pa.schema([("plugin", pa.string()), ("contig", pa.string()), ("position", pa.int64())])
+        schema = pa.schema([empty.field(name) for name in columns if name in empty.names]) if columns else empty
+        return schema, iter(())
+
+    if columns:
+        unknown = sorted(set(columns) - set(dataset.schema.names))
+        if unknown:
+            raise ColumnarQueryError(f"Unknown annotation columns: {', '.join(unknown)}")
+
+    field = pa.dataset.field
+    predicate = None
+    if region is not None:
+        predicate = (field("position") >= region.start) & (field("position") <= region.end)
+    scanner = dataset.scanner(columns=columns, filter=predicate, batch_size=batch_size)
+    return scanner.projected_schema, scanner.to_batches()
+
+
+class _ChunkSink:
+    """Minimal writable file that hands written bytes back to a generator."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.closed = False
+        self._position = 0
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def export_stream(schema, batches: Iterator, *, format: ExportFormat) -> Iterator[bytes]:
+    """Serialize record batches as an Arrow IPC stream or a Parquet file, chunk by chunk."""
+
+    pa = _pyarrow()
+    sink = _ChunkSink()
+    if format == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    for batch in batches:
+        if format == "arrow":
+            writer.write_batch(batch)
+        else:
+            writer.write_table(pa.Table.from_batches([batch], schema=schema))
+        if chunk := sink.drain():
+            yield chunk
+    writer.close()
+    if chunk := sink.drain():
+        yield chunk
+
+
+def media_type(format: ExportFormat) -> str:
+    """Return the response media type for an export format."""
+
+    return ARROW_STREAM_MEDIA_TYPE if format == "arrow" else PARQUET_MEDIA_TYPE
+
@@ -0,0 +1,570 @@
+"""Process-wide access to the loaded pangenome graph."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from app.genomics.bubbles import BubbleIndex
+from app.genomics.gfa import PangenomeGraph, open_graph
+from app.genomics.layout import FORMAT_VERSION as LAYOUT_FORMAT_VERSION
+from app.genomics.layout import GraphLayout, LayoutTile
+from app.genomics.minimizers import MinimizerIndex, MinimizerIndexError, SequenceHit
+from app.genomics.path_index import PathPositionIndex
+from app.models.graph import (
+    BubbleTraversal,
+    GraphBubble,
+    GraphBubbleList,
+    GraphEdge,
+    GraphHandle,
+    GraphLayoutContig,
+    GraphLayoutSummary,
+    GraphNode,
+    GraphSearchHit,
+    GraphSearchResult,
+    GraphSelection,
+    GraphSelectionPath,
+    GraphStep,
+    GraphTile,
+    GraphTileBin,
+    GraphTileNode,
+)
+
+_source: Optional[tuple[Path, Path]] = None
+_reference_sample: Optional[str] = None
+_minimizer: tuple[int, int] = (15, 10)
+_index_workers: Optional[int] = None
+_tiles: tuple[int, int] = (32_768, 128)
+# The graph and the structures built from it, by name, once loaded.
+_loaded: dict[str, Any] = {}
+# Bumped by ``unload_graph`` so builds started before it do not store their results.
+_generation = 0
+_tile_cache: "OrderedDict[tuple[int, int], TileBody]" = OrderedDict()
+# Serialized tiles kept per worker; the least recently used are evicted first.
+_TILE_CACHE_SIZE = 1024
+# Separate from ``_lock`` so cached tiles never wait on configuration changes.
+_tile_lock = threading.Lock()
+_load_error: Optional[str] = None
+# Failures of the optional indexes, by index; the graph itself keeps serving.
+_index_errors: dict[str, str] = {}
+# Guards the module state above and is only held briefly. Each structure is
+# built under its own lock instead, so building the search index does not
+# hold up tiles, bubbles or a reconfiguration.
+_lock = threading.Lock()
+_build_locks = {
+    name: threading.Lock() for name in ("graph", "path_index", "bubbles", "minimizers", "layout")
+}
+# Indexes whose failures do not make the graph unavailable.
+OPTIONAL_INDEXES = ("bubbles", "minimizers", "layout")
+_DESCRIPTIONS = {
+    "graph": "pangenome graph",
+    "path_index": "path index",
+    "bubbles": "bubble index",
+    "minimizers": "minimizer index",
+    "layout": "graph layout",
+}
+
+T = TypeVar("T")
+
+
+class GraphUnavailableError(RuntimeError):
+    """Raised when graph operations are requested but no graph is loaded."""
+
+
+@dataclass(frozen=True)
+class TileBody:
+    """A serialized layout tile and its entity tag."""
+
+    body: bytes
+    etag: str
+
+
+@dataclass(frozen=True)
+class GraphState:
+    """Load state of the configured graph, as reported by the readiness probe."""
+
+    configured: bool
+    graph_loaded: bool
+    index_loaded: bool
+    error: Optional[str] = None
+    index_errors: dict[str, str] = field(default_factory=dict)
+
+
+def configure_graph(
+    source: Path,
+    cache_dir: Path,
+    *,
+    reference_sample: Optional[str] = None,
+    minimizer: tuple[int, int] = (15, 10),
+    index_workers: Optional[int] = None,
+    tiles: tuple[int, int] = (32_768, 128),
+) -> None:
+    """Register the GFA graph to open on first use instead of at startup.
+
+    Compiling a new GFA can take minutes and even memory-mapping an existing
+    one touches many files, so worker startup only records where the graph
+    lives. :func:`get_graph` and :func:`get_path_index` load it on demand.
+    ``reference_sample`` selects the reference paths that bubbles are
+    decomposed along (see :func:`app.genomics.bubbles.reference_paths`).
+    ``minimizer`` is the ``(k, w)`` of the sequence search index, whose path
+    shards are built by ``index_workers`` processes (all CPUs when ``None``).
+    ``tiles`` is the ``(tile_bases, tile_bins)`` of the explorer layout (see
+    :mod:`app.genomics.layout`).
+    """
+
+    global _source, _reference_sample, _minimizer, _index_workers, _tiles, _load_error
+    with _lock:
+        _source = (source, cache_dir)
+        _reference_sample = reference_sample
+        _minimizer = minimizer
+        _index_workers = index_workers
+        _tiles = tiles
+        _load_error = None
+        _index_errors.clear()
+
+
+def _load(name: str, build: Callable[[], T]) -> T:
+    """Return the structure ``name``, building it under its own lock on first use."""
+
+    global _load_error
+    value = _loaded.get(name)
+    if value is not None:
+        return value
+    with _build_locks[name]:
+        with _lock:
+            value, generation = _loaded.get(name), _generation
+        if value is not None:
+            return value
+        try:
+            value = build()
+        except GraphUnavailableError:
+            raise
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            with _lock:
+                if generation == _generation:
+                    if name in OPTIONAL_INDEXES:
+                        _index_errors[name] = error
+                    else:
+                        _load_error = error
+            raise GraphUnavailableError(
+                f"Failed to load the {_DESCRIPTIONS[name]}: {exc}"
+            ) from exc
+        with _lock:
+            if generation == _generation:
+                _loaded[name] = value
+                _index_errors.pop(name, None)
+        return value
+
+
+def _ensure_graph() -> PangenomeGraph:
+    def build() -> PangenomeGraph:
+        source = _source
+        if source is None:
+            raise GraphUnavailableError("No pangenome graph is loaded")
+        return open_graph(*source)
+
+    return _load("graph", build)
+
+
+def _ensure_path_index() -> PathPositionIndex:
+    graph = _ensure_graph()
+    return _load("path_index", lambda: PathPositionIndex.load_or_build(graph))
+
+
+def _ensure_bubble_index() -> BubbleIndex:
+    path_index = _ensure_path_index()
+    reference = _reference_sample
+    return _load(
+        "bubbles", lambda: BubbleIndex.load_or_build(path_index.graph, path_index, reference)
+    )
+
+
+def _ensure_minimizer_index() -> MinimizerIndex:
+    graph = _ensure_graph()
+    (k, w), workers = _minimizer, _index_workers or os.cpu_count()
+    return _load("minimizers", lambda: MinimizerIndex.load_or_build(graph, k=k, w=w, workers=workers))
+
+
+def _ensure_layout() -> GraphLayout:
+    path_index = _ensure_path_index()
+    reference, (tile_bases, tile_bins) = _reference_sample, _tiles
+    return _load(
+        "layout",
+        lambda: GraphLayout.load_or_build(
+            path_index.graph, path_index, reference, tile_bases=tile_bases, tile_bins=tile_bins
+        ),
+    )
+
+
+_BUILDERS: dict[str, Callable[[], Any]] = {
+    "bubbles": _ensure_bubble_index,
+    "minimizers": _ensure_minimizer_index,
+    "layout": _ensure_layout,
+}
+
+
+def load_graph(source: Path, cache_dir: Path) -> PangenomeGraph:
+    """Compile (if needed) and memory-map the configured GFA graph and its indexes."""
+
+    configure_graph(source, cache_dir)
+    return warm_up()
+
+
+def warm_up(indexes: Iterable[str] = ()) -> PangenomeGraph:
+    """Load the configured graph and its indexes now rather than on first request.
+
+    ``indexes`` names optional indexes from :data:`OPTIONAL_INDEXES` to build
+    as well. A failure of one of them is recorded in :func:`graph_state` and
+    does not stop the others.
+    """
+
+    graph = _ensure_graph()
+    _ensure_path_index()
+    for name in indexes:
+        try:
+            _BUILDERS[name]()
+        except GraphUnavailableError:
+            continue
+    return graph
+
+
+def reference_sample() -> Optional[str]:
+    """Return the sample whose paths bubbles are decomposed along, if one is configured."""
+
+    return _reference_sample
+
+
+def get_graph() -> PangenomeGraph:
+    """Return the configured graph, loading it on first use.
+
+    Raises :class:`GraphUnavailableError` when no graph is configured or it
+    cannot be opened.
+    """
+
+    return _ensure_graph()
+
+
+def get_path_index() -> PathPositionIndex:
+    """Return the path-position index of the configured graph, loading it on first use."""
+
+    return _ensure_path_index()
+
+
+def get_bubble_index() -> BubbleIndex:
+    """Return the bubble decomposition of the configured graph, building it on first use.
+
+    Decomposing a large graph takes a while, so it is not part of
+    :func:`warm_up`; the first projection pays for it once and later opens
+    only map the stored arrays.
+    """
+
+    return _ensure_bubble_index()
+
+
+def get_minimizer_index() -> MinimizerIndex:
+    """Return the sequence search index of the configured graph, building it on first use.
+
+    Like the bubble index it is left out of :func:`warm_up`. Shards of paths
+    already indexed for an earlier version of the graph are reused.
+    """
+
+    return _ensure_minimizer_index()
+
+
+def get_layout() -> GraphLayout:
+    """Return the explorer layout of the configured graph, building it on first use."""
+
+    return _ensure_layout()
+
+
+def graph_state() -> GraphState:
+    """Describe whether the graph and its index are configured and loaded.
+
+    ``error`` is set when the graph or its path index failed to load.
+    Failures of the indexes built on first use (bubbles, minimizers, layout)
+    are kept in ``index_errors`` instead. They only affect their own
+    endpoints, and a later request retries the build.
+    """
+
+    return GraphState(
+        configured=_source is not None,
+        graph_loaded="graph" in _loaded,
+        index_loaded="path_index" in _loaded,
+        error=_load_error,
+        index_errors=dict(_index_errors),
+    )
+
+
+def unload_graph() -> None:
+    """Drop references to the loaded graph so its mappings can be closed."""
+
+    global _source, _reference_sample, _load_error, _generation
+    with _lock:
+        _source = None
+        _reference_sample = None
+        _loaded.clear()
+        _generation += 1
+        _load_error = None
+        _index_errors.clear()
+    with _tile_lock:
+        _tile_cache.clear()
+
+
+def _orientation(node_handle: int) -> str:
+    return "-" if node_handle & 1 else "+"
+
+
+def extract_selection(
+    path: str,
+    start: int,
+    end: int,
+    *,
+    context: int,
+    include_sequence: bool,
+    max_nodes: int,
+) -> GraphSelection:
+    """Build a graph-selection document for ``path[start:end]`` plus context hops.
+
+    Raises ``KeyError`` for unknown paths and ``ValueError`` for oversize selections.
+    """
+
+    graph = get_graph()
+    index = get_path_index()
+    if not graph.has_path(path):
+        raise KeyError(path)
+
+    subgraph = index.extract(path, start, end, context=context, max_nodes=max_nodes)
+    names = {node: graph.segment_name(node) for node in subgraph.nodes.tolist()}
+
+    nodes = [
+        GraphNode(
+            id=names[node],
+            length=graph.segment_length(node),
+            sequence=graph.sequence(node) if include_sequence else None,
+        )
+        for node in subgraph.nodes.tolist()
+    ]
+    edges = [
+        GraphEdge(
+            source=names[source >> 1],
+            source_orientation=_orientation(source),
+            target=names[target >> 1],
+            target_orientation=_orientation(target),
+        )
+        for source, target in subgraph.edges
+    ]
+    paths = [
+        GraphSelectionPath(
+            name=run.path,
+            steps=[
+                GraphStep(
+                    node=names[index.step_handle(step) >> 1],
+                    orientation=_orientation(index.step_handle(step)),
+                    offset=index.step_offset(step),
+                )
+                for step in range(run.first, run.last)
+            ],
+        )
+        for run in subgraph.runs
+    ]
+    return GraphSelection(
+        path=path, start=start, end=end, context=context, nodes=nodes, edges=edges, paths=paths
+    )
+
+
+def _graph_handle(graph: PangenomeGraph, node_handle: int) -> GraphHandle:
+    return GraphHandle(
+        node=graph.segment_name(node_handle >> 1), orientation=_orientation(node_handle)
+    )
+
+
+def describe_bubble(bubble_id: int) -> GraphBubble:
+    """Return a bubble with its anchors and traversals; ``KeyError`` for unknown ids."""
+
+    bubbles = get_bubble_index()
+    graph = bubbles.graph
+    bubble = bubbles.bubble(bubble_id)
+    return GraphBubble(
+        id=bubble.id,
+        path=bubble.path,
+        start=bubble.start,
+        end=bubble.end,
+        left=_graph_handle(graph, bubble.left),
+        right=_graph_handle(graph, bubble.right),
+        traversals=[
+            BubbleTraversal(
+                index=index,
+                reference=index == 0,
+                length=int(graph.segment_lengths[handles >> 1].sum()),
+                steps=[_graph_handle(graph, node_handle) for node_handle in handles.tolist()],
+            )
+            for index, handles in enumerate(bubble.traversals)
+        ],
+    )
+
+
+def list_bubbles(path: str, start: int, end: int, *, limit: int) -> GraphBubbleList:
+    """Return up to ``limit`` bubbles overlapping ``path[start:end]``.
+
+    Raises ``KeyError`` for unknown paths. Paths that are not references have
+    no bubbles.
+    """
+
+    bubbles = get_bubble_index()
+    if not bubbles.graph.has_path(path):
+        raise KeyError(path)
+    ids = bubbles.overlapping(path, start, end)[:limit]
+    return GraphBubbleList(bubbles=[describe_bubble(bubble_id) for bubble_id in ids])
+
+
+def _search_hit(
+    graph: PangenomeGraph, index: PathPositionIndex, hit: SequenceHit, query: str
+) -> GraphSearchHit:
+    if hit.path is None:
+        assert hit.segment is not None
+        start, end = max(hit.start, 0), min(hit.end, graph.segment_length(hit.segment))
+        target = graph.sequence(hit.segment)[start:end].upper()
+        nodes = [GraphStep(node=graph.segment_name(hit.segment), orientation="+", offset=0)]
+    else:
+        start, end = max(hit.start, 0), min(hit.end, graph.path_length(hit.path))
+        target = index.sequence(hit.path, start, end)
+        first, last = index.step_range(hit.path, start, end)
+        nodes = [
+            GraphStep(
+                node=graph.segment_name(index.step_handle(step) >> 1),
+                orientation=_orientation(index.step_handle(step)),
+                offset=index.step_offset(step),
+            )
+            for step in range(first, last)
+        ]
+    if hit.reverse:
+        query = query[::-1].translate(str.maketrans("ACGTN", "TGCAN"))
+    return GraphSearchHit(
+        path=hit.path,
+        start=start,
+        end=end,
+        strand="-" if hit.reverse else "+",
+        matches=hit.matches,
+        exact=target == query,
+        nodes=nodes,
+    )
+
+
+def search_sequence(sequence: str, *, max_hits: int, min_matches: int) -> GraphSearchResult:
+    """Locate ``sequence`` in the graph with the minimizer index.
+
+    Each hit is a path interval (or an interval of a segment no path visits)
+    with the steps it covers. ``exact`` tells whether the interval spells the
+    query exactly. Raises :class:`MinimizerIndexError` for queries shorter
+    than ``k``.
+    """
+
+    minimizers = get_minimizer_index()
+    index = get_path_index()
+    query = sequence.upper()
+    count, hits = minimizers.search(query, max_hits=max_hits, min_matches=min_matches)
+    return GraphSearchResult(
+        query_length=len(query),
+        minimizers=count,
+        hits=[_search_hit(minimizers.graph, index, hit, query) for hit in hits],
+    )
+
+
+def layout_summary() -> GraphLayoutSummary:
+    """Describe the layout's extent, zoom levels and contigs."""
+
+    metadata = get_layout().metadata
+    return GraphLayoutSummary(
+        width=metadata["width"],
+        lanes=metadata["lanes"],
+        max_zoom=metadata["max_zoom"],
+        tile_bases=metadata["tile_bases"],
+        tile_bins=metadata["tile_bins"],
+        contigs=[GraphLayoutContig(**contig) for contig in metadata["contigs"]],
+    )
+
+
+def _tile_document(graph: PangenomeGraph, tile: LayoutTile) -> GraphTile:
+    nodes = tile.nodes.tolist()
+    segments = {row[3] for row in nodes}
+    names = {segment: graph.segment_name(segment) for segment in segments}
+    edges: set[tuple[int, int]] = set()
+    for segment in segments:
+        for source in (segment * 2, segment * 2 + 1):
+            for target in graph.successors(source).tolist():
+                # Each link is stored on both strands; keep one canonical copy.
+                edges.add(min((source, target), (target ^ 1, source ^ 1)))
+    for source, target in edges:
+        for segment in (source >> 1, target >> 1):
+            if segment not in names:
+                names[segment] = graph.segment_name(segment)
+    return GraphTile(
+        z=tile.z,
+        x=tile.x,
+        start=tile.start,
+        end=tile.end,
+        detail=tile.detail,
+        nodes=[
+            GraphTileNode(id=names[segment], x=x, length=length, lane=lane, depth=depth)
+            for x, length, lane, segment, depth in nodes
+        ],
+        bins=[
+            GraphTileBin(
+                lane=lane,
+                start=x_min,
+                end=x_max,
+                nodes=count,
+                bases=bases,
+                depth=depth / count,
+            )
+            for _, lane, count, bases, depth, x_min, x_max in tile.bins.tolist()
+        ],
+        edges=[
+            GraphEdge(
+                source=names[source >> 1],
+                source_orientation=_orientation(source),
+                target=names[target >> 1],
+                target_orientation=_orientation(target),
+            )
+            for source, target in sorted(edges)
+        ],
+    )
+
+
+def layout_tile(z: int, x: int) -> TileBody:
+    """Return tile ``x`` of zoom ``z`` as JSON bytes; ``KeyError`` when out of range.
+
+    Tiles never change for a compiled graph, so the entity tag is derived
+    from the graph build, layout settings and tile address rather than the
+    body, and serialized tiles are kept in a small LRU cache.
+    """
+
+    layout = get_layout()
+    key = (z, x)
+    with _tile_lock:
+        cached = _tile_cache.get(key)
+        if cached is not None:
+            _tile_cache.move_to_end(key)
+            return cached
+    tile = layout.tile(z, x)
+    metadata = layout.metadata
+    identity = (
+        f"{layout.graph.directory.name}:{LAYOUT_FORMAT_VERSION}:{metadata['reference_sample']}:"
+        f"{metadata['tile_bases']}:{metadata['tile_bins']}:{z}:{x}"
+    )
+    entry = TileBody(
+        body=_tile_document(layout.graph, tile).model_dump_json().encode(),
+        etag='"' + hashlib.sha256(identity.encode()).hexdigest()[:32] + '"',
+    )
+    with _tile_lock:
+        _tile_cache[key] = entry
+        if len(_tile_cache) > _TILE_CACHE_SIZE:
+            _tile_cache.popitem(last=False)
+    return entry
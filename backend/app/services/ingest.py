@@ -0,0 +1,212 @@
+"""Streaming ingestion of VCF uploads into the variants table."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import AsyncIterable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import VcfAsset
+from app.genomics.normalize import (
+    CheckRef,
+    FieldNumbers,
+    NormalizationStats,
+    RecordReorderer,
+    normalize_block,
+)
+from app.genomics.vcf import (
+    VcfFormatError,
+    VcfRecord,
+    decompress_stream,
+    iter_lines,
+    parse_record,
+)
+from app.repositories import assets as asset_repo
+
+_normalize_pool: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass(frozen=True)
+class NormalizeOptions:
+    """How to normalize records on their way into the variant store."""
+
+    reference: Path
+    check_ref: CheckRef
+    executor: Executor
+    block_size: int
+    # Blocks handed to workers ahead of the one being inserted.
+    max_pending: int
+
+
+def normalize_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    """Return the worker pool shared by normalizing ingestions, starting it on first use."""
+
+    global _normalize_pool
+    if _normalize_pool is None:
+        # Started from a request handler in the multithreaded server; do not fork it.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _normalize_pool = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, mp_context=context
+        )
+    return _normalize_pool
+
+
+def shutdown_normalize_pool() -> None:
+    """Stop the normalization workers, if they were started."""
+
+    global _normalize_pool
+    if _normalize_pool is not None:
+        pool, _normalize_pool = _normalize_pool, None
+        pool.shutdown(cancel_futures=True)
+
+
+class _Normalizer:
+    """Send blocks of data lines to worker processes and collect sorted records in order."""
+
+    def __init__(self, options: NormalizeOptions, header_lines: list[str]) -> None:
+        self.options = options
+        self.numbers = FieldNumbers.from_header(header_lines)
+        self.stats = NormalizationStats()
+        self.reorderer = RecordReorderer()
+        self._block: list[str] = []
+        self._pending: deque[asyncio.Future] = deque()
+
+    def _submit(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._pending.append(
+            loop.run_in_executor(
+                self.options.executor,
+                normalize_block,
+                self._block,
+                str(self.options.reference),
+                self.numbers,
+                self.options.check_ref,
+            )
+        )
+        self._block = []
+
+    async def _collect(self) -> list[VcfRecord]:
+        records, stats = await self._pending.popleft()
+        self.stats.merge(stats)
+        return [released for record in records for released in self.reorderer.push(record)]
+
+    async def add(self, line: str) -> list[VcfRecord]:
+        """Queue a data line; returns records that are ready to insert."""
+
+        self._block.append(line)
+        if len(self._block) < self.options.block_size:
+            return []
+        self._submit()
+        if len(self._pending) <= self.options.max_pending:
+            return []
+        return await self._collect()
+
+    async def drain(self) -> list[VcfRecord]:
+        """Normalize everything still queued and return the remaining records."""
+
+        if self._block:
+            self._submit()
+        records: list[VcfRecord] = []
+        while self._pending:
+            records.extend(await self._collect())
+        records.extend(self.reorderer.flush())
+        return records
+
+    def cancel(self) -> None:
+        for future in self._pending:
+            future.cancel()
+
+
+def _normalize_header(header_lines: list[str], options: NormalizeOptions) -> list[str]:
+    return [
+        *header_lines,
+        f"##pgip_normalize=<reference={options.reference.name},check_ref={options.check_ref},"
+        "multiallelics=split,left_align=true>",
+    ]
+
+
+async def ingest_vcf_stream(
+    session: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    *,
+    source: str,
+    batch_size: int,
+    normalize: Optional[NormalizeOptions] = None,
+) -> VcfAsset:
+    """Parse a (b)gzipped VCF byte stream and load it in fixed-size batches.
+
+    Only one batch of parsed records is held in memory at a time, so the cost
+    of ingesting a file is independent of its size. With ``normalize``,
+    blocks of lines are normalized by worker processes while earlier blocks
+    are inserted, and the normalization statistics are stored on the asset.
+    """
+
+    asset = await asset_repo.create_vcf_asset(session, source=source)
+    header_lines: list[str] = []
+    samples: list[str] = []
+    batch: list[VcfRecord] = []
+    record_count = 0
+    normalizer: Optional[_Normalizer] = None
+
+    async def insert(records: Iterable[VcfRecord]) -> None:
+        nonlocal batch, record_count
+        batch.extend(records)
+        while len(batch) >= batch_size:
+            await asset_repo.insert_variants(session, asset_id=asset.id, records=batch[:batch_size])
+            record_count += batch_size
+            batch = batch[batch_size:]
+
+    seen_columns = False
+    try:
+        async for line in iter_lines(decompress_stream(chunks)):
+            if not line:
+                continue
+            if line.startswith("##"):
+                header_lines.append(line)
+                continue
+            if line.startswith("#"):
+                samples = line.split("\t")[9:]
+                seen_columns = True
+                if normalize is not None:
+                    normalizer = _Normalizer(normalize, header_lines)
+                continue
+            if not seen_columns:
+                raise VcfFormatError("Missing #CHROM header line before data records")
+
+            if normalizer is not None:
+                await insert(await normalizer.add(line))
+            else:
+                await insert((parse_record(line),))
+
+        if not seen_columns:
+            raise VcfFormatError("Missing #CHROM header line")
+
+        if normalizer is not None:
+            await insert(await normalizer.drain())
+        await asset_repo.insert_variants(session, asset_id=asset.id, records=batch)
+        record_count += len(batch)
+    except Exception:
+        if normalizer is not None:
+            normalizer.cancel()
+        await asset_repo.fail_vcf_asset(session, asset)
+        raise
+
+    if normalize is not None:
+        header_lines = _normalize_header(header_lines, normalize)
+    return await asset_repo.complete_vcf_asset(
+        session,
+        asset,
+        header="\n".join(header_lines),
+        samples=samples,
+        record_count=record_count,
+        normalization=normalizer.stats.summary() if normalizer is not None else None,
+    )
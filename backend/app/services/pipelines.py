@@ -0,0 +1,366 @@
+"""Validation and execution of plugin pipelines.
+
+A pipeline is a DAG of plugin stages. Each stage input is either an external
+file or the output of an upstream stage, and the two ends of every edge must
+declare the same media type. Stages run as soon as their inputs allow, so
+independent branches execute in parallel under the run scheduler.
+
+Annotation JSONL edges are streamed: the consumer is started once its producer
+is running and reads records through a named pipe fed by
+:mod:`app.runtime.streams`. Every other edge is a barrier and hands over the
+producer's finished output directory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models import PipelineRun, Plugin, PluginRun
+from app.db.session import get_session_factory
+from app.models.pipeline import PipelineRequest, PipelineStage
+from app.models.plugin import PluginManifest
+from app.repositories import pipelines as pipeline_repo
+from app.repositories import plugins as plugin_repo
+from app.repositories import runs as run_repo
+from app.runtime.resources import Resources
+from app.runtime.streams import FifoWriter, OutputFollower, create_fifo
+from app.services import runs as run_service
+from app.services.runs import ANNOTATION_MEDIA_TYPE
+
+
+class PipelineValidationError(ValueError):
+    """Raised when a pipeline request is not a valid DAG of registered plugins."""
+
+
+@dataclass(eq=False)
+class _Stage:
+    definition: PipelineStage
+    plugin: Plugin
+    manifest: PluginManifest
+    resources: Resources
+    run_id: str = field(default_factory=lambda: str(uuid4()))
+    workspace: Path = field(init=False)
+    failed: bool = False
+    started: asyncio.Event = field(default_factory=asyncio.Event)
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    # Set once the stage's process has exited; read by follower and FIFO threads.
+    exited: threading.Event = field(default_factory=threading.Event)
+
+    def __post_init__(self) -> None:
+        self.workspace = Path(get_settings().run_workspace_dir).resolve() / self.run_id
+
+    @property
+    def id(self) -> str:
+        return self.definition.id
+
+    def media_type(self, input_name: str) -> str:
+        return next(item.media_type for item in self.manifest.inputs if item.name == input_name)
+
+    def streamed(self, input_name: str) -> bool:
+        if input_name not in self.definition.sources:
+            return False
+        return self.media_type(input_name) == ANNOTATION_MEDIA_TYPE
+
+    def signal_all(self) -> None:
+        self.started.set()
+        self.finished.set()
+        self.exited.set()
+
+
+def _validate_stage(stage: _Stage, stages: dict[str, _Stage]) -> None:
+    definition = stage.definition
+    declared = {item.name: item for item in stage.manifest.inputs}
+    overlap = sorted(set(definition.inputs) & set(definition.sources))
+    if overlap:
+        raise PipelineValidationError(
+            f"Stage {stage.id!r} binds inputs both to files and stages: {', '.join(overlap)}"
+        )
+    bound = set(definition.inputs) | set(definition.sources)
+    unknown = sorted(bound - set(declared))
+    if unknown:
+        raise PipelineValidationError(
+            f"Unknown inputs for stage {stage.id!r} ({stage.manifest.name}): {', '.join(unknown)}"
+        )
+    missing = sorted(
+        name for name, item in declared.items() if not item.optional and name not in bound
+    )
+    if missing:
+        raise PipelineValidationError(
+            f"Missing required inputs for stage {stage.id!r}: {', '.join(missing)}"
+        )
+    for name, path in definition.inputs.items():
+        if not Path(path).exists():
+            raise PipelineValidationError(
+                f"Input {name!r} of stage {stage.id!r} does not exist: {path}"
+            )
+
+    for name, source in definition.sources.items():
+        producer = stages.get(source.stage)
+        if producer is None:
+            raise PipelineValidationError(
+                f"Stage {stage.id!r} reads from unknown stage {source.stage!r}"
+            )
+        outputs = {item.name: item for item in producer.manifest.outputs}
+        output = outputs.get(source.output)
+        if output is None:
+            raise PipelineValidationError(
+                f"Stage {source.stage!r} ({producer.manifest.name}) has no output {source.output!r}"
+            )
+        if output.media_type != declared[name].media_type:
+            raise PipelineValidationError(
+                f"Output {source.stage}.{source.output} has media type {output.media_type}, "
+                f"but input {stage.id}.{name} expects {declared[name].media_type}"
+            )
+
+
+def _check_acyclic(stages: dict[str, _Stage]) -> None:
+    waiting = {
+        stage_id: {source.stage for source in stage.definition.sources.values()}
+        for stage_id, stage in stages.items()
+    }
+    ready = [stage_id for stage_id, upstream in waiting.items() if not upstream]
+    visited = 0
+    while ready:
+        current = ready.pop()
+        visited += 1
+        for stage_id, upstream in waiting.items():
+            if current in upstream:
+                upstream.discard(current)
+                if not upstream:
+                    ready.append(stage_id)
+    if visited != len(stages):
+        cyclic = sorted(stage_id for stage_id, upstream in waiting.items() if upstream)
+        raise PipelineValidationError(
+            f"Pipeline contains a cycle through stages: {', '.join(cyclic)}"
+        )
+
+
+async def _resolve(session: AsyncSession, request: PipelineRequest) -> dict[str, _Stage]:
+    settings = get_settings()
+    capacity = run_service.get_scheduler().capacity
+    stages: dict[str, _Stage] = {}
+    for definition in request.stages:
+        if definition.id in stages:
+            raise PipelineValidationError(f"Duplicate stage id {definition.id!r}")
+        plugin = await plugin_repo.get_plugin(
+            session, name=definition.plugin, version=definition.version
+        )
+        if plugin is None:
+            label = " ".join(filter(None, (definition.plugin, definition.version)))
+            raise PipelineValidationError(f"Stage {definition.id!r} uses unknown plugin {label}")
+        manifest = PluginManifest.model_validate(plugin.manifest)
+        try:
+            resources = run_service.resources_for(manifest, settings)
+        except run_service.RunValidationError as exc:
+            raise PipelineValidationError(f"Stage {definition.id!r}: {exc}") from exc
+        if not capacity.fits(resources):
+            raise PipelineValidationError(
+                f"Stage {definition.id!r} requests {resources.cpu:g} CPU / {resources.memory} bytes, "
+                "which exceeds the capacity of this node"
+            )
+        stages[definition.id] = _Stage(definition, plugin, manifest, resources)
+
+    for stage in stages.values():
+        _validate_stage(stage, stages)
+    _check_acyclic(stages)
+    return stages
+
+
+def _stage_inputs(stage: _Stage, stages: dict[str, _Stage]) -> dict[str, str]:
+    """Return the input paths of a stage: files, upstream outputs or named pipes."""
+
+    inputs = dict(stage.definition.inputs)
+    for name, source in stage.definition.sources.items():
+        if stage.streamed(name):
+            inputs[name] = str(_fifo_path(stage, name, source.stage, source.output))
+        else:
+            inputs[name] = str(stages[source.stage].workspace / "output" / source.output)
+    return inputs
+
+
+def _fifo_path(stage: _Stage, input_name: str, producer: str, output: str) -> Path:
+    return stage.workspace / "input" / input_name / f"{producer}-{output}.jsonl"
+
+
+async def submit_pipeline(session: AsyncSession, request: PipelineRequest) -> PipelineRun:
+    """Validate a pipeline, persist it with one queued run per stage and start it."""
+
+    stages = await _resolve(session, request)
+    now = datetime.now(timezone.utc)
+    pipeline = PipelineRun(
+        id=str(uuid4()),
+        status="queued",
+        stages=request.model_dump(mode="json")["stages"],
+        created_at=now,
+    )
+    runs = [
+        PluginRun(
+            id=stage.run_id,
+            plugin_name=stage.plugin.name,
+            plugin_version=stage.plugin.version,
+            container_digest=stage.manifest.provenance.container_digest,
+            status="queued",
+            parameters=stage.definition.parameters,
+            inputs=_stage_inputs(stage, stages),
+            workspace=str(stage.workspace),
+            cpu=stage.resources.cpu,
+            memory=stage.resources.memory,
+            pipeline_id=pipeline.id,
+            stage=stage.id,
+            created_at=now,
+        )
+        for stage in stages.values()
+    ]
+    pipeline = await pipeline_repo.create_pipeline(session, pipeline, runs)
+    run_service.track_task(
+        _execute_pipeline(pipeline.id, stages),
+        run_ids=[stage.run_id for stage in stages.values()],
+    )
+    return pipeline
+
+
+def _start_streams(stages: dict[str, _Stage]) -> None:
+    """Create the named pipes and start one follower per streamed producer output."""
+
+    capacity = max(1, get_settings().pipeline_stream_queue_chunks)
+    sinks: dict[tuple[str, str], list[queue.Queue]] = {}
+    threads: list[threading.Thread] = []
+    for stage in stages.values():
+        for name, source in stage.definition.sources.items():
+            if not stage.streamed(name):
+                continue
+            channel: queue.Queue = queue.Queue(maxsize=capacity)
+            sinks.setdefault((source.stage, source.output), []).append(channel)
+            fifo = create_fifo(_fifo_path(stage, name, source.stage, source.output))
+            threads.append(FifoWriter(fifo, channel, stage.exited))
+    for (producer_id, output), channels in sinks.items():
+        producer = stages[producer_id]
+        directory = producer.workspace / "output" / output
+        threads.append(OutputFollower(directory, channels, producer.exited))
+    for thread in threads:
+        thread.start()
+
+
+async def _run_stage(stage: _Stage, stages: dict[str, _Stage]) -> None:
+    session_factory = get_session_factory()
+    sources = stage.definition.sources
+    upstream = {source.stage for source in sources.values()}
+    streamed = {source.stage for name, source in sources.items() if stage.streamed(name)}
+    barriers = {source.stage for name, source in sources.items() if not stage.streamed(name)}
+    started = time.monotonic()
+    exit_code, error, cached = -1, None, False
+    streamed_records, usage = 0, None
+    try:
+        for producer_id in sorted(barriers):
+            await stages[producer_id].finished.wait()
+        # A streaming consumer only queues once its producers hold their
+        # resources, so it can never occupy capacity a producer is waiting for.
+        for producer_id in sorted(streamed):
+            await stages[producer_id].started.wait()
+        failed = sorted(producer_id for producer_id in upstream if stages[producer_id].failed)
+        if failed:
+            error = f"Upstream stage failed: {', '.join(failed)}"
+        else:
+
+            async def mark_running() -> None:
+                nonlocal started
+                started = time.monotonic()
+                async with session_factory() as session:
+                    await run_repo.mark_running(session, stage.run_id)
+                stage.started.set()
+
+            spec = run_service.build_run_spec(
+                stage.run_id,
+                stage.manifest,
+                stage.workspace,
+                _stage_inputs(stage, stages),
+                stage.definition.parameters,
+                stage.resources,
+            )
+            loader = run_service.start_stream_loader(
+                stage.run_id, stage.manifest, stage.workspace, stage.exited, lambda: started
+            )
+            # Named pipes cannot be hashed up front, so streamed stages bypass the cache.
+            outcome, cached = await run_service.run_job(
+                spec,
+                stage.resources,
+                digest=None if streamed else stage.manifest.provenance.container_digest,
+                on_started=mark_running,
+            )
+            stage.started.set()
+            stage.exited.set()
+            exit_code, error, usage = outcome.exit_code, outcome.error, outcome.usage
+            if loader is not None:
+                streamed_records, load_error = await run_service.await_stream_loader(loader)
+                if load_error and exit_code == 0 and error is None:
+                    exit_code, error = -1, load_error
+            for producer_id in sorted(streamed):
+                await stages[producer_id].finished.wait()
+            failed = sorted(producer_id for producer_id in streamed if stages[producer_id].failed)
+            if failed and exit_code == 0 and error is None:
+                exit_code, error = -1, f"Upstream stage failed: {', '.join(failed)}"
+    finally:
+        stage.failed = exit_code != 0 or error is not None
+        stage.started.set()
+        stage.exited.set()
+
+    try:
+        await run_service.finish_run(
+            stage.run_id,
+            stage.manifest,
+            stage.workspace,
+            exit_code=exit_code,
+            error=error,
+            started=started,
+            cache_hits=int(cached),
+            preloaded=(stage.manifest.stream.output,) if stage.manifest.stream else (),
+            preloaded_records=streamed_records,
+            usage=usage,
+        )
+    finally:
+        stage.finished.set()
+
+
+async def _execute_pipeline(pipeline_id: str, stages: dict[str, _Stage]) -> None:
+    session_factory = get_session_factory()
+    try:
+        await asyncio.to_thread(_start_streams, stages)
+    except OSError as exc:
+        error = f"Failed to create stage streams: {exc}"
+        for stage in stages.values():
+            await run_service.finish_run(
+                stage.run_id,
+                stage.manifest,
+                stage.workspace,
+                exit_code=-1,
+                error=error,
+                started=time.monotonic(),
+            )
+        async with session_factory() as session:
+            await pipeline_repo.mark_finished(session, pipeline_id, error=error)
+        return
+
+    try:
+        async with session_factory() as session:
+            await pipeline_repo.set_status(session, pipeline_id, "running")
+        await asyncio.gather(*(_run_stage(stage, stages) for stage in stages.values()))
+    finally:
+        # Release any follower, FIFO writer or waiting stage if the pipeline is cancelled.
+        for stage in stages.values():
+            stage.signal_all()
+
+    failed = [stage.id for stage in stages.values() if stage.failed]
+    async with session_factory() as session:
+        await pipeline_repo.mark_finished(
+            session, pipeline_id, error=f"Failed stages: {', '.join(failed)}" if failed else None
+        )
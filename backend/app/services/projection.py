@@ -0,0 +1,122 @@
+"""Projection of ingested VCF assets onto the loaded pangenome graph."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import GraphProjection, VcfAsset
+from app.genomics.projection import VariantProjector
+from app.repositories import projections as projection_repo
+from app.services import graph as graph_service
+
+
+class AssetNotReadyError(ValueError):
+    """Raised when projecting an asset that has not finished loading."""
+
+
+def graph_key() -> str:
+    """Identify the loaded graph build and reference; projections are stored per key.
+
+    Bubble ids depend on the reference sample as well as the build, so a
+    different ``reference_sample`` gets its own projections. The graph is
+    loaded on first use, so call this from a worker thread.
+    """
+
+    name = graph_service.get_graph().directory.name
+    sample = graph_service.reference_sample()
+    return name if sample is None else f"{name}:{sample}"
+
+
+def _project_rows(
+    projector: VariantProjector, projection_id: int, rows: Sequence[Row]
+) -> tuple[list[dict[str, Any]], dict[str, int]]:
+    """Project one batch of variant rows and build the rows to insert. Runs in a thread."""
+
+    graph = projector.graph
+    names: dict[int, str] = {}
+
+    def name(segment: int) -> str:
+        if segment not in names:
+            names[segment] = graph.segment_name(segment)
+        return names[segment]
+
+    results = projector.project(
+        [row.contig for row in rows],
+        [row.position for row in rows],
+        [row.ref for row in rows],
+        [row.alt for row in rows],
+    )
+    inserts: list[dict[str, Any]] = []
+    counts = {"placed_count": 0, "bubble_count": 0, "matched_count": 0}
+    for row, result in zip(rows, results):
+        if result is None:
+            continue
+        counts["placed_count"] += 1
+        counts["bubble_count"] += result.bubble is not None
+        counts["matched_count"] += result.alt_handles is not None
+        inserts.append(
+            {
+                "projection_id": projection_id,
+                "variant_id": row.id,
+                "path": result.path,
+                "bubble_id": result.bubble,
+                "traversal": result.traversal,
+                "ref_nodes": [name(segment) for segment in result.ref_nodes],
+                "alt_nodes": (
+                    None
+                    if result.alt_handles is None
+                    else [name(node_handle >> 1) for node_handle in result.alt_handles]
+                ),
+            }
+        )
+    return inserts, counts
+
+
+async def project_asset(
+    session: AsyncSession, asset: VcfAsset, *, batch_size: int
+) -> GraphProjection:
+    """Project every variant of ``asset`` onto the loaded graph and store the result.
+
+    Variants are read ``batch_size`` at a time in id order. Each batch is
+    projected in a worker thread, so the event loop stays free, and its rows
+    are inserted before the next batch is read. The whole projection is
+    committed at once, and a failure leaves it marked ``failed``. Raises
+    :class:`graph_service.GraphUnavailableError` when no graph is loaded.
+    """
+
+    if asset.status != "ready":
+        raise AssetNotReadyError(f"Asset {asset.id} is {asset.status}, not ready")
+
+    bubbles = await asyncio.to_thread(graph_service.get_bubble_index)
+    path_index = await asyncio.to_thread(graph_service.get_path_index)
+    projector = VariantProjector(bubbles, path_index)
+    projection = await projection_repo.start_projection(
+        session, asset_id=asset.id, graph_key=await asyncio.to_thread(graph_key)
+    )
+    counts = {"variant_count": 0, "placed_count": 0, "bubble_count": 0, "matched_count": 0}
+    last_id = 0
+    try:
+        while True:
+            rows = await projection_repo.variant_batch(
+                session, asset_id=asset.id, after=last_id, limit=batch_size
+            )
+            if not rows:
+                break
+            inserts, batch_counts = await asyncio.to_thread(
+                _project_rows, projector, projection.id, rows
+            )
+            await projection_repo.insert_projected(session, inserts)
+            counts["variant_count"] += len(rows)
+            for name, value in batch_counts.items():
+                counts[name] += value
+            last_id = rows[-1].id
+    except Exception:
+        await projection_repo.fail_projection(session, projection)
+        raise
+
+    return await projection_repo.complete_projection(session, projection, counts=counts)
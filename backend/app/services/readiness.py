@@ -0,0 +1,108 @@
+"""Deep readiness checks for load balancers and orchestrators.
+
+``/health`` only proves the process answers. Readiness additionally confirms
+that the database answers within a timeout, that its schema matches this
+build, and that a configured pangenome graph has finished loading. Probes can
+arrive every second from several sources, so a report is reused for
+``readiness_cache_seconds`` and concurrent probes share one evaluation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import Settings
+from app.db import session as db_session
+from app.db.schema import SchemaRevisionError, verify_schema
+from app.models.health import ReadinessCheck, ReadinessReport
+from app.services import graph as graph_service
+
+_report: Optional[tuple[float, ReadinessReport]] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def reset() -> None:
+    """Forget the cached report; called when the application starts."""
+
+    global _report, _lock
+    _report = None
+    _lock = None
+
+
+async def _ping(engine: AsyncEngine, timeout: float) -> ReadinessCheck:
+    async def probe() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout)
+    except asyncio.TimeoutError:
+        return ReadinessCheck(ok=False, detail=f"no response within {timeout:g}s")
+    except Exception as exc:  # any driver or network failure means not ready
+        return ReadinessCheck(ok=False, detail=f"{type(exc).__name__}: {exc}")
+    return ReadinessCheck(ok=True, detail=f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+async def _schema(engine: AsyncEngine, timeout: float) -> ReadinessCheck:
+    try:
+        revision = await asyncio.wait_for(verify_schema(engine), timeout)
+    except asyncio.TimeoutError:
+        return ReadinessCheck(ok=False, detail=f"no response within {timeout:g}s")
+    except SchemaRevisionError as exc:
+        return ReadinessCheck(ok=False, detail=str(exc))
+    except Exception as exc:
+        return ReadinessCheck(ok=False, detail=f"{type(exc).__name__}: {exc}")
+    return ReadinessCheck(ok=True, detail=f"revision {revision}")
+
+
+def _graph(settings: Settings) -> ReadinessCheck:
+    state = graph_service.graph_state()
+    if not state.configured:
+        return ReadinessCheck(ok=True, detail="not configured")
+    if state.error:
+        return ReadinessCheck(ok=False, detail=state.error)
+    if state.graph_loaded and state.index_loaded:
+        # Optional indexes that failed to build do not make the worker unready.
+        failed = "; ".join(f"{name}: {error}" for name, error in sorted(state.index_errors.items()))
+        return ReadinessCheck(ok=True, detail=f"loaded ({failed})" if failed else "loaded")
+    if not settings.graph_preload:
+        return ReadinessCheck(ok=True, detail="loads on first use")
+    return ReadinessCheck(ok=False, detail="loading")
+
+
+async def _evaluate(settings: Settings) -> ReadinessReport:
+    timeout = settings.readiness_timeout_seconds
+    engine = db_session.get_engine()
+    checks = {"database": await _ping(engine, timeout)}
+    if db_session.read_engine is not None:
+        checks["database_replica"] = await _ping(db_session.read_engine, timeout)
+    checks["schema"] = (
+        await _schema(engine, timeout)
+        if checks["database"].ok
+        else ReadinessCheck(ok=False, detail="database unreachable")
+    )
+    checks["graph"] = _graph(settings)
+    ready = all(check.ok for check in checks.values())
+    return ReadinessReport(status="ready" if ready else "unavailable", checks=checks)
+
+
+async def check_readiness(settings: Settings) -> ReadinessReport:
+    """Return the readiness report, re-evaluating it at most once per cache period."""
+
+    global _report, _lock
+    if _report is not None and time.monotonic() - _report[0] < settings.readiness_cache_seconds:
+        return _report[1]
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _report is not None and time.monotonic() - _report[0] < settings.readiness_cache_seconds:
+            return _report[1]
+        report = await _evaluate(settings)
+        _report = (time.monotonic(), report)
+        return report
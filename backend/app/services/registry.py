@@ -0,0 +1,201 @@
+"""In-process cache of serialized plugin registry responses.
+
+The plugin list and manifests are read far more often than they change, so
+responses are cached as ready-to-send JSON bytes together with a strong ETag.
+A hit costs one dictionary lookup: no database round trip and no Pydantic
+validation or serialization.
+
+Writes made through this process (:func:`upsert_plugin`, :func:`delete_plugin`
+and finished runs) invalidate the cache immediately. Writes made by other
+worker processes become visible once ``PGIP_REGISTRY_CACHE_TTL_SECONDS``
+expires. Misses are loaded from the primary rather than a read replica, since
+a lagging replica read right after an invalidation would be cached for a full
+TTL.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import REGISTRY_CACHE_LOOKUPS
+from app.db.models import Plugin
+from app.models.plugin import PluginManifest, PluginSummary
+from app.repositories import plugins as plugin_repo
+from app.repositories.plugins import PluginFilter
+
+_summaries = TypeAdapter(list[PluginSummary])
+# Filtered listings make the key space open-ended; past this many entries the
+# cache is flushed rather than tracking recency.
+_MAX_ENTRIES = 1024
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a plugin listing cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized JSON response and its entity tag."""
+
+    body: bytes
+    etag: str
+    expires_at: float
+    next_cursor: Optional[str] = None
+
+
+_entries: dict[tuple, CachedBody] = {}
+_generation = 0
+
+
+def encode_cursor(plugin: Plugin) -> str:
+    """Return an opaque, URL-safe cursor for the plugins listed after ``plugin``."""
+
+    raw = json.dumps([plugin.updated_at.isoformat(), plugin.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, plugin_id = json.loads(raw)
+        return datetime.fromisoformat(updated_at), int(plugin_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed pagination cursor") from exc
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in (value.removeprefix("W/") for value in candidates)
+
+
+def invalidate() -> None:
+    """Drop every cached response."""
+
+    global _generation
+    _generation += 1
+    _entries.clear()
+
+
+async def _cached(
+    key: tuple, load: Callable[[], Awaitable[Optional[tuple[bytes, Optional[str]]]]]
+) -> Optional[CachedBody]:
+    ttl = get_settings().registry_cache_ttl_seconds
+    now = time.monotonic()
+    entry = _entries.get(key)
+    if entry is not None and entry.expires_at > now:
+        REGISTRY_CACHE_LOOKUPS.inc(result="hit")
+        return entry
+
+    REGISTRY_CACHE_LOOKUPS.inc(result="miss")
+    generation = _generation
+    loaded = await load()
+    if loaded is None:
+        return None
+    body, next_cursor = loaded
+    entry = CachedBody(body=body, etag=_etag(body), expires_at=now + ttl, next_cursor=next_cursor)
+    # An invalidation while loading means ``body`` may already be stale.
+    if ttl > 0 and generation == _generation:
+        if len(_entries) >= _MAX_ENTRIES:
+            _entries.clear()
+        _entries[key] = entry
+    return entry
+
+
+async def plugin_list(
+    session: AsyncSession,
+    filters: PluginFilter = PluginFilter(),
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> CachedBody:
+    """Return one page of serialized plugin summaries matching ``filters``.
+
+    ``next_cursor`` of the result is set when more plugins follow the page.
+    Raises :class:`InvalidCursorError` for malformed cursors.
+    """
+
+    after = decode_cursor(cursor) if cursor else None
+
+    async def load() -> tuple[bytes, Optional[str]]:
+        records = await plugin_repo.list_plugins(session, filters, limit=limit + 1, after=after)
+        next_cursor = encode_cursor(records[limit - 1]) if len(records) > limit else None
+        body = _summaries.dump_json(
+            [
+                PluginSummary(
+                    name=record.name,
+                    version=record.version,
+                    description=record.description,
+                    tags=record.tags or [],
+                    latest_run_at=record.latest_run_at,
+                )
+                for record in records[:limit]
+            ]
+        )
+        return body, next_cursor
+
+    entry = await _cached(("list", filters, limit, cursor), load)
+    assert entry is not None
+    return entry
+
+
+async def plugin_manifest(
+    session: AsyncSession, *, name: str, version: Optional[str] = None
+) -> Optional[CachedBody]:
+    """Return the serialized manifest of a plugin version (latest when omitted)."""
+
+    async def load() -> Optional[tuple[bytes, None]]:
+        record = await plugin_repo.get_plugin(session, name=name, version=version)
+        if record is None:
+            return None
+        return PluginManifest.model_validate(record.manifest).model_dump_json().encode(), None
+
+    return await _cached(("manifest", name, version), load)
+
+
+async def upsert_plugin(session: AsyncSession, manifest: PluginManifest) -> Plugin:
+    """Insert or update a manifest and invalidate cached registry responses."""
+
+    try:
+        return await plugin_repo.upsert_plugin(session, manifest)
+    finally:
+        invalidate()
+
+
+async def upsert_plugins(session: AsyncSession, manifests: list[PluginManifest]) -> list[Plugin]:
+    """Bulk insert or update manifests and invalidate cached registry responses."""
+
+    try:
+        return await plugin_repo.upsert_plugins(session, manifests)
+    finally:
+        invalidate()
+
+
+async def delete_plugin(session: AsyncSession, *, name: str, version: str) -> bool:
+    """Delete a manifest and invalidate cached registry responses."""
+
+    try:
+        return await plugin_repo.delete_plugin(session, name=name, version=version)
+    finally:
+        invalidate()
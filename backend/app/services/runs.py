@@ -0,0 +1,729 @@
+"""Submission and lifecycle management of plugin runs."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Collection
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+from uuid import uuid4
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, get_settings
+from app.core.metrics import RUN_DURATION_SECONDS, RUN_FIRST_RESULT_SECONDS, CallbackMetric
+from app.db.models import Plugin, PluginRun
+from app.db.session import get_session_factory
+from app.models.plugin import PluginManifest
+from app.models.run import PluginVersionUsage, RunRequest, ShardOptions
+from app.repositories import annotations as annotation_repo
+from app.repositories import runs as run_repo
+from app.runtime.accounting import ResourceUsage
+from app.runtime.cache import InputHasher, ResultCache, cache_key
+from app.runtime.executor import RunOutcome, RunSpec, execute_run
+from app.runtime.resources import Resources, parse_memory, total_memory
+from app.runtime.scheduler import RunScheduler
+from app.runtime.sharding import Shard, merge_annotation_outputs, split_vcf
+from app.services import annotations as annotation_service
+from app.services import columnar, registry
+
+ANNOTATION_MEDIA_TYPE = "application/vnd.pgip.annotation+jsonl"
+VCF_MEDIA_TYPE = "application/vnd.pgip.vcf"
+
+_scheduler: Optional[RunScheduler] = None
+_cache: Optional[ResultCache] = None
+_hasher = InputHasher()
+_tasks: set[asyncio.Task] = set()
+# Runs executed by this worker, whose leases the heartbeat renews.
+_active_runs: set[str] = set()
+# A lease not renewed for this many heartbeat intervals belongs to a stopped worker.
+_LEASE_INTERVALS = 3
+ORPHANED_ERROR = "Run was interrupted: the worker executing it stopped"
+
+
+def _scheduler_gauge(attribute: str):
+    def read() -> Optional[float]:
+        return None if _scheduler is None else float(getattr(_scheduler, attribute))
+
+    return read
+
+
+def _cache_stat(attribute: str):
+    def read() -> Optional[float]:
+        return None if _cache is None else float(getattr(_cache.stats(), attribute))
+
+    return read
+
+
+CallbackMetric(
+    "pgip_run_queue_depth", "Plugin jobs waiting for capacity.", _scheduler_gauge("queue_depth")
+)
+CallbackMetric("pgip_runs_active", "Plugin jobs currently executing.", _scheduler_gauge("running"))
+CallbackMetric(
+    "pgip_result_cache_hits_total", "Result cache hits.", _cache_stat("hits"), kind="counter"
+)
+CallbackMetric(
+    "pgip_result_cache_misses_total", "Result cache misses.", _cache_stat("misses"), kind="counter"
+)
+CallbackMetric(
+    "pgip_result_cache_hit_ratio",
+    "Fraction of result cache lookups that hit.",
+    _cache_stat("hit_ratio"),
+)
+CallbackMetric(
+    "pgip_result_cache_size_bytes", "Bytes stored in the result cache.", _cache_stat("size_bytes")
+)
+
+
+class RunValidationError(ValueError):
+    """Raised when a run request does not satisfy the plugin manifest."""
+
+
+def start_runtime(settings: Settings) -> RunScheduler:
+    """Create and start the process-wide run scheduler and result cache.
+
+    Also starts the run heartbeat, which renews the leases of this worker's
+    runs and fails runs whose worker stopped renewing theirs (see
+    :func:`reconcile_runs`). Must be called with the event loop running.
+    """
+
+    global _scheduler, _cache
+    memory = (
+        parse_memory(settings.run_memory_capacity)
+        if settings.run_memory_capacity
+        else total_memory()
+    )
+    capacity = Resources(cpu=settings.run_cpu_capacity or float(os.cpu_count() or 1), memory=memory)
+    scheduler = RunScheduler(
+        capacity=capacity,
+        max_workers=settings.run_max_workers,
+        pool_kind=settings.run_pool_kind,
+    )
+    scheduler.start()
+    _scheduler = scheduler
+    _cache = (
+        ResultCache(Path(settings.cache_dir), parse_memory(settings.cache_max_size))
+        if settings.cache_enabled
+        else None
+    )
+    track_task(_heartbeat(settings.run_heartbeat_seconds))
+    return scheduler
+
+
+async def reconcile_runs(lease_seconds: float, *, expire: bool = True) -> int:
+    """Renew this worker's run leases, then fail runs whose lease expired.
+
+    Runs left ``queued`` or ``running`` by a worker that crashed or was shut
+    down mid-run would otherwise never finish. With ``expire=False`` only the
+    leases are renewed. Returns how many runs were failed.
+    """
+
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await run_repo.renew_leases(session, set(_active_runs))
+        if not expire:
+            return 0
+        failed = await run_repo.fail_expired(
+            session,
+            before=datetime.now(timezone.utc) - timedelta(seconds=lease_seconds),
+            error=ORPHANED_ERROR,
+        )
+    if failed:
+        registry.invalidate()
+    return failed
+
+
+async def _heartbeat(interval: float) -> None:
+    lease_seconds = interval * _LEASE_INTERVALS
+    # Other workers' leases lapse while the database is unreachable. Only expire
+    # leases once this worker has been connected for a full lease, so that the
+    # others have had as long to renew theirs.
+    connected_since: Optional[float] = None
+    while True:
+        now = time.monotonic()
+        if connected_since is None:
+            connected_since = now
+        try:
+            await reconcile_runs(lease_seconds, expire=now - connected_since >= lease_seconds)
+        except (OSError, SQLAlchemyError):  # database briefly unreachable; retry next beat
+            connected_since = None
+        await asyncio.sleep(interval)
+
+
+async def stop_runtime() -> None:
+    """Cancel outstanding run tasks and shut the worker pool down."""
+
+    global _scheduler
+    for task in list(_tasks):
+        task.cancel()
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
+    if _scheduler is not None:
+        scheduler, _scheduler = _scheduler, None
+        await scheduler.stop()
+
+
+def get_scheduler() -> RunScheduler:
+    """Return the running scheduler."""
+
+    if _scheduler is None:
+        raise RuntimeError("Run scheduler has not been started")
+    return _scheduler
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the result cache, or ``None`` when caching is disabled."""
+
+    return _cache
+
+
+def _validate_inputs(manifest: PluginManifest, inputs: dict[str, str]) -> None:
+    declared = {item.name: item for item in manifest.inputs}
+    unknown = sorted(set(inputs) - set(declared))
+    if unknown:
+        raise RunValidationError(f"Unknown inputs for {manifest.name}: {', '.join(unknown)}")
+    missing = sorted(name for name, item in declared.items() if not item.optional and name not in inputs)
+    if missing:
+        raise RunValidationError(f"Missing required inputs: {', '.join(missing)}")
+    for name, path in inputs.items():
+        if not Path(path).exists():
+            raise RunValidationError(f"Input {name!r} does not exist: {path}")
+
+
+def _validate_sharding(manifest: PluginManifest, request: RunRequest) -> None:
+    shard = request.shard
+    if shard is None:
+        return
+    media_types = {item.name: item.media_type for item in manifest.inputs}
+    if shard.input not in request.inputs:
+        raise RunValidationError(f"Shard input {shard.input!r} is not among the provided inputs")
+    if media_types.get(shard.input) != VCF_MEDIA_TYPE:
+        raise RunValidationError(f"Shard input {shard.input!r} must have media type {VCF_MEDIA_TYPE}")
+    if not Path(request.inputs[shard.input]).is_file():
+        raise RunValidationError(f"Shard input {shard.input!r} must be a file")
+
+
+def resources_for(manifest: PluginManifest, settings: Settings) -> Resources:
+    """Return the resources a manifest requests, with configured defaults."""
+
+    try:
+        return Resources.from_manifest(
+            manifest.resources,
+            default_cpu=settings.run_default_cpu,
+            default_memory=settings.run_default_memory,
+        )
+    except ValueError as exc:
+        raise RunValidationError(str(exc)) from exc
+
+
+async def submit_run(session: AsyncSession, plugin: Plugin, request: RunRequest) -> PluginRun:
+    """Validate a run request, persist it as queued and hand it to the scheduler."""
+
+    settings = get_settings()
+    manifest = PluginManifest.model_validate(plugin.manifest)
+    _validate_inputs(manifest, request.inputs)
+    _validate_sharding(manifest, request)
+    resources = resources_for(manifest, settings)
+    scheduler = get_scheduler()
+    if not scheduler.capacity.fits(resources):
+        raise RunValidationError(
+            f"Plugin requests {resources.cpu:g} CPU / {resources.memory} bytes, "
+            "which exceeds the capacity of this node"
+        )
+
+    run_id = str(uuid4())
+    workspace = Path(settings.run_workspace_dir).resolve() / run_id
+    run = await run_repo.create_run(
+        session,
+        PluginRun(
+            id=run_id,
+            plugin_name=plugin.name,
+            plugin_version=plugin.version,
+            status="queued",
+            container_digest=manifest.provenance.container_digest,
+            parameters=request.parameters,
+            inputs=request.inputs,
+            workspace=str(workspace),
+            cpu=resources.cpu,
+            memory=resources.memory,
+            created_at=datetime.now(timezone.utc),
+        ),
+    )
+
+    spec = build_run_spec(run_id, manifest, workspace, request.inputs, request.parameters, resources)
+    if request.shard is None:
+        work = _execute(run_id, spec, resources, manifest)
+    else:
+        work = _execute_sharded(run_id, spec, resources, request.shard, manifest)
+    track_task(_supervise(run_id, manifest, workspace, work), run_ids=(run_id,))
+    return run
+
+
+async def plugin_usage(session: AsyncSession, plugin_name: str) -> list[PluginVersionUsage]:
+    """Summarize measured resource usage per plugin version and container digest."""
+
+    rows = await run_repo.version_usage(session, plugin_name)
+    return [
+        PluginVersionUsage(
+            version=row.version,
+            container_digest=row.container_digest,
+            runs=row.runs,
+            mean_wall_seconds=row.wall_seconds / row.runs,
+            mean_cpu_seconds=row.cpu_seconds / row.runs,
+            mean_cores=row.cpu_seconds / row.wall_seconds if row.wall_seconds else 0.0,
+            mean_peak_rss_bytes=int(row.mean_peak_rss_bytes or 0),
+            max_peak_rss_bytes=int(row.max_peak_rss_bytes or 0),
+            mean_read_bytes=None if row.mean_read_bytes is None else int(row.mean_read_bytes),
+            mean_write_bytes=None if row.mean_write_bytes is None else int(row.mean_write_bytes),
+            records=row.records,
+            records_per_second=row.records / row.wall_seconds if row.wall_seconds else 0.0,
+            last_run_at=row.last_run_at,
+        )
+        for row in rows
+    ]
+
+
+def track_task(
+    coroutine: Coroutine[Any, Any, None], *, run_ids: Collection[str] = ()
+) -> asyncio.Task:
+    """Run ``coroutine`` in the background until it finishes or the runtime stops.
+
+    The leases of ``run_ids`` are renewed for as long as the task runs.
+    """
+
+    task = asyncio.create_task(coroutine)
+    _tasks.add(task)
+    _active_runs.update(run_ids)
+
+    def done(finished: asyncio.Task) -> None:
+        _tasks.discard(finished)
+        _active_runs.difference_update(run_ids)
+
+    task.add_done_callback(done)
+    return task
+
+
+async def _supervise(
+    run_id: str, manifest: PluginManifest, workspace: Path, work: Awaitable[None]
+) -> None:
+    """Await a run's execution and record it as failed if the execution raises."""
+
+    started = time.monotonic()
+    try:
+        await work
+    except Exception as exc:  # e.g. the scheduler was stopped or the database failed
+        await finish_run(
+            run_id,
+            manifest,
+            workspace,
+            exit_code=-1,
+            error=f"Run failed: {type(exc).__name__}: {exc}",
+            started=started,
+            preloaded=(manifest.stream.output,) if manifest.stream else (),
+        )
+
+
+def build_run_spec(
+    run_id: str,
+    manifest: PluginManifest,
+    workspace: Path,
+    inputs: dict[str, str],
+    parameters: dict,
+    resources: Resources,
+) -> RunSpec:
+    settings = get_settings()
+    return RunSpec(
+        run_id=run_id,
+        entrypoint=manifest.entrypoint,
+        workspace=str(workspace),
+        inputs=dict(inputs),
+        outputs=[output.name for output in manifest.outputs],
+        parameters=dict(parameters),
+        threads=resources.threads,
+        backend_api=settings.run_backend_api,
+        timeout=settings.run_timeout_seconds,
+        stream_input=manifest.stream.input if manifest.stream else None,
+        stream_output=manifest.stream.output if manifest.stream else None,
+    )
+
+
+async def run_job(
+    spec: RunSpec,
+    resources: Resources,
+    *,
+    digest: Optional[str],
+    staged_inputs: Optional[dict[str, Path]] = None,
+    on_started: Optional[Callable[[], Awaitable[None]]] = None,
+) -> tuple[RunOutcome, bool]:
+    """Run one job through the scheduler, short-circuiting through the result cache.
+
+    Only plugins pinned to a container digest are cached, since only they are
+    deterministic. Returns the outcome and whether it was served from cache.
+    """
+
+    cache = get_result_cache()
+    output_dir = Path(spec.workspace) / "output"
+    key: Optional[str] = None
+    if cache is not None and digest:
+        inputs = {name: Path(path) for name, path in spec.inputs.items()}
+        inputs.update(staged_inputs or {})
+        hashes = await asyncio.to_thread(
+            lambda: {name: _hasher.hash_path(path) for name, path in inputs.items()}
+        )
+        key = cache_key(digest, spec.parameters, hashes)
+        if await asyncio.to_thread(cache.restore, key, output_dir):
+            return RunOutcome(exit_code=0), True
+
+    job = get_scheduler().submit(execute_run, spec, resources=resources)
+    if on_started is not None:
+        await job.started.wait()
+        await on_started()
+    try:
+        outcome: RunOutcome = await job.result
+    except Exception as exc:  # worker crashed (e.g. broken process pool)
+        outcome = RunOutcome(exit_code=-1, error=f"Run failed: {exc}")
+
+    if key is not None and outcome.exit_code == 0 and outcome.error is None:
+        await asyncio.to_thread(cache.store, key, output_dir)
+    return outcome, False
+
+
+async def finish_run(
+    run_id: str,
+    manifest: PluginManifest,
+    workspace: Path,
+    *,
+    exit_code: int,
+    error: Optional[str],
+    started: float,
+    cache_hits: int = 0,
+    preloaded: Collection[str] = (),
+    preloaded_records: int = 0,
+    usage: Optional[ResourceUsage] = None,
+) -> None:
+    """Load annotation outputs of a successful run, then record its final status.
+
+    ``started`` is the ``time.monotonic()`` reading when the run began.
+    ``preloaded`` names outputs already loaded by :func:`start_stream_loader`,
+    which loaded ``preloaded_records`` records; they are removed again if the
+    run failed. ``usage`` is what the plugin process consumed, if it ran.
+    Annotations loaded before a later step fails are removed the same way.
+    A run that already has a final status, because it was failed as orphaned
+    while this worker could not renew its lease, keeps that status and loses
+    the annotations it loaded.
+    """
+
+    session_factory = get_session_factory()
+    record_count: Optional[int] = None
+    loaded_any = bool(preloaded)
+    if exit_code == 0 and error is None:
+        loaded_any = True
+        directories = [
+            workspace / "output" / output.name
+            for output in manifest.outputs
+            if output.media_type == ANNOTATION_MEDIA_TYPE
+        ]
+        settings = get_settings()
+        try:
+            async with session_factory() as session:
+                loaded = await annotation_service.load_run_annotations(
+                    session,
+                    run_id=run_id,
+                    plugin_name=manifest.name,
+                    plugin_version=manifest.version,
+                    directories=[path for path in directories if path.name not in preloaded],
+                    batch_size=settings.annotation_ingest_batch_size,
+                )
+            if loaded:
+                await _record_first_result(run_id, manifest, started)
+            record_count = preloaded_records + loaded
+            if settings.annotation_columnar_dir:
+                await asyncio.to_thread(
+                    columnar.write_run_annotations,
+                    Path(settings.annotation_columnar_dir),
+                    run_id=run_id,
+                    plugin_name=manifest.name,
+                    plugin_version=manifest.version,
+                    directories=directories,
+                    row_group_size=settings.annotation_row_group_size,
+                )
+        except (OSError, ValueError, columnar.ColumnarUnavailableError) as exc:
+            exit_code, error = -1, f"Failed to load annotations: {exc}"
+            record_count = None
+
+    async with session_factory() as session:
+        if loaded_any and (exit_code != 0 or error is not None):
+            await annotation_repo.delete_run_annotations(session, run_id)
+        recorded = await run_repo.mark_finished(
+            session,
+            run_id,
+            exit_code=exit_code,
+            error=error,
+            cache_hits=cache_hits,
+            usage=usage,
+            record_count=record_count,
+        )
+        if not recorded:
+            # The run was failed as orphaned meanwhile; its outputs must not stay visible.
+            await annotation_repo.delete_run_annotations(session, run_id)
+            settings = get_settings()
+            if settings.annotation_columnar_dir:
+                await asyncio.to_thread(
+                    columnar.delete_run_annotations,
+                    Path(settings.annotation_columnar_dir),
+                    run_id=run_id,
+                    plugin_name=manifest.name,
+                )
+            return
+    # ``latest_run_at`` is part of the cached plugin list.
+    registry.invalidate()
+    RUN_DURATION_SECONDS.observe(
+        time.monotonic() - started,
+        plugin=manifest.name,
+        status="succeeded" if exit_code == 0 and error is None else "failed",
+    )
+
+
+async def _record_first_result(run_id: str, manifest: PluginManifest, started: float) -> None:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await run_repo.mark_first_result(session, run_id)
+    RUN_FIRST_RESULT_SECONDS.observe(
+        time.monotonic() - started,
+        plugin=manifest.name,
+        io_mode="stream" if manifest.stream else "files",
+    )
+
+
+def start_stream_loader(
+    run_id: str,
+    manifest: PluginManifest,
+    workspace: Path,
+    exited: threading.Event,
+    started: Callable[[], float],
+) -> Optional[asyncio.Task[int]]:
+    """Start loading a ``stream`` I/O mode run's stdout records while it runs.
+
+    Returns ``None`` for plugins using the ``files`` mode. Set ``exited`` once
+    the job has finished, then pass the task to :func:`await_stream_loader`.
+    ``started`` returns the ``time.monotonic()`` reading when the run began.
+    """
+
+    if manifest.stream is None:
+        return None
+
+    session_factory = get_session_factory()
+
+    async def load() -> int:
+        async with session_factory() as session:
+            return await annotation_service.follow_run_annotations(
+                session,
+                run_id=run_id,
+                plugin_name=manifest.name,
+                plugin_version=manifest.version,
+                directory=workspace / "output" / manifest.stream.output,
+                exited=exited,
+                batch_size=get_settings().annotation_ingest_batch_size,
+                on_first_result=lambda: _record_first_result(run_id, manifest, started()),
+            )
+
+    return asyncio.create_task(load())
+
+
+async def await_stream_loader(loader: asyncio.Task[int]) -> tuple[int, Optional[str]]:
+    """Wait for a stream loader; returns the records it loaded and why it failed, if it did."""
+
+    try:
+        return await loader, None
+    except Exception as exc:  # malformed records or a database error
+        return 0, f"Failed to load annotations: {exc}"
+
+
+async def _execute(
+    run_id: str, spec: RunSpec, resources: Resources, manifest: PluginManifest
+) -> None:
+    session_factory = get_session_factory()
+    started = time.monotonic()
+
+    async def mark_running() -> None:
+        nonlocal started
+        started = time.monotonic()
+        async with session_factory() as session:
+            await run_repo.mark_running(session, run_id)
+
+    exited = threading.Event()
+    loader = start_stream_loader(run_id, manifest, Path(spec.workspace), exited, lambda: started)
+    try:
+        outcome, cached = await run_job(
+            spec,
+            resources,
+            digest=manifest.provenance.container_digest,
+            on_started=mark_running,
+        )
+    finally:
+        exited.set()
+    exit_code, error = outcome.exit_code, outcome.error
+    streamed = 0
+    if loader is not None:
+        streamed, load_error = await await_stream_loader(loader)
+        if load_error and exit_code == 0 and error is None:
+            exit_code, error = -1, load_error
+    await finish_run(
+        run_id,
+        manifest,
+        Path(spec.workspace),
+        exit_code=exit_code,
+        error=error,
+        started=started,
+        cache_hits=int(cached),
+        preloaded=(manifest.stream.output,) if manifest.stream else (),
+        preloaded_records=streamed,
+        usage=outcome.usage,
+    )
+
+
+async def _execute_sharded(
+    run_id: str,
+    spec: RunSpec,
+    resources: Resources,
+    options: ShardOptions,
+    manifest: PluginManifest,
+) -> None:
+    """Split the shard input, run every shard concurrently and merge the outputs.
+
+    Stream I/O mode shards pipe their staged shard to stdin and capture stdout
+    like an unsharded run. Their ``stream.jsonl`` files are merged with the
+    other annotation outputs and loaded once every shard has finished.
+    """
+
+    settings = get_settings()
+    session_factory = get_session_factory()
+    workspace = Path(spec.workspace)
+    started = time.monotonic()
+    async with session_factory() as session:
+        await run_repo.mark_running(session, run_id)
+
+    try:
+        shards, contigs = await asyncio.to_thread(
+            split_vcf,
+            Path(spec.inputs[options.input]),
+            workspace / "shards",
+            input_name=options.input,
+            strategy=options.strategy,
+            window_size=options.window_size or settings.shard_window_size,
+        )
+    except (OSError, ValueError) as exc:
+        await finish_run(
+            run_id,
+            manifest,
+            workspace,
+            exit_code=-1,
+            error=f"Failed to split input: {exc}",
+            started=started,
+        )
+        return
+
+    async with session_factory() as session:
+        await run_repo.set_shard_count(session, run_id, len(shards))
+
+    shared_inputs = {name: path for name, path in spec.inputs.items() if name != options.input}
+    limit = asyncio.Semaphore(max(1, settings.shard_concurrency))
+
+    async def run_shard(shard: Shard) -> tuple[RunOutcome, bool]:
+        shard_spec = RunSpec(
+            run_id=f"{run_id}:{shard.index}",
+            entrypoint=spec.entrypoint,
+            workspace=str(shard.workspace),
+            inputs=shared_inputs,
+            outputs=spec.outputs,
+            parameters={**spec.parameters, "region": shard.region},
+            threads=spec.threads,
+            backend_api=spec.backend_api,
+            timeout=spec.timeout,
+            stream_input=spec.stream_input,
+            stream_output=spec.stream_output,
+        )
+        async with limit:
+            result = await run_job(
+                shard_spec,
+                resources,
+                digest=manifest.provenance.container_digest,
+                staged_inputs={options.input: shard.workspace / "input" / options.input},
+            )
+        async with session_factory() as session:
+            await run_repo.increment_shards_completed(session, run_id)
+        return result
+
+    results = await asyncio.gather(*(run_shard(shard) for shard in shards))
+    cache_hits = sum(cached for _, cached in results)
+    usage = ResourceUsage.combine(
+        (outcome.usage for outcome, _ in results), wall_seconds=time.monotonic() - started
+    )
+    failures = [
+        f"shard {shard.index} ({shard.region}): {outcome.error}"
+        for shard, (outcome, _) in zip(shards, results)
+        if outcome.exit_code != 0 or outcome.error
+    ]
+    if failures:
+        await finish_run(
+            run_id,
+            manifest,
+            workspace,
+            exit_code=-1,
+            error="; ".join(failures),
+            started=started,
+            cache_hits=cache_hits,
+            usage=usage,
+        )
+        return
+
+    try:
+        await asyncio.to_thread(_merge_outputs, manifest, workspace, shards, contigs)
+    except (OSError, ValueError) as exc:
+        await finish_run(
+            run_id,
+            manifest,
+            workspace,
+            exit_code=-1,
+            error=f"Failed to merge shard outputs: {exc}",
+            started=started,
+            usage=usage,
+        )
+        return
+
+    await finish_run(
+        run_id,
+        manifest,
+        workspace,
+        exit_code=0,
+        error=None,
+        started=started,
+        cache_hits=cache_hits,
+        usage=usage,
+    )
+
+
+def _merge_outputs(
+    manifest: PluginManifest, workspace: Path, shards: list[Shard], contigs: list[str]
+) -> None:
+    """Combine shard outputs into the parent run's ``output/<name>/`` directories.
+
+    Annotation JSONL is merged in coordinate order; other media types are
+    collected as one file per shard.
+    """
+
+    for output in manifest.outputs:
+        target_dir = workspace / "output" / output.name
+        target_dir.mkdir(parents=True, exist_ok=True)
+        shard_dirs = [shard.workspace / "output" / output.name for shard in shards]
+        if output.media_type == ANNOTATION_MEDIA_TYPE:
+            merge_annotation_outputs(shard_dirs, target_dir / "annotations.jsonl", contigs)
+            continue
+        for shard, shard_dir in zip(shards, shard_dirs):
+            for path in sorted(shard_dir.glob("*")) if shard_dir.is_dir() else []:
+                path.replace(target_dir / f"shard-{shard.index:05d}-{path.name}")
@@ -0,0 +1,87 @@
+"""Cohort statistics over the genotypes of ingested VCF assets."""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import VcfAsset
+from app.genomics.genotypes import compute_statistics, genotype_matrix
+from app.genomics.intervals import GenomicRegion
+from app.models.variant import CohortStatistics, VariantStatistics
+from app.repositories import variants as variant_repo
+
+
+class UnknownSampleError(ValueError):
+    """Raised when a requested sample is not part of the asset."""
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+async def cohort_statistics(
+    session: AsyncSession,
+    asset: VcfAsset,
+    *,
+    region: Optional[GenomicRegion] = None,
+    samples: Optional[list[str]] = None,
+    after: int = 0,
+    limit: int,
+    batch_size: int,
+) -> CohortStatistics:
+    """Compute AF, call rate, heterozygosity and HWE for one page of variants.
+
+    The page holds up to ``limit`` variants with ids above ``after``, in id
+    order. ``next_after`` is set when the page is full, so the next page
+    starts there. Genotypes are streamed ``batch_size`` variants at a time
+    into an ``int8`` matrix, restricted to the requested sample columns, and
+    reduced with whole-matrix NumPy operations. Memory is bounded by the page
+    of results plus one batch of genotypes.
+    """
+
+    all_samples = list(asset.samples)
+    if samples:
+        positions = {name: index for index, name in enumerate(all_samples)}
+        unknown = [name for name in samples if name not in positions]
+        if unknown:
+            raise UnknownSampleError(f"Unknown samples: {', '.join(unknown)}")
+        columns: Optional[np.ndarray] = np.array([positions[name] for name in samples], dtype=np.intp)
+    else:
+        columns = None
+    sample_count = len(samples) if samples else len(all_samples)
+
+    stmt = variant_repo.genotype_statement(asset.id, after=after, region=region).limit(limit)
+    result = await session.stream(stmt.execution_options(yield_per=batch_size))
+    variants: list[VariantStatistics] = []
+    async for rows in result.partitions():
+        matrix = genotype_matrix([row.genotypes for row in rows], len(all_samples))
+        if columns is not None:
+            matrix = matrix[:, columns]
+        stats = compute_statistics(matrix)
+        variants.extend(
+            VariantStatistics(
+                id=row.id,
+                contig=row.contig,
+                position=row.position,
+                ref=row.ref,
+                alt=row.alt,
+                called=int(stats.called[index]),
+                call_rate=float(stats.call_rate[index]),
+                allele_frequency=_optional(stats.allele_frequency[index]),
+                heterozygosity=_optional(stats.heterozygosity[index]),
+                hwe_p=float(stats.hwe_p[index]),
+            )
+            for index, row in enumerate(rows)
+        )
+
+    return CohortStatistics(
+        asset_id=asset.id,
+        sample_count=sample_count,
+        variant_count=len(variants),
+        variants=variants,
+        next_after=variants[-1].id if len(variants) == limit else None,
+    )
@@ -0,0 +1,146 @@
+"""Command line entry point for the benchmark suite.
+
+Run from ``backend/``::
+
+    python -m benchmarks list
+    python -m benchmarks run --scale medium --output results/current.json
+    python -m benchmarks run region_query --set vcf_records=500000 --output results/rq.json
+    python -m benchmarks compare results/baseline.json results/current.json
+
+``compare`` exits with status 1 when any metric regressed by more than the
+threshold, so it can gate CI jobs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.harness import (
+    SCALES,
+    BenchmarkError,
+    available_benchmarks,
+    compare,
+    load_results,
+    run_suite,
+    save_results,
+)
+
+
+def _override(value: str) -> tuple[str, int]:
+    key, separator, number = value.partition("=")
+    if not separator or key not in SCALES["small"]:
+        raise argparse.ArgumentTypeError(
+            f"expected KEY=INTEGER with KEY one of {', '.join(SCALES['small'])}"
+        )
+    try:
+        return key, int(number.replace("_", ""))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"{number!r} is not an integer") from exc
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n")[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List the available benchmarks")
+
+    run = commands.add_parser("run", help="Run benchmarks and write a result file")
+    run.add_argument("names", nargs="*", help="Benchmarks to run (all by default)")
+    run.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run.add_argument(
+        "--set",
+        dest="overrides",
+        type=_override,
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override one dataset parameter of the scale",
+    )
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument(
+        "--database-url",
+        help="Benchmark against this database instead of a scratch SQLite file; "
+        "its tables are dropped first",
+    )
+    run.add_argument("--output", type=Path, help="Result file (default: results/<timestamp>.json)")
+
+    comparison = commands.add_parser("compare", help="Compare two result files")
+    comparison.add_argument("baseline", type=Path)
+    comparison.add_argument("current", type=Path)
+    comparison.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown treated as a regression (default: 0.10)",
+    )
+    return parser
+
+
+def _list() -> int:
+    for name, entry in sorted(available_benchmarks().items()):
+        print(f"{name:<20} {entry.description}")
+    return 0
+
+
+def _run(arguments: argparse.Namespace) -> int:
+    document = run_suite(
+        arguments.names or None,
+        scale=arguments.scale,
+        overrides=dict(arguments.overrides),
+        seed=arguments.seed,
+        database_url=arguments.database_url,
+        progress=lambda name: print(f"running {name}...", file=sys.stderr),
+    )
+    output = arguments.output or Path("results") / (
+        datetime.now().strftime("%Y%m%dT%H%M%S") + ".json"
+    )
+    save_results(document, output)
+    for name, result in sorted(document["benchmarks"].items()):
+        print(f"{name} ({result['wall_seconds']:.1f}s)")
+        for metric, value in sorted(result["metrics"].items()):
+            print(f"  {metric:<32} {value:>14.3f}")
+    print(f"results written to {output}")
+    return 0
+
+
+def _compare(arguments: argparse.Namespace) -> int:
+    comparisons = compare(
+        load_results(arguments.baseline),
+        load_results(arguments.current),
+        threshold=arguments.threshold,
+    )
+    print(f"{'benchmark':<20} {'metric':<32} {'baseline':>12} {'current':>12} {'change':>8}")
+    for item in comparisons:
+        flag = {"regression": "  REGRESSION", "improvement": "  improved"}.get(item.status, "")
+        print(
+            f"{item.benchmark:<20} {item.metric:<32} {item.baseline:>12.3f} "
+            f"{item.current:>12.3f} {item.change:>+8.1%}{flag}"
+        )
+    regressions = [item for item in comparisons if item.status == "regression"]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {arguments.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arguments = _parser().parse_args(argv)
+    try:
+        if arguments.command == "list":
+            return _list()
+        if arguments.command == "run":
+            return _run(arguments)
+        return _compare(arguments)
+    except BenchmarkError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Annotation load throughput and NDJSON streaming from /api/v1/annotations."""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.datasets import CONTIG_LENGTH
+from benchmarks.harness import BenchmarkContext, BenchmarkError, RequestTimer, benchmark
+
+_PAGE = 1_000_000  # the endpoint's maximum page size
+
+# Writes ``count`` annotations sorted by position, spread evenly over one contig.
+PLUGIN_SCRIPT = """
+import json, os, pathlib, random
+params = json.loads(os.environ["PGIP_PARAMETERS"])
+rng = random.Random(params["seed"])
+count, length = params["count"], params["contig_length"]
+out = pathlib.Path(os.environ["PGIP_WORKSPACE"]) / "output" / "annotations" / "annotations.jsonl"
+with out.open("w") as handle:
+    for index in range(count):
+        position = 1 + index * (length // count)
+        record = {"contig": "chr1", "position": position, "score": round(rng.random(), 6)}
+        handle.write(json.dumps(record) + "\\n")
+"""
+
+
+def _manifest(entrypoint: str) -> dict:
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat()
+    return {
+        "name": "benchmark-annotator",
+        "version": "1.0.0",
+        "description": "Writes synthetic annotation records for benchmarking.",
+        "authors": ["PGIP Core Team"],
+        "entrypoint": entrypoint,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "inputs": [
+            {
+                "name": "variants",
+                "description": "Unused VCF slice",
+                "media_type": "application/vnd.pgip.vcf",
+            }
+        ],
+        "outputs": [
+            {
+                "name": "annotations",
+                "description": "Annotation records in JSONL",
+                "media_type": "application/vnd.pgip.annotation+jsonl",
+            }
+        ],
+        "provenance": {"container_image": "ghcr.io/pgip/benchmark-annotator:1.0.0"},
+        "resources": {"cpu": "500m", "memory": "256Mi"},
+    }
+
+
+def _wait_for_run(client, run_id: str, timeout: float = 3600) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        run = client.get(f"/api/v1/runs/{run_id}").json()
+        if run["status"] in ("succeeded", "failed"):
+            return run
+        time.sleep(0.02)
+    raise BenchmarkError(f"Run {run_id} did not finish within {timeout:.0f}s")
+
+
+@benchmark("annotation_stream")
+def annotation_stream(context: BenchmarkContext) -> dict[str, float]:
+    """Load a plugin's annotations, then stream them back and query regions."""
+
+    parameters = context.parameters
+    count = parameters["annotations"]
+    script = context.workdir / "annotator.py"
+    script.write_text(PLUGIN_SCRIPT, encoding="utf-8")
+    variants = context.workdir / "variants.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\n", encoding="ascii")
+    rng = random.Random(context.seed + 3)
+    width = parameters["region_width"]
+
+    with context.application() as client:
+        manifest = _manifest(f"{sys.executable} {script}")
+        if client.post("/api/v1/plugins/", json=manifest).status_code != 201:
+            raise BenchmarkError("Could not register the benchmark plugin")
+        started = time.perf_counter()
+        response = client.post(
+            f"/api/v1/plugins/{manifest['name']}/runs",
+            json={
+                "inputs": {"variants": str(variants)},
+                "parameters": {
+                    "count": count,
+                    "seed": context.seed,
+                    "contig_length": CONTIG_LENGTH,
+                },
+            },
+        )
+        if response.status_code != 202:
+            raise BenchmarkError(f"Run submission failed ({response.status_code})")
+        run = _wait_for_run(client, response.json()["id"])
+        load_seconds = time.perf_counter() - started
+        if run["status"] != "succeeded":
+            raise BenchmarkError(f"Benchmark plugin failed: {run['error']}")
+
+        started = time.perf_counter()
+        first_byte_ms = None
+        records = 0
+        params = {"run_id": run["id"], "limit": _PAGE}
+        while True:
+            cursor = None
+            with client.stream("GET", "/api/v1/annotations", params=params) as stream:
+                for line in stream.iter_lines():
+                    if first_byte_ms is None:
+                        first_byte_ms = (time.perf_counter() - started) * 1000
+                    if line.startswith('{"next_cursor"'):
+                        cursor = json.loads(line)["next_cursor"]
+                    elif line:
+                        records += 1
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+        stream_seconds = time.perf_counter() - started
+        if records != count:
+            raise BenchmarkError(f"Expected {count} streamed annotations, received {records}")
+
+        timer = RequestTimer(client)
+        for _ in range(parameters["queries"]):
+            start = rng.randrange(1, CONTIG_LENGTH - width)
+            region = f"chr1:{start}-{start + width}"
+            timer.get("region", "/api/v1/annotations", params={"region": region})
+    return {
+        "load_seconds": load_seconds,
+        "load_records_per_second": count / load_seconds,
+        "stream_first_byte_ms": first_byte_ms or 0.0,
+        "stream_records_per_second": count / stream_seconds,
+        **timer.metrics(),
+    }
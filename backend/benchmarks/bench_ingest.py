@@ -0,0 +1,107 @@
+"""Ingestion throughput for VCF uploads and GFA graph compilation."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.genomics.gfa import PangenomeGraph, compile_gfa
+from benchmarks.datasets import write_gfa, write_vcf
+from benchmarks.harness import BenchmarkContext, BenchmarkError, RequestTimer, benchmark
+
+UPLOAD_CHUNK = 1 << 20
+
+
+def _chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(UPLOAD_CHUNK):
+            yield chunk
+
+
+def synthetic_vcf(context: BenchmarkContext) -> Path:
+    """Write the suite's VCF dataset into the benchmark's scratch directory."""
+
+    parameters = context.parameters
+    return write_vcf(
+        context.workdir / "synthetic.vcf",
+        records=parameters["vcf_records"],
+        samples=parameters["vcf_samples"],
+        contigs=parameters["vcf_contigs"],
+        seed=context.seed,
+    )
+
+
+def upload_vcf(client: TestClient, path: Path) -> dict:
+    """Stream ``path`` to the VCF ingestion endpoint and return the asset summary."""
+
+    response = client.post(
+        "/api/v1/assets/vcf", params={"source": "benchmark"}, content=_chunks(path)
+    )
+    if response.status_code != 201:
+        raise BenchmarkError(
+            f"VCF ingestion failed ({response.status_code}): {response.text[:200]}"
+        )
+    return response.json()
+
+
+@benchmark("vcf_ingest")
+def vcf_ingest(context: BenchmarkContext) -> dict[str, float]:
+    """Stream a synthetic VCF through POST /api/v1/assets/vcf."""
+
+    path = synthetic_vcf(context)
+    records = context.parameters["vcf_records"]
+    with context.application() as client:
+        started = time.perf_counter()
+        asset = upload_vcf(client, path)
+        elapsed = time.perf_counter() - started
+    if asset["record_count"] != records:
+        raise BenchmarkError(f"Expected {records} records, ingested {asset['record_count']}")
+    return {
+        "seconds": elapsed,
+        "records_per_second": records / elapsed,
+        "megabytes_per_second": path.stat().st_size / 1e6 / elapsed,
+    }
+
+
+@benchmark("graph")
+def graph(context: BenchmarkContext) -> dict[str, float]:
+    """Compile a synthetic GFA, then time subgraph selections through the API."""
+
+    parameters = context.parameters
+    source = write_gfa(
+        context.workdir / "synthetic.gfa",
+        nodes=parameters["gfa_nodes"],
+        paths=parameters["gfa_paths"],
+        seed=context.seed,
+    )
+    started = time.perf_counter()
+    compiled = compile_gfa(source, context.workdir / "compiled")
+    compile_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    graph = PangenomeGraph(compiled)
+    open_ms = (time.perf_counter() - started) * 1000
+    path_lengths = {name: graph.path_length(name) for name in graph.path_names}
+
+    rng = random.Random(context.seed)
+    width = parameters["selection_width"]
+    with context.application(graph_gfa_path=str(source)) as client:
+        timer = RequestTimer(client)
+        timer.get("load", "/api/v1/graph")  # the first request waits for the lazy load
+        for _ in range(parameters["queries"]):
+            name = rng.choice(sorted(path_lengths))
+            start = rng.randrange(0, max(1, path_lengths[name] - width))
+            timer.get(
+                "selection",
+                f"/api/v1/graph/paths/{name}/selection",
+                params={"start": start, "end": start + width},
+            )
+    return {
+        "compile_seconds": compile_seconds,
+        "nodes_per_second": parameters["gfa_nodes"] / compile_seconds,
+        "open_ms": open_ms,
+        **timer.metrics(),
+    }
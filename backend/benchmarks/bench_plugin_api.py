@@ -0,0 +1,87 @@
+"""Latency percentiles of the plugin registry API."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+
+from benchmarks.harness import BenchmarkContext, BenchmarkError, RequestTimer, benchmark
+
+TAGS = ("frequency", "pathogenicity", "conservation", "structural", "expression", "baseline", "qc")
+WORDS = ("allele", "frequency", "graph", "variant", "splice", "coverage", "cohort", "score")
+MEDIA_TYPES = (
+    "application/vnd.pgip.vcf",
+    "application/vnd.pgip.gfa",
+    "application/vnd.pgip.graph-selection+json",
+)
+_BATCH = 500
+
+
+def synthetic_manifests(count: int, seed: int) -> list[dict]:
+    """Return ``count`` reproducible manifests with varied tags, authors and media types."""
+
+    rng = random.Random(seed)
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat()
+    manifests = []
+    for index in range(count):
+        name = f"plugin-{index:05d}"
+        manifests.append(
+            {
+                "name": name,
+                "version": f"{rng.randrange(0, 3)}.{rng.randrange(0, 10)}.0",
+                "description": " ".join(rng.choices(WORDS, k=8)),
+                "authors": [f"author-{rng.randrange(0, 50)}"],
+                "entrypoint": f"python -m {name.replace('-', '_')}",
+                "created_at": timestamp,
+                "updated_at": timestamp,
+                "inputs": [
+                    {
+                        "name": "source",
+                        "description": "Input",
+                        "media_type": rng.choice(MEDIA_TYPES),
+                    }
+                ],
+                "outputs": [{"name": "annotations", "description": "Annotations"}],
+                "tags": sorted(set(rng.choices(TAGS, k=2))),
+                "provenance": {"container_image": f"ghcr.io/pgip/{name}:1.0"},
+            }
+        )
+    return manifests
+
+
+@benchmark("plugin_api")
+def plugin_api(context: BenchmarkContext) -> dict[str, float]:
+    """Register synthetic plugins, then time listing, search, paging and manifest reads."""
+
+    manifests = synthetic_manifests(context.parameters["plugins"], context.seed)
+    queries = context.parameters["queries"]
+    rng = random.Random(context.seed + 2)
+    with context.application() as client:
+        for start in range(0, len(manifests), _BATCH):
+            response = client.post("/api/v1/plugins:batch", json=manifests[start : start + _BATCH])
+            if response.status_code != 200:
+                raise BenchmarkError(f"Plugin registration failed ({response.status_code})")
+
+        timer = RequestTimer(client)
+        for _ in range(queries):
+            timer.get("list", "/api/v1/plugins/", params={"limit": 100})
+            timer.get(
+                "search",
+                "/api/v1/plugins/",
+                params={"tag": rng.choice(TAGS), "q": rng.choice(WORDS), "limit": 100},
+            )
+
+        cursor = None
+        for _ in range(queries):
+            params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+            response = timer.get("page", "/api/v1/plugins/", params=params)
+            cursor = response.headers.get("X-Next-Cursor")
+
+        etags: dict[str, str] = {}
+        for _ in range(queries):
+            name = rng.choice(manifests)["name"]
+            url = f"/api/v1/plugins/{name}"
+            if name in etags:
+                timer.get("revalidate", url, headers={"If-None-Match": etags[name]})
+            etags[name] = timer.get("get", url).headers["ETag"]
+    return timer.metrics()
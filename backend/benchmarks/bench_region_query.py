@@ -0,0 +1,38 @@
+"""Latency of binned region queries against an ingested synthetic VCF.
+
+Run from ``backend/`` on its own with::
+
+    python -m benchmarks run region_query --set vcf_records=200000
+"""
+
+from __future__ import annotations
+
+import random
+
+from benchmarks.bench_ingest import synthetic_vcf, upload_vcf
+from benchmarks.datasets import CONTIG_LENGTH
+from benchmarks.harness import BenchmarkContext, RequestTimer, benchmark
+
+
+@benchmark("region_query")
+def region_query(context: BenchmarkContext) -> dict[str, float]:
+    """Time GET /api/v1/variants for random windows after ingesting a VCF."""
+
+    parameters = context.parameters
+    path = synthetic_vcf(context)
+    rng = random.Random(context.seed + 1)
+    width = parameters["region_width"]
+    regions = []
+    for _ in range(parameters["queries"]):
+        contig = f"chr{rng.randrange(1, parameters['vcf_contigs'] + 1)}"
+        start = rng.randrange(1, CONTIG_LENGTH - width)
+        regions.append(f"{contig}:{start}-{start + width}")
+
+    with context.application() as client:
+        upload_vcf(client, path)
+        timer = RequestTimer(client)
+        # The first query after startup runs on cold connections and caches.
+        timer.get("first", "/api/v1/variants", params={"region": regions[0]})
+        for region in regions:
+            timer.get("query", "/api/v1/variants", params={"region": region, "limit": 10_000})
+    return timer.metrics()
@@ -0,0 +1,164 @@
+"""Seeded generators for synthetic benchmark inputs.
+
+The same arguments always produce byte-identical files, so results from
+different machines or commits are measured against the same data. Generation
+uses NumPy's PCG64 stream, which is stable across platforms and releases.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+BASES = np.array(list("ACGT"))
+_BASE_BYTES = np.frombuffer(b"ACGT", dtype=np.uint8)
+_GENOTYPES = np.array(["0|0", "0|1", "1|0", "1|1"])
+_BLOCK = 4096
+CONTIG_LENGTH = 50_000_000
+
+
+def _contigs(count: int) -> list[str]:
+    return [f"chr{index}" for index in range(1, count + 1)]
+
+
+@contextmanager
+def _open_text(path: Path, compress: bool) -> Iterator[io.TextIOWrapper]:
+    with open(path, "wb") as raw:
+        if not compress:
+            with io.TextIOWrapper(raw, encoding="ascii", newline="\n") as handle:
+                yield handle
+            return
+        # A fixed mtime and no file name keep the gzip header reproducible.
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed:
+            with io.TextIOWrapper(compressed, encoding="ascii", newline="\n") as handle:
+                yield handle
+
+
+def write_vcf(
+    path: Path,
+    *,
+    records: int,
+    samples: int,
+    contigs: int = 1,
+    contig_length: int = CONTIG_LENGTH,
+    seed: int = 42,
+    compress: bool = False,
+) -> Path:
+    """Write a sorted, phased VCF with ``records`` sites and ``samples`` diploid genotypes.
+
+    Sites are spread evenly over ``contigs`` contigs. About 5% of them are
+    deletions spanning up to 20 kb (encoded with ``INFO/END``) so region
+    queries have to consider overlapping long records. Allele frequencies
+    follow a Beta(0.5, 2) site-frequency spectrum.
+    """
+
+    rng = np.random.Generator(np.random.PCG64(seed))
+    names = _contigs(contigs)
+    sample_names = [f"S{index:05d}" for index in range(samples)]
+    with _open_text(path, compress) as handle:
+        handle.write("##fileformat=VCFv4.2\n")
+        handle.write("##source=pgip-benchmarks\n")
+        for name in names:
+            handle.write(f"##contig=<ID={name},length={contig_length}>\n")
+        handle.write('##INFO=<ID=END,Number=1,Type=Integer,Description="End position">\n')
+        handle.write('##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n')
+        columns = ["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT"]
+        handle.write("\t".join(columns + sample_names) + "\n")
+        per_contig = np.diff(np.linspace(0, records, contigs + 1).astype(np.int64))
+        for name, count in zip(names, per_contig):
+            positions = np.sort(rng.choice(contig_length - 20_000, size=count, replace=False)) + 1
+            for start in range(0, count, _BLOCK):
+                _write_block(handle, rng, name, positions[start : start + _BLOCK], samples)
+    return path
+
+
+def _write_block(
+    handle, rng: np.random.Generator, contig: str, positions: np.ndarray, samples: int
+) -> None:
+    size = len(positions)
+    refs = rng.integers(0, 4, size)
+    alts = (refs + rng.integers(1, 4, size)) % 4
+    deletions = rng.random(size) < 0.05
+    spans = rng.integers(50, 20_000, size)
+    frequencies = rng.beta(0.5, 2.0, size)
+    if samples:
+        haplotypes = rng.random((size, samples, 2)) < frequencies[:, None, None]
+        codes = haplotypes[..., 0] * 2 + haplotypes[..., 1]
+    lines = []
+    for index in range(size):
+        position = int(positions[index])
+        ref, alt = BASES[refs[index]], BASES[alts[index]]
+        info = f"END={position + int(spans[index]) - 1}" if deletions[index] else "."
+        alt_field = "<DEL>" if deletions[index] else alt
+        fields = [contig, str(position), ".", ref, alt_field, "50", "PASS", info]
+        if samples:
+            fields.append("GT")
+            fields.extend(_GENOTYPES[codes[index]])
+        lines.append("\t".join(fields))
+    handle.write("\n".join(lines))
+    handle.write("\n")
+
+
+def write_gfa(
+    path: Path,
+    *,
+    nodes: int,
+    paths: int,
+    bubble_rate: float = 0.3,
+    mean_segment_length: int = 32,
+    seed: int = 42,
+) -> Path:
+    """Write a GFA 1.0 graph with exactly ``nodes`` segments and ``paths`` P-lines.
+
+    The graph is a backbone of sites; a fraction ``bubble_rate`` of them are
+    biallelic bubbles with two alternative segments. Every path walks the
+    backbone from start to end, picking one alternative at each bubble, so
+    all paths are colinear like haplotypes of one chromosome.
+    """
+
+    if nodes < 1 or paths < 1:
+        raise ValueError("A graph needs at least one node and one path")
+    rng = np.random.Generator(np.random.PCG64(seed))
+    # Assign segments to sites: a bubble site consumes two segments.
+    sites: list[tuple[int, ...]] = []
+    draws = rng.random(nodes)
+    segment = 1
+    while segment <= nodes:
+        if segment < nodes and draws[segment - 1] < bubble_rate:
+            sites.append((segment, segment + 1))
+            segment += 2
+        else:
+            sites.append((segment,))
+            segment += 1
+
+    lengths = rng.geometric(1 / mean_segment_length, nodes)
+    with open(path, "w", encoding="ascii", newline="\n") as handle:
+        handle.write("H\tVN:Z:1.0\n")
+        for start in range(0, nodes, _BLOCK):
+            stop = min(nodes, start + _BLOCK)
+            bases = _BASE_BYTES[rng.integers(0, 4, int(lengths[start:stop].sum()))]
+            sequence = bases.tobytes().decode("ascii")
+            offsets = np.concatenate(([0], np.cumsum(lengths[start:stop]))).tolist()
+            handle.write(
+                "".join(
+                    f"S\t{start + index + 1}\t{sequence[offsets[index] : offsets[index + 1]]}\n"
+                    for index in range(stop - start)
+                )
+            )
+        links = []
+        for left, right in zip(sites, sites[1:]):
+            links.extend(f"L\t{a}\t+\t{b}\t+\t0M\n" for a in left for b in right)
+        handle.write("".join(links))
+        first = np.array([site[0] for site in sites])
+        last = np.array([site[-1] for site in sites])
+        bubble_frequencies = rng.beta(0.5, 2.0, len(sites))
+        for index in range(paths):
+            picks = rng.random(len(sites)) < bubble_frequencies
+            steps = "+,".join(map(str, np.where(picks, last, first).tolist()))
+            handle.write(f"P\tsample{index}\t{steps}+\t*\n")
+    return path
@@ -0,0 +1,371 @@
+"""Benchmark registry, in-process application fixture and result files.
+
+Each benchmark is a function decorated with :func:`benchmark` that receives a
+:class:`BenchmarkContext` and returns named metrics. Metric names encode how
+to compare them: ``*_per_second`` is better when higher, ``*_ms`` and
+``*_seconds`` when lower; anything else is recorded for reference only.
+
+A suite run is saved as one JSON document holding the environment, the scale
+parameters and every metric, so two documents can be compared with
+:func:`compare` to flag regressions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import make_url
+
+SCHEMA_VERSION = 1
+BENCHMARK_MODULES = (
+    "benchmarks.bench_ingest",
+    "benchmarks.bench_region_query",
+    "benchmarks.bench_plugin_api",
+    "benchmarks.bench_annotations",
+)
+
+# Dataset sizes per scale; individual values can be overridden on the command line.
+SCALES: dict[str, dict[str, int]] = {
+    "small": {
+        "vcf_records": 20_000,
+        "vcf_samples": 10,
+        "vcf_contigs": 2,
+        "gfa_nodes": 20_000,
+        "gfa_paths": 8,
+        "plugins": 200,
+        "annotations": 50_000,
+        "queries": 200,
+        "region_width": 100_000,
+        "selection_width": 5_000,
+    },
+    "medium": {
+        "vcf_records": 200_000,
+        "vcf_samples": 100,
+        "vcf_contigs": 4,
+        "gfa_nodes": 200_000,
+        "gfa_paths": 32,
+        "plugins": 1_000,
+        "annotations": 500_000,
+        "queries": 500,
+        "region_width": 100_000,
+        "selection_width": 10_000,
+    },
+    "large": {
+        "vcf_records": 2_000_000,
+        "vcf_samples": 500,
+        "vcf_contigs": 22,
+        "gfa_nodes": 2_000_000,
+        "gfa_paths": 64,
+        "plugins": 5_000,
+        "annotations": 5_000_000,
+        "queries": 1_000,
+        "region_width": 100_000,
+        "selection_width": 10_000,
+    },
+}
+
+Direction = Literal["higher", "lower"]
+
+
+class BenchmarkError(RuntimeError):
+    """Raised when a benchmark cannot produce a valid measurement."""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    description: str
+    function: Callable[["BenchmarkContext"], dict[str, float]]
+
+
+_BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register the decorated function as the benchmark ``name``."""
+
+    def register(function: Callable[["BenchmarkContext"], dict[str, float]]):
+        description = (function.__doc__ or "").strip().split("\n")[0]
+        _BENCHMARKS[name] = Benchmark(name, description, function)
+        return function
+
+    return register
+
+
+def available_benchmarks() -> dict[str, Benchmark]:
+    """Import every benchmark module and return the registry by name."""
+
+    for module in BENCHMARK_MODULES:
+        importlib.import_module(module)
+    return dict(_BENCHMARKS)
+
+
+@dataclass
+class BenchmarkContext:
+    """Scratch space, dataset sizes and the seed handed to each benchmark."""
+
+    workdir: Path
+    parameters: dict[str, int]
+    seed: int
+    database_url: Optional[str] = None
+
+    @contextmanager
+    def application(self, **settings: str) -> Iterator[TestClient]:
+        """Start the application in-process against a fresh database.
+
+        ``settings`` are extra ``Settings`` fields (e.g. ``graph_gfa_path``);
+        they are applied through ``PGIP_*`` environment variables for the
+        lifetime of the client.
+        """
+
+        from app.core.config import get_settings
+        from app.main import app
+        from app.services import registry
+
+        database_url = self.database_url or (
+            f"sqlite+aiosqlite:///{(self.workdir / 'bench.db').as_posix()}"
+        )
+        environment = {
+            "PGIP_DATABASE_URL": database_url,
+            "PGIP_DATABASE_SCHEMA_MODE": "create",
+            "PGIP_RUN_WORKSPACE_DIR": str(self.workdir / "runs"),
+            "PGIP_CACHE_DIR": str(self.workdir / "result-cache"),
+            "PGIP_GRAPH_CACHE_DIR": str(self.workdir / "graph-cache"),
+        }
+        environment.update({f"PGIP_{key.upper()}": value for key, value in settings.items()})
+        saved = {key: os.environ.get(key) for key in environment}
+        os.environ.update(environment)
+        get_settings.cache_clear()
+        registry.invalidate()
+        try:
+            if self.database_url:
+                asyncio.run(_reset_database(database_url))
+            with TestClient(app) as client:
+                yield client
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+            get_settings.cache_clear()
+            registry.invalidate()
+
+
+async def _reset_database(database_url: str) -> None:
+    from app.db.session import dispose_engines, drop_all, init_engine
+
+    init_engine(database_url, echo=False)
+    await drop_all()
+    await dispose_engines()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values``."""
+
+    if not values:
+        raise BenchmarkError("No samples to summarize")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_metrics(prefix: str, timings_ms: list[float]) -> dict[str, float]:
+    """Summarize latencies as ``<prefix>_p50_ms`` and ``<prefix>_p99_ms``."""
+
+    return {
+        f"{prefix}_p50_ms": percentile(timings_ms, 0.50),
+        f"{prefix}_p99_ms": percentile(timings_ms, 0.99),
+    }
+
+
+class RequestTimer:
+    """Issue API requests and collect their latencies under a label."""
+
+    def __init__(self, client: TestClient) -> None:
+        self.client = client
+        self.samples: dict[str, list[float]] = {}
+
+    def request(self, label: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, fail on an error status and record its latency."""
+
+        started = time.perf_counter()
+        response = self.client.request(method, url, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise BenchmarkError(
+                f"{method} {url} returned {response.status_code}: {response.text[:200]}"
+            )
+        self.samples.setdefault(label, []).append(elapsed)
+        return response
+
+    def get(self, label: str, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request(label, "GET", url, **kwargs)
+
+    def metrics(self) -> dict[str, float]:
+        """Return p50/p99 latencies per label, or ``<label>_ms`` for a single request."""
+
+        metrics: dict[str, float] = {}
+        for label, timings in self.samples.items():
+            if len(timings) == 1:
+                metrics[f"{label}_ms"] = timings[0]
+            else:
+                metrics.update(latency_metrics(label, timings))
+        return metrics
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def environment() -> dict[str, Any]:
+    """Describe the machine and build a result was measured on."""
+
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    names: Optional[list[str]] = None,
+    *,
+    scale: str = "small",
+    overrides: Optional[dict[str, int]] = None,
+    seed: int = 42,
+    database_url: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> dict[str, Any]:
+    """Run the selected benchmarks (all by default) and return the result document."""
+
+    registry = available_benchmarks()
+    selected = names or sorted(registry)
+    unknown = sorted(set(selected) - set(registry))
+    if unknown:
+        raise BenchmarkError(f"Unknown benchmarks: {', '.join(unknown)}")
+    if scale not in SCALES:
+        raise BenchmarkError(f"Unknown scale {scale!r}; choose from {', '.join(SCALES)}")
+    parameters = {**SCALES[scale], **(overrides or {})}
+
+    results: dict[str, Any] = {}
+    for name in selected:
+        if progress is not None:
+            progress(name)
+        with tempfile.TemporaryDirectory(prefix=f"pgip-bench-{name}-") as workdir:
+            context = BenchmarkContext(Path(workdir), dict(parameters), seed, database_url)
+            started = time.perf_counter()
+            metrics = registry[name].function(context)
+            results[name] = {
+                "metrics": {key: float(value) for key, value in metrics.items()},
+                "wall_seconds": time.perf_counter() - started,
+            }
+    return {
+        "schema": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "database": make_url(database_url).get_backend_name() if database_url else "sqlite",
+        "scale": scale,
+        "seed": seed,
+        "parameters": parameters,
+        "benchmarks": results,
+    }
+
+
+def save_results(document: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if document.get("schema") != SCHEMA_VERSION:
+        raise BenchmarkError(f"{path} has unsupported schema {document.get('schema')!r}")
+    return document
+
+
+def metric_direction(metric: str) -> Optional[Direction]:
+    """Return whether larger or smaller values of ``metric`` are better."""
+
+    if metric.endswith("_per_second"):
+        return "higher"
+    if metric.endswith(("_ms", "_seconds")):
+        return "lower"
+    return None
+
+
+@dataclass(frozen=True)
+class Comparison:
+    benchmark: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    status: Literal["regression", "improvement", "unchanged"]
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], *, threshold: float = 0.10
+) -> list[Comparison]:
+    """Compare every directional metric present in both result documents.
+
+    ``change`` is the relative change in the metric's "better" direction, so
+    a negative value is a slowdown. A slowdown beyond ``threshold`` is a
+    regression. Raises :class:`BenchmarkError` when the documents were
+    measured on different datasets and are not comparable.
+    """
+
+    for key in ("scale", "seed", "parameters", "database"):
+        if baseline.get(key) != current.get(key):
+            raise BenchmarkError(
+                f"Results differ in {key} ({baseline.get(key)!r} vs {current.get(key)!r}); "
+                "rerun both with the same options"
+            )
+
+    comparisons = []
+    for name, result in sorted(current["benchmarks"].items()):
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        for metric, value in sorted(result["metrics"].items()):
+            direction = metric_direction(metric)
+            previous = reference["metrics"].get(metric)
+            if direction is None or previous is None or previous == 0:
+                continue
+            change = (value - previous) / previous
+            if direction == "lower":
+                change = -change
+            if change < -threshold:
+                status = "regression"
+            elif change > threshold:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            comparisons.append(Comparison(name, metric, previous, value, change, status))
+    return comparisons
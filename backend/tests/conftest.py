@@ -10,24 +10,35 @@ from typing import AsyncGenerator
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import get_settings
 from app.db.session import (
     create_all,
     drop_all,
-    get_engine,
+    dispose_engines,
+    get_read_session,
     get_session,
     get_session_factory,
     init_engine,
 )
 from app.main import app
+from app.services import registry
 
 
 @pytest.fixture()
-def client(tmp_path: Path) -> Iterator[TestClient]:
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
     """Provide a TestClient with an isolated SQLite database."""
 
     database_path = tmp_path / "test_pgip.db"
     database_url = f"sqlite+aiosqlite:///{database_path.as_posix()}"
 
+    # The application lifespan re-initializes the engine from settings, so
+    # point those at the temporary database as well.
+    monkeypatch.setenv("PGIP_DATABASE_URL", database_url)
+    monkeypatch.setenv("PGIP_RUN_WORKSPACE_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("PGIP_CACHE_DIR", str(tmp_path / "result-cache"))
+    get_settings.cache_clear()
+    registry.invalidate()
+
     init_engine(database_url, echo=False)
 
     # Recreate schema for the fresh database
@@ -44,9 +55,36 @@ def client(tmp_path: Path) -> Iterator[TestClient]:
             yield session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
 
     with TestClient(app) as test_client:
         yield test_client
 
     app.dependency_overrides.pop(get_session, None)
-    asyncio.run(get_engine().dispose())
+    app.dependency_overrides.pop(get_read_session, None)
+    asyncio.run(dispose_engines())
+    get_settings.cache_clear()
+
+
+@pytest.fixture()
+def graph_settings() -> dict[str, str]:
+    """Extra ``PGIP_*`` variables for :func:`graph_env`; graph test modules override this."""
+
+    return {}
+
+
+@pytest.fixture()
+def graph_env(
+    gfa_path: Path, graph_settings: dict[str, str], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Configure the app to serve the module's ``gfa_path`` graph.
+
+    Modules enable it with ``pytestmark = pytest.mark.usefixtures("graph_env")``,
+    which sets the variables before ``client`` starts the app.
+    """
+
+    monkeypatch.setenv("PGIP_GRAPH_GFA_PATH", str(gfa_path))
+    monkeypatch.setenv("PGIP_GRAPH_CACHE_DIR", str(tmp_path / "graph-cache"))
+    for name, value in graph_settings.items():
+        monkeypatch.setenv(name, value)
+    return gfa_path
@@ -0,0 +1,87 @@
+"""Tests for annotation loading and the streaming query API."""
+
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from tests.test_health import _sample_manifest
+from tests.test_runs import _wait_for_run
+
+ANNOTATING_SCRIPT = """
+import json, os, pathlib
+workspace = pathlib.Path(os.environ["PGIP_WORKSPACE"])
+out = workspace / "output" / "annotations" / "annotations.jsonl"
+with out.open("w") as handle:
+    for contig in ("chr2", "chr1"):
+        for position in range(1, 11):
+            handle.write(json.dumps({"contig": contig, "position": position, "score": position / 10}) + "\\n")
+    handle.write(json.dumps({"summary": True}) + "\\n")
+"""
+
+
+def _run_plugin(client: TestClient, tmp_path: Path, name: str) -> dict:
+    script = tmp_path / "annotate.py"
+    script.write_text(ANNOTATING_SCRIPT)
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\n")
+    manifest = _sample_manifest()
+    manifest["name"] = name
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "1", "memory": "64Mi"}
+    client.post("/api/v1/plugins/", json=manifest)
+    response = client.post(f"/api/v1/plugins/{name}/runs", json={"inputs": {"variants": str(variants)}})
+    run = _wait_for_run(client, response.json()["id"])
+    assert run["status"] == "succeeded", run["error"]
+    return run
+
+
+def _lines(response) -> list[dict]:
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_annotations_stream_in_keyset_order(client: TestClient, tmp_path: Path) -> None:
+    run = _run_plugin(client, tmp_path, "alpha")
+    _run_plugin(client, tmp_path, "beta")
+
+    records = _lines(client.get("/api/v1/annotations", params={"region": "chr1:3-4"}))
+    assert [(r["position"], r["plugin_name"]) for r in records] == [
+        (3, "alpha"), (3, "beta"), (4, "alpha"), (4, "beta")
+    ]
+    assert records[0]["run_id"] == run["id"]
+    assert records[0]["payload"]["score"] == 0.3
+
+    only_run = _lines(client.get("/api/v1/annotations", params={"run_id": run["id"], "limit": 100}))
+    assert len(only_run) == 20
+    assert only_run[0]["contig"] == "chr1"
+
+
+def test_annotation_cursor_pagination_covers_every_record(client: TestClient, tmp_path: Path) -> None:
+    _run_plugin(client, tmp_path, "alpha")
+    _run_plugin(client, tmp_path, "beta")
+
+    seen: list[tuple] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        lines = _lines(client.get("/api/v1/annotations", params=params))
+        pages += 1
+        if "next_cursor" not in lines[-1]:
+            seen.extend((r["contig"], r["position"], r["plugin_name"]) for r in lines)
+            break
+        cursor = lines[-1]["next_cursor"]
+        assert len(lines) == 8
+        seen.extend((r["contig"], r["position"], r["plugin_name"]) for r in lines[:-1])
+
+    assert pages == 6
+    assert len(seen) == len(set(seen)) == 40
+    assert seen == sorted(seen)
+
+
+def test_annotation_query_rejects_bad_arguments(client: TestClient) -> None:
+    assert client.get("/api/v1/annotations", params={"cursor": "not-a-cursor"}).status_code == 422
+    assert client.get("/api/v1/annotations", params={"region": "chr1:9-1"}).status_code == 422
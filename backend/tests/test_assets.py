@@ -0,0 +1,95 @@
+"""Tests for streaming VCF ingestion."""
+
+import asyncio
+import gzip
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.session import get_read_session
+from app.main import app
+
+VCF_HEADER = (
+    "##fileformat=VCFv4.2\n"
+    "##contig=<ID=chr1,length=248956422>\n"
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS1\tS2\n"
+)
+
+
+def _vcf_records(count: int, contig: str = "chr1", start: int = 1000) -> str:
+    return "".join(
+        f"{contig}\t{start + index * 10}\trs{index}\tA\tG\t50\tPASS\tDP=10\tGT\t0/1\t0/0\n"
+        for index in range(count)
+    )
+
+
+def _bgzf_like(text: str, members: int = 3) -> bytes:
+    """Compress text as several concatenated gzip members, like BGZF does."""
+
+    lines = text.splitlines(keepends=True)
+    step = max(1, len(lines) // members)
+    return b"".join(
+        gzip.compress("".join(lines[index : index + step]).encode())
+        for index in range(0, len(lines), step)
+    )
+
+
+def test_ingest_bgzipped_vcf(client: TestClient) -> None:
+    body = _bgzf_like(VCF_HEADER + _vcf_records(25))
+
+    response = client.post(
+        "/api/v1/assets/vcf",
+        params={"source": "cohort.vcf.gz"},
+        content=body,
+        headers={"Content-Type": "application/gzip"},
+    )
+    assert response.status_code == 201
+    asset = response.json()
+    assert asset["status"] == "ready"
+    assert asset["record_count"] == 25
+    assert asset["samples"] == ["S1", "S2"]
+    assert asset["source"] == "cohort.vcf.gz"
+
+    detail = client.get(f"/api/v1/assets/vcf/{asset['id']}")
+    assert detail.status_code == 200
+    assert detail.json()["record_count"] == 25
+
+
+def test_ingest_plain_vcf(client: TestClient) -> None:
+    response = client.post("/api/v1/assets/vcf", content=(VCF_HEADER + _vcf_records(3)).encode())
+    assert response.status_code == 201
+    assert response.json()["record_count"] == 3
+
+
+def test_ingest_rejects_malformed_vcf(client: TestClient) -> None:
+    response = client.post("/api/v1/assets/vcf", content=b"chr1\t100\tA\n")
+    assert response.status_code == 422
+
+
+def test_status_reads_do_not_depend_on_replica_lag(client: TestClient, tmp_path: Path) -> None:
+    # An empty replica stands in for one that has not caught up yet.
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lagging.db'}")
+
+    async def create_schema() -> None:
+        async with replica.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    factory = async_sessionmaker(replica, expire_on_commit=False)
+
+    async def lagging_session() -> AsyncIterator[AsyncSession]:
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_session] = lagging_session
+    try:
+        body = (VCF_HEADER + _vcf_records(2)).encode()
+        asset = client.post("/api/v1/assets/vcf", content=body).json()
+        assert client.get(f"/api/v1/assets/vcf/{asset['id']}").json()["status"] == "ready"
+        # Analytical reads stay on the replica.
+        assert client.get(f"/api/v1/assets/vcf/{asset['id']}/stats").status_code == 404
+    finally:
+        asyncio.run(replica.dispose())
@@ -0,0 +1,73 @@
+"""Tests for the benchmark harness and its dataset generators."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from app.genomics.gfa import PangenomeGraph, compile_gfa
+from app.genomics.vcf import parse_record
+from benchmarks.datasets import write_gfa, write_vcf
+from benchmarks.harness import BenchmarkError, compare, run_suite
+
+
+def test_generators_are_deterministic_and_parseable(tmp_path: Path) -> None:
+    first = write_vcf(tmp_path / "a.vcf", records=500, samples=4, contigs=2, seed=7)
+    second = write_vcf(tmp_path / "b.vcf", records=500, samples=4, contigs=2, seed=7)
+    other = write_vcf(tmp_path / "c.vcf", records=500, samples=4, contigs=2, seed=8)
+    assert first.read_bytes() == second.read_bytes() != other.read_bytes()
+
+    compressed = write_vcf(
+        tmp_path / "a.vcf.gz", records=500, samples=4, contigs=2, seed=7, compress=True
+    )
+    assert gzip.decompress(compressed.read_bytes()) == first.read_bytes()
+    lines = first.read_text().splitlines()
+    assert lines[-501].split("\t")[9:] == ["S00000", "S00001", "S00002", "S00003"]
+    records = [parse_record(line) for line in lines[-500:]]
+    assert {record.contig for record in records} == {"chr1", "chr2"}
+    assert any(record.end_position > record.position for record in records)
+
+    graph = write_gfa(tmp_path / "a.gfa", nodes=300, paths=3, seed=7)
+    again = write_gfa(tmp_path / "b.gfa", nodes=300, paths=3, seed=7)
+    assert graph.read_bytes() == again.read_bytes()
+    compiled = PangenomeGraph(compile_gfa(graph, tmp_path / "compiled"))
+    assert compiled.node_count == 300
+    assert compiled.path_names == ["sample0", "sample1", "sample2"]
+
+
+def _document(metrics: dict[str, float], **overrides) -> dict:
+    return {
+        "scale": "small",
+        "seed": 42,
+        "database": "sqlite",
+        "parameters": {"queries": 10},
+        "benchmarks": {"region_query": {"metrics": metrics, "wall_seconds": 1.0}},
+        **overrides,
+    }
+
+
+def test_compare_flags_regressions_by_metric_direction() -> None:
+    baseline = _document({"query_p50_ms": 10.0, "records_per_second": 1000.0, "count": 5.0})
+    current = _document({"query_p50_ms": 12.0, "records_per_second": 1500.0, "count": 9.0})
+    results = {item.metric: item for item in compare(baseline, current, threshold=0.1)}
+    assert set(results) == {"query_p50_ms", "records_per_second"}
+    assert results["query_p50_ms"].status == "regression"
+    assert results["query_p50_ms"].change == pytest.approx(-0.2)
+    assert results["records_per_second"].status == "improvement"
+    assert compare(baseline, current, threshold=0.25)[0].status == "unchanged"
+
+    with pytest.raises(BenchmarkError, match="seed"):
+        compare(baseline, _document({}, seed=1))
+
+
+def test_suite_runs_at_tiny_scale() -> None:
+    document = run_suite(
+        ["region_query", "plugin_api"],
+        overrides={"vcf_records": 200, "vcf_samples": 2, "plugins": 20, "queries": 5},
+    )
+    assert document["parameters"]["vcf_records"] == 200
+    region = document["benchmarks"]["region_query"]["metrics"]
+    assert {"first_ms", "query_p50_ms", "query_p99_ms"} <= set(region)
+    assert document["benchmarks"]["plugin_api"]["metrics"]["page_p99_ms"] > 0
+    with pytest.raises(BenchmarkError, match="Unknown benchmarks"):
+        run_suite(["nope"])
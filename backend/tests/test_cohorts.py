@@ -0,0 +1,99 @@
+"""Tests for carrier bitmaps and cohort queries."""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics import bitmaps
+from app.genomics.vcf import parse_record
+
+SAMPLES = ["S1", "S2", "S3", "S4", "S5"]
+HEADER = (
+    "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t"
+    + "\t".join(SAMPLES)
+    + "\n"
+)
+RECORDS = [
+    "chr1\t100\trare\tA\tG\t.\t.\t.\tGT\t0/1\t0/0\t0/0\t0/0\t0/0",
+    "chr1\t200\tshared\tC\tT\t.\t.\t.\tGT\t0/1\t1/1\t0/0\t./.\t0/0",
+    "chr1\t300\tcommon\tG\tA\t.\t.\t.\tGT\t1/1\t0/1\t0/1\t1/1\t0/1",
+    "chr1\t400\tnone\tT\tC\t.\t.\t.\tGT\t0/0\t0/0\t0/0\t0/0\t0/0",
+    "chr2\t50\tother\tA\tT\t.\t.\t.\tGT\t0/0\t0/0\t1|0\t0/0\t0/1",
+    "chr2\t90\tsites\tA\tC\t.\t.\t.\t.",
+]
+
+
+def test_bitmap_containers_round_trip() -> None:
+    rng = np.random.default_rng(3)
+    sparse = np.array([3, 64, 70_000], dtype=np.int64)
+    dense = np.sort(rng.choice(80_000, size=9_000, replace=False))
+    for members in (sparse, dense, np.zeros(0, dtype=np.int64)):
+        blob = bitmaps.encode_bitmap(members)
+        assert np.array_equal(bitmaps.decode_bitmap(blob), members)
+
+    # The dense container costs a fixed 8 KiB instead of 2 bytes per member.
+    assert len(bitmaps.encode_bitmap(dense)) < 2 * len(dense)
+    matrix = bitmaps.dense_matrix(
+        [bitmaps.encode_bitmap(sparse), None, bitmaps.encode_bitmap(dense)], 80_000
+    )
+    assert list(bitmaps.popcount(matrix)) == [3, 0, 9_000]
+    expected = bitmaps.mask(dense, 80_000)
+    assert np.array_equal(matrix[2], expected)
+    shared = len(np.intersect1d(sparse, dense))
+    assert bitmaps.popcount(matrix & bitmaps.mask(sparse, 80_000)).tolist() == [3, 0, shared]
+
+
+def test_records_carry_bitmaps() -> None:
+    record = parse_record(RECORDS[1])
+    assert bitmaps.decode_bitmap(record.carriers).tolist() == [0, 1]
+    assert (record.carrier_count, record.allele_frequency) == (2, pytest.approx(3 / 8))
+    sites = parse_record(RECORDS[5])
+    assert (sites.carriers, sites.carrier_count, sites.allele_frequency) == (None, None, None)
+
+
+@pytest.fixture()
+def cohort_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Several candidate batches for the six test variants.
+    monkeypatch.setenv("PGIP_STATS_BATCH_SIZE", "2")
+
+
+@pytest.fixture()
+def client(cohort_env: None, client: TestClient) -> TestClient:
+    """Run the shared client fixture with small query batches."""
+
+    return client
+
+
+def test_cohort_queries(client: TestClient) -> None:
+    body = (HEADER + "\n".join(RECORDS) + "\n").encode()
+    asset = client.post("/api/v1/assets/vcf", content=body).json()
+    url = f"/api/v1/assets/vcf/{asset['id']}/cohort"
+
+    def identifiers(query: dict) -> list[str]:
+        response = client.post(url, json=query)
+        assert response.status_code == 200, response.text
+        names = {100: "rare", 200: "shared", 300: "common", 400: "none", 50: "other"}
+        return [names[variant["position"]] for variant in response.json()["variants"]]
+
+    assert identifiers({"any_of": ["S1", "S3"]}) == ["rare", "shared", "common", "other"]
+    assert identifiers({"any_of": ["S1", "S3"], "af_below": 0.3}) == ["rare", "other"]
+    assert identifiers({"any_of": ["S1", "S2", "S5"], "min_carriers": 2}) == ["shared", "common"]
+    assert identifiers({"all_of": ["S1", "S2"]}) == ["shared", "common"]
+    assert identifiers({"none_of": ["S1"], "af_at_least": 0.0}) == ["none", "other"]
+    assert identifiers({"any_of": ["S5"], "region": "chr2:1-100"}) == ["other"]
+
+    result = client.post(url, json={"all_of": ["S2"], "any_of": ["S4"]}).json()
+    (common,) = result["variants"]
+    assert (common["carrier_count"], common["carriers"]) == (5, ["S2", "S4"])
+    assert common["allele_frequency"] == pytest.approx(0.7)
+
+    first = client.post(url, json={"any_of": SAMPLES, "limit": 2}).json()
+    assert first["variant_count"] == 2
+    rest = client.post(url, json={"any_of": SAMPLES, "after": first["next_after"]}).json()
+    assert [variant["position"] for variant in rest["variants"]] == [300, 50]
+    assert rest["next_after"] is None
+
+    unknown = client.post(url, json={"any_of": ["S9"]})
+    assert unknown.status_code == 422
+    assert "S9" in unknown.json()["detail"]
+    assert client.post("/api/v1/assets/vcf/999/cohort", json={}).status_code == 404
@@ -0,0 +1,118 @@
+"""Tests for the optional Parquet annotation store."""
+
+import io
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_annotations import _run_plugin
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture()
+def columnar_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    store = tmp_path / "columnar"
+    monkeypatch.setenv("PGIP_ANNOTATION_COLUMNAR_DIR", str(store))
+    monkeypatch.setenv("PGIP_ANNOTATION_ROW_GROUP_SIZE", "4")
+    return store
+
+
+@pytest.fixture()
+def client(columnar_dir: Path, client: TestClient) -> TestClient:
+    """Run the shared client fixture with the columnar store enabled."""
+
+    return client
+
+
+def test_runs_are_written_to_partitioned_parquet(client: TestClient, columnar_dir: Path, tmp_path: Path) -> None:
+    run = _run_plugin(client, tmp_path, "alpha")
+
+    files = sorted(columnar_dir.rglob("*.parquet"))
+    assert [path.parent.relative_to(columnar_dir).as_posix() for path in files] == [
+        "plugin=alpha/contig=chr1",
+        "plugin=alpha/contig=chr2",
+    ]
+    metadata = pq.ParquetFile(files[0]).metadata
+    assert metadata.num_rows == 10
+    assert metadata.num_row_groups == 3
+    assert files[0].name == f"run-{run['id']}.parquet"
+    assert "score" in metadata.schema.names
+
+
+def test_export_projects_columns_and_prunes_by_region(client: TestClient, tmp_path: Path) -> None:
+    _run_plugin(client, tmp_path, "alpha")
+    _run_plugin(client, tmp_path, "beta")
+
+    response = client.get(
+        "/api/v1/annotations/export",
+        params={"plugin": "beta", "region": "chr2:3-6", "columns": "contig,position,score"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["contig", "position", "score"]
+    assert table.column("position").to_pylist() == [3, 4, 5, 6]
+    assert set(table.column("contig").to_pylist()) == {"chr2"}
+
+    parquet = client.get("/api/v1/annotations/export", params={"format": "parquet"})
+    assert parquet.status_code == 200
+    assert pq.read_table(io.BytesIO(parquet.content)).num_rows == 40
+
+    unknown = client.get("/api/v1/annotations/export", params={"columns": "nope"})
+    assert unknown.status_code == 422
+
+
+def _write_jsonl(directory: Path, records: list[str]) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "annotations.jsonl").write_text("".join(f"{record}\n" for record in records))
+    return directory
+
+
+def test_field_types_are_promoted_across_batches_and_runs(tmp_path: Path) -> None:
+    from app.services import columnar
+
+    store = tmp_path / "store"
+    first = _write_jsonl(
+        tmp_path / "first",
+        [
+            '{"contig": "chr1", "position": 1, "score": 1, "label": null}',
+            '{"contig": "chr1", "position": 2, "score": 2, "label": null}',
+            '{"contig": "chr1", "position": 3, "score": 0.5, "label": "high"}',
+        ],
+    )
+    columnar.write_run_annotations(
+        store, run_id="a", plugin_name="p", plugin_version="1", directories=[first], row_group_size=2
+    )
+    table = pq.read_table(next(store.rglob("run-a.parquet")))
+    assert table.schema.field("score").type == pa.float64()
+    assert table.column("score").to_pylist() == [1.0, 2.0, 0.5]
+    assert table.column("label").to_pylist() == [None, None, "high"]
+
+    second = _write_jsonl(tmp_path / "second", ['{"contig": "chr1", "position": 4, "label": 7}'])
+    columnar.write_run_annotations(
+        store, run_id="b", plugin_name="p", plugin_version="1", directories=[second], row_group_size=2
+    )
+    schema, batches = columnar.scan_batches(store, columns=["position", "score", "label"])
+    exported = pa.Table.from_batches(list(batches), schema=schema).sort_by("position")
+    assert exported.column("label").to_pylist() == [None, None, "high", "7"]
+    assert exported.column("score").to_pylist() == [1.0, 2.0, 0.5, None]
+
+
+def test_failed_writes_leave_no_partial_files(tmp_path: Path) -> None:
+    from app.services import columnar
+
+    store = tmp_path / "store"
+    outputs = _write_jsonl(
+        tmp_path / "out",
+        [f'{{"contig": "chr1", "position": {position}}}' for position in range(1, 4)],
+    )
+    (outputs / "z.jsonl").write_text('{"contig": "chr2", "position": 1, "big": 99999999999999999999999}\n')
+    with pytest.raises(columnar.ColumnarQueryError):
+        columnar.write_run_annotations(
+            store, run_id="a", plugin_name="p", plugin_version="1",
+            directories=[outputs], row_group_size=2,
+        )
+    assert not list(store.rglob("*.parquet"))
@@ -0,0 +1,170 @@
+"""Tests for database engine configuration."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.schema import SchemaRevisionError, head_revision, include_object, verify_schema
+
+
+def test_postgres_engine_options_apply_pool_and_driver_settings() -> None:
+    settings = Settings(
+        database_pool_size=3, database_statement_cache_size=0, database_statement_timeout_ms=5000
+    )
+    options = db_session._engine_options("postgresql+asyncpg://pgip@db/pgip", settings, "replica")
+
+    assert options["pool_size"] == 3
+    assert options["pool_pre_ping"] is True
+    assert options["poolclass"].engine_label == "replica"
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "5000"
+    assert db_session._engine_options("sqlite+aiosqlite:///./pgip.db", settings, "primary") == {}
+
+
+def test_timed_pool_records_checkout_wait(tmp_path: Path) -> None:
+    label = "test-timed-pool"
+
+    async def scenario() -> None:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=db_session._timed_pool(label),
+            pool_size=1,
+            max_overflow=0,
+        )
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    _, _, count = DB_POOL_CHECKOUT_SECONDS.samples()[(label,)]
+    assert count >= 1
+
+
+def test_read_sessions_route_to_replica(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    primary = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    monkeypatch.setattr(db_session, "engine", None)
+    monkeypatch.setattr(db_session, "read_engine", None)
+    monkeypatch.setattr(db_session, "_session_factory", None)
+    monkeypatch.setattr(db_session, "_read_session_factory", None)
+
+    db_session.init_engine(primary, replica_url=replica)
+    assert db_session.get_read_session_factory().kw["bind"] is db_session.read_engine
+    assert str(db_session.read_engine.url) == replica
+
+    db_session.init_engine(primary)
+    assert db_session.get_read_session_factory() is db_session.get_session_factory()
+    asyncio.run(db_session.dispose_engines())
+
+
+def test_migrations_match_models_and_verify(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from alembic import command
+    from alembic.autogenerate import compare_metadata
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+
+    from app.core.config import get_settings
+    from app.db.schema import SCRIPT_LOCATION
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setenv("PGIP_DATABASE_URL", url)
+    get_settings.cache_clear()
+    config = Config()
+    config.set_main_option("script_location", str(SCRIPT_LOCATION))
+    command.upgrade(config, "head")
+    get_settings.cache_clear()
+
+    async def scenario() -> None:
+        engine = create_async_engine(url)
+        async with engine.connect() as connection:
+            diff = await connection.run_sync(
+                lambda sync: compare_metadata(
+                    MigrationContext.configure(
+                        sync, opts={"include_object": include_object(sync.dialect.name)}
+                    ),
+                    Base.metadata,
+                )
+            )
+        assert diff == []
+        assert await verify_schema(engine) == head_revision()
+
+        async with engine.begin() as connection:
+            await connection.execute(text("UPDATE alembic_version SET version_num = 'stale'"))
+        # Verification happens once per engine; a new engine sees the mismatch.
+        assert await verify_schema(engine) == head_revision()
+        await engine.dispose()
+        fresh = create_async_engine(url)
+        with pytest.raises(SchemaRevisionError, match="revision stale"):
+            await verify_schema(fresh)
+        await fresh.dispose()
+
+        empty = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}")
+        with pytest.raises(SchemaRevisionError, match="no schema revision"):
+            await verify_schema(empty)
+        await empty.dispose()
+
+        # Schema creation stamps only unstamped databases; an old stamp must be upgraded.
+        monkeypatch.setattr(db_session, "engine", fresh)
+        with pytest.raises(SchemaRevisionError, match="revision stale.*alembic upgrade head"):
+            await db_session.create_all()
+        async with fresh.connect() as connection:
+            stamp = await connection.execute(text("SELECT version_num FROM alembic_version"))
+            assert stamp.scalar() == "stale"
+        await fresh.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_carrier_migration_backfills_existing_variants(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import sqlite3
+
+    import numpy as np
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.config import get_settings
+    from app.db.schema import SCRIPT_LOCATION
+    from app.genomics.bitmaps import decode_bitmap
+
+    database = tmp_path / "backfill.db"
+    monkeypatch.setenv("PGIP_DATABASE_URL", f"sqlite+aiosqlite:///{database}")
+    get_settings.cache_clear()
+    config = Config()
+    config.set_main_option("script_location", str(SCRIPT_LOCATION))
+    command.upgrade(config, "0007")
+
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "INSERT INTO vcf_assets (id, source, status, header, samples, record_count, created_at)"
+            " VALUES (1, 'old.vcf', 'ready', '', '[\"A\", \"B\", \"C\"]', 2, '2026-01-01')"
+        )
+        for variant_id, genotypes in ((1, [0, 1, 2]), (2, None)):
+            connection.execute(
+                "INSERT INTO variants (id, asset_id, contig, position, end_position, bin, ref, alt,"
+                " genotypes) VALUES (?, 1, 'chr1', ?, ?, 4681, 'A', 'G', ?)",
+                (
+                    variant_id,
+                    variant_id,
+                    variant_id,
+                    None if genotypes is None else np.asarray(genotypes, np.int8).tobytes(),
+                ),
+            )
+    command.upgrade(config, "head")
+    get_settings.cache_clear()
+
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute(
+            "SELECT carriers, carrier_count, allele_frequency FROM variants ORDER BY id"
+        ).fetchall()
+    assert decode_bitmap(rows[0][0]).tolist() == [1, 2]
+    assert rows[0][1:] == (2, pytest.approx(0.5))
+    assert rows[1] == (None, None, None)
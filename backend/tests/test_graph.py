@@ -0,0 +1,166 @@
+"""Tests for the compiled pangenome graph and graph endpoints."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics.gfa import GfaFormatError, compile_gfa, handle, open_graph
+from app.genomics.minimizers import _spell_path, minimizers
+from app.services import graph as graph_service
+from app.services import readiness
+
+pytestmark = pytest.mark.usefixtures("graph_env")
+
+# A small bubble: s1 -> (s2 | s3) -> s4, with two paths through it.
+GFA = "\n".join(
+    [
+        "H\tVN:Z:1.0",
+        "S\ts1\tACGT",
+        "S\ts2\tA",
+        "S\ts3\tTT",
+        "S\ts4\t*\tLN:i:5",
+        "L\ts1\t+\ts2\t+\t0M",
+        "L\ts1\t+\ts3\t+\t0M",
+        "L\ts2\t+\ts4\t+\t0M",
+        "L\ts3\t+\ts4\t+\t0M",
+        "P\tref\ts1+,s2+,s4+\t*",
+        "W\tHG002\t1\tchr1\t0\t11\t>s1>s3>s4",
+    ]
+)
+
+
+@pytest.fixture()
+def gfa_path(tmp_path: Path) -> Path:
+    path = tmp_path / "bubble.gfa"
+    path.write_text(GFA + "\n")
+    return path
+
+
+def test_compile_and_open_graph(gfa_path: Path, tmp_path: Path) -> None:
+    graph = open_graph(gfa_path, tmp_path / "cache")
+
+    assert graph.node_count == 4
+    assert graph.path_names == ["ref", "HG002#1#chr1"]
+    s1, s2, s3, s4 = (graph.segment_id(name) for name in ("s1", "s2", "s3", "s4"))
+    assert graph.segment_id("missing") is None
+    assert graph.sequence(s1) == "ACGT"
+    assert graph.segment_length(s4) == 5
+
+    assert sorted(graph.successors(handle(s1)).tolist()) == sorted([handle(s2), handle(s3)])
+    # Links are traversable from the reverse strand as well.
+    assert graph.successors(handle(s4, True)).tolist() == sorted([handle(s2, True), handle(s3, True)])
+    assert graph.neighbors(s2).tolist() == sorted([s1, s4])
+
+    assert graph.path_steps("HG002#1#chr1").tolist() == [handle(s1), handle(s3), handle(s4)]
+    assert graph.path_length("ref") == 10
+
+    # A second open reuses the compiled arrays.
+    assert open_graph(gfa_path, tmp_path / "cache").directory == graph.directory
+
+
+def test_compile_rejects_undefined_segments(tmp_path: Path) -> None:
+    source = tmp_path / "broken.gfa"
+    source.write_text("S\ta\tAC\nL\ta\t+\tb\t+\t0M\n")
+    with pytest.raises(GfaFormatError):
+        compile_gfa(source, tmp_path / "compiled")
+
+
+def test_segments_without_sequence_are_spelled_as_unknown_bases(tmp_path: Path) -> None:
+    source = tmp_path / "lengths.gfa"
+    source.write_text(
+        "S\ta\t*\tLN:i:4\nS\tb\tACGTACGT\nL\ta\t+\tb\t+\t0M\nP\tp\ta+,b+\t*\n"
+    )
+    graph = open_graph(source, tmp_path / "cache")
+    a, b = graph.segment_id("a"), graph.segment_id("b")
+
+    assert graph.sequence(a) == "NNNN"
+    assert graph.sequence(b) == "ACGTACGT"
+    assert graph.handle_sequence(handle(a, True)) == "NNNN"
+    spelled = b"".join(chunk.tobytes() for chunk in _spell_path(graph, "p", chunk_bases=3))
+    assert spelled == b"NNNNACGTACGT"
+    # No k-mer overlapping the placeholder bases is indexed.
+    _, positions, _ = minimizers(np.frombuffer(spelled, dtype=np.uint8), 3, 1)
+    assert positions.min() >= 4
+
+
+def test_graph_loads_lazily(gfa_path: Path, tmp_path: Path) -> None:
+    graph_service.configure_graph(gfa_path, tmp_path / "lazy-cache")
+    try:
+        assert graph_service.graph_state() == graph_service.GraphState(
+            configured=True, graph_loaded=False, index_loaded=False
+        )
+        assert not (tmp_path / "lazy-cache").exists()
+
+        assert graph_service.get_graph().node_count == 4
+        assert not graph_service.graph_state().index_loaded
+        graph_service.get_path_index()
+        assert graph_service.graph_state().index_loaded
+    finally:
+        graph_service.unload_graph()
+
+    with pytest.raises(graph_service.GraphUnavailableError):
+        graph_service.get_graph()
+
+
+def test_ready_waits_for_graph_preload(client: TestClient) -> None:
+    # Preloading runs in the background; requests wait for it under the load lock.
+    assert client.get("/api/v1/graph").status_code == 200
+    client.get("/api/v1/graph/paths/ref/selection", params={"start": 0, "end": 1})
+    readiness.reset()
+    report = client.get("/ready").json()
+    assert report["checks"]["graph"] == {"ok": True, "detail": "loaded"}
+
+
+def test_failed_optional_index_keeps_worker_ready(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(graph_service.GraphLayout, "load_or_build", fail)
+    assert client.get("/api/v1/graph/layout").status_code == 503
+    state = graph_service.graph_state()
+    assert (state.error, state.index_errors) == (None, {"layout": "OSError: disk full"})
+    readiness.reset()
+    graph_check = client.get("/ready").json()["checks"]["graph"]
+    assert graph_check == {"ok": True, "detail": "loaded (layout: OSError: disk full)"}
+    assert client.get("/api/v1/graph").status_code == 200
+
+
+def test_graph_endpoints(client: TestClient) -> None:
+    summary = client.get("/api/v1/graph")
+    assert summary.status_code == 200
+    assert summary.json()["node_count"] == 4
+    assert summary.json()["total_length"] == 12
+
+    paths = client.get("/api/v1/graph/paths").json()["paths"]
+    assert paths[0] == {"name": "ref", "steps": 3, "length": 10}
+
+
+def test_graph_selection_extracts_path_interval(client: TestClient) -> None:
+    # ref is s1(0-4) s2(4-5) s4(5-10); [3, 5) touches s1 and s2.
+    response = client.get(
+        "/api/v1/graph/paths/ref/selection", params={"start": 3, "end": 5, "context": 0}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.pgip.graph-selection+json")
+    selection = response.json()
+    assert [node["id"] for node in selection["nodes"]] == ["s1", "s2"]
+    assert selection["edges"] == [
+        {"source": "s1", "source_orientation": "+", "target": "s2", "target_orientation": "+"}
+    ]
+    ref_steps = next(path for path in selection["paths"] if path["name"] == "ref")["steps"]
+    assert [(step["node"], step["offset"]) for step in ref_steps] == [("s1", 0), ("s2", 4)]
+
+    with_context = client.get(
+        "/api/v1/graph/paths/ref/selection",
+        params={"start": 3, "end": 5, "context": 1, "include_sequence": False},
+    ).json()
+    assert {node["id"] for node in with_context["nodes"]} == {"s1", "s2", "s3", "s4"}
+    assert len(with_context["edges"]) == 4
+    assert {path["name"] for path in with_context["paths"]} == {"ref", "HG002#1#chr1"}
+
+    missing = client.get("/api/v1/graph/paths/nope/selection", params={"start": 0, "end": 1})
+    assert missing.status_code == 404
@@ -0,0 +1,123 @@
+"""Tests for the tiled explorer layout and its tile endpoint."""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics.gfa import open_graph
+from app.genomics.layout import GraphLayout, _lanes
+from app.genomics.path_index import PathPositionIndex
+from app.services import graph as graph_service
+
+pytestmark = pytest.mark.usefixtures("graph_env")
+
+# chr1 is the reference; HG002 takes s3 instead of s2, and s5 is only linked.
+GFA = "\n".join(
+    [
+        "S\ts1\tACGT",
+        "S\ts2\tA",
+        "S\ts3\tTT",
+        "S\ts4\tGGCCA",
+        "S\ts5\tCAT",
+        "L\ts1\t+\ts2\t+\t0M",
+        "L\ts1\t+\ts3\t+\t0M",
+        "L\ts2\t+\ts4\t+\t0M",
+        "L\ts3\t+\ts4\t+\t0M",
+        "L\ts4\t+\ts5\t+\t0M",
+        "P\tchr1\ts1+,s2+,s4+\t*",
+        "W\tHG002\t1\tchr1\t0\t11\t>s1>s3>s4",
+    ]
+)
+
+
+@pytest.fixture()
+def gfa_path(tmp_path: Path) -> Path:
+    path = tmp_path / "layout.gfa"
+    path.write_text(GFA + "\n")
+    return path
+
+
+def test_layout_levels(gfa_path: Path, tmp_path: Path) -> None:
+    graph = open_graph(gfa_path, tmp_path / "cache")
+    path_index = PathPositionIndex.load_or_build(graph)
+    layout = GraphLayout.load_or_build(graph, path_index, tile_bases=8, tile_bins=4)
+    assert (layout.width, layout.max_zoom, layout.metadata["lanes"]) == (13, 1, 2)
+    assert layout.metadata["contigs"] == [
+        {"name": "chr1", "path": "chr1", "offset": 0, "length": 11}
+    ]
+
+    names = {graph.segment_id(f"s{index}"): f"s{index}" for index in range(1, 6)}
+    detail = layout.tile(1, 0)
+    assert detail.detail
+    placed = {names[segment]: (x, lane) for x, _, lane, segment, _ in detail.nodes.tolist()}
+    assert placed == {"s1": (0, 0), "s2": (4, 0), "s3": (4, 1), "s4": (5, 0)}
+    # s4 reaches into the second tile; s5 follows it over the link.
+    assert [names[row[3]] for row in layout.tile(1, 1).nodes.tolist()] == ["s4", "s5"]
+
+    overview = layout.tile(0, 0)
+    assert not overview.detail
+    assert [row[:4] for row in overview.bins.tolist()] == [
+        [0, 0, 1, 4],
+        [1, 0, 2, 6],
+        [1, 1, 1, 2],
+        [2, 0, 1, 3],
+    ]
+    with pytest.raises(KeyError):
+        layout.tile(0, 1)
+
+
+def test_lane_packing_takes_the_lowest_free_lane() -> None:
+    x = np.array([0, 0, 5, 10, 12, 2, 20])
+    lengths = np.array([10, 4, 3, 5, 1, 2, 0])
+    depth = np.array([3, 1, 1, 2, 1, 1, 1])
+
+    expected = np.zeros(len(x), dtype=np.int64)
+    lane_ends: list[int] = []
+    for node in np.lexsort((-depth, x)):
+        end = int(x[node]) + max(int(lengths[node]), 1)
+        lane = next((lane for lane, last in enumerate(lane_ends) if last <= x[node]), len(lane_ends))
+        lane_ends[lane:lane + 1] = [end]
+        expected[node] = lane
+    assert _lanes(x, lengths, depth).tolist() == expected.tolist() == [0, 1, 1, 0, 1, 2, 0]
+
+
+@pytest.fixture()
+def graph_settings() -> dict[str, str]:
+    return {"PGIP_GRAPH_TILE_BASES": "8", "PGIP_GRAPH_TILE_BINS": "4"}
+
+
+def test_tile_endpoint(client: TestClient) -> None:
+    summary = client.get("/api/v1/graph/layout").json()
+    assert (summary["width"], summary["max_zoom"], summary["tile_bases"]) == (13, 1, 8)
+
+    response = client.get("/api/v1/graph/layout/tiles/1/0")
+    assert response.status_code == 200, response.text
+    assert response.headers["cache-control"] == "public, max-age=3600"
+    tile = response.json()
+    assert tile["detail"] is True
+    assert [node["id"] for node in tile["nodes"]] == ["s1", "s2", "s3", "s4"]
+    edges = {(edge["source"], edge["target"]) for edge in tile["edges"]}
+    assert {("s1", "s2"), ("s1", "s3"), ("s3", "s4"), ("s4", "s5")} <= edges
+
+    etag = response.headers["etag"]
+    cached = client.get("/api/v1/graph/layout/tiles/1/0", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    # Cached tiles are served while the graph state lock is held.
+    with graph_service._lock:
+        worker = threading.Thread(target=graph_service.layout_tile, args=(1, 0))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+    overview = client.get("/api/v1/graph/layout/tiles/0/0").json()
+    assert overview["detail"] is False
+    assert overview["bins"][1] == {
+        "lane": 0, "start": 4, "end": 10, "nodes": 2, "bases": 6, "depth": 1.5
+    }
+    assert client.get("/api/v1/graph/layout/tiles/0/5").status_code == 404
+    assert client.get("/api/v1/graph/layout/tiles/7/0").status_code == 404
@@ -0,0 +1,144 @@
+"""Tests for the minimizer sequence index and graph search endpoint."""
+
+import os
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics.gfa import open_graph
+from app.genomics.minimizers import (
+    MinimizerIndex,
+    _chunked_minimizers,
+    _hash64,
+    build_minimizer_index,
+    minimizers,
+)
+from app.services import graph as graph_service
+
+pytestmark = pytest.mark.usefixtures("graph_env")
+
+_rng = random.Random(7)
+SEGMENTS = {
+    name: "".join(_rng.choice("ACGT") for _ in range(length))
+    for name, length in [("s1", 600), ("s2", 40), ("s3", 55), ("s4", 700), ("s5", 300)]
+}
+COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+def reverse_complement(sequence: str) -> str:
+    return sequence.translate(COMPLEMENT)[::-1]
+
+
+def write_gfa(path: Path, walks: list[str]) -> Path:
+    # s5 is on no path; only the segment shard covers it.
+    lines = [f"S\t{name}\t{sequence}" for name, sequence in SEGMENTS.items()]
+    lines += ["L\ts1\t+\ts2\t+\t0M", "L\ts1\t+\ts3\t+\t0M", "L\ts2\t+\ts4\t+\t0M"]
+    lines += ["L\ts3\t+\ts4\t-\t0M"]
+    lines += ["P\tchr1\ts1+,s2+,s4+\t*", *walks]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+HG002 = "W\tHG002\t1\tchr1\t0\t1355\t>s1>s3<s4"
+
+
+def naive_minimizers(sequence: str, k: int, w: int) -> set[tuple[int, int, bool]]:
+    codes = {"A": 0, "C": 1, "G": 2, "T": 3}
+    mask = np.uint64((1 << (2 * k)) - 1)
+    kmers = []
+    for start in range(len(sequence) - k + 1):
+        forward = reverse = 0
+        for offset, base in enumerate(sequence[start : start + k]):
+            forward = forward << 2 | codes[base]
+            reverse |= (3 - codes[base]) << (2 * offset)
+        value = int(_hash64(np.array([min(forward, reverse)], dtype=np.uint64), mask)[0])
+        kmers.append((value, start, reverse < forward))
+    return {min(kmers[start : start + w]) for start in range(len(kmers) - w + 1)}
+
+
+def test_minimizers_match_definition() -> None:
+    sequence = "".join(_rng.choice("ACGT") for _ in range(500))
+    hashes, positions, strands = minimizers(np.frombuffer(sequence.encode(), np.uint8), 11, 5)
+    found = set(zip(hashes.tolist(), positions.tolist(), strands.tolist()))
+    assert found == naive_minimizers(sequence, 11, 5)
+
+    reverse = reverse_complement(sequence)
+    reverse_hashes, *_ = minimizers(np.frombuffer(reverse.encode(), np.uint8), 11, 5)
+    assert set(reverse_hashes.tolist()) == set(hashes.tolist())
+
+    bases = np.frombuffer(sequence.encode(), np.uint8)
+    chunked = _chunked_minimizers((bases[:77], bases[77:300], bases[300:]), 11, 5)
+    whole = _chunked_minimizers((bases,), 11, 5)
+    assert all(np.array_equal(left, right) for left, right in zip(chunked, whole))
+
+
+def test_index_is_incremental_per_path(tmp_path: Path) -> None:
+    cache = tmp_path / "cache"
+    graph = open_graph(write_gfa(tmp_path / "v1.gfa", []), cache)
+    manifest = build_minimizer_index(graph, k=15, w=10)
+    assert (manifest["built"], manifest["reused"]) == (["chr1"], [])
+    assert manifest["segments"] is not None
+
+    # Adding a haplotype recompiles the graph but only indexes the new path.
+    graph = open_graph(write_gfa(tmp_path / "v2.gfa", [HG002]), cache)
+    manifest = build_minimizer_index(graph, k=15, w=10, workers=2)
+    assert (manifest["built"], manifest["reused"]) == (["HG002#1#chr1"], ["chr1"])
+
+    index = MinimizerIndex.load_or_build(graph, k=15, w=10)
+    chr1 = SEGMENTS["s1"] + SEGMENTS["s2"] + SEGMENTS["s4"]
+    count, hits = index.search(chr1[580:700])
+    assert count > 0
+    assert (hits[0].path, hits[0].start, hits[0].end, hits[0].reverse) == ("chr1", 580, 700, False)
+
+    _, hits = index.search(reverse_complement(SEGMENTS["s4"][100:250]))
+    assert {(hit.path, hit.reverse) for hit in hits[:2]} == {
+        ("chr1", True),
+        ("HG002#1#chr1", False),
+    }
+
+    _, hits = index.search(SEGMENTS["s5"][50:200])
+    assert (hits[0].path, hits[0].segment, hits[0].start) == (None, graph.segment_id("s5"), 50)
+
+
+@pytest.fixture()
+def gfa_path(tmp_path: Path) -> Path:
+    return write_gfa(tmp_path / "search.gfa", [HG002])
+
+
+@pytest.fixture()
+def graph_settings() -> dict[str, str]:
+    return {"PGIP_GRAPH_INDEX_WORKERS": "1"}
+
+
+def test_search_endpoint(client: TestClient, tmp_path: Path) -> None:
+    query = SEGMENTS["s1"][590:] + SEGMENTS["s3"] + reverse_complement(SEGMENTS["s4"])[:30]
+    response = client.post("/api/v1/graph/search", json={"sequence": query.lower()})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["query_length"] == len(query)
+    best = result["hits"][0]
+    assert (best["path"], best["start"], best["end"]) == ("HG002#1#chr1", 590, 685)
+    assert best["strand"] == "+"
+    assert best["exact"] is True
+    assert [(node["node"], node["orientation"]) for node in best["nodes"]] == [
+        ("s1", "+"), ("s3", "+"), ("s4", "-")
+    ]
+    assert [node["offset"] for node in best["nodes"]] == [0, 600, 655]
+    assert os.listdir(tmp_path / "graph-cache" / "minimizers")
+
+    short = client.post("/api/v1/graph/search", json={"sequence": "ACGT"})
+    assert short.status_code == 422
+    assert client.post("/api/v1/graph/search", json={"sequence": "ACGU" * 10}).status_code == 422
+
+
+def test_search_index_builds_off_the_request_path(client: TestClient, tmp_path: Path) -> None:
+    # A search index build in progress does not hold up other graph requests.
+    with graph_service._build_locks["minimizers"]:
+        assert client.get("/api/v1/graph/layout").status_code == 200
+
+    graph_service.warm_up(["minimizers"])
+    assert os.listdir(tmp_path / "graph-cache" / "minimizers")
+    assert graph_service.graph_state().index_errors == {}
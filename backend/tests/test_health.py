@@ -4,7 +4,9 @@ from datetime import datetime, timezone
 
 from fastapi.testclient import TestClient
 
+from app.db.schema import head_revision
 from app.models.plugin import PluginManifest
+from app.services import readiness
 
 
 def _sample_manifest() -> dict:
@@ -47,6 +49,28 @@ def test_health_endpoint_returns_ok(client: TestClient) -> None:
     assert response.json() == {"status": "ok"}
 
 
+def test_ready_reports_dependency_checks(client: TestClient, monkeypatch) -> None:
+    response = client.get("/ready")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready"
+    assert report["checks"]["database"]["ok"]
+    assert report["checks"]["schema"]["detail"] == f"revision {head_revision()}"
+    assert report["checks"]["graph"] == {"ok": True, "detail": "not configured"}
+
+    # Reports are cached, so a failing dependency shows up once the entry expires.
+    async def unreachable(engine, timeout):
+        return readiness.ReadinessCheck(ok=False, detail="refused")
+
+    monkeypatch.setattr(readiness, "_ping", unreachable)
+    assert client.get("/ready").status_code == 200
+    readiness.reset()
+    failing = client.get("/ready")
+    assert failing.status_code == 503
+    assert failing.json()["status"] == "unavailable"
+    assert failing.json()["checks"]["schema"] == {"ok": False, "detail": "database unreachable"}
+
+
 def test_plugin_lifecycle(client: TestClient) -> None:
     manifest_payload = _sample_manifest()
 
@@ -76,3 +100,95 @@ def test_plugin_lifecycle(client: TestClient) -> None:
 def test_delete_missing_plugin_returns_404(client: TestClient) -> None:
     response = client.delete("/api/v1/plugins/unknown", params={"version": "0.0.1"})
     assert response.status_code == 404
+
+
+def test_plugin_reads_support_conditional_requests(client: TestClient) -> None:
+    manifest_payload = _sample_manifest()
+    client.post("/api/v1/plugins/", json=manifest_payload)
+
+    first = client.get("/api/v1/plugins/")
+    etag = first.headers["ETag"]
+    assert client.get("/api/v1/plugins/").headers["ETag"] == etag
+
+    not_modified = client.get("/api/v1/plugins/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    detail = client.get(f"/api/v1/plugins/{manifest_payload['name']}")
+    detail_etag = detail.headers["ETag"]
+    assert client.get(
+        f"/api/v1/plugins/{manifest_payload['name']}", headers={"If-None-Match": f"W/{detail_etag}"}
+    ).status_code == 304
+
+    manifest_payload["description"] = "Updated description"
+    client.post("/api/v1/plugins/", json=manifest_payload)
+    refreshed = client.get("/api/v1/plugins/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()[0]["description"] == "Updated description"
+    assert refreshed.headers["ETag"] != etag
+
+
+def test_batch_registration_upserts_in_one_request(client: TestClient) -> None:
+    manifests = []
+    for index in range(3):
+        manifest = _sample_manifest()
+        manifest["version"] = f"0.{index}.0"
+        manifests.append(manifest)
+    client.post("/api/v1/plugins/", json=manifests[0])
+    manifests[0] = {**manifests[0], "description": "Re-registered"}
+
+    response = client.post("/api/v1/plugins:batch", json=manifests)
+    assert response.status_code == 200
+    assert sorted(item["version"] for item in response.json()) == ["0.0.0", "0.1.0", "0.2.0"]
+
+    listed = {item["version"]: item for item in client.get("/api/v1/plugins/").json()}
+    assert len(listed) == 3
+    assert listed["0.0.0"]["description"] == "Re-registered"
+    detail = client.get(f"/api/v1/plugins/{manifests[0]['name']}", params={"version": "0.0.0"})
+    assert detail.json()["description"] == "Re-registered"
+
+
+def test_plugin_listing_filters_and_paginates(client: TestClient) -> None:
+    manifests = []
+    for index in range(5):
+        manifest = _sample_manifest()
+        manifest["name"] = f"plugin-{index}"
+        manifest["updated_at"] = datetime(2024, 1, 1 + index, tzinfo=timezone.utc).isoformat()
+        manifest["tags"] = ["even"] if index % 2 == 0 else ["odd"]
+        manifest["authors"] = [f"Author {index % 2}"]
+        if index == 3:
+            manifest["description"] = "Projects variants onto graph bubbles"
+            manifest["inputs"][0]["media_type"] = "application/vnd.pgip.gfa"
+            manifest["outputs"][0]["media_type"] = "text/csv"
+        manifests.append(manifest)
+    client.post("/api/v1/plugins:batch", json=manifests)
+
+    def names(**params) -> list[str]:
+        return [item["name"] for item in client.get("/api/v1/plugins/", params=params).json()]
+
+    assert names(tag="even") == ["plugin-4", "plugin-2", "plugin-0"]
+    assert names(author="Author 1") == ["plugin-3", "plugin-1"]
+    assert names(input_media_type="application/vnd.pgip.gfa") == ["plugin-3"]
+    assert names(output_media_type="text/csv", tag="odd") == ["plugin-3"]
+    assert names(q="graph Bubbles") == ["plugin-3"]
+    assert names(q="allele frequencies", tag="odd") == ["plugin-1"]
+    assert names(tag="missing") == []
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+        response = client.get("/api/v1/plugins/", params=params)
+        pages.append([item["name"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == [["plugin-4", "plugin-3"], ["plugin-2", "plugin-1"], ["plugin-0"]]
+
+    # Facets follow updates and deletes.
+    manifests[4]["tags"] = ["odd"]
+    client.post("/api/v1/plugins/", json=manifests[4])
+    client.delete("/api/v1/plugins/plugin-2", params={"version": manifests[2]["version"]})
+    assert names(tag="even") == ["plugin-0"]
+
+    invalid = client.get("/api/v1/plugins/", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 422
@@ -0,0 +1,49 @@
+"""Tests for metric primitives and the Prometheus endpoint."""
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Counter, Histogram, Registry, render_prometheus
+from tests.test_health import _sample_manifest
+
+
+def test_render_prometheus_text_format(monkeypatch) -> None:
+    registry = Registry()
+    monkeypatch.setattr("app.core.metrics.REGISTRY", registry)
+    requests = Counter("demo_requests_total", "Requests.", labelnames=("path",))
+    latency = Histogram("demo_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc(path='/a"b')
+    for value in (0.05, 0.5, 2.0):
+        latency.observe(value)
+
+    assert render_prometheus(registry).splitlines() == [
+        "# HELP demo_requests_total Requests.",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{path="/a\\"b"} 1',
+        "# HELP demo_latency_seconds Latency.",
+        "# TYPE demo_latency_seconds histogram",
+        'demo_latency_seconds_bucket{le="0.1"} 1',
+        'demo_latency_seconds_bucket{le="1"} 2',
+        'demo_latency_seconds_bucket{le="+Inf"} 3',
+        "demo_latency_seconds_sum 2.55",
+        "demo_latency_seconds_count 3",
+    ]
+
+
+def test_metrics_endpoint_reports_requests_queries_and_caches(client: TestClient) -> None:
+    manifest = _sample_manifest()
+    client.post("/api/v1/plugins/", json=manifest)
+    client.get(f"/api/v1/plugins/{manifest['name']}")
+    client.get(f"/api/v1/plugins/{manifest['name']}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'pgip_http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/plugins/{plugin_name}",status="200"}'
+    ) in body
+    assert 'pgip_db_query_duration_seconds_count{engine="primary",operation="INSERT"}' in body
+    assert "pgip_registry_cache_hit_ratio " in body
+    assert "pgip_run_queue_depth 0" in body
+    assert "pgip_result_cache_hit_ratio 0" in body
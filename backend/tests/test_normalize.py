@@ -0,0 +1,148 @@
+"""Tests for in-process VCF normalization during ingestion."""
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.genomics.fasta import IndexedFasta
+from app.genomics.normalize import RecordReorderer, left_align
+from app.genomics.vcf import parse_record
+
+# chr1 has a CA repeat at 2-7 and a T run at 11-14; lines wrap at 10 bases.
+REFERENCE = ">chr1 test\nGCACACATGG\nTTTTAAAACC\nCCGGGG\n>chr2\nACGTACGTAC\n"
+
+VCF_HEADER = (
+    "##fileformat=VCFv4.2\n"
+    '##INFO=<ID=AC,Number=A,Type=Integer,Description="Allele count">\n'
+    '##INFO=<ID=DP,Number=1,Type=Integer,Description="Depth">\n'
+    '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+    '##FORMAT=<ID=AD,Number=R,Type=Integer,Description="Allelic depths">\n'
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS1\tS2\n"
+)
+
+VCF_RECORDS = (
+    "chr1\t3\t.\tA\tG\t50\tPASS\tAC=1;DP=9\tGT:AD\t0/1:4,5\t0/0:9,0\n"
+    "chr1\t5\t.\tACA\tA\t50\tPASS\tAC=1;DP=9\tGT:AD\t0/1:4,5\t0/0:9,0\n"
+    "chr1\t9\t.\tG\tA,T\t50\tPASS\tAC=3,1;DP=9\tGT:AD\t1/2:1,4,3\t0/1:5,2,0\n"
+    "chr1\t13\t.\tTT\tT\t50\tPASS\tAC=1;DP=9\tGT:AD\t0/1:4,5\t0/0:9,0\n"
+    "chr2\t2\t.\tC\tT\t50\tPASS\tAC=2;DP=9\tGT:AD\t1/1:0,9\t0/0:9,0\n"
+)
+
+
+@pytest.fixture()
+def reference(tmp_path: Path) -> Path:
+    path = tmp_path / "reference.fa"
+    path.write_text(REFERENCE)
+    return path
+
+
+@pytest.fixture()
+def client(reference: Path, monkeypatch: pytest.MonkeyPatch, client: TestClient) -> TestClient:
+    """Run the shared client fixture with a reference FASTA configured."""
+
+    monkeypatch.setenv("PGIP_REFERENCE_FASTA_PATH", str(reference))
+    monkeypatch.setenv("PGIP_VCF_NORMALIZE_WORKERS", "1")
+    # Several small blocks, so records cross block boundaries.
+    monkeypatch.setenv("PGIP_VCF_NORMALIZE_BLOCK_SIZE", "2")
+    get_settings.cache_clear()
+    return client
+
+
+def test_indexed_fasta_fetches_across_lines(reference: Path) -> None:
+    fasta = IndexedFasta(reference)
+    assert fasta.contigs == ["chr1", "chr2"]
+    assert fasta.length("chr1") == 26
+    assert fasta.fetch("chr1", 8, 13) == "TGGTTT"
+    assert fasta.fetch("chr1", 24, 40) == "GGG"
+    assert reference.with_name("reference.fa.fai").exists()
+
+
+def test_left_align_shifts_across_repeats(reference: Path) -> None:
+    fasta = IndexedFasta(reference)
+    assert left_align(fasta, "chr1", 5, "ACA", "A") == (1, "GCA", "G")
+    assert left_align(fasta, "chr1", 13, "TT", "T") == (10, "GT", "G")
+    assert left_align(fasta, "chr1", 14, "T", "TT") == (10, "G", "GT")
+    assert left_align(fasta, "chr1", 3, "A", "G") == (3, "A", "G")
+
+
+def test_reorderer_restores_coordinate_order() -> None:
+    reorderer = RecordReorderer(window=5)
+    lines = ["chr1\t10\t.\tA\tG", "chr1\t4\t.\tA\tG", "chr1\t30\t.\tA\tG", "chr2\t1\t.\tA\tG"]
+    released = []
+    for line in lines:
+        released.extend(reorderer.push(parse_record(line + "\t.\t.\t.")))
+    released.extend(reorderer.flush())
+    assert [(record.contig, record.position) for record in released] == [
+        ("chr1", 4),
+        ("chr1", 10),
+        ("chr1", 30),
+        ("chr2", 1),
+    ]
+
+
+def test_normalized_ingest_splits_and_left_aligns(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/assets/vcf",
+        params={"normalize": "true"},
+        content=(VCF_HEADER + VCF_RECORDS).encode(),
+    )
+    assert response.status_code == 201, response.text
+    asset = response.json()
+    assert asset["record_count"] == 6
+
+    summary = asset["normalization"]
+    assert summary["input_records"] == 5
+    assert summary["records"] == 6
+    assert summary["multiallelic_sites"] == 1
+    assert summary["split_records"] == 1
+    assert summary["realigned"] == 2
+    assert (summary["snvs"], summary["deletions"], summary["insertions"]) == (4, 2, 0)
+    assert (summary["transitions"], summary["transversions"]) == (3, 1)
+    assert summary["ts_tv_ratio"] == 3.0
+    assert summary["contigs"] == {"chr1": 5, "chr2": 1}
+
+    variants = client.get(
+        "/api/v1/variants", params={"region": "chr1:1-30", "asset_id": asset["id"]}
+    ).json()
+    assert [(row["position"], row["ref"], row["alt"], row["info"]) for row in variants] == [
+        (1, "GCA", "G", "AC=1;DP=9"),
+        (3, "A", "G", "AC=1;DP=9"),
+        (9, "G", "A", "AC=3;DP=9"),
+        (9, "G", "T", "AC=1;DP=9"),
+        (10, "GT", "G", "AC=1;DP=9"),
+    ]
+
+
+def test_plain_ingest_has_no_normalization_summary(client: TestClient) -> None:
+    response = client.post("/api/v1/assets/vcf", content=(VCF_HEADER + VCF_RECORDS).encode())
+    assert response.status_code == 201
+    assert response.json()["record_count"] == 5
+    assert response.json()["normalization"] is None
+
+
+def test_reference_mismatch_is_rejected_or_excluded(client: TestClient) -> None:
+    body = (VCF_HEADER + VCF_RECORDS + "chr1\t20\t.\tG\tA\t50\tPASS\t.\tGT\t0/1\t0/0\n").encode()
+
+    rejected = client.post("/api/v1/assets/vcf", params={"normalize": "true"}, content=body)
+    assert rejected.status_code == 422
+    assert "chr1:20" in rejected.json()["detail"]
+
+    excluded = client.post(
+        "/api/v1/assets/vcf", params={"normalize": "true", "check_ref": "exclude"}, content=body
+    )
+    assert excluded.status_code == 201
+    summary = excluded.json()["normalization"]
+    assert (summary["ref_mismatches"], summary["excluded"], summary["records"]) == (1, 1, 6)
+
+
+def test_normalize_requires_reference(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("PGIP_REFERENCE_FASTA_PATH")
+    get_settings.cache_clear()
+    response = client.post(
+        "/api/v1/assets/vcf", params={"normalize": "true"}, content=VCF_HEADER.encode()
+    )
+    assert response.status_code == 503
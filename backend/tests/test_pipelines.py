@@ -0,0 +1,191 @@
+"""Tests for plugin pipelines."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from tests.test_health import _sample_manifest
+
+PRODUCER_SCRIPT = """
+import json, os, pathlib, sys, time
+params = json.loads(os.environ["PGIP_PARAMETERS"])
+if params.get("fail"):
+    sys.exit(3)
+workspace = pathlib.Path(os.environ["PGIP_WORKSPACE"])
+marker = pathlib.Path(params["marker"])
+with (workspace / "output" / "annotations" / "annotations.jsonl").open("w") as handle:
+    handle.write(json.dumps({"contig": "chr1", "position": 1, "score": 1}) + "\\n")
+    handle.flush()
+    # Wait for the downstream stage to see the first record before writing the rest.
+    deadline = time.monotonic() + 10
+    while not marker.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    for position in range(2, 6):
+        handle.write(json.dumps({"contig": "chr1", "position": position, "score": position}) + "\\n")
+    handle.write(json.dumps({"contig": "chr1", "position": 6, "streamed": marker.exists()}) + "\\n")
+"""
+
+CONSUMER_SCRIPT = """
+import json, os, pathlib
+params = json.loads(os.environ["PGIP_PARAMETERS"])
+workspace = pathlib.Path(os.environ["PGIP_WORKSPACE"])
+with (workspace / "output" / "annotations" / "annotations.jsonl").open("w") as out:
+    for path in sorted((workspace / "input" / "annotations").iterdir()):
+        with path.open() as handle:
+            for line in handle:
+                record = json.loads(line)
+                pathlib.Path(params["marker"]).touch()
+                record["rescored"] = True
+                out.write(json.dumps(record) + "\\n")
+"""
+
+
+def _register(client: TestClient, tmp_path: Path, name: str, script: str, *, consumer: bool) -> None:
+    path = tmp_path / f"{name}.py"
+    path.write_text(script)
+    manifest = _sample_manifest()
+    manifest["name"] = name
+    manifest["entrypoint"] = f"{sys.executable} {path}"
+    manifest["resources"] = {"cpu": "250m", "memory": "64Mi"}
+    if consumer:
+        manifest["inputs"] = [
+            {
+                "name": "annotations",
+                "description": "Upstream annotation records",
+                "media_type": "application/vnd.pgip.annotation+jsonl",
+            }
+        ]
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 201
+
+
+def _wait_for_pipeline(client: TestClient, pipeline_id: str) -> dict:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        pipeline = client.get(f"/api/v1/pipelines/{pipeline_id}").json()
+        if pipeline["status"] in ("succeeded", "failed"):
+            return pipeline
+        time.sleep(0.05)
+    raise AssertionError(f"Pipeline {pipeline_id} did not finish")
+
+
+def _variants(tmp_path: Path) -> str:
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\n")
+    return str(variants)
+
+
+def test_pipeline_streams_records_between_stages(client: TestClient, tmp_path: Path) -> None:
+    _register(client, tmp_path, "producer", PRODUCER_SCRIPT, consumer=False)
+    _register(client, tmp_path, "rescorer", CONSUMER_SCRIPT, consumer=True)
+    marker = tmp_path / "seen"
+    response = client.post(
+        "/api/v1/pipelines/",
+        json={
+            "stages": [
+                {
+                    "id": "rescore",
+                    "plugin": "rescorer",
+                    "sources": {"annotations": {"stage": "annotate", "output": "annotations"}},
+                    "parameters": {"marker": str(marker)},
+                },
+                {
+                    "id": "annotate",
+                    "plugin": "producer",
+                    "inputs": {"variants": _variants(tmp_path)},
+                    "parameters": {"marker": str(marker)},
+                },
+                {
+                    "id": "side",
+                    "plugin": "producer",
+                    "inputs": {"variants": _variants(tmp_path)},
+                    "parameters": {"marker": _variants(tmp_path)},
+                },
+            ]
+        },
+    )
+    assert response.status_code == 202, response.text
+    assert [stage["status"] for stage in response.json()["stages"]] == ["queued"] * 3
+
+    pipeline = _wait_for_pipeline(client, response.json()["id"])
+    assert pipeline["status"] == "succeeded", pipeline["error"]
+    stages = {stage["stage"]: stage for stage in pipeline["stages"]}
+    assert {stage["status"] for stage in stages.values()} == {"succeeded"}
+    assert {stage["pipeline_id"] for stage in stages.values()} == {pipeline["id"]}
+
+    produced = Path(stages["annotate"]["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+    assert json.loads(produced.read_text().splitlines()[-1])["streamed"] is True
+    rescored = Path(stages["rescore"]["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+    records = [json.loads(line) for line in rescored.read_text().splitlines()]
+    assert [record["position"] for record in records] == [1, 2, 3, 4, 5, 6]
+    assert all(record["rescored"] for record in records)
+
+    loaded = client.get("/api/v1/annotations", params={"run_id": stages["rescore"]["id"]})
+    assert len(loaded.text.splitlines()) == 6
+
+
+def test_pipeline_marks_downstream_failed_when_producer_fails(
+    client: TestClient, tmp_path: Path
+) -> None:
+    _register(client, tmp_path, "producer", PRODUCER_SCRIPT, consumer=False)
+    _register(client, tmp_path, "rescorer", CONSUMER_SCRIPT, consumer=True)
+    response = client.post(
+        "/api/v1/pipelines/",
+        json={
+            "stages": [
+                {
+                    "id": "annotate",
+                    "plugin": "producer",
+                    "inputs": {"variants": _variants(tmp_path)},
+                    "parameters": {"fail": True},
+                },
+                {
+                    "id": "rescore",
+                    "plugin": "rescorer",
+                    "sources": {"annotations": {"stage": "annotate", "output": "annotations"}},
+                    "parameters": {"marker": str(tmp_path / "seen")},
+                },
+            ]
+        },
+    )
+    pipeline = _wait_for_pipeline(client, response.json()["id"])
+    assert pipeline["status"] == "failed"
+    stages = {stage["stage"]: stage for stage in pipeline["stages"]}
+    assert stages["annotate"]["exit_code"] == 3
+    assert stages["rescore"]["status"] == "failed"
+    assert "annotate" in stages["rescore"]["error"]
+
+
+def test_pipeline_rejects_invalid_graphs(client: TestClient, tmp_path: Path) -> None:
+    _register(client, tmp_path, "producer", PRODUCER_SCRIPT, consumer=False)
+    _register(client, tmp_path, "rescorer", CONSUMER_SCRIPT, consumer=True)
+    from_a = {"annotations": {"stage": "a", "output": "annotations"}}
+    from_b = {"annotations": {"stage": "b", "output": "annotations"}}
+
+    def post(stages: list[dict]):
+        return client.post("/api/v1/pipelines/", json={"stages": stages})
+
+    mismatch = post(
+        [
+            {"id": "a", "plugin": "producer", "inputs": {"variants": _variants(tmp_path)}},
+            {"id": "b", "plugin": "producer", "sources": {"variants": from_a["annotations"]}},
+        ]
+    )
+    assert mismatch.status_code == 422
+    assert "media type" in mismatch.json()["detail"]
+
+    cycle = post(
+        [
+            {"id": "a", "plugin": "rescorer", "sources": from_b},
+            {"id": "b", "plugin": "rescorer", "sources": from_a},
+        ]
+    )
+    assert cycle.status_code == 422
+    assert "cycle" in cycle.json()["detail"]
+
+    unknown = post([{"id": "a", "plugin": "rescorer", "sources": from_b}])
+    assert unknown.status_code == 422
+    assert post([{"id": "a", "plugin": "missing"}]).status_code == 422
+    assert client.get("/api/v1/pipelines/nope").status_code == 404
@@ -0,0 +1,153 @@
+"""Tests for bubble decomposition and variant-to-graph projection."""
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics.bubbles import BubbleIndex
+from app.genomics.gfa import handle, open_graph
+from app.genomics.path_index import PathPositionIndex
+from app.genomics.projection import VariantProjector
+from app.services import graph as graph_service
+from app.services import projection as projection_service
+
+pytestmark = pytest.mark.usefixtures("graph_env")
+
+# chr1 is the reference path. HG002 takes s3 instead of s2 and skips s6, and
+# HG003 walks the reference backwards.
+GFA = "\n".join(
+    [
+        "S\ts1\tACGT",
+        "S\ts2\tA",
+        "S\ts3\tTT",
+        "S\ts4\tGGCCA",
+        "S\ts5\tT",
+        "S\ts6\tC",
+        "S\ts7\tGATTACA",
+        "L\ts1\t+\ts2\t+\t0M",
+        "L\ts1\t+\ts3\t+\t0M",
+        "L\ts2\t+\ts4\t+\t0M",
+        "L\ts3\t+\ts4\t+\t0M",
+        "L\ts4\t+\ts5\t+\t0M",
+        "L\ts5\t+\ts6\t+\t0M",
+        "L\ts6\t+\ts7\t+\t0M",
+        "L\ts5\t+\ts7\t+\t0M",
+        "P\tchr1\ts1+,s2+,s4+,s5+,s6+,s7+\t*",
+        "W\tHG002\t1\tchr1\t0\t18\t>s1>s3>s4>s5>s7",
+        "W\tHG003\t1\tchr1\t0\t19\t<s7<s6<s5<s4<s2<s1",
+    ]
+)
+
+VCF = (
+    "##fileformat=VCFv4.2\n"
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS1\n"
+    "chr1\t2\tsnv\tC\tT\t50\tPASS\t.\tGT\t0/1\n"
+    "chr1\t5\tbranch\tA\tTT\t50\tPASS\t.\tGT\t0/1\n"
+    "chr1\t5\tnovel\tA\tG\t50\tPASS\t.\tGT\t0/1\n"
+    "chr1\t11\tskip\tTC\tT\t50\tPASS\t.\tGT\t1/1\n"
+    "chr2\t1\toffgraph\tA\tG\t50\tPASS\t.\tGT\t0/1\n"
+)
+
+
+@pytest.fixture()
+def gfa_path(tmp_path: Path) -> Path:
+    path = tmp_path / "bubbles.gfa"
+    path.write_text(GFA + "\n")
+    return path
+
+
+def test_bubbles_and_projection(gfa_path: Path, tmp_path: Path) -> None:
+    graph = open_graph(gfa_path, tmp_path / "cache")
+    path_index = PathPositionIndex.load_or_build(graph)
+    bubbles = BubbleIndex.load_or_build(graph, path_index)
+    s1, s2, s3, s4, s5, s6, s7 = (graph.segment_id(f"s{index}") for index in range(1, 8))
+
+    assert bubbles.bubble_count == 2
+    first, second = bubbles.bubble(0), bubbles.bubble(1)
+    assert (first.start, first.end, first.left, first.right) == (4, 5, handle(s1), handle(s4))
+    # The reversed HG003 walk is oriented like the reference and deduplicated.
+    assert [handles.tolist() for handles in first.traversals] == [[handle(s2)], [handle(s3)]]
+    assert (second.start, second.end) == (11, 12)
+    assert [handles.tolist() for handles in second.traversals] == [[handle(s6)], []]
+    assert [bubbles.node_bubble(node) for node in (s1, s2, s3, s4, s5, s6, s7)] == [
+        None, 0, 0, None, None, 1, None
+    ]
+    assert list(bubbles.overlapping("chr1", 0, 4)) == [0]
+    assert list(bubbles.overlapping("chr1", 6, 9)) == []
+
+    projector = VariantProjector(bubbles, path_index)
+    snv, branch, novel, skip, offgraph = projector.project(
+        ["chr1", "chr1", "chr1", "chr1", "chr2"],
+        [2, 5, 5, 11, 1],
+        ["C", "A", "A", "TC", "A"],
+        ["T", "TT", "G", "T", "G"],
+    )
+    assert (snv.ref_nodes, snv.bubble) == ([s1], None)
+    assert (branch.bubble, branch.traversal, branch.alt_handles) == (0, 1, [handle(s3)])
+    assert (novel.bubble, novel.alt_handles) == (0, None)
+    assert (skip.ref_nodes, skip.bubble, skip.alt_handles) == ([s5, s6], 1, [])
+    assert offgraph is None
+
+
+@pytest.fixture()
+def graph_settings() -> dict[str, str]:
+    # Several batches for the five test variants.
+    return {"PGIP_GRAPH_PROJECTION_BATCH_SIZE": "2"}
+
+
+def test_projection_endpoints(client: TestClient) -> None:
+    asset = client.post("/api/v1/assets/vcf", content=VCF.encode()).json()
+    assert client.get(f"/api/v1/assets/vcf/{asset['id']}/projection").status_code == 404
+
+    response = client.post(f"/api/v1/assets/vcf/{asset['id']}/projection")
+    assert response.status_code == 201, response.text
+    summary = response.json()
+    assert summary["status"] == "ready"
+    assert (
+        summary["variant_count"],
+        summary["placed_count"],
+        summary["bubble_count"],
+        summary["matched_count"],
+    ) == (5, 4, 3, 2)
+    # Projecting again replaces the earlier rows.
+    assert client.post(f"/api/v1/assets/vcf/{asset['id']}/projection").status_code == 201
+    assert client.get(f"/api/v1/assets/vcf/{asset['id']}/projection").json()["placed_count"] == 4
+
+    variants = client.get(
+        "/api/v1/variants", params={"region": "chr1:1-20", "asset_id": asset["id"]}
+    ).json()
+    ids = {variant["identifier"]: variant["id"] for variant in variants}
+
+    skip = client.get(f"/api/v1/variants/{ids['skip']}/graph").json()
+    assert skip["ref_nodes"] == ["s5", "s6"]
+    assert skip["alt_nodes"] == []
+    branch = client.get(f"/api/v1/variants/{ids['branch']}/graph").json()
+    assert (branch["path"], branch["traversal"], branch["alt_nodes"]) == ("chr1", 1, ["s3"])
+    assert client.get(f"/api/v1/variants/{ids['novel']}/graph").json()["alt_nodes"] is None
+    assert client.get(f"/api/v1/variants/{ids['snv']}/graph").json()["bubble_id"] is None
+
+    bubble_id = branch["bubble_id"]
+    bubble = client.get(f"/api/v1/graph/bubbles/{bubble_id}").json()
+    assert (bubble["path"], bubble["start"], bubble["end"]) == ("chr1", 4, 5)
+    assert bubble["left"] == {"node": "s1", "orientation": "+"}
+    assert [traversal["length"] for traversal in bubble["traversals"]] == [1, 2]
+    assert bubble["traversals"][0]["reference"] is True
+
+    in_bubble = client.get(f"/api/v1/graph/bubbles/{bubble_id}/variants").json()
+    assert [variant["identifier"] for variant in in_bubble] == ["branch", "novel"]
+
+    listing = client.get("/api/v1/graph/bubbles", params={"path": "chr1"}).json()
+    assert [item["id"] for item in listing["bubbles"]] == [0, 1]
+    assert client.get("/api/v1/graph/bubbles/99").status_code == 404
+    assert client.get("/api/v1/graph/bubbles", params={"path": "nope"}).status_code == 404
+
+
+def test_graph_key_depends_on_reference_sample(gfa_path: Path, tmp_path: Path) -> None:
+    try:
+        graph_service.configure_graph(gfa_path, tmp_path / "cache")
+        plain = projection_service.graph_key()
+        graph_service.configure_graph(gfa_path, tmp_path / "cache", reference_sample="HG002")
+        assert projection_service.graph_key() == f"{plain}:HG002"
+    finally:
+        graph_service.unload_graph()
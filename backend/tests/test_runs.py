@@ -0,0 +1,489 @@
+"""Tests for the plugin run runtime."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.db.models import Annotation, PluginRun
+from app.db.session import get_session_factory
+from app.models.plugin import PluginManifest
+from app.repositories import runs as run_repo
+from app.runtime.cache import InputHasher
+from app.runtime.resources import Resources, parse_cpu, parse_memory
+from app.runtime.scheduler import RunScheduler
+from app.services import runs as run_service
+from tests.test_health import _sample_manifest
+
+PLUGIN_SCRIPT = """
+import json, os, pathlib
+workspace = pathlib.Path(os.environ["PGIP_WORKSPACE"])
+params = json.loads(os.environ["PGIP_PARAMETERS"])
+records = (workspace / "input" / "variants").iterdir()
+lines = sum(len(path.read_text().splitlines()) for path in records)
+out = workspace / "output" / "annotations" / "annotations.jsonl"
+out.write_text(json.dumps({"run": os.environ["PGIP_RUN_ID"], "lines": lines, **params}) + "\\n")
+"""
+
+
+def test_parse_resource_quantities() -> None:
+    assert parse_cpu("500m") == 0.5
+    assert parse_cpu("2") == 2
+    assert parse_memory("4Gi") == 4 * 2**30
+    assert parse_memory("512M") == 512 * 10**6
+    with pytest.raises(ValueError):
+        parse_memory("lots")
+
+
+def test_scheduler_never_oversubscribes_capacity() -> None:
+    lock = threading.Lock()
+    active = {"cpu": 0.0, "peak": 0.0}
+
+    def job(cpu: float) -> float:
+        with lock:
+            active["cpu"] += cpu
+            active["peak"] = max(active["peak"], active["cpu"])
+        time.sleep(0.05)
+        with lock:
+            active["cpu"] -= cpu
+        return cpu
+
+    async def scenario() -> list[float]:
+        scheduler = RunScheduler(capacity=Resources(cpu=2, memory=4 * 2**30), max_workers=8)
+        scheduler.start()
+        jobs = [
+            scheduler.submit(job, cpu, resources=Resources(cpu=cpu, memory=2**30))
+            for cpu in (1.5, 1, 0.5, 1, 2)
+        ]
+        assert scheduler.queue_depth > 0
+        results = await asyncio.gather(*(item.result for item in jobs))
+        await scheduler.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [1.5, 1, 0.5, 1, 2]
+    assert active["peak"] <= 2
+
+
+def test_process_scheduler_does_not_fork_the_server() -> None:
+    async def scenario() -> str:
+        scheduler = RunScheduler(
+            capacity=Resources(cpu=1, memory=2**30), max_workers=1, pool_kind="process"
+        )
+        scheduler.start()
+        method = scheduler._pool._mp_context.get_start_method()
+        job = scheduler.submit(os.getpid, resources=Resources(cpu=1, memory=2**20))
+        try:
+            assert await job.result != os.getpid()
+        finally:
+            await scheduler.stop()
+        return method
+
+    assert asyncio.run(scenario()) in ("forkserver", "spawn")
+
+
+def _wait_for_run(client: TestClient, run_id: str) -> dict:
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        run = client.get(f"/api/v1/runs/{run_id}").json()
+        if run["status"] in ("succeeded", "failed"):
+            return run
+        time.sleep(0.05)
+    raise AssertionError(f"Run {run_id} did not finish")
+
+
+def test_plugin_run_lifecycle(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "plugin.py"
+    script.write_text(PLUGIN_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "1", "memory": "64Mi"}
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 201
+    assert client.get("/api/v1/plugins/").json()[0]["latest_run_at"] is None
+
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\nchr1\t2\t.\tC\tT\t.\t.\t.\n")
+    response = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs",
+        json={"inputs": {"variants": str(variants)}, "parameters": {"threshold": 0.01}},
+    )
+    assert response.status_code == 202
+    run = _wait_for_run(client, response.json()["id"])
+    assert run["status"] == "succeeded", run["error"]
+
+    output = Path(run["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+    assert '"lines": 2' in output.read_text()
+    assert '"threshold": 0.01' in output.read_text()
+
+    plugin = client.get("/api/v1/plugins/").json()[0]
+    assert plugin["latest_run_at"] is not None
+    # Re-registering the manifest must not touch the time of the last run.
+    manifest["description"] = "Updated description"
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 201
+    assert client.get("/api/v1/plugins/").json()[0]["latest_run_at"] == plugin["latest_run_at"]
+
+
+def test_run_errors_and_orphaned_runs_are_recorded_as_failed(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    manifest = _sample_manifest()
+    manifest["resources"] = {"cpu": "1", "memory": "64Mi"}
+    client.post("/api/v1/plugins/", json=manifest)
+
+    async def broken_job(*args, **kwargs):
+        raise RuntimeError("worker pool is shut down")
+
+    monkeypatch.setattr(run_service, "run_job", broken_job)
+    response = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs", json={"inputs": {"variants": __file__}}
+    )
+    run = _wait_for_run(client, response.json()["id"])
+    assert run["status"] == "failed"
+    assert "worker pool is shut down" in run["error"]
+
+    # A run whose worker stopped renewing its lease, and one this worker still owns.
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    async def scenario() -> int:
+        async with get_session_factory()() as session:
+            for run_id in ("orphan", "owned"):
+                session.add(
+                    PluginRun(
+                        id=run_id,
+                        plugin_name=manifest["name"],
+                        plugin_version=manifest["version"],
+                        status="running",
+                        workspace=str(tmp_path),
+                        cpu=1.0,
+                        memory=1,
+                        created_at=stale,
+                    )
+                )
+            await session.commit()
+        run_service._active_runs.add("owned")
+        try:
+            return await run_service.reconcile_runs(lease_seconds=60)
+        finally:
+            run_service._active_runs.discard("owned")
+
+    assert client.portal.call(scenario) == 1
+    orphan = client.get("/api/v1/runs/orphan").json()
+    assert (orphan["status"], orphan["error"]) == ("failed", run_service.ORPHANED_ERROR)
+    assert client.get("/api/v1/runs/owned").json()["status"] == "running"
+
+    # The worker that owned the orphan reconnects late: its outcome must not revive the run.
+    output = tmp_path / "output" / "annotations"
+    output.mkdir(parents=True)
+    (output / "annotations.jsonl").write_text('{"contig": "chr1", "position": 1}\n')
+
+    async def late_worker() -> tuple[bool, int]:
+        async with get_session_factory()() as session:
+            dispatched = await run_repo.mark_running(session, "orphan")
+        await run_service.finish_run(
+            "orphan",
+            PluginManifest.model_validate(manifest),
+            tmp_path,
+            exit_code=0,
+            error=None,
+            started=time.monotonic(),
+        )
+        async with get_session_factory()() as session:
+            loaded = await session.scalar(
+                select(func.count()).select_from(Annotation).where(Annotation.run_id == "orphan")
+            )
+        return dispatched, loaded
+
+    assert client.portal.call(late_worker) == (False, 0)
+    orphan = client.get("/api/v1/runs/orphan").json()
+    assert (orphan["status"], orphan["error"]) == ("failed", run_service.ORPHANED_ERROR)
+
+
+def test_heartbeat_expires_leases_only_after_a_full_connected_lease(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[bool] = []
+
+    async def reconcile(lease_seconds: float, *, expire: bool = True) -> int:
+        calls.append(expire)
+        if len(calls) == 2:
+            raise OSError("database unreachable")
+        if calls.count(True) >= 2:
+            raise asyncio.CancelledError
+        return 0
+
+    monkeypatch.setattr(run_service, "reconcile_runs", reconcile)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run_service._heartbeat(0.01))
+    # Never on the first beat, and not again right after the outage.
+    assert calls[:3] == [False, False, False]
+    assert calls[-2:] == [True, True]
+
+
+USAGE_SCRIPT = """
+import json, os, pathlib, time
+params = json.loads(os.environ["PGIP_PARAMETERS"])
+ballast = bytearray(params["megabytes"] * 2**20)
+deadline = time.process_time() + 0.2
+while time.process_time() < deadline:
+    pass
+out = pathlib.Path(os.environ["PGIP_WORKSPACE"]) / "output" / "annotations" / "annotations.jsonl"
+with out.open("w") as handle:
+    for position in range(1, params["records"] + 1):
+        handle.write(json.dumps({"contig": "chr1", "position": position}) + "\\n")
+"""
+
+
+def test_runs_record_resource_usage(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "plugin.py"
+    script.write_text(USAGE_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "500m", "memory": "256Mi"}
+    manifest["provenance"]["container_digest"] = "sha256:" + "ab" * 32
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 201
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\n")
+
+    runs = []
+    for records in (100, 300):
+        response = client.post(
+            f"/api/v1/plugins/{manifest['name']}/runs",
+            json={
+                "inputs": {"variants": str(variants)},
+                "parameters": {"megabytes": 64, "records": records},
+            },
+        )
+        runs.append(_wait_for_run(client, response.json()["id"]))
+    assert [run["status"] for run in runs] == ["succeeded", "succeeded"]
+
+    run = runs[1]
+    assert run["container_digest"] == manifest["provenance"]["container_digest"]
+    assert run["record_count"] == 300
+    assert run["cpu_seconds"] >= 0.2
+    assert run["wall_seconds"] >= run["cpu_seconds"] * 0.5
+    assert run["peak_rss_bytes"] >= 64 * 2**20
+    assert run["records_per_second"] == pytest.approx(300 / run["wall_seconds"])
+    if Path("/proc/self/io").exists():
+        output = Path(run["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+        assert run["write_bytes"] >= output.stat().st_size
+
+    usage = client.get(f"/api/v1/plugins/{manifest['name']}/usage").json()
+    assert len(usage) == 1
+    summary = usage[0]
+    assert summary["version"] == manifest["version"]
+    assert summary["container_digest"] == manifest["provenance"]["container_digest"]
+    assert summary["runs"] == 2
+    assert summary["records"] == 400
+    assert summary["max_peak_rss_bytes"] >= 64 * 2**20
+    total_wall = sum(run["wall_seconds"] for run in runs)
+    assert summary["records_per_second"] == pytest.approx(400 / total_wall)
+    assert client.get("/api/v1/plugins/missing/usage").status_code == 404
+
+
+def test_plugin_run_rejects_invalid_requests(client: TestClient) -> None:
+    manifest = _sample_manifest()
+    client.post("/api/v1/plugins/", json=manifest)
+
+    missing = client.post(f"/api/v1/plugins/{manifest['name']}/runs", json={"inputs": {}})
+    assert missing.status_code == 422
+
+    manifest["resources"] = {"cpu": "100000"}
+    manifest["version"] = "0.2.0"
+    client.post("/api/v1/plugins/", json=manifest)
+    oversized = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs",
+        json={"version": "0.2.0", "inputs": {"variants": __file__}},
+    )
+    assert oversized.status_code == 422
+
+
+SHARD_PLUGIN_SCRIPT = """
+import json, os, pathlib
+workspace = pathlib.Path(os.environ["PGIP_WORKSPACE"])
+out = workspace / "output" / "annotations" / "annotations.jsonl"
+with out.open("w") as handle:
+    for path in (workspace / "input" / "variants").iterdir():
+        for line in path.read_text().splitlines():
+            if line.startswith("#"):
+                continue
+            contig, position = line.split("\\t")[:2]
+            region = json.loads(os.environ["PGIP_PARAMETERS"])["region"]
+            handle.write(json.dumps({"contig": contig, "position": int(position), "region": region}) + "\\n")
+"""
+
+
+def test_sharded_run_merges_outputs_in_coordinate_order(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "shard_plugin.py"
+    script.write_text(SHARD_PLUGIN_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "500m", "memory": "64Mi"}
+    client.post("/api/v1/plugins/", json=manifest)
+
+    positions = [("chr2", 5), ("chr2", 150), ("chr1", 20), ("chr1", 250), ("chr1", 90), ("chr2", 310)]
+    variants = tmp_path / "cohort.vcf"
+    variants.write_text(
+        "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+        + "".join(f"{contig}\t{position}\t.\tA\tG\t.\t.\t.\n" for contig, position in positions)
+    )
+
+    response = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs",
+        json={
+            "inputs": {"variants": str(variants)},
+            "shard": {"input": "variants", "strategy": "window", "window_size": 100},
+        },
+    )
+    assert response.status_code == 202
+    run = _wait_for_run(client, response.json()["id"])
+    assert run["status"] == "succeeded", run["error"]
+    assert run["shard_count"] == 5
+    assert run["shards_completed"] == 5
+
+    merged = Path(run["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+    records = [json.loads(line) for line in merged.read_text().splitlines()]
+    assert [(record["contig"], record["position"]) for record in records] == [
+        ("chr2", 5), ("chr2", 150), ("chr2", 310), ("chr1", 20), ("chr1", 90), ("chr1", 250)
+    ]
+    assert records[0]["region"] == "chr2:1-100"
+
+
+def test_pinned_plugin_runs_are_served_from_cache(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "plugin.py"
+    script.write_text(PLUGIN_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "1", "memory": "64Mi"}
+    manifest["provenance"]["container_digest"] = "sha256:" + "ab" * 32
+    client.post("/api/v1/plugins/", json=manifest)
+
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\n")
+    body = {"inputs": {"variants": str(variants)}, "parameters": {"threshold": 0.5}}
+    url = f"/api/v1/plugins/{manifest['name']}/runs"
+
+    first = _wait_for_run(client, client.post(url, json=body).json()["id"])
+    second = _wait_for_run(client, client.post(url, json=body).json()["id"])
+    assert first["cache_hits"] == 0
+    assert second["status"] == "succeeded"
+    assert second["cache_hits"] == 1
+    cached = Path(second["workspace"]) / "output" / "annotations" / "annotations.jsonl"
+    assert '"lines": 1' in cached.read_text()
+
+    variants.write_text("chr1\t1\t.\tA\tG\t.\t.\t.\nchr1\t2\t.\tC\tT\t.\t.\t.\n")
+    third = _wait_for_run(client, client.post(url, json=body).json()["id"])
+    assert third["cache_hits"] == 0
+
+    stats = client.get("/api/v1/cache/stats").json()
+    assert stats["enabled"] is True
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+    assert stats["bytes_saved"] > 0
+
+
+def test_input_hasher_memo_is_bounded(tmp_path: Path) -> None:
+    hasher = InputHasher(max_entries=2)
+    paths = [tmp_path / f"input-{index}.txt" for index in range(3)]
+    for index, path in enumerate(paths):
+        path.write_text(f"payload {index}")
+        hasher.hash_path(path)
+    assert list(hasher._memo) == [str(path.resolve()) for path in paths[1:]]
+
+    # Rewriting a file replaces its entry instead of adding another.
+    paths[2].write_text("rewritten payload")
+    hasher.hash_path(paths[2])
+    assert len(hasher._memo) == 2
+
+
+STREAM_PLUGIN_SCRIPT = """
+import json, os, pathlib, sys, time
+release = pathlib.Path(json.loads(os.environ["PGIP_PARAMETERS"])["release"])
+for number, line in enumerate(sys.stdin, start=1):
+    contig, position = line.split("\\t")[:2]
+    sys.stdout.write(json.dumps({"contig": contig, "position": int(position), "n": number}) + "\\n")
+    sys.stdout.flush()
+    if number == 1:
+        deadline = time.monotonic() + 10
+        while not release.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+"""
+
+
+def test_stream_mode_loads_annotations_while_running(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "stream_plugin.py"
+    script.write_text(STREAM_PLUGIN_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "1", "memory": "64Mi"}
+    manifest["stream"] = {"input": "variants", "output": "missing"}
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 422
+    manifest["stream"] = {"input": "variants", "output": "annotations"}
+    assert client.post("/api/v1/plugins/", json=manifest).status_code == 201
+
+    variants = tmp_path / "slice.vcf"
+    variants.write_text("".join(f"chr1\t{position}\t.\tA\tG\t.\t.\t.\n" for position in (5, 6, 7)))
+    release = tmp_path / "release"
+    response = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs",
+        json={"inputs": {"variants": str(variants)}, "parameters": {"release": str(release)}},
+    )
+    run_id = response.json()["id"]
+
+    deadline = time.monotonic() + 10
+    while not client.get("/api/v1/annotations", params={"run_id": run_id}).text:
+        assert time.monotonic() < deadline, "first record was not loaded while the run was blocked"
+        time.sleep(0.02)
+    assert client.get(f"/api/v1/runs/{run_id}").json()["status"] == "running"
+    release.touch()
+
+    run = _wait_for_run(client, run_id)
+    assert run["status"] == "succeeded", run["error"]
+    assert run["started_at"] <= run["first_result_at"] <= run["finished_at"]
+    assert not (Path(run["workspace"]) / "input" / "variants").exists()
+    records = client.get("/api/v1/annotations", params={"run_id": run_id}).text.splitlines()
+    assert [json.loads(line)["payload"]["n"] for line in records] == [1, 2, 3]
+    assert run["record_count"] == 3
+
+
+SHARDED_STREAM_PLUGIN_SCRIPT = """
+import json, sys
+for line in sys.stdin:
+    if not line.startswith("#"):
+        contig, position = line.split("\\t")[:2]
+        sys.stdout.write(json.dumps({"contig": contig, "position": int(position)}) + "\\n")
+"""
+
+
+def test_sharded_stream_runs_load_every_shard(client: TestClient, tmp_path: Path) -> None:
+    script = tmp_path / "stream_plugin.py"
+    script.write_text(SHARDED_STREAM_PLUGIN_SCRIPT)
+    manifest = _sample_manifest()
+    manifest["entrypoint"] = f"{sys.executable} {script}"
+    manifest["resources"] = {"cpu": "500m", "memory": "64Mi"}
+    manifest["stream"] = {"input": "variants", "output": "annotations"}
+    client.post("/api/v1/plugins/", json=manifest)
+
+    variants = tmp_path / "cohort.vcf"
+    variants.write_text(
+        "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+        + "".join(f"chr1\t{position}\t.\tA\tG\t.\t.\t.\n" for position in (250, 20, 130))
+    )
+    response = client.post(
+        f"/api/v1/plugins/{manifest['name']}/runs",
+        json={
+            "inputs": {"variants": str(variants)},
+            "shard": {"input": "variants", "strategy": "window", "window_size": 100},
+        },
+    )
+    run = _wait_for_run(client, response.json()["id"])
+    assert run["status"] == "succeeded", run["error"]
+    assert (run["shard_count"], run["record_count"]) == (3, 3)
+    records = client.get("/api/v1/annotations", params={"run_id": run["id"]}).text.splitlines()
+    assert [json.loads(line)["position"] for line in records] == [20, 130, 250]
@@ -0,0 +1,75 @@
+"""Tests for genotype encoding and cohort statistics."""
+
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.genomics.genotypes import compute_statistics, encode_genotypes, genotype_matrix
+
+HEADER = "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS1\tS2\tS3\tS4\n"
+RECORDS = [
+    "chr1\t100\t.\tA\tG\t.\t.\t.\tGT:DP\t0/0:10\t0/1:12\t1|1:9\t./.:0",
+    "chr1\t200\t.\tC\tT\t.\t.\t.\tDP:GT\t8:0/1\t7:0/1\t9:0/1\t6:0/1",
+    "chr1\t300\t.\tG\tA,C\t.\t.\t.\tGT\t0/0\t0/0\t0/2\t1/2",
+]
+
+
+def test_encode_genotypes_handles_format_layouts() -> None:
+    assert list(np.frombuffer(encode_genotypes("GT:DP", ["0/0:1", "1|0:2", "./.:0", "1"]), np.int8)) == [
+        0, 1, -1, 2
+    ]
+    assert list(np.frombuffer(encode_genotypes("DP:GT", ["3:0/1", "4"]), np.int8)) == [1, -1]
+    assert encode_genotypes("DP", ["3"]) is None
+
+
+def test_compute_statistics_matches_closed_form() -> None:
+    matrix = genotype_matrix(
+        [np.array(row, dtype=np.int8).tobytes() for row in ([0, 1, 2, -1], [1, 1, 1, 1], [0, 0, 0, 0])],
+        sample_count=4,
+    )
+    stats = compute_statistics(matrix)
+
+    assert list(stats.called) == [3, 4, 4]
+    assert stats.call_rate[0] == pytest.approx(0.75)
+    assert stats.allele_frequency[0] == pytest.approx(0.5)
+    assert stats.heterozygosity[1] == pytest.approx(1.0)
+    # All heterozygous at p = 0.5: chi-square = 4 with one degree of freedom.
+    assert stats.hwe_p[1] == pytest.approx(math.erfc(math.sqrt(2.0)), rel=1e-6)
+    assert stats.hwe_p[2] == 1.0
+
+
+def test_vcf_statistics_endpoint(client: TestClient) -> None:
+    asset = client.post("/api/v1/assets/vcf", content=(HEADER + "\n".join(RECORDS) + "\n").encode()).json()
+
+    report = client.get(f"/api/v1/assets/vcf/{asset['id']}/stats").json()
+    assert report["sample_count"] == 4
+    assert report["variant_count"] == 3
+    first, second, third = report["variants"]
+    assert first["called"] == 3
+    assert first["allele_frequency"] == pytest.approx(0.5)
+    assert second["heterozygosity"] == 1.0
+    assert third["allele_frequency"] == pytest.approx(3 / 8)
+
+    subset = client.get(
+        f"/api/v1/assets/vcf/{asset['id']}/stats",
+        params={"region": "chr1:150-350", "samples": "S1,S2"},
+    ).json()
+    assert subset["sample_count"] == 2
+    assert [variant["position"] for variant in subset["variants"]] == [200, 300]
+    assert subset["variants"][1]["allele_frequency"] == 0.0
+
+    first_page = client.get(f"/api/v1/assets/vcf/{asset['id']}/stats", params={"limit": 2}).json()
+    assert [variant["position"] for variant in first_page["variants"]] == [100, 200]
+    assert first_page["next_after"] == first_page["variants"][-1]["id"]
+    rest = client.get(
+        f"/api/v1/assets/vcf/{asset['id']}/stats",
+        params={"limit": 2, "after": first_page["next_after"]},
+    ).json()
+    assert [variant["position"] for variant in rest["variants"]] == [300]
+    assert rest["next_after"] is None
+
+    unknown = client.get(f"/api/v1/assets/vcf/{asset['id']}/stats", params={"samples": "S9"})
+    assert unknown.status_code == 422
+    assert client.get("/api/v1/assets/vcf/999/stats").status_code == 404
@@ -0,0 +1,62 @@
+"""Tests for region queries over ingested variants."""
+
+from fastapi.testclient import TestClient
+
+from app.genomics.intervals import (
+    MAX_POSITION,
+    interval_to_bin,
+    parse_region,
+    region_to_bin_ranges,
+    region_to_bins,
+)
+from app.repositories.variants import region_statement
+
+VCF = (
+    "##fileformat=VCFv4.2\n"
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+    "chr1\t99000\tdel1\tA\t<DEL>\t.\tPASS\tSVTYPE=DEL;END=150000\n"
+    "chr1\t100500\tsnv1\tC\tT\t.\tPASS\t.\n"
+    "chr1\t199999\tsnv2\tG\tA\t.\tPASS\t.\n"
+    "chr1\t250000\tsnv3\tG\tA\t.\tPASS\t.\n"
+    "chr2\t150000\tsnv4\tT\tC\t.\tPASS\t.\n"
+)
+
+
+def test_region_bins_cover_overlapping_intervals() -> None:
+    query_bins = set(region_to_bins(100_000, 200_000))
+    assert interval_to_bin(99_000, 150_000) in query_bins
+    assert interval_to_bin(150_000, 150_000) in query_bins
+    assert interval_to_bin(5_000_000, 5_000_000) not in query_bins
+    ranges = region_to_bin_ranges(100_000, 200_000)
+    assert query_bins == {bin for first, last in ranges for bin in range(first, last + 1)}
+
+
+def test_parse_region() -> None:
+    assert parse_region("chr1:100,000-200,000") == ("chr1", 100_000, 200_000)
+    assert parse_region("chrX").start == 1
+
+
+def test_region_query_returns_overlapping_variants(client: TestClient) -> None:
+    asset = client.post("/api/v1/assets/vcf", content=VCF.encode()).json()
+
+    response = client.get(
+        "/api/v1/variants", params={"region": "chr1:100000-200000", "asset_id": asset["id"]}
+    )
+    assert response.status_code == 200
+    assert [record["identifier"] for record in response.json()] == ["del1", "snv1", "snv2"]
+
+    invalid = client.get("/api/v1/variants", params={"region": "chr1:200-100"})
+    assert invalid.status_code == 422
+
+
+def test_whole_contig_query_binds_one_range_per_level(client: TestClient) -> None:
+    region = parse_region("chr1")
+    assert region.end == MAX_POSITION
+    assert len(region_to_bins(region.start, region.end)) > 32_767
+    params = region_statement(region).compile().params
+    assert len(params) == 1 + 2 * 6 + 2
+
+    asset = client.post("/api/v1/assets/vcf", content=VCF.encode()).json()
+    response = client.get("/api/v1/variants", params={"region": "chr1", "asset_id": asset["id"]})
+    assert response.status_code == 200
+    assert [record["identifier"] for record in response.json()] == ["del1", "snv1", "snv2", "snv3"]
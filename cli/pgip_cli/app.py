@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -25,6 +26,22 @@ class PluginSummary(BaseModel):
     latest_run_at: Optional[str] = None
 
 
+class PluginVersionUsage(BaseModel):
+    version: str
+    container_digest: Optional[str] = None
+    runs: int
+    mean_wall_seconds: float
+    mean_cpu_seconds: float
+    mean_cores: float
+    mean_peak_rss_bytes: int
+    max_peak_rss_bytes: int
+    mean_read_bytes: Optional[int] = None
+    mean_write_bytes: Optional[int] = None
+    records: int
+    records_per_second: float
+    last_run_at: Optional[str] = None
+
+
 class PluginManifest(BaseModel):
     name: str
     version: str
@@ -38,6 +55,7 @@ class PluginManifest(BaseModel):
     tags: list[str] = []
     provenance: dict
     resources: Optional[dict] = None
+    stream: Optional[dict] = None
 
 
 def _client(base_url: str) -> httpx.Client:
@@ -51,24 +69,54 @@ def _get_base_url(api_url: Optional[str]) -> str:
 app = typer.Typer(help="Interact with the PanGenome Insight Platform backend.")
 plugins_app = typer.Typer(help="Manage annotation plugins.")
 app.add_typer(plugins_app, name="plugins")
+annotations_app = typer.Typer(help="Query plugin annotation results.")
+app.add_typer(annotations_app, name="annotations")
 
 
 @plugins_app.command("list")
-def list_plugins(api_url: Optional[str] = typer.Option(None, help="Override backend API URL")) -> None:
-    """List available plugins."""
+def list_plugins(
+    tag: Optional[str] = typer.Option(None, help="Only plugins carrying this tag"),
+    author: Optional[str] = typer.Option(None, help="Only plugins by this author"),
+    input_type: Optional[str] = typer.Option(None, help="Only plugins accepting this media type"),
+    output_type: Optional[str] = typer.Option(None, help="Only plugins producing this media type"),
+    search: Optional[str] = typer.Option(
+        None, "--search", "-q", help="Words to match in name and description"
+    ),
+    page_size: int = typer.Option(500, min=1, max=1000, help="Plugins fetched per request"),
+    api_url: Optional[str] = typer.Option(None, help="Override backend API URL"),
+) -> None:
+    """List available plugins, following pagination cursors until every match is fetched."""
+
+    params = {
+        key: value
+        for key, value in {
+            "tag": tag,
+            "author": author,
+            "input_media_type": input_type,
+            "output_media_type": output_type,
+            "q": search,
+            "limit": page_size,
+        }.items()
+        if value
+    }
 
     base_url = _get_base_url(api_url)
+    payload: list[PluginSummary] = []
     with _client(base_url) as client:
-        response = client.get("/api/v1/plugins/")
-    if response.status_code != 200:
-        console.print(f"[red]Error:[/] {response.text}")
-        raise typer.Exit(code=1)
-
-    try:
-        payload = [PluginSummary.model_validate(item) for item in response.json()]
-    except ValidationError as exc:
-        console.print(f"[red]Failed to parse response:[/] {exc}")
-        raise typer.Exit(code=1) from exc
+        while True:
+            response = client.get("/api/v1/plugins/", params=params)
+            if response.status_code != 200:
+                console.print(f"[red]Error:[/] {response.text}")
+                raise typer.Exit(code=1)
+            try:
+                payload.extend(PluginSummary.model_validate(item) for item in response.json())
+            except ValidationError as exc:
+                console.print(f"[red]Failed to parse response:[/] {exc}")
+                raise typer.Exit(code=1) from exc
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
 
     table = Table(title="PGIP Plugins")
     table.add_column("Name", style="cyan", no_wrap=True)
@@ -90,13 +138,14 @@ def show_plugin(
     api_url: Optional[str] = typer.Option(None, help="Override backend API URL"),
     output: Optional[Path] = typer.Option(None, help="Write manifest JSON to file"),
 ) -> None:
-    """Show manifest details for a plugin."""
+    """Show manifest details for a plugin and the measured usage of its runs."""
 
     base_url = _get_base_url(api_url)
     params = {"version": version} if version else None
 
     with _client(base_url) as client:
         response = client.get(f"/api/v1/plugins/{name}", params=params)
+        usage_response = None if output else client.get(f"/api/v1/plugins/{name}/usage")
 
     if response.status_code != 200:
         console.print(f"[red]Error:[/] {response.text}")
@@ -114,20 +163,135 @@ def show_plugin(
         return
 
     console.print_json(data=manifest.model_dump(mode="json"))
+    if usage_response is None or usage_response.status_code != 200:
+        return
+    try:
+        usage = [PluginVersionUsage.model_validate(item) for item in usage_response.json()]
+    except ValidationError as exc:
+        console.print(f"[red]Failed to parse run statistics:[/] {exc}")
+        raise typer.Exit(code=1) from exc
+    _print_usage([item for item in usage if version is None or item.version == version])
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    size = float(value)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _print_usage(usage: list[PluginVersionUsage]) -> None:
+    if not usage:
+        console.print("No measured runs yet.")
+        return
+
+    table = Table(title="Run statistics (successful runs)")
+    table.add_column("Version", style="magenta")
+    table.add_column("Digest", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Wall (mean)", justify="right")
+    table.add_column("CPU (mean)", justify="right")
+    table.add_column("Cores", justify="right")
+    table.add_column("Peak RSS (max)", justify="right")
+    table.add_column("Read / write (mean)", justify="right")
+    table.add_column("Records/s", justify="right", style="green")
+
+    for item in usage:
+        digest = item.container_digest.split(":")[-1][:12] if item.container_digest else "-"
+        table.add_row(
+            item.version,
+            digest,
+            str(item.runs),
+            f"{item.mean_wall_seconds:.2f}s",
+            f"{item.mean_cpu_seconds:.2f}s",
+            f"{item.mean_cores:.2f}",
+            _format_bytes(item.max_peak_rss_bytes),
+            f"{_format_bytes(item.mean_read_bytes)} / {_format_bytes(item.mean_write_bytes)}",
+            f"{item.records_per_second:,.0f}",
+        )
+
+    console.print(table)
+
+
+def _load_manifest(path: Path) -> PluginManifest:
+    return PluginManifest.model_validate(json.loads(path.read_text()))
+
+
+async def _register_batches(
+    base_url: str, batches: list[list[dict]], concurrency: int
+) -> list[httpx.Response]:
+    """POST up to ``concurrency`` manifest batches at a time.
+
+    The backend (uvicorn) speaks HTTP/1.1 only, so each in-flight batch needs
+    its own connection. HTTP/2 is still offered, and a proxy that speaks it
+    multiplexes the batches over fewer connections.
+    """
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, http2=True, limits=limits, timeout=60.0) as client:
+
+        async def send(batch: list[dict]) -> httpx.Response:
+            async with semaphore:
+                return await client.post("/api/v1/plugins:batch", json=batch)
+
+        return await asyncio.gather(*(send(batch) for batch in batches))
+
+
+def _register_directory(directory: Path, base_url: str, batch_size: int, concurrency: int) -> None:
+    manifests: list[PluginManifest] = []
+    failures = 0
+    for path in sorted(directory.glob("*.json")):
+        try:
+            manifests.append(_load_manifest(path))
+        except (json.JSONDecodeError, ValidationError) as exc:
+            console.print(f"[red]Invalid manifest {path.name}:[/] {exc}")
+            failures += 1
+    if failures:
+        raise typer.Exit(code=1)
+    if not manifests:
+        console.print(f"[yellow]No manifests found in {directory}[/]")
+        return
+
+    payload = [manifest.model_dump(mode="json") for manifest in manifests]
+    batches = [payload[index : index + batch_size] for index in range(0, len(payload), batch_size)]
+    responses = asyncio.run(_register_batches(base_url, batches, concurrency))
+
+    registered = 0
+    for response in responses:
+        if response.status_code != 200:
+            console.print(f"[red]Error:[/] {response.text}")
+            failures += 1
+        else:
+            registered += len(response.json())
+    console.print(f"[green]Registered {registered} plugin versions from {directory}[/]")
+    if failures:
+        raise typer.Exit(code=1)
 
 
 @plugins_app.command("register")
 def register_plugin(
-    manifest_path: Path = typer.Argument(..., exists=True, readable=True, help="Path to manifest JSON"),
+    manifest_path: Path = typer.Argument(
+        ..., exists=True, readable=True, help="Path to a manifest JSON file or a directory of them"
+    ),
     api_url: Optional[str] = typer.Option(None, help="Override backend API URL"),
+    batch_size: int = typer.Option(100, min=1, help="Manifests per request in directory mode"),
+    concurrency: int = typer.Option(8, min=1, help="Concurrent requests in directory mode"),
 ) -> None:
-    """Register or update a plugin manifest from a JSON file."""
+    """Register or update a plugin manifest from a JSON file, or every manifest in a directory."""
 
     base_url = _get_base_url(api_url)
 
+    if manifest_path.is_dir():
+        _register_directory(manifest_path, base_url, batch_size, concurrency)
+        return
+
     try:
-        manifest_data = json.loads(manifest_path.read_text())
-        manifest = PluginManifest.model_validate(manifest_data)
+        manifest = _load_manifest(manifest_path)
     except (json.JSONDecodeError, ValidationError) as exc:
         console.print(f"[red]Invalid manifest:[/] {exc}")
         raise typer.Exit(code=1) from exc
@@ -140,3 +304,43 @@ def register_plugin(
         raise typer.Exit(code=1)
 
     console.print(f"[green]Registered plugin {manifest.name} v{manifest.version}[/]")
+
+
+@annotations_app.command("export")
+def export_annotations(
+    output: Path = typer.Argument(..., help="Destination file (.arrow or .parquet)"),
+    plugin: Optional[str] = typer.Option(None, help="Restrict to one plugin"),
+    region: Optional[str] = typer.Option(None, help="Region in contig:start-end notation"),
+    columns: Optional[str] = typer.Option(None, help="Comma-separated columns to export"),
+    format: Optional[str] = typer.Option(
+        None, help="arrow or parquet; inferred from the output suffix when omitted"
+    ),
+    api_url: Optional[str] = typer.Option(None, help="Override backend API URL"),
+) -> None:
+    """Export annotations from the columnar store to an Arrow or Parquet file."""
+
+    export_format = format or ("parquet" if output.suffix == ".parquet" else "arrow")
+    params = {
+        key: value
+        for key, value in {
+            "plugin": plugin,
+            "region": region,
+            "columns": columns,
+            "format": export_format,
+        }.items()
+        if value
+    }
+
+    base_url = _get_base_url(api_url)
+    written = 0
+    with _client(base_url) as client:
+        with client.stream("GET", "/api/v1/annotations/export", params=params, timeout=None) as response:
+            if response.status_code != 200:
+                console.print(f"[red]Error:[/] {response.read().decode()}")
+                raise typer.Exit(code=1)
+            with output.open("wb") as handle:
+                for chunk in response.iter_bytes():
+                    handle.write(chunk)
+                    written += len(chunk)
+
+    console.print(f"[green]Wrote {written:,} bytes of {export_format} to {output}[/]")